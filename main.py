@@ -19,6 +19,7 @@ from src.ui.bulk_add import bulk_add_page
 from src.ui.scan import scan_page
 from src.ui.db_editor import db_editor_page
 from src.ui.storage import storage_page
+from src.services.image_routes import add_image_files, IMMUTABLE, REVALIDATE
 
 @ui.page('/')
 def home():
@@ -61,11 +62,16 @@ os.makedirs('data/images', exist_ok=True)
 os.makedirs('data/img', exist_ok=True)
 os.makedirs('data/collections/storage', exist_ok=True)
 os.makedirs('data/flags', exist_ok=True)
-app.add_static_files('/images', 'data/images')
+os.makedirs('data/sprites', exist_ok=True)
+# Card images are addressed by image id and flags by country code, so they never change
+add_image_files(app, '/images', 'data/images', IMMUTABLE)
 app.add_static_files('/data/img', 'data/img') # Serve data/img for Art Match if used
-app.add_static_files('/sets', 'data/sets')
-app.add_static_files('/storage', 'data/collections/storage')
-app.add_static_files('/flags', 'data/flags')
+# Set images can be replaced; their URLs carry a version (see ImageManager.get_set_image_url)
+add_image_files(app, '/sets', 'data/sets', REVALIDATE)
+add_image_files(app, '/storage', 'data/collections/storage', REVALIDATE)
+add_image_files(app, '/flags', 'data/flags', IMMUTABLE)
+# Sprite sheets are named by the ids of the images they contain
+add_image_files(app, '/sprites', 'data/sprites', IMMUTABLE)
 app.add_static_files('/debug', 'debug')
 
 # Handle Chrome DevTools probe to prevent 404 warnings
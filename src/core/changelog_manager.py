@@ -1,17 +1,47 @@
 import os
+import re
+import gzip
 import json
 import time
+import struct
 import logging
-from typing import Dict, Any, Optional, List, Union
+from typing import Dict, Any, Iterator, Optional, List, Union
 
 logger = logging.getLogger(__name__)
 
 CHANGELOGS_DIR = os.path.join("data", "changelogs")
 
+# The active segment is rolled over to "<name>.log.<n>" once it reaches this size.
+SEGMENT_MAX_BYTES = 1024 * 1024
+
+# A compact snapshot of the collection is kept every this many records (see maybe_checkpoint).
+CHECKPOINT_INTERVAL = 100
+
+# Each index file is a flat array of record start offsets in its segment.
+_OFFSET = struct.Struct('<Q')
+
 class ChangelogManager:
-    def __init__(self, data_dir: str = CHANGELOGS_DIR):
+    """
+    Append-only changelog per collection file.
+
+    Records are JSON lines in "<name>.log" (the active segment). Next to every segment
+    lives an ".idx" file with the byte offset of each record, and "<name>.log.meta"
+    holds the id counter and the list of rolled segments. Appending, reading the last
+    record and undoing it therefore only touch the tail of the files, independent of
+    how long the history is.
+
+    Checkpoints ("<name>.log.ckpt.<id>", gzipped JSON) snapshot the collection as of
+    record <id>, so a past state can be rebuilt by replaying only the records after
+    the nearest checkpoint (see collection_history.reconstruct).
+    """
+    def __init__(self, data_dir: str = CHANGELOGS_DIR, segment_max_bytes: int = SEGMENT_MAX_BYTES,
+                 checkpoint_interval: int = CHECKPOINT_INTERVAL):
         self.data_dir = data_dir
+        self.segment_max_bytes = segment_max_bytes
+        self.checkpoint_interval = checkpoint_interval
         os.makedirs(self.data_dir, exist_ok=True)
+        # Validated meta per log file; the index is checked once per process
+        self._meta: Dict[str, Dict[str, Any]] = {}
 
     def _get_filepath(self, collection_name: str) -> str:
         # Sanitize name to avoid path traversal
@@ -48,22 +78,25 @@ class ChangelogManager:
         filepath = self._get_filepath(collection_name)
         timestamp = time.time()
 
-        # Calculate ID based on existing lines
-        current_id = 0
-        if os.path.exists(filepath):
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    current_id = sum(1 for _ in f)
-            except Exception:
-                pass
+        try:
+            meta = self._load_meta(filepath)
 
-        new_id = current_id + 1
-        entry_data['id'] = new_id
-        entry_data['timestamp'] = timestamp
+            if _file_size(filepath) >= self.segment_max_bytes:
+                self._roll_segment(filepath, meta)
 
-        try:
-            with open(filepath, 'a', encoding='utf-8') as f:
-                f.write(json.dumps(entry_data) + "\n")
+            new_id = meta['last_id'] + 1
+            entry_data['id'] = new_id
+            entry_data['timestamp'] = timestamp
+
+            with open(filepath, 'ab') as f:
+                f.seek(0, os.SEEK_END)
+                offset = f.tell()
+                f.write((json.dumps(entry_data) + "\n").encode('utf-8'))
+            with open(_index_path(filepath), 'ab') as f:
+                f.write(_OFFSET.pack(offset))
+
+            meta['last_id'] = new_id
+            self._save_meta(filepath, meta)
 
             if entry_data.get('type') == 'batch':
                 logger.info(f"Logged batch change for {collection_name}: {entry_data.get('description')}")
@@ -74,10 +107,16 @@ class ChangelogManager:
 
     def get_last_change(self, collection_name: str) -> Optional[Dict[str, Any]]:
         """Returns the last change for a collection, or None if empty."""
-        history = self.load_history(collection_name)
-        if history:
-            return history[-1]
-        return None
+        filepath = self._get_filepath(collection_name)
+        try:
+            self._load_meta(filepath)
+            offset = _last_offset(filepath)
+            if offset is None:
+                return None
+            return _read_record(filepath, offset)
+        except Exception as e:
+            logger.error(f"Error reading last change for {collection_name}: {e}")
+            return None
 
     def load_history(self, collection_name: str) -> List[Dict[str, Any]]:
         filepath = self._get_filepath(collection_name)
@@ -86,10 +125,13 @@ class ChangelogManager:
 
         history = []
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                for line in f:
-                    if line.strip():
-                        history.append(json.loads(line))
+            meta = self._load_meta(filepath)
+            paths = [_segment_path(filepath, seq) for seq in meta['segments']] + [filepath]
+            for path in paths:
+                with open(path, 'r', encoding='utf-8') as f:
+                    for line in f:
+                        if line.strip():
+                            history.append(json.loads(line))
         except Exception as e:
             logger.error(f"Error loading history for {collection_name}: {e}")
 
@@ -99,22 +141,292 @@ class ChangelogManager:
         """
         Removes the last entry from the log and returns it.
         """
-        history = self.load_history(collection_name)
-        if not history:
+        filepath = self._get_filepath(collection_name)
+        try:
+            meta = self._load_meta(filepath)
+            offset = _last_offset(filepath)
+            if offset is None:
+                return None
+
+            last_item = _read_record(filepath, offset)
+
+            with open(filepath, 'r+b') as f:
+                f.truncate(offset)
+            index_path = _index_path(filepath)
+            with open(index_path, 'r+b') as f:
+                f.truncate(_file_size(index_path) - _OFFSET.size)
+
+            if offset == 0 and meta['segments']:
+                self._restore_segment(filepath, meta)
+
+            # Undone records never happened; drop snapshots that include them
+            stale = [c for c in meta['checkpoints'] if c[0] >= last_item.get('id', 0)]
+            if stale:
+                for ckpt_id, _ in stale:
+                    _remove_file(_checkpoint_path(filepath, ckpt_id))
+                meta['checkpoints'] = [c for c in meta['checkpoints'] if c not in stale]
+                self._save_meta(filepath, meta)
+        except Exception as e:
+            logger.error(f"Error rewriting history for {collection_name}: {e}")
             return None
 
-        last_item = history.pop()
+        return last_item
 
-        # Rewrite file
+    def iter_changes(self, collection_name: str, after_id: int = 0, until: Optional[float] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the records with an id above after_id (and a timestamp up to until), oldest first.
+        Segments that end at or before after_id are skipped without being read.
+        """
+        filepath = self._get_filepath(collection_name)
+        if not os.path.exists(filepath):
+            return
+
+        meta = self._load_meta(filepath)
+        paths = [_segment_path(filepath, seq) for seq in meta['segments']] + [filepath]
+        for path in paths:
+            offset = _last_offset(path)
+            if offset is None or _read_record(path, offset).get('id', 0) <= after_id:
+                continue
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    if record.get('id', 0) <= after_id:
+                        continue
+                    if until is not None and record.get('timestamp', 0) > until:
+                        return
+                    yield record
+
+    def maybe_checkpoint(self, collection_name: str, data: Dict[str, Any]) -> bool:
+        """
+        Snapshots data (a dumped Collection) if no checkpoint exists yet or checkpoint_interval
+        records were logged since the last one. data must reflect every logged record.
+        """
         filepath = self._get_filepath(collection_name)
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                for item in history:
-                    f.write(json.dumps(item) + "\n")
+            meta = self._load_meta(filepath)
+            tail_id = self._tail_id(filepath)
+            if meta['checkpoints']:
+                last_ckpt_id = meta['checkpoints'][-1][0]
+                if tail_id - last_ckpt_id < self.checkpoint_interval:
+                    return False
+            self.write_checkpoint(collection_name, data)
+            return True
         except Exception as e:
-            logger.error(f"Error rewriting history for {collection_name}: {e}")
+            logger.error(f"Failed to checkpoint {collection_name}: {e}")
+            return False
+
+    def write_checkpoint(self, collection_name: str, data: Dict[str, Any]):
+        """Stores data (a dumped Collection) as the state after the current last record."""
+        filepath = self._get_filepath(collection_name)
+        meta = self._load_meta(filepath)
+        ckpt_id = self._tail_id(filepath)
+        timestamp = time.time()
+
+        path = _checkpoint_path(filepath, ckpt_id)
+        tmp_path = path + ".tmp"
+        with gzip.open(tmp_path, 'wt', encoding='utf-8') as f:
+            json.dump({'id': ckpt_id, 'timestamp': timestamp, 'collection': data}, f, separators=(',', ':'))
+        os.replace(tmp_path, path)
+
+        meta['checkpoints'] = [c for c in meta['checkpoints'] if c[0] != ckpt_id] + [[ckpt_id, timestamp]]
+        self._save_meta(filepath, meta)
+        logger.info(f"Wrote changelog checkpoint for {collection_name} at record {ckpt_id}")
+
+    def load_checkpoint(self, collection_name: str, timestamp: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Returns the newest checkpoint taken at or before timestamp (or the newest overall)
+        as {'id', 'timestamp', 'collection'}, or None.
+        """
+        filepath = self._get_filepath(collection_name)
+        meta = self._load_meta(filepath)
+        candidates = [c for c in meta['checkpoints'] if timestamp is None or c[1] <= timestamp]
+        if not candidates:
             return None
 
-        return last_item
+        ckpt_id = max(candidates, key=lambda c: c[1])[0]
+        with gzip.open(_checkpoint_path(filepath, ckpt_id), 'rt', encoding='utf-8') as f:
+            return json.load(f)
+
+    def _tail_id(self, filepath: str) -> int:
+        offset = _last_offset(filepath)
+        if offset is None:
+            return 0
+        return int(_read_record(filepath, offset).get('id', 0))
+
+    def _load_meta(self, filepath: str) -> Dict[str, Any]:
+        """
+        Returns the meta for a log file. On first access per process the active index is
+        verified against the log (and rebuilt if it is missing or stale, e.g. for logs
+        written before indexes existed or after an interrupted write).
+        """
+        meta = self._meta.get(filepath)
+        if meta is not None:
+            return meta
+
+        meta = {'last_id': 0, 'segments': [], 'checkpoints': []}
+        meta_path = _meta_path(filepath)
+        if os.path.exists(meta_path):
+            try:
+                with open(meta_path, 'r', encoding='utf-8') as f:
+                    stored = json.load(f)
+                meta['last_id'] = int(stored.get('last_id', 0))
+                meta['segments'] = [int(s) for s in stored.get('segments', [])]
+                meta['checkpoints'] = [[int(c[0]), float(c[1])] for c in stored.get('checkpoints', [])]
+            except Exception as e:
+                logger.warning(f"Changelog meta {meta_path} is unreadable, rebuilding: {e}")
+                meta['segments'] = self._scan_segments(filepath)
+                meta['checkpoints'] = self._scan_checkpoints(filepath)
+        else:
+            meta['segments'] = self._scan_segments(filepath)
+            meta['checkpoints'] = self._scan_checkpoints(filepath)
+
+        meta['segments'] = [s for s in meta['segments'] if os.path.exists(_segment_path(filepath, s))]
+        meta['checkpoints'] = [c for c in meta['checkpoints'] if os.path.exists(_checkpoint_path(filepath, c[0]))]
+        _ensure_index(filepath)
+        if _file_size(filepath) == 0 and meta['segments']:
+            self._restore_segment(filepath, meta)
+
+        # Never hand out an id below one already on disk
+        offset = _last_offset(filepath)
+        if offset is not None:
+            last = _read_record(filepath, offset)
+            meta['last_id'] = max(meta['last_id'], int(last.get('id', 0)))
+
+        self._meta[filepath] = meta
+        self._save_meta(filepath, meta)
+        return meta
+
+    def _save_meta(self, filepath: str, meta: Dict[str, Any]):
+        meta_path = _meta_path(filepath)
+        tmp_path = meta_path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(tmp_path, meta_path)
+
+    def _scan_segments(self, filepath: str) -> List[int]:
+        base = os.path.basename(filepath)
+        pattern = re.compile(re.escape(base) + r"\.(\d+)$")
+        segments = []
+        for name in os.listdir(self.data_dir):
+            m = pattern.match(name)
+            if m:
+                segments.append(int(m.group(1)))
+        return sorted(segments)
+
+    def _scan_checkpoints(self, filepath: str) -> List[List[Any]]:
+        """Recovers the checkpoint list from disk, using file mtimes as timestamps."""
+        base = os.path.basename(filepath)
+        pattern = re.compile(re.escape(base) + r"\.ckpt\.(\d+)$")
+        checkpoints = []
+        for name in os.listdir(self.data_dir):
+            m = pattern.match(name)
+            if m:
+                checkpoints.append([int(m.group(1)), os.path.getmtime(os.path.join(self.data_dir, name))])
+        return sorted(checkpoints)
+
+    def _roll_segment(self, filepath: str, meta: Dict[str, Any]):
+        seq = meta['segments'][-1] + 1 if meta['segments'] else 1
+        seg_path = _segment_path(filepath, seq)
+        os.replace(filepath, seg_path)
+        os.replace(_index_path(filepath), _index_path(seg_path))
+        meta['segments'].append(seq)
+        self._save_meta(filepath, meta)
+        logger.info(f"Rolled changelog {os.path.basename(filepath)} over to segment {seq}")
+
+    def _restore_segment(self, filepath: str, meta: Dict[str, Any]):
+        """Makes the newest rolled segment active again once the active one is empty."""
+        seq = meta['segments'].pop()
+        seg_path = _segment_path(filepath, seq)
+        os.replace(seg_path, filepath)
+        if os.path.exists(_index_path(seg_path)):
+            os.replace(_index_path(seg_path), _index_path(filepath))
+        _ensure_index(filepath)
+        self._save_meta(filepath, meta)
+
+def _segment_path(filepath: str, seq: int) -> str:
+    return f"{filepath}.{seq}"
+
+def _checkpoint_path(filepath: str, ckpt_id: int) -> str:
+    return f"{filepath}.ckpt.{ckpt_id}"
+
+def _index_path(path: str) -> str:
+    return path + ".idx"
+
+def _meta_path(filepath: str) -> str:
+    return filepath + ".meta"
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+def _remove_file(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+def _last_offset(path: str) -> Optional[int]:
+    """Offset of the last record in a segment, from its index."""
+    index_path = _index_path(path)
+    if _file_size(index_path) < _OFFSET.size:
+        return None
+    with open(index_path, 'rb') as f:
+        f.seek(-_OFFSET.size, os.SEEK_END)
+        return _OFFSET.unpack(f.read(_OFFSET.size))[0]
+
+def _read_record(path: str, offset: int) -> Dict[str, Any]:
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return json.loads(f.read().decode('utf-8'))
+
+def _ensure_index(path: str):
+    """Rebuilds the index of a segment unless its last offset points at the last record."""
+    size = _file_size(path)
+    index_size = _file_size(_index_path(path))
+
+    if index_size % _OFFSET.size == 0:
+        if size == 0 and index_size == 0:
+            return
+        offset = _last_offset(path)
+        if offset is not None and offset < size:
+            try:
+                _read_record(path, offset)
+                return
+            except ValueError:
+                pass
+
+    _rebuild_index(path)
+
+def _rebuild_index(path: str):
+    offsets = []
+    valid_end = 0
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            pos = 0
+            for line in f:
+                if line.strip():
+                    try:
+                        json.loads(line.decode('utf-8'))
+                    except ValueError:
+                        # Torn write at the end of the log; everything after it is dropped
+                        logger.warning(f"Dropping unreadable changelog tail in {path} at byte {pos}")
+                        break
+                    offsets.append(pos)
+                pos += len(line)
+                valid_end = pos
+
+        with open(path, 'r+b') as f:
+            f.truncate(valid_end)
+            if valid_end:
+                f.seek(valid_end - 1)
+                if f.read(1) != b"\n":
+                    f.write(b"\n")
+
+    with open(_index_path(path), 'wb') as f:
+        f.write(b"".join(_OFFSET.pack(o) for o in offsets))
 
 changelog_manager = ChangelogManager()
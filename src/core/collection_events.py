@@ -0,0 +1,145 @@
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class EntryChanged:
+    """The quantity of a collection entry changed by quantity_delta (entries at zero are removed)."""
+    collection: Any
+    api_card: Any
+    variant_id: str
+    set_code: str
+    rarity: str
+    image_id: Optional[int]
+    language: str
+    condition: str
+    first_edition: bool
+    storage_location: Optional[str]
+    quantity_delta: int
+
+@dataclass(frozen=True)
+class VariantAdded:
+    collection: Any
+    card_id: int
+    variant_id: str
+
+@dataclass(frozen=True)
+class VariantRemoved:
+    collection: Any
+    card_id: int
+    variant_id: str
+
+@dataclass(frozen=True)
+class StorageRenamed:
+    collection: Any
+    old_name: Optional[str]
+    new_name: Optional[str]
+
+@dataclass(frozen=True)
+class CollectionSaved:
+    """
+    A collection was written to filename. changes holds the change events of the saved
+    instance since it was loaded or last saved, or None if they are unknown (the file was
+    created or replaced wholesale), in which case other holders of the file must reload it.
+    """
+    collection: Any
+    filename: str
+    changes: Optional[Tuple[Any, ...]]
+
+CHANGE_EVENTS = (EntryChanged, VariantAdded, VariantRemoved, StorageRenamed)
+
+class CollectionEventBus:
+    """
+    In-process publish/subscribe of collection changes. CollectionEditor publishes a change
+    event for every entry, variant and storage edit and persistence publishes CollectionSaved,
+    so pages can patch their view models instead of reloading, and replay the edits saved by
+    other pages (and sessions) onto their own copy of the collection.
+
+    Listeners are called synchronously in the publishing thread, which may be a worker
+    thread: they should only queue events and apply them from the UI loop.
+
+    The change events of tracked collections (see track) are also recorded until the next
+    save, to be handed out with CollectionSaved. Edits that bypass CollectionEditor are not
+    recorded.
+    """
+    def __init__(self):
+        self.listeners: List[Callable[[Any], None]] = []
+        self.listeners_lock = threading.Lock()
+        # id(collection) -> change events since the last load or save
+        self._unsaved: Dict[int, List[Any]] = {}
+        self._unsaved_lock = threading.Lock()
+        self._recording = threading.local()
+
+    def subscribe(self, callback: Callable[[Any], None]):
+        with self.listeners_lock:
+            if callback not in self.listeners:
+                self.listeners.append(callback)
+
+    def unsubscribe(self, callback: Callable[[Any], None]):
+        with self.listeners_lock:
+            if callback in self.listeners:
+                self.listeners.remove(callback)
+
+    def publish(self, event):
+        if isinstance(event, CHANGE_EVENTS) and getattr(self._recording, 'enabled', True):
+            with self._unsaved_lock:
+                changes = self._unsaved.get(id(event.collection))
+                if changes is not None:
+                    # Recorded without the collection, which must stay collectable
+                    changes.append(replace(event, collection=None))
+
+        with self.listeners_lock:
+            listeners = list(self.listeners)
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                logger.error(f"Error in collection event listener: {e}")
+
+    def track(self, collection):
+        """Starts recording the changes of a collection freshly loaded from (or saved to) its file."""
+        key = id(collection)
+        with self._unsaved_lock:
+            new = key not in self._unsaved
+            self._unsaved[key] = []
+        if new:
+            weakref.finalize(collection, self._forget, key)
+
+    def take_changes(self, collection) -> Optional[Tuple[Any, ...]]:
+        """The recorded changes of a collection, resetting the record; None if it is not tracked."""
+        with self._unsaved_lock:
+            changes = self._unsaved.get(id(collection))
+            if changes is None:
+                return None
+            self._unsaved[id(collection)] = []
+            return tuple(changes)
+
+    def restore_changes(self, collection, changes: Optional[Tuple[Any, ...]]):
+        """Puts back changes taken for a save that failed, ahead of any recorded since."""
+        if changes is None:
+            return
+        with self._unsaved_lock:
+            recorded = self._unsaved.get(id(collection))
+            if recorded is not None:
+                recorded[:0] = changes
+
+    @contextmanager
+    def replaying(self) -> Iterator[None]:
+        """Context in which published changes are not recorded, for edits that were saved elsewhere."""
+        previous = getattr(self._recording, 'enabled', True)
+        self._recording.enabled = False
+        try:
+            yield
+        finally:
+            self._recording.enabled = previous
+
+    def _forget(self, key: int):
+        with self._unsaved_lock:
+            self._unsaved.pop(key, None)
+
+collection_events = CollectionEventBus()
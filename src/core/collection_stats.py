@@ -0,0 +1,74 @@
+from typing import Dict, List, Optional, Tuple
+from pydantic import BaseModel, PrivateAttr
+
+class CollectionStats(BaseModel):
+    """
+    Aggregate statistics for a collection (totals, unique counts and distributions).
+    Built once from a collection and then kept up to date in O(1) per entry change.
+    Persisted as a small sidecar file next to the collection so the dashboard
+    does not need to load and walk the full collection.
+    """
+    name: str = ""
+    total_qty: int = 0
+    total_value: float = 0.0
+    unique_cards: int = 0
+    unique_variants: int = 0
+    rarity_dist: Dict[str, int] = {}
+    condition_dist: Dict[str, int] = {}
+    language_dist: Dict[str, int] = {}
+    # (size, mtime_ns) of the collection file these stats describe. Used to detect stale sidecars.
+    source_stamp: Optional[List[int]] = None
+
+    # Per-card and per-variant quantities, needed to maintain the unique counts incrementally.
+    # Only available on stats built from a live collection (not persisted).
+    _card_qty: Dict[int, int] = PrivateAttr(default_factory=dict)
+    _variant_qty: Dict[Tuple[int, str], int] = PrivateAttr(default_factory=dict)
+
+    @classmethod
+    def from_collection(cls, collection) -> "CollectionStats":
+        """Builds the statistics with a single walk over the collection."""
+        stats = cls(name=collection.name)
+        for card in collection.cards:
+            for var in card.variants:
+                for entry in var.entries:
+                    stats.apply_entry_delta(card.card_id, var.variant_id, var.rarity,
+                                            entry.condition, entry.language,
+                                            entry.quantity, entry.market_value)
+        return stats
+
+    def apply_entry_delta(self, card_id: int, variant_id: str, rarity: str, condition: str,
+                          language: str, quantity_delta: int, unit_value: Optional[float] = 0.0):
+        """Applies a quantity change of a single collection entry."""
+        if not quantity_delta:
+            return
+
+        self.total_qty += quantity_delta
+        self.total_value += (unit_value or 0.0) * quantity_delta
+
+        _add(self.rarity_dist, rarity, quantity_delta)
+        _add(self.condition_dist, condition, quantity_delta)
+        _add(self.language_dist, language, quantity_delta)
+
+        old_card = self._card_qty.get(card_id, 0)
+        new_card = _add(self._card_qty, card_id, quantity_delta)
+        if old_card <= 0 < new_card:
+            self.unique_cards += 1
+        elif new_card <= 0 < old_card:
+            self.unique_cards -= 1
+
+        var_key = (card_id, variant_id)
+        old_var = self._variant_qty.get(var_key, 0)
+        new_var = _add(self._variant_qty, var_key, quantity_delta)
+        if old_var <= 0 < new_var:
+            self.unique_variants += 1
+        elif new_var <= 0 < old_var:
+            self.unique_variants -= 1
+
+def _add(dist: dict, key, delta: int) -> int:
+    """Adds delta to dist[key], dropping the key once it reaches zero. Returns the new value."""
+    val = dist.get(key, 0) + delta
+    if val > 0:
+        dist[key] = val
+    else:
+        dist.pop(key, None)
+    return val
@@ -24,7 +24,8 @@ class ConfigManager:
             "language": "en",
             "theme": "dark",
             "deck_builder_page_size": 9,
-            "bulk_add_page_size": 50
+            "bulk_add_page_size": 50,
+            "sprite_sheets": False
         }
 
     def save_config(self):
@@ -52,4 +53,11 @@ class ConfigManager:
         self.config["bulk_add_page_size"] = size
         self.save_config()
 
+    def get_sprite_sheets(self) -> bool:
+        return self.config.get("sprite_sheets", False)
+
+    def set_sprite_sheets(self, enabled: bool):
+        self.config["sprite_sheets"] = enabled
+        self.save_config()
+
 config_manager = ConfigManager()
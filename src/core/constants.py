@@ -74,3 +74,9 @@ CONDITION_ABBREVIATIONS = {
     "Poor": "PO",
     "Damaged": "DM"
 }
+
+# Monster Categories (as matched by ApiCard.matches_category)
+MONSTER_CATEGORIES = [
+    "Effect", "Normal", "Synchro", "Xyz", "Ritual", "Fusion", "Link",
+    "Pendulum", "Toon", "Spirit", "Union", "Gemini", "Flip"
+]
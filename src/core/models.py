@@ -1,7 +1,49 @@
-from typing import List, Optional, Literal
-from pydantic import BaseModel, Field
+from typing import Iterable, List, Optional, Literal, Tuple
+from pydantic import BaseModel, Field, PrivateAttr
+from src.core.collection_stats import CollectionStats
+from src.core.ownership_index import OwnershipIndex
+from src.core.storage_index import StorageIndex
+from src.core.utils import SetCodeParts, parse_set_code
 import uuid
 
+class _SetCoded(BaseModel):
+    """Caches the parsed set_code of a variant, so hot loops read attributes instead of reparsing."""
+    _code_parts: Optional[SetCodeParts] = PrivateAttr(default=None)
+
+    @property
+    def code_parts(self) -> SetCodeParts:
+        parts = self._code_parts
+        if parts is None or parts.code != self.set_code:
+            parts = self._code_parts = parse_set_code(self.set_code)
+        return parts
+
+def cache_code_parts(items: Iterable[_SetCoded]):
+    """Parses the set codes of freshly loaded variants, sharing the interned code strings."""
+    for item in items:
+        parts = item._code_parts = parse_set_code(item.set_code)
+        item.set_code = parts.code
+
+def cache_prices(cards: Iterable["ApiCard"]):
+    """Parses the price strings of freshly loaded cards, so pages read floats instead of reparsing."""
+    for card in cards:
+        for p in card.card_prices:
+            p._values = p.parse_values()
+        for s in card.card_sets:
+            s._price = (s.set_price, parse_price(s.set_price))
+
+def listed_price(value: Optional[str]) -> Optional[float]:
+    """A price string of the card database as a float, None if missing or malformed."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+def parse_price(value: Optional[str]) -> float:
+    """A price string of the card database as a float (0.0 if missing or malformed)."""
+    return listed_price(value) or 0.0
+
 # --- Collection Models ---
 
 class CollectionEntry(BaseModel):
@@ -21,7 +63,7 @@ class StorageDefinition(BaseModel):
     image_path: Optional[str] = None
     set_code: Optional[str] = None
 
-class CollectionVariant(BaseModel):
+class CollectionVariant(_SetCoded):
     variant_id: str
     set_code: str
     rarity: str
@@ -47,18 +89,73 @@ class Collection(BaseModel):
     cards: List[CollectionCard] = []
     storage_definitions: List[StorageDefinition] = []
 
+    _stats: Optional[CollectionStats] = PrivateAttr(default=None)
+    _ownership: Optional[OwnershipIndex] = PrivateAttr(default=None)
+    _storage_index: Optional[StorageIndex] = PrivateAttr(default=None)
+
+    @property
+    def stats(self) -> CollectionStats:
+        """
+        Live aggregate statistics. Built lazily on first access, then maintained
+        incrementally by CollectionEditor through track_entry_delta.
+        """
+        if self._stats is None:
+            self._stats = CollectionStats.from_collection(self)
+        self._stats.name = self.name
+        return self._stats
+
+    @property
+    def ownership(self) -> OwnershipIndex:
+        """
+        Live ownership lookups by card id. Built lazily on first access, then maintained
+        incrementally by CollectionEditor through the track_* methods below.
+        """
+        if self._ownership is None:
+            self._ownership = OwnershipIndex.from_collection(self)
+        return self._ownership
+
+    @property
+    def storage_index(self) -> StorageIndex:
+        """
+        Live entries, quantities and values by storage location. Built lazily on first access,
+        then maintained incrementally by CollectionEditor through the track_* methods below.
+        """
+        if self._storage_index is None:
+            self._storage_index = StorageIndex.from_collection(self)
+        return self._storage_index
+
+    def track_entry_delta(self, card_id: int, variant: CollectionVariant, entry: CollectionEntry, quantity_delta: int):
+        """Records a quantity change of an entry. No-op until the stats or indexes have been built."""
+        if self._stats is not None:
+            self._stats.apply_entry_delta(card_id, variant.variant_id, variant.rarity,
+                                          entry.condition, entry.language,
+                                          quantity_delta, entry.market_value)
+        if self._ownership is not None:
+            self._ownership.apply_entry_delta(card_id, variant, entry, quantity_delta)
+        if self._storage_index is not None:
+            self._storage_index.apply_entry_delta(card_id, variant, entry, quantity_delta)
+
+    def track_card_added(self, card: CollectionCard):
+        if self._ownership is not None:
+            self._ownership.add_card(card)
+
+    def track_card_removed(self, card: CollectionCard):
+        if self._ownership is not None:
+            self._ownership.remove_card(card)
+
+    def track_storage_rename(self, old_name: Optional[str], new_name: Optional[str]):
+        if self._ownership is not None:
+            self._ownership.rename_storage(old_name, new_name)
+        if self._storage_index is not None:
+            self._storage_index.rename_storage(old_name, new_name)
+
     @property
     def total_value(self) -> float:
-        val = 0.0
-        for card in self.cards:
-            for var in card.variants:
-                for entry in var.entries:
-                    val += (entry.market_value or 0.0) * entry.quantity
-        return val
+        return self.stats.total_value
 
     @property
     def total_cards(self) -> int:
-        return sum(c.total_quantity for c in self.cards)
+        return self.stats.total_qty
 
 class Deck(BaseModel):
     name: str = "New Deck"
@@ -92,7 +189,7 @@ class ApiCardImage(BaseModel):
     image_url_small: str
     image_url_cropped: Optional[str] = None
 
-class ApiCardSet(BaseModel):
+class ApiCardSet(_SetCoded):
     variant_id: Optional[str] = None
     set_name: str
     set_code: str
@@ -101,10 +198,21 @@ class ApiCardSet(BaseModel):
     set_price: Optional[str] = None
     image_id: Optional[int] = Field(None, alias='card_image_id')
 
+    # (set_price string, parsed value)
+    _price: Optional[Tuple[Optional[str], float]] = PrivateAttr(default=None)
+
     model_config = {
         "populate_by_name": True
     }
 
+    @property
+    def price(self) -> float:
+        """set_price as a float (0.0 if missing or malformed), reparsed only when set_price changes."""
+        cached = self._price
+        if cached is None or cached[0] != self.set_price:
+            cached = self._price = (self.set_price, parse_price(self.set_price))
+        return cached[1]
+
 class ApiCardPrice(BaseModel):
     cardmarket_price: Optional[str] = None
     tcgplayer_price: Optional[str] = None
@@ -112,6 +220,37 @@ class ApiCardPrice(BaseModel):
     amazon_price: Optional[str] = None
     coolstuffinc_price: Optional[str] = None
 
+    # (cardmarket, tcgplayer, coolstuffinc, lowest); prices are replaced with the database, never edited
+    _values: Optional[Tuple[float, float, float, float]] = PrivateAttr(default=None)
+
+    @property
+    def values(self) -> Tuple[float, float, float, float]:
+        if self._values is None:
+            self._values = self.parse_values()
+        return self._values
+
+    def parse_values(self) -> Tuple[float, float, float, float]:
+        listed = [listed_price(v) for v in (self.cardmarket_price, self.tcgplayer_price, self.coolstuffinc_price)]
+        prices = [v for v in listed if v is not None]
+        return (*(v or 0.0 for v in listed), min(prices) if prices else 0.0)
+
+    @property
+    def cardmarket(self) -> float:
+        return self.values[0]
+
+    @property
+    def tcgplayer(self) -> float:
+        return self.values[1]
+
+    @property
+    def coolstuffinc(self) -> float:
+        return self.values[2]
+
+    @property
+    def lowest(self) -> float:
+        """The lowest listed price of the three sources, 0.0 if none is listed."""
+        return self.values[3]
+
 class ApiCard(BaseModel):
     id: int
     name: str
@@ -132,6 +271,16 @@ class ApiCard(BaseModel):
     card_sets: List[ApiCardSet] = []
     card_prices: List[ApiCardPrice] = []
 
+    @property
+    def tcgplayer_price(self) -> float:
+        """The TCGplayer market price as a float (0.0 if missing or malformed)."""
+        return self.card_prices[0].tcgplayer if self.card_prices else 0.0
+
+    @property
+    def lowest_price(self) -> float:
+        """The lowest of the CardMarket, TCGplayer and CoolStuffInc prices (0.0 if none is listed)."""
+        return self.card_prices[0].lowest if self.card_prices else 0.0
+
     @property
     def is_extra_deck(self) -> bool:
         """
@@ -0,0 +1,103 @@
+from typing import AbstractSet, Dict, Mapping, Optional, Tuple
+
+class OwnershipIndex:
+    """
+    Live lookup tables of what a collection owns: the CollectionCard of a card id, per-card,
+    per-variant and per-printing totals, and per-card language, condition and storage
+    breakdowns. Built with one walk over the collection, then kept up to date in O(1) per
+    entry change by CollectionEditor (through the Collection.track_* hooks).
+
+    Only entries with a positive quantity count as owned. Returned mappings and sets are
+    live views and must not be mutated.
+    """
+    def __init__(self):
+        self._cards: Dict[int, object] = {}
+        self._card_qty: Dict[int, int] = {}
+        self._variant_qty: Dict[Tuple[int, str], int] = {}
+        # (card_id, normalized set code, rarity): sums variants that only differ by region
+        self._printing_qty: Dict[Tuple[int, str, str], int] = {}
+        self._languages: Dict[int, Dict[str, int]] = {}
+        self._conditions: Dict[int, Dict[str, int]] = {}
+        self._storage: Dict[int, Dict[Optional[str], int]] = {}
+
+    @classmethod
+    def from_collection(cls, collection) -> "OwnershipIndex":
+        index = cls()
+        for card in collection.cards:
+            index.add_card(card)
+            for var in card.variants:
+                for entry in var.entries:
+                    index.apply_entry_delta(card.card_id, var, entry, entry.quantity)
+        return index
+
+    def card(self, card_id: int):
+        """The CollectionCard of a card id, or None."""
+        return self._cards.get(card_id)
+
+    def total(self, card_id: int) -> int:
+        return self._card_qty.get(card_id, 0)
+
+    @property
+    def totals(self) -> Mapping[int, int]:
+        """Owned quantity by card id, for owned cards only."""
+        return self._card_qty
+
+    def variant_total(self, card_id: int, variant_id: str) -> int:
+        return self._variant_qty.get((card_id, variant_id), 0)
+
+    def printing_total(self, card_id: int, normalized_code: str, rarity: str) -> int:
+        """Owned quantity of a set code and rarity across all regions (see normalize_set_code)."""
+        return self._printing_qty.get((card_id, normalized_code, rarity), 0)
+
+    def languages(self, card_id: int) -> AbstractSet[str]:
+        return self._languages.get(card_id, _EMPTY).keys()
+
+    def conditions(self, card_id: int) -> AbstractSet[str]:
+        return self._conditions.get(card_id, _EMPTY).keys()
+
+    def storage(self, card_id: int) -> Mapping[Optional[str], int]:
+        """Owned quantity of a card by storage location (None for unsorted)."""
+        return self._storage.get(card_id, _EMPTY)
+
+    def add_card(self, card):
+        # Like a scan of collection.cards, the first CollectionCard of a duplicated card id wins
+        self._cards.setdefault(card.card_id, card)
+
+    def remove_card(self, card):
+        if self._cards.get(card.card_id) is card:
+            del self._cards[card.card_id]
+
+    def apply_entry_delta(self, card_id: int, variant, entry, quantity_delta: int):
+        """Applies a quantity change of a single collection entry."""
+        if not quantity_delta:
+            return
+        _add(self._card_qty, card_id, quantity_delta)
+        _add(self._variant_qty, (card_id, variant.variant_id), quantity_delta)
+        _add(self._printing_qty, (card_id, variant.code_parts.normalized, variant.rarity), quantity_delta)
+        _add_nested(self._languages, card_id, entry.language, quantity_delta)
+        _add_nested(self._conditions, card_id, entry.condition, quantity_delta)
+        _add_nested(self._storage, card_id, entry.storage_location, quantity_delta)
+
+    def rename_storage(self, old_name: Optional[str], new_name: Optional[str]):
+        for locations in self._storage.values():
+            qty = locations.pop(old_name, 0)
+            if qty:
+                locations[new_name] = locations.get(new_name, 0) + qty
+
+_EMPTY: Dict = {}
+
+def _add(dist: dict, key, delta: int):
+    """Adds delta to dist[key], dropping the key once it reaches zero."""
+    val = dist.get(key, 0) + delta
+    if val > 0:
+        dist[key] = val
+    else:
+        dist.pop(key, None)
+
+def _add_nested(dists: dict, card_id: int, key, delta: int):
+    dist = dists.get(card_id)
+    if dist is None:
+        dist = dists[card_id] = {}
+    _add(dist, key, delta)
+    if not dist:
+        del dists[card_id]
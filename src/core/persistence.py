@@ -1,21 +1,76 @@
 import json
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 import yaml
 import os
 import time
 import logging
 import uuid
-from typing import List, Optional
-from src.core.models import Collection, Deck
+import hashlib
+from typing import List, Optional, Dict, Any, Iterable
+from src.core.models import Collection, CollectionCard, CollectionVariant, CollectionEntry, StorageDefinition, Deck, cache_code_parts
+from src.core.collection_stats import CollectionStats
+from src.core.collection_events import collection_events, CollectionSaved
+from src.core.changelog_manager import ChangelogManager, changelog_manager
 
 DATA_DIR = "data"
 COLLECTIONS_DIR = os.path.join(DATA_DIR, "collections")
 DECKS_DIR = os.path.join(DATA_DIR, "decks")
 logger = logging.getLogger(__name__)
 
+# Header written into every collection file saved by this app.
+# Files carrying a valid header (matching checksum) are trusted and skip pydantic validation on load.
+FILE_HEADER_KEY = "_openyugi"
+FILE_FORMAT_VERSION = 1
+
+# Statistics sidecar written next to each collection file (e.g. my_cards.json.stats)
+STATS_SIDECAR_SUFFIX = ".stats"
+
+def _canonical_json(data: Any) -> bytes:
+    """Serializes data to canonical (sorted keys, compact) JSON bytes."""
+    if HAS_ORJSON:
+        return orjson.dumps(data, option=orjson.OPT_SORT_KEYS)
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+
+def _collection_checksum(data: Dict[str, Any]) -> str:
+    """Computes a checksum over the canonical JSON form of the collection payload."""
+    return hashlib.sha256(_canonical_json(data)).hexdigest()
+
+def _is_trusted(header: Any, data: Dict[str, Any]) -> bool:
+    """Returns True if the header was written by this app and the payload is unmodified."""
+    if not isinstance(header, dict):
+        return False
+    if header.get("version") != FILE_FORMAT_VERSION:
+        return False
+    checksum = header.get("checksum")
+    return bool(checksum) and checksum == _collection_checksum(data)
+
+def construct_collection(data: Dict[str, Any]) -> Collection:
+    """
+    Builds a Collection from trusted data using model_construct (no validation).
+    Only use this for data previously produced by Collection.model_dump(mode='json').
+    """
+    cards = []
+    for c in data.get('cards', []):
+        variants = []
+        for v in c.get('variants', []):
+            entries = [CollectionEntry.model_construct(**e) for e in v.get('entries', [])]
+            variants.append(CollectionVariant.model_construct(**{**v, 'entries': entries}))
+        cards.append(CollectionCard.model_construct(**{**c, 'variants': variants}))
+
+    storage = [StorageDefinition.model_construct(**s) for s in data.get('storage_definitions', [])]
+    return Collection.model_construct(**{**data, 'cards': cards, 'storage_definitions': storage})
+
 class PersistenceManager:
-    def __init__(self, data_dir: str = COLLECTIONS_DIR, decks_dir: str = DECKS_DIR):
+    def __init__(self, data_dir: str = COLLECTIONS_DIR, decks_dir: str = DECKS_DIR,
+                 changelog: Optional[ChangelogManager] = None):
         self.data_dir = data_dir
         self.decks_dir = decks_dir
+        # When set, saved collections are periodically checkpointed into their changelog
+        self.changelog = changelog
         os.makedirs(self.data_dir, exist_ok=True)
         os.makedirs(self.decks_dir, exist_ok=True)
 
@@ -24,8 +79,12 @@ class PersistenceManager:
         files = [f for f in os.listdir(self.data_dir) if f.endswith(('.json', '.yaml', '.yml'))]
         return files
 
-    def load_collection(self, filename: str) -> Collection:
-        """Loads a collection from a JSON or YAML file."""
+    def load_collection(self, filename: str, trusted: bool = True) -> Collection:
+        """
+        Loads a collection from a JSON or YAML file.
+        If trusted is True and the file carries a valid app header, validation is skipped.
+        Hand-edited or foreign files always go through full pydantic validation.
+        """
         logger.info(f"Loading collection: {filename}")
         filepath = os.path.join(self.data_dir, filename)
         if not os.path.exists(filepath):
@@ -33,51 +92,137 @@ class PersistenceManager:
             raise FileNotFoundError(f"Collection file {filename} not found.")
 
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                if filename.endswith('.json'):
-                    data = json.load(f)
-                elif filename.endswith(('.yaml', '.yml')):
-                    data = yaml.safe_load(f)
+            if filename.endswith('.json'):
+                if HAS_ORJSON:
+                    with open(filepath, 'rb') as f:
+                        data = orjson.loads(f.read())
                 else:
-                    raise ValueError("Unsupported file format")
+                    with open(filepath, 'r', encoding='utf-8') as f:
+                        data = json.load(f)
+            elif filename.endswith(('.yaml', '.yml')):
+                with open(filepath, 'r', encoding='utf-8') as f:
+                    data = yaml.safe_load(f)
+            else:
+                raise ValueError("Unsupported file format")
 
-            return Collection(**data)
+            header = data.pop(FILE_HEADER_KEY, None) if isinstance(data, dict) else None
+
+            if trusted and _is_trusted(header, data):
+                collection = construct_collection(data)
+            else:
+                collection = Collection(**data)
+            for card in collection.cards:
+                cache_code_parts(card.variants)
+            collection_events.track(collection)
+            return collection
         except Exception as e:
             logger.error(f"Error loading collection {filename}: {e}")
             raise
 
     def save_collection(self, collection: Collection, filename: str):
-        """Saves a collection to a file."""
+        """Saves a collection to a file, publishing CollectionSaved with its changes since the last load or save."""
         logger.info(f"Saving collection: {filename}")
         filepath = os.path.join(self.data_dir, filename)
+        # Taken before dumping: changes made meanwhile are published with the next save
+        changes = collection_events.take_changes(collection)
         data = collection.model_dump(mode='json')
+        header = {"version": FILE_FORMAT_VERSION, "checksum": _collection_checksum(data)}
         # Use UUID to prevent collisions if multiple saves run concurrently
         temp_filepath = filepath + f".{uuid.uuid4()}.tmp"
 
         try:
-            with open(temp_filepath, 'w', encoding='utf-8') as f:
-                if filename.endswith('.json'):
-                    json.dump(data, f, indent=2)
-                elif filename.endswith(('.yaml', '.yml')):
-                    yaml.safe_dump(data, f)
+            if filename.endswith('.json'):
+                payload = {FILE_HEADER_KEY: header, **data}
+                if HAS_ORJSON:
+                    with open(temp_filepath, 'wb') as f:
+                        f.write(orjson.dumps(payload, option=orjson.OPT_INDENT_2))
+                        f.flush()
+                        os.fsync(f.fileno())
                 else:
-                    raise ValueError("Unsupported file format")
+                    with open(temp_filepath, 'w', encoding='utf-8') as f:
+                        json.dump(payload, f, indent=2)
+                        f.flush()
+                        os.fsync(f.fileno())
+            elif filename.endswith(('.yaml', '.yml')):
+                with open(temp_filepath, 'w', encoding='utf-8') as f:
+                    yaml.safe_dump({FILE_HEADER_KEY: header, **data}, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+            else:
+                raise ValueError("Unsupported file format")
+
+            self._replace_file(temp_filepath, filepath)
+        except Exception as e:
+            logger.error(f"Error saving collection {filename}: {e}")
+            collection_events.restore_changes(collection, changes)
+            if os.path.exists(temp_filepath):
+                try:
+                    os.remove(temp_filepath)
+                except OSError:
+                    pass
+            raise
+
+        if changes is None:
+            collection_events.track(collection)
+        collection_events.publish(CollectionSaved(collection, filename, changes))
+        self.save_collection_stats(collection.stats, filename)
+        if self.changelog:
+            self.changelog.maybe_checkpoint(filename, data)
+
+    def save_collection_stream(self, name: str, description: Optional[str], storage_definitions: List[Dict[str, Any]],
+                               cards: Iterable[Dict[str, Any]], filename: str) -> CollectionStats:
+        """
+        Writes a JSON collection file card by card without building a Collection in memory.
+        cards yields dicts in the CollectionCard.model_dump(mode='json') format.
+        The checksum header and statistics sidecar are computed on the fly.
+        Returns the statistics of the written collection.
+        """
+        if not filename.endswith('.json'):
+            raise ValueError("Streaming is only supported for JSON collections")
+
+        logger.info(f"Streaming collection: {filename}")
+        filepath = os.path.join(self.data_dir, filename)
+        temp_filepath = filepath + f".{uuid.uuid4()}.tmp"
+
+        stats = CollectionStats(name=name)
+        # Canonical form has sorted keys: cards, description, name, storage_definitions
+        hasher = hashlib.sha256(b'{"cards":[')
+
+        try:
+            with open(temp_filepath, 'wb') as f:
+                f.write(b'{"name":' + _canonical_json(name) +
+                        b',"description":' + _canonical_json(description) +
+                        b',"storage_definitions":' + _canonical_json(storage_definitions) +
+                        b',"cards":[')
+
+                first = True
+                for card in cards:
+                    raw = _canonical_json(card)
+                    if not first:
+                        f.write(b',')
+                        hasher.update(b',')
+                    f.write(b'\n' + raw)
+                    hasher.update(raw)
+                    first = False
+
+                    for var in card.get('variants', []):
+                        for entry in var.get('entries', []):
+                            stats.apply_entry_delta(card['card_id'], var['variant_id'], var['rarity'],
+                                                    entry['condition'], entry['language'],
+                                                    entry['quantity'], entry.get('market_value'))
+
+                hasher.update(b'],"description":' + _canonical_json(description) +
+                              b',"name":' + _canonical_json(name) +
+                              b',"storage_definitions":' + _canonical_json(storage_definitions) + b'}')
+
+                header = {"version": FILE_FORMAT_VERSION, "checksum": hasher.hexdigest()}
+                f.write(b'\n],"' + FILE_HEADER_KEY.encode('utf-8') + b'":' + _canonical_json(header) + b'}\n')
                 f.flush()
                 os.fsync(f.fileno())
 
-            # Retry logic for Windows file locking issues
-            max_retries = 3
-            for attempt in range(max_retries):
-                try:
-                    os.replace(temp_filepath, filepath)
-                    break
-                except PermissionError as e:
-                    if attempt < max_retries - 1:
-                        time.sleep(0.1)  # Wait a bit before retrying
-                    else:
-                        raise e
+            self._replace_file(temp_filepath, filepath)
         except Exception as e:
-            logger.error(f"Error saving collection {filename}: {e}")
+            logger.error(f"Error streaming collection {filename}: {e}")
             if os.path.exists(temp_filepath):
                 try:
                     os.remove(temp_filepath)
@@ -85,6 +230,79 @@ class PersistenceManager:
                     pass
             raise
 
+        self.save_collection_stats(stats, filename)
+        collection_events.publish(CollectionSaved(None, filename, None))
+        return stats
+
+    def _replace_file(self, temp_filepath: str, filepath: str):
+        # Retry logic for Windows file locking issues
+        max_retries = 3
+        for attempt in range(max_retries):
+            try:
+                os.replace(temp_filepath, filepath)
+                break
+            except PermissionError as e:
+                if attempt < max_retries - 1:
+                    time.sleep(0.1)  # Wait a bit before retrying
+                else:
+                    raise e
+
+    # --- Statistics Sidecar ---
+
+    def _get_stats_path(self, filename: str) -> str:
+        return os.path.join(self.data_dir, filename + STATS_SIDECAR_SUFFIX)
+
+    def _get_file_stamp(self, filename: str) -> Optional[List[int]]:
+        """Returns (size, mtime_ns) of a collection file, used to detect stale sidecars."""
+        try:
+            st = os.stat(os.path.join(self.data_dir, filename))
+            return [st.st_size, st.st_mtime_ns]
+        except OSError:
+            return None
+
+    def save_collection_stats(self, stats: CollectionStats, filename: str):
+        """Writes the statistics sidecar for a collection file. Failures are logged, not raised."""
+        try:
+            stats.source_stamp = self._get_file_stamp(filename)
+            data = stats.model_dump(mode='json')
+            with open(self._get_stats_path(filename), 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+        except Exception as e:
+            logger.error(f"Error saving statistics for {filename}: {e}")
+
+    def load_collection_stats(self, filename: str) -> Optional[CollectionStats]:
+        """Returns the cached statistics for a collection file, or None if missing or stale."""
+        path = self._get_stats_path(filename)
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                stats = CollectionStats(**json.load(f))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable statistics for {filename}: {e}")
+            return None
+
+        stamp = self._get_file_stamp(filename)
+        if stamp is None or stats.source_stamp != stamp:
+            return None
+        return stats
+
+    def get_collection_stats(self, filename: str) -> CollectionStats:
+        """
+        Returns statistics for a collection file. Uses the sidecar if it is up to date,
+        otherwise loads the collection, rebuilds the statistics and rewrites the sidecar.
+        """
+        stats = self.load_collection_stats(filename)
+        if stats is not None:
+            return stats
+
+        logger.info(f"Rebuilding statistics for {filename}")
+        collection = self.load_collection(filename)
+        stats = collection.stats
+        self.save_collection_stats(stats, filename)
+        return stats
+
     # --- Deck Management ---
 
     def list_decks(self) -> List[str]:
@@ -187,4 +405,4 @@ class PersistenceManager:
             logger.error(f"Error saving UI state: {e}")
 
 # Global instance
-persistence = PersistenceManager()
+persistence = PersistenceManager(changelog=changelog_manager)
@@ -0,0 +1,87 @@
+from typing import Dict, Iterable, Mapping, Optional
+
+class StorageRef:
+    """An owned collection entry and the card and variant it belongs to."""
+    __slots__ = ('card_id', 'variant', 'entry', 'quantity')
+
+    def __init__(self, card_id: int, variant, entry, quantity: int = 0):
+        self.card_id = card_id
+        self.variant = variant
+        self.entry = entry
+        self.quantity = quantity
+
+class StorageIndex:
+    """
+    Live index of a collection's entries by storage location (None for unsorted), with the
+    owned quantity and market value of every location. Built with one walk over the
+    collection, then kept up to date in O(1) per entry change by CollectionEditor (through
+    the Collection.track_* hooks), like OwnershipIndex.
+
+    Only entries with a positive quantity are indexed. Values use the entries' market_value,
+    like CollectionStats.total_value. Returned mappings are live views and must not be mutated.
+    """
+    def __init__(self):
+        # location -> id(entry) -> ref
+        self._refs: Dict[Optional[str], Dict[int, StorageRef]] = {}
+        self._qty: Dict[Optional[str], int] = {}
+        self._value: Dict[Optional[str], float] = {}
+
+    @classmethod
+    def from_collection(cls, collection) -> "StorageIndex":
+        index = cls()
+        for card in collection.cards:
+            for var in card.variants:
+                for entry in var.entries:
+                    index.apply_entry_delta(card.card_id, var, entry, entry.quantity)
+        return index
+
+    def entries(self, location: Optional[str]) -> Iterable[StorageRef]:
+        """The owned entries stored in a location, in the order they were first stored."""
+        return self._refs.get(location, _EMPTY).values()
+
+    def quantity(self, location: Optional[str]) -> int:
+        return self._qty.get(location, 0)
+
+    def value(self, location: Optional[str]) -> float:
+        return self._value.get(location, 0.0)
+
+    @property
+    def quantities(self) -> Mapping[Optional[str], int]:
+        """Owned quantity by storage location, for non-empty locations only."""
+        return self._qty
+
+    def apply_entry_delta(self, card_id: int, variant, entry, quantity_delta: int):
+        """Applies a quantity change of a single collection entry (called before entry.quantity is updated)."""
+        if not quantity_delta:
+            return
+        location = entry.storage_location
+        refs = self._refs.get(location)
+        if refs is None:
+            refs = self._refs[location] = {}
+        ref = refs.get(id(entry))
+        if ref is None:
+            ref = refs[id(entry)] = StorageRef(card_id, variant, entry)
+        ref.quantity += quantity_delta
+        if ref.quantity <= 0:
+            del refs[id(entry)]
+            if not refs:
+                del self._refs[location]
+
+        qty = self._qty.get(location, 0) + quantity_delta
+        value = self._value.get(location, 0.0) + (entry.market_value or 0.0) * quantity_delta
+        if qty > 0:
+            self._qty[location] = qty
+            self._value[location] = value
+        else:
+            self._qty.pop(location, None)
+            self._value.pop(location, None)
+
+    def rename_storage(self, old_name: Optional[str], new_name: Optional[str]):
+        refs = self._refs.pop(old_name, None)
+        if not refs:
+            return
+        self._refs.setdefault(new_name, {}).update(refs)
+        self._qty[new_name] = self._qty.get(new_name, 0) + self._qty.pop(old_name, 0)
+        self._value[new_name] = self._value.get(new_name, 0.0) + self._value.pop(old_name, 0.0)
+
+_EMPTY: Dict = {}
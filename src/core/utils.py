@@ -1,6 +1,7 @@
 import re
+import sys
 import hashlib
-from typing import Optional
+from typing import Dict, NamedTuple, Optional
 
 # Region Code Mapping
 # Maps region codes (both legacy 1-letter and standard 2-letter) to standard Language Codes.
@@ -124,6 +125,47 @@ def _parse_set_code(set_code: str):
     # So if no region matched, we treat region as None.
     return prefix, None, rest
 
+class SetCodeParts(NamedTuple):
+    """
+    A parsed set code, e.g. LOB-G020 -> ('LOB-G020', 'LOB', 'G', 'DE', '020', 'LOB-020').
+    region is None for codes without one (SDY-006), which count as English.
+    """
+    code: str
+    prefix: str
+    region: Optional[str]
+    language: str
+    number: str
+    normalized: str
+
+    def is_compatible(self, language: str) -> bool:
+        """See is_set_code_compatible."""
+        return self.region is None or self.language == language.upper()
+
+# Parsed set codes by code. Parsing is deterministic, so entries never go stale; the cache
+# is only dropped when it grows past the limit (e.g. from many distinct scanned codes).
+_SET_CODE_PARTS: Dict[str, SetCodeParts] = {}
+SET_CODE_CACHE_LIMIT = 200_000
+
+def parse_set_code(set_code: str) -> SetCodeParts:
+    """Parses a set code once; the parts and the code itself are interned and shared by all callers."""
+    parts = _SET_CODE_PARTS.get(set_code)
+    if parts is None:
+        parsed = _parse_set_code(set_code)
+        prefix, region, number = parsed if parsed else (set_code, None, '')
+        if len(_SET_CODE_PARTS) >= SET_CODE_CACHE_LIMIT:
+            _SET_CODE_PARTS.clear()
+        code = sys.intern(set_code)
+        parts = SetCodeParts(
+            code=code,
+            prefix=sys.intern(prefix),
+            region=region,
+            language=REGION_TO_LANGUAGE_MAP.get(region, 'EN') if region else 'EN',
+            number=sys.intern(number),
+            normalized=sys.intern(f"{prefix}-{number}") if region else code
+        )
+        _SET_CODE_PARTS[code] = parts
+    return parts
+
 def transform_set_code(set_code: str, language: str) -> str:
     """
     Transforms a set code based on the language.
@@ -133,26 +175,20 @@ def transform_set_code(set_code: str, language: str) -> str:
     If it does not have a region code (e.g. SDY-006), it remains unchanged.
     """
     lang_code = language.upper()
-    parsed = _parse_set_code(set_code)
-
-    if parsed:
-        prefix, region, suffix = parsed
-
-        if region:
-            new_region_code = lang_code
+    parts = parse_set_code(set_code)
 
-            # Check if original was 1-letter and in our map
-            if len(region) == 1:
-                 # Try to find legacy code for target language
-                 if lang_code in LANGUAGE_TO_LEGACY_REGION_MAP:
-                     new_region_code = LANGUAGE_TO_LEGACY_REGION_MAP[lang_code]
+    if parts.region:
+        new_region_code = lang_code
 
-            return f"{prefix}-{new_region_code}{suffix}"
+        # Check if original was 1-letter and in our map
+        if len(parts.region) == 1:
+             # Try to find legacy code for target language
+             if lang_code in LANGUAGE_TO_LEGACY_REGION_MAP:
+                 new_region_code = LANGUAGE_TO_LEGACY_REGION_MAP[lang_code]
 
-        # No region found (e.g. SDY-006), return as is
-        return set_code
+        return f"{parts.prefix}-{new_region_code}{parts.number}"
 
-    # Fallback to original if parsing completely failed (no hyphen?)
+    # No region found (e.g. SDY-006) or no hyphen at all, return as is
     return set_code
 
 def normalize_set_code(set_code: str) -> str:
@@ -163,13 +199,7 @@ def normalize_set_code(set_code: str) -> str:
          SDY-006 -> SDY-006
          SGX2-END16 -> SGX2-D16 (Strips EN, keeps D16)
     """
-    parsed = _parse_set_code(set_code)
-    if parsed:
-        prefix, region, suffix = parsed
-        if region:
-            return f"{prefix}-{suffix}"
-        return set_code # No region, so Prefix-Suffix is just set_code
-    return set_code
+    return parse_set_code(set_code).normalized
 
 def extract_language_code(set_code: str) -> str:
     """
@@ -177,14 +207,8 @@ def extract_language_code(set_code: str) -> str:
     Returns a standard language code (e.g., 'EN', 'DE').
     Defaults to 'EN' if no specific region is found or if it maps to English.
     """
-    parsed = _parse_set_code(set_code)
-    if parsed:
-        prefix, region, suffix = parsed
-        if region:
-             return REGION_TO_LANGUAGE_MAP.get(region, 'EN')
-
-    # Case 2: No region code (e.g. SDY-006) -> Usually EN (NA print)
-    return 'EN'
+    # No region code (e.g. SDY-006) -> Usually EN (NA print)
+    return parse_set_code(set_code).language
 
 def is_set_code_compatible(set_code: str, language: str) -> bool:
     """
@@ -197,22 +221,8 @@ def is_set_code_compatible(set_code: str, language: str) -> bool:
     Incompatible means:
     - The code has a region identifier for a DIFFERENT language (e.g. LOB-EN001 for DE).
     """
-    target_lang = language.upper()
-    parsed = _parse_set_code(set_code)
-
-    if parsed:
-        prefix, region, suffix = parsed
-        if region:
-            mapped_lang = REGION_TO_LANGUAGE_MAP.get(region)
-            if mapped_lang:
-                return mapped_lang == target_lang
-            else:
-                return False # Unknown region
-
-        # No region -> Compatible
-        return True
-
-    return True # Unparsable -> assume compatible or ignore
+    # No region (or unparsable) -> Compatible
+    return parse_set_code(set_code).is_compatible(language)
 
 def get_legacy_code(prefix: str, number: str, language: str) -> Optional[str]:
     """
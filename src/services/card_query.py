@@ -0,0 +1,405 @@
+import logging
+import re
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from src.core.constants import MONSTER_CATEGORIES
+from src.services.filter_engine import FilterColumns, DEFAULT_SEARCH_FIELDS
+from src.services.text_index import CardTextIndex
+
+logger = logging.getLogger(__name__)
+
+class QueryError(ValueError):
+    """Raised for queries that cannot be parsed or do not apply to the page's rows."""
+
+# --- AST ---
+
+@dataclass(frozen=True)
+class Term:
+    field: str
+    op: str
+    value: str
+
+@dataclass(frozen=True)
+class Text:
+    text: str
+
+@dataclass(frozen=True)
+class Not:
+    child: 'Node'
+
+@dataclass(frozen=True)
+class And:
+    children: Tuple['Node', ...]
+
+@dataclass(frozen=True)
+class Or:
+    children: Tuple['Node', ...]
+
+Node = Union[Term, Text, Not, And, Or]
+
+# --- Fields ---
+
+# Planner cost classes: lower runs first within an AND
+COST_INDEX = 0    # answered from a prebuilt index (set prefix, rarity, owned languages/conditions/storage)
+COST_OWNED = 1    # per-row ownership and price arrays
+COST_SCAN = 2     # card column comparisons
+COST_TEXT = 3     # substring search (ranked with the index terms when the text index can estimate it)
+
+@dataclass(frozen=True)
+class FieldSpec:
+    kind: str        # 'numeric', 'text' or 'value'
+    cost: int
+
+FIELDS: Dict[str, FieldSpec] = {
+    'atk': FieldSpec('numeric', COST_SCAN),           # filter_atk_min/max
+    'def': FieldSpec('numeric', COST_SCAN),           # filter_def_min/max
+    'level': FieldSpec('numeric', COST_SCAN),         # filter_level
+    'price': FieldSpec('numeric', COST_OWNED),        # filter_price_min/max
+    'owned': FieldSpec('numeric', COST_OWNED),        # filter_ownership_min/max
+    'type': FieldSpec('value', COST_SCAN),            # filter_card_type
+    'attr': FieldSpec('value', COST_SCAN),            # filter_attr
+    'race': FieldSpec('value', COST_SCAN),            # filter_monster_race / filter_st_race
+    'archetype': FieldSpec('value', COST_SCAN),       # filter_archetype
+    'category': FieldSpec('value', COST_SCAN),        # filter_monster_category
+    'set': FieldSpec('value', COST_INDEX),            # filter_set
+    'rarity': FieldSpec('value', COST_INDEX),         # filter_rarity
+    'lang': FieldSpec('value', COST_INDEX),           # filter_owned_lang
+    'condition': FieldSpec('value', COST_INDEX),      # filter_condition
+    'storage': FieldSpec('value', COST_INDEX),        # filter_storage
+    'name': FieldSpec('text', COST_TEXT),             # search text
+    'desc': FieldSpec('text', COST_TEXT),             # search text
+}
+
+ALIASES = {
+    'attribute': 'attr', 'lv': 'level', 'rank': 'level', 'arch': 'archetype', 'cat': 'category',
+    'r': 'rarity', 'language': 'lang', 'cond': 'condition', 'qty': 'owned', 'text': 'desc',
+}
+
+# --- Parser ---
+
+_TERM = re.compile(r'^([A-Za-z_]+)(>=|<=|!=|:|=|>|<)(.*)$', re.S)
+
+def _tokenize(query: str) -> List[Tuple[str, object]]:
+    tokens = []
+    i, n = 0, len(query)
+    while i < n:
+        ch = query[i]
+        if ch.isspace():
+            i += 1
+        elif ch in '()':
+            tokens.append((ch, ch))
+            i += 1
+        elif ch == '-' and i + 1 < n and not query[i + 1].isspace():
+            tokens.append(('not', '-'))
+            i += 1
+        else:
+            # A chunk runs to the next whitespace or parenthesis outside of quotes
+            start, quoted = i, False
+            while i < n and (quoted or not (query[i].isspace() or query[i] in '()')):
+                if query[i] == '"':
+                    quoted = not quoted
+                i += 1
+            if quoted:
+                raise QueryError("Unterminated quote")
+            chunk = query[start:i]
+            if chunk in ('OR', 'AND', 'NOT'):
+                tokens.append((chunk.lower(), chunk))
+            else:
+                tokens.append(('chunk', chunk))
+    return tokens
+
+def _unquote(value: str) -> str:
+    return value.replace('"', '')
+
+def _make_term(chunk: str) -> Node:
+    m = _TERM.match(chunk) if not chunk.startswith('"') else None
+    if not m:
+        return Text(_unquote(chunk))
+
+    field = m.group(1).lower()
+    field = ALIASES.get(field, field)
+    if field not in FIELDS:
+        raise QueryError(f"Unknown field '{m.group(1)}'")
+    op = '=' if m.group(2) == ':' else m.group(2)
+    value = _unquote(m.group(3)).strip()
+    if not value:
+        raise QueryError(f"Missing value for '{m.group(1)}'")
+
+    spec = FIELDS[field]
+    if spec.kind == 'numeric':
+        try:
+            float(value)
+        except ValueError:
+            raise QueryError(f"'{m.group(1)}' needs a number, got '{value}'")
+    elif op not in ('=', '!='):
+        raise QueryError(f"'{m.group(1)}' does not support '{op}'")
+
+    term = Term(field, '=' if spec.kind != 'numeric' else op, value)
+    return Not(term) if op == '!=' and spec.kind != 'numeric' else term
+
+class _Parser:
+    def __init__(self, tokens: List[Tuple[str, object]]):
+        self.tokens = tokens
+        self.pos = 0
+
+    def peek(self) -> Optional[str]:
+        return self.tokens[self.pos][0] if self.pos < len(self.tokens) else None
+
+    def take(self) -> Tuple[str, object]:
+        token = self.tokens[self.pos]
+        self.pos += 1
+        return token
+
+    def parse_or(self) -> Node:
+        children = [self.parse_and()]
+        while self.peek() == 'or':
+            self.take()
+            children.append(self.parse_and())
+        return children[0] if len(children) == 1 else Or(tuple(children))
+
+    def parse_and(self) -> Node:
+        children = []
+        while self.peek() not in (None, ')', 'or'):
+            if self.peek() == 'and':
+                self.take()
+                continue
+            children.append(self.parse_unary())
+        if not children:
+            raise QueryError("Expected a search term")
+        return children[0] if len(children) == 1 else And(tuple(children))
+
+    def parse_unary(self) -> Node:
+        kind, value = self.take()
+        if kind == 'not':
+            if self.peek() in (None, ')', 'or', 'and'):
+                raise QueryError("Expected a term after negation")
+            return Not(self.parse_unary())
+        if kind == '(':
+            node = self.parse_or()
+            if self.peek() != ')':
+                raise QueryError("Missing ')'")
+            self.take()
+            return node
+        if kind == 'chunk':
+            return _make_term(value)
+        raise QueryError(f"Unexpected '{value}'")
+
+def parse(query: str) -> Optional[Node]:
+    """Parses a query into its AST (None for an empty query). Raises QueryError."""
+    tokens = _tokenize(query)
+    if not tokens:
+        return None
+    parser = _Parser(tokens)
+    node = parser.parse_or()
+    if parser.pos < len(tokens):
+        raise QueryError(f"Unexpected '{tokens[parser.pos][1]}'")
+    return node
+
+# --- Planner ---
+
+class _Context:
+    def __init__(self, cols: FilterColumns, text_index: Optional[CardTextIndex], search_fields: Sequence[str]):
+        self.cols = cols
+        self.text_index = text_index
+        self.search_fields = search_fields
+
+    def term_mask(self, term: Term) -> np.ndarray:
+        # Shares the columns' per-filter mask cache, so unchanged terms are free on the next keystroke
+        mask = self.cols.cached_mask(('query', term), lambda: _term_mask(self.cols, term))
+        if mask is None:
+            raise QueryError(f"'{term.field}' is not available here")
+        return mask
+
+    def text_estimate(self, node: Union[Term, Text]) -> Optional[int]:
+        """Upper bound of the rows a text term matches, from the text index's trigram candidates."""
+        return self.cols.estimate_search(_text_value(node), _text_fields(node, self), self.text_index)
+
+def _term_mask(cols: FilterColumns, term: Term) -> Optional[np.ndarray]:
+    field, value = term.field, term.value
+    if FIELDS[field].kind == 'numeric':
+        column = 'qty' if field == 'owned' else field
+        return cols.compare_rows(column, term.op, float(value))
+    if field == 'type':
+        return cols.card_type_rows([value])
+    if field == 'attr':
+        return cols.attribute_rows(value)
+    if field == 'race':
+        return cols.race_rows(value)
+    if field == 'archetype':
+        return cols.archetype_rows(value)
+    if field == 'category':
+        category = next((c for c in MONSTER_CATEGORIES if c.lower() == value.lower()), None)
+        if category is None:
+            raise QueryError(f"Unknown category '{value}' (one of {', '.join(MONSTER_CATEGORIES)})")
+        return cols.category_rows([category])
+    if field == 'set':
+        # A known set prefix selects like the set dropdown, anything else like typed set text
+        return cols.set_prefix_rows(value) if cols.has_set_prefix(value) else cols.set_rows(value)
+    if field == 'rarity':
+        return cols.rarity_rows(value)
+    if field == 'lang':
+        return cols.language_rows([value])
+    if field == 'condition':
+        return cols.condition_rows([value])
+    if field == 'storage':
+        return cols.storage_rows([value])
+    raise QueryError(f"Unsupported field '{field}'")
+
+def _cost(node: Node) -> int:
+    if isinstance(node, Term):
+        return FIELDS[node.field].cost
+    if isinstance(node, Text):
+        return COST_TEXT
+    if isinstance(node, Not):
+        return _cost(node.child)
+    return max(_cost(c) for c in node.children)
+
+def _is_text(node: Node) -> bool:
+    return isinstance(node, Text) or (isinstance(node, Term) and FIELDS[node.field].kind == 'text')
+
+def _text_value(node: Union[Term, Text]) -> str:
+    return node.text if isinstance(node, Text) else node.value
+
+def _text_fields(node: Union[Term, Text], ctx: _Context) -> Sequence[str]:
+    return ctx.search_fields if isinstance(node, Text) else (node.field,)
+
+def _text_rows(node: Union[Term, Text], ctx: _Context, candidates: np.ndarray) -> np.ndarray:
+    """
+    Literal substring matches among candidates. A text without literal matches in any row
+    falls back to fuzzy names; that is decided over all rows, like the search box does, so
+    the result does not depend on the plan order or on what earlier terms left.
+    """
+    txt = _text_value(node)
+    fields = _text_fields(node, ctx)
+    hits = np.flatnonzero(ctx.cols.search(txt, fields, ctx.text_index, fuzzy=False, within=candidates))
+    if len(hits) or 'name' not in fields or ctx.text_index is None:
+        return hits
+    mask = ctx.cols.cached_mask(('query_text', tuple(fields), txt.lower(), id(ctx.text_index)),
+                                lambda: ctx.cols.search(txt, fields, ctx.text_index))
+    return candidates[mask[candidates]]
+
+def _rows(node: Node, ctx: _Context, candidates: np.ndarray) -> np.ndarray:
+    """The subset of candidates (sorted row positions) matching node."""
+    if not len(candidates):
+        return candidates
+    if _is_text(node):
+        return _text_rows(node, ctx, candidates)
+    if isinstance(node, Term):
+        return candidates[ctx.term_mask(node)[candidates]]
+    if isinstance(node, Not):
+        return np.setdiff1d(candidates, _rows(node.child, ctx, candidates), assume_unique=True)
+    if isinstance(node, And):
+        for child in _order(node.children, ctx):
+            candidates = _rows(child, ctx, candidates)
+            if not len(candidates):
+                break
+        return candidates
+    # Or: each branch only needs to look at the rows no earlier branch matched
+    matched = np.empty(0, dtype=np.int64)
+    remaining = candidates
+    for child in _order(node.children, ctx):
+        hits = _rows(child, ctx, remaining)
+        matched = np.union1d(matched, hits)
+        remaining = np.setdiff1d(remaining, hits, assume_unique=True)
+        if not len(remaining):
+            break
+    return matched
+
+def _order(children: Sequence[Node], ctx: _Context) -> List[Node]:
+    """
+    Cheapest first; among index-backed terms the most selective first, which the
+    precomputed index masks make free to count. Text terms the text index can estimate
+    (see _Context.text_estimate) rank among the index-backed terms by their estimate.
+    """
+    return sorted(children, key=lambda child: _plan_key(child, ctx))
+
+def _plan_key(node: Node, ctx: _Context) -> Tuple[int, int]:
+    """(cost class, estimated matching rows) of node within an AND or OR."""
+    cost = _cost(node)
+    if cost == COST_INDEX and isinstance(node, Term):
+        return (cost, int(np.count_nonzero(ctx.term_mask(node))))
+    if _is_text(node):
+        estimate = ctx.text_estimate(node)
+        if estimate is not None:
+            return (COST_INDEX, estimate)
+    return (cost, 0)
+
+class QueryPlan:
+    """
+    A parsed advanced-search query, ready to evaluate against any page's FilterColumns:
+
+        atk>=2500 attr:DARK set:LOB rarity:"Ultra Rare" owned>0 lang:DE storage:"Binder 3"
+
+    Terms are `field<op>value` (ops `:` `=` `!=` `>` `>=` `<` `<=`) or bare words, which search
+    the page's search fields like the search box does. Terms are ANDed; `OR`, `-term` /
+    `NOT term` and parentheses are supported. Fields evaluate through the same FilterColumns
+    predicates as the FilterPane state keys noted in FIELDS, so `attr:DARK` selects exactly what
+    the Attribute dropdown does.
+    """
+    def __init__(self, query: str):
+        self.query = query
+        self.root = parse(query)
+
+    def evaluate(self, cols: FilterColumns, text_index: Optional[CardTextIndex] = None,
+                 search_fields: Sequence[str] = DEFAULT_SEARCH_FIELDS) -> np.ndarray:
+        """Boolean mask over the rows of cols. Raises QueryError for fields the page lacks."""
+        mask = np.zeros(cols.n, dtype=bool)
+        if self.root is None:
+            mask[:] = True
+            return mask
+        ctx = _Context(cols, text_index, search_fields)
+        mask[_rows(self.root, ctx, np.arange(cols.n))] = True
+        return mask
+
+    def explain(self, cols: FilterColumns, text_index: Optional[CardTextIndex] = None,
+                search_fields: Sequence[str] = DEFAULT_SEARCH_FIELDS) -> List[str]:
+        """The evaluation order of the plan against cols, one line per step (for debugging)."""
+        ctx = _Context(cols, text_index, search_fields)
+        lines: List[str] = []
+
+        def walk(node: Node, depth: int):
+            pad = '  ' * depth
+            if isinstance(node, (And, Or)):
+                lines.append(f"{pad}{type(node).__name__.upper()}")
+                for child in _order(node.children, ctx):
+                    walk(child, depth + 1)
+            elif isinstance(node, Not):
+                lines.append(f"{pad}NOT")
+                walk(node.child, depth + 1)
+            else:
+                step = f"text '{node.text}'" if isinstance(node, Text) else f"{node.field} {node.op} '{node.value}'"
+                cost = _cost(node)
+                estimate = ctx.text_estimate(node) if _is_text(node) else None
+                lines.append(f"{pad}{step} [cost {cost}]" if estimate is None
+                             else f"{pad}{step} [cost {COST_INDEX}, ~{estimate} rows]")
+
+        if self.root is not None:
+            walk(self.root, 0)
+        return lines
+
+_plan_cache: Dict[str, QueryPlan] = {}
+
+def compile_query(query: str) -> QueryPlan:
+    """Parses query into a QueryPlan, caching the most recent ones. Raises QueryError."""
+    query = query.strip()
+    plan = _plan_cache.get(query)
+    if plan is None:
+        plan = QueryPlan(query)
+        if len(_plan_cache) >= 64:
+            _plan_cache.clear()
+        _plan_cache[query] = plan
+    return plan
+
+def evaluate_query(query: str, cols: FilterColumns, text_index: Optional[CardTextIndex] = None,
+                   search_fields: Sequence[str] = DEFAULT_SEARCH_FIELDS) -> Tuple[np.ndarray, str]:
+    """
+    Evaluates an advanced search query for a page. Returns the row mask and an error
+    message; an invalid query matches all rows so the page keeps showing results.
+    """
+    try:
+        return compile_query(query or '').evaluate(cols, text_index, search_fields), ''
+    except QueryError as e:
+        return np.ones(cols.n, dtype=bool), str(e)
@@ -0,0 +1,87 @@
+from bisect import insort
+from typing import Iterable, List, Set
+from src.core.models import ApiCard, ApiCardSet
+
+def set_option(card_set: ApiCardSet) -> str:
+    """Set selector entry of a card set, e.g. 'Legend of Blue Eyes White Dragon | LOB'."""
+    return f"{card_set.set_name} | {card_set.code_parts.prefix}"
+
+class _SortedOptions:
+    """A set of option strings that also keeps them as a sorted list."""
+    def __init__(self, values: Iterable[str]):
+        self._values: Set[str] = {v for v in values if v}
+        self.sorted: List[str] = sorted(self._values)
+
+    def add(self, value: str):
+        if value and value not in self._values:
+            self._values.add(value)
+            # Copy on write: pages may still hold the previous list
+            updated = list(self.sorted)
+            insort(updated, value)
+            self.sorted = updated
+
+class CatalogMetadata:
+    """
+    Filter option vocabularies of a card database: set selector entries, monster and
+    spell/trap races, archetypes, rarities and attributes, each served as a sorted list.
+
+    The lists are shared by every page, so callers must not mutate them; additions
+    replace a list instead of changing it in place.
+    """
+    def __init__(self, cards: Iterable[ApiCard] = ()):
+        sets, m_races, st_races, archetypes, rarities, attributes = set(), set(), set(), set(), set(), set()
+        for c in cards:
+            for s in c.card_sets or []:
+                sets.add(set_option(s))
+                rarities.add(s.set_rarity)
+            archetypes.add(c.archetype)
+            attributes.add(c.attribute)
+            if "Monster" in c.type:
+                m_races.add(c.race)
+            elif "Spell" in c.type or "Trap" in c.type:
+                st_races.add(c.race)
+
+        self._sets = _SortedOptions(sets)
+        self._monster_races = _SortedOptions(m_races)
+        self._st_races = _SortedOptions(st_races)
+        self._archetypes = _SortedOptions(archetypes)
+        self._rarities = _SortedOptions(rarities)
+        self._attributes = _SortedOptions(attributes)
+
+    @property
+    def sets(self) -> List[str]:
+        return self._sets.sorted
+
+    @property
+    def monster_races(self) -> List[str]:
+        return self._monster_races.sorted
+
+    @property
+    def st_races(self) -> List[str]:
+        return self._st_races.sorted
+
+    @property
+    def archetypes(self) -> List[str]:
+        return self._archetypes.sorted
+
+    @property
+    def rarities(self) -> List[str]:
+        return self._rarities.sorted
+
+    @property
+    def attributes(self) -> List[str]:
+        return self._attributes.sorted
+
+    def add_card_set(self, card_set: ApiCardSet):
+        """Registers a set or variant added to the database."""
+        self._sets.add(set_option(card_set))
+        self._rarities.add(card_set.set_rarity)
+
+    def apply_to(self, state: dict):
+        """Copies the option lists into a page's filter state."""
+        state['available_sets'] = self.sets
+        state['available_monster_races'] = self.monster_races
+        state['available_st_races'] = self.st_races
+        state['available_archetypes'] = self.archetypes
+        state['available_rarities'] = self.rarities
+        state['available_attributes'] = self.attributes
@@ -1,6 +1,7 @@
 from src.core.models import Collection, CollectionCard, CollectionVariant, CollectionEntry, ApiCard
+from src.core.collection_events import collection_events, EntryChanged, VariantAdded, VariantRemoved, StorageRenamed
 from src.core.utils import generate_variant_id
-from typing import Optional
+from typing import Iterable, Optional
 
 class CollectionEditor:
     @staticmethod
@@ -19,7 +20,7 @@ class CollectionEditor:
         """
         Returns the quantity of a specific card entry (specific storage location).
         """
-        target_card = next((c for c in collection.cards if c.card_id == card_id), None)
+        target_card = collection.ownership.card(card_id)
         if not target_card:
             return 0
 
@@ -57,7 +58,7 @@ class CollectionEditor:
         """
         Returns the total quantity of a card configuration across all storage locations.
         """
-        target_card = next((c for c in collection.cards if c.card_id == card_id), None)
+        target_card = collection.ownership.card(card_id)
         if not target_card:
             return 0
 
@@ -102,11 +103,7 @@ class CollectionEditor:
         modified = False
 
         # 1. Find or Create CollectionCard
-        target_card = None
-        for c in collection.cards:
-            if c.card_id == api_card.id:
-                target_card = c
-                break
+        target_card = collection.ownership.card(api_card.id)
 
         if not target_card:
             # If removing/setting 0 and it doesn't exist, do nothing
@@ -118,6 +115,7 @@ class CollectionEditor:
 
             target_card = CollectionCard(card_id=api_card.id, name=api_card.name)
             collection.cards.append(target_card)
+            collection.track_card_added(target_card)
             modified = True
 
         # 2. Determine Variant ID
@@ -146,6 +144,7 @@ class CollectionEditor:
                      image_id=image_id
                  )
                  target_card.variants.append(target_variant)
+                 collection_events.publish(VariantAdded(collection, target_card.card_id, target_variant_id))
                  modified = True
 
         if target_variant:
@@ -169,34 +168,50 @@ class CollectionEditor:
                 final_quantity = current_quantity + quantity
 
             # 6. Apply Quantity Change
+            def entry_changed(delta: int):
+                collection_events.publish(EntryChanged(
+                    collection, api_card, target_variant.variant_id, target_variant.set_code,
+                    target_variant.rarity, target_variant.image_id, language, condition,
+                    first_edition, storage_location, delta))
+
             if final_quantity > 0:
                 if target_entry:
                     if target_entry.quantity != final_quantity:
+                        delta = final_quantity - target_entry.quantity
+                        collection.track_entry_delta(target_card.card_id, target_variant, target_entry, delta)
                         target_entry.quantity = final_quantity
+                        entry_changed(delta)
                         modified = True
                 else:
-                    target_variant.entries.append(CollectionEntry(
+                    new_entry = CollectionEntry(
                         condition=condition,
                         language=language,
                         first_edition=first_edition,
                         quantity=final_quantity,
                         storage_location=storage_location
-                    ))
+                    )
+                    target_variant.entries.append(new_entry)
+                    collection.track_entry_delta(target_card.card_id, target_variant, new_entry, final_quantity)
+                    entry_changed(final_quantity)
                     modified = True
             else:
                 if target_entry:
                     target_variant.entries.remove(target_entry)
+                    collection.track_entry_delta(target_card.card_id, target_variant, target_entry, -target_entry.quantity)
+                    entry_changed(-target_entry.quantity)
                     modified = True
 
             # 7. Cleanup Empty Variant
             if not target_variant.entries:
                 target_card.variants.remove(target_variant)
+                collection_events.publish(VariantRemoved(collection, target_card.card_id, target_variant.variant_id))
                 modified = True
 
         # 8. Cleanup Empty Card
         if not target_card.variants:
             if target_card in collection.cards:
                 collection.cards.remove(target_card)
+                collection.track_card_removed(target_card)
                 modified = True
 
         return modified
@@ -264,4 +279,29 @@ class CollectionEditor:
                         entry.storage_location = new_name
                         modified = True
 
+        if modified:
+            collection.track_storage_rename(old_name, new_name)
+            collection_events.publish(StorageRenamed(collection, old_name, new_name))
+        return modified
+
+    @staticmethod
+    def replay_changes(collection: Collection, changes: Iterable) -> bool:
+        """
+        Applies change events recorded on another copy of the collection (see CollectionSaved).
+        The replayed edits are published like any other, but not recorded as unsaved changes,
+        since they are already in the file.
+        Returns True if the collection was modified.
+        """
+        modified = False
+        with collection_events.replaying():
+            for change in changes:
+                if isinstance(change, EntryChanged):
+                    modified |= CollectionEditor.apply_change(
+                        collection, change.api_card, change.set_code, change.rarity, change.language,
+                        change.quantity_delta, change.condition, change.first_edition,
+                        image_id=change.image_id, variant_id=change.variant_id, mode='ADD',
+                        storage_location=change.storage_location
+                    )
+                elif isinstance(change, StorageRenamed):
+                    modified |= CollectionEditor.rename_storage_location(collection, change.old_name, change.new_name)
         return modified
@@ -0,0 +1,108 @@
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Tuple, Optional
+from src.core.models import Collection, CollectionCard, CollectionVariant, ApiCard
+from src.core.persistence import persistence, construct_collection
+from src.core.changelog_manager import changelog_manager
+from src.services.undo_service import UndoService
+
+logger = logging.getLogger(__name__)
+
+# (card_id, variant_id, language, condition, first_edition, storage_location)
+EntryKey = Tuple[int, str, str, str, bool, Optional[str]]
+
+def reconstruct(collection_name: str, timestamp: float) -> Collection:
+    """
+    Rebuilds a collection file as it was at the given unix timestamp. Blocks.
+    Starts from the newest checkpoint taken at or before the timestamp and replays only
+    the changelog records after it. Without such a checkpoint the replay starts from an
+    empty copy of the current collection, so changes made before logging began are missing.
+    """
+    checkpoint = changelog_manager.load_checkpoint(collection_name, timestamp)
+    if checkpoint:
+        collection = construct_collection(checkpoint['collection'])
+        after_id = checkpoint['id']
+    else:
+        current = persistence.load_collection(collection_name)
+        collection = Collection(
+            name=current.name,
+            description=current.description,
+            storage_definitions=current.storage_definitions
+        )
+        after_id = 0
+
+    card_cache: Dict[int, ApiCard] = {}
+    replayed = 0
+    for record in changelog_manager.iter_changes(collection_name, after_id=after_id, until=timestamp):
+        UndoService.apply_forward(collection, record, card_cache=card_cache)
+        replayed += 1
+
+    logger.info(f"Reconstructed {collection_name} as of {datetime.fromtimestamp(timestamp)}: "
+                f"checkpoint at record {after_id}, {replayed} records replayed")
+    return collection
+
+def diff_changes(current: Collection, target: Collection) -> List[Dict[str, Any]]:
+    """Returns changelog-style ADD/REMOVE changes that turn current into target."""
+    current_entries = _entry_index(current)
+    target_entries = _entry_index(target)
+
+    changes = []
+    for key in list(current_entries) + [k for k in target_entries if k not in current_entries]:
+        cur_qty = current_entries[key][0].quantity if key in current_entries else 0
+        tgt_qty = target_entries[key][0].quantity if key in target_entries else 0
+        if cur_qty == tgt_qty:
+            continue
+
+        _, card, var = target_entries[key] if tgt_qty > cur_qty else current_entries[key]
+        changes.append({
+            'action': 'ADD' if tgt_qty > cur_qty else 'REMOVE',
+            'quantity': abs(tgt_qty - cur_qty),
+            'card_data': {
+                'card_id': card.card_id,
+                'name': card.name,
+                'set_code': var.set_code,
+                'rarity': var.rarity,
+                'image_id': var.image_id,
+                'language': key[2],
+                'condition': key[3],
+                'first_edition': key[4],
+                'variant_id': var.variant_id,
+                'storage_location': key[5]
+            }
+        })
+    return changes
+
+def restore_to(collection_name: str, timestamp: float) -> int:
+    """
+    Restores a collection file to its state at the given timestamp. Blocks.
+    The restore is logged as a single batch, so it can itself be undone.
+    Returns the number of entry changes applied.
+    """
+    current = persistence.load_collection(collection_name)
+    target = reconstruct(collection_name, timestamp)
+    changes = diff_changes(current, target)
+    if not changes:
+        return 0
+
+    record = {'type': 'batch', 'changes': changes}
+    UndoService.apply_forward(current, record)
+
+    changelog_manager.log_batch_change(
+        collection_name,
+        f"Restored to {datetime.fromtimestamp(timestamp).strftime('%Y-%m-%d %H:%M')}",
+        changes
+    )
+    persistence.save_collection(current, collection_name)
+    return len(changes)
+
+def _entry_index(collection: Collection) -> Dict[EntryKey, Tuple[Any, CollectionCard, CollectionVariant]]:
+    index = {}
+    for card in collection.cards:
+        for var in card.variants:
+            for entry in var.entries:
+                if entry.quantity <= 0:
+                    continue
+                key = (card.card_id, var.variant_id, entry.language, entry.condition,
+                       entry.first_edition, entry.storage_location)
+                index[key] = (entry, card, var)
+    return index
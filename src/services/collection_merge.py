@@ -0,0 +1,133 @@
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Any
+from src.core.models import Collection
+from src.core.persistence import persistence
+
+logger = logging.getLogger(__name__)
+
+# (card_id, variant_id, language, condition, first_edition, storage_location)
+MergeKey = Tuple[int, str, str, str, bool, Optional[str]]
+
+@dataclass
+class MergeConflict:
+    kind: str  # 'storage', 'variant' or 'card'
+    key: str
+    message: str
+
+@dataclass
+class MergeResult:
+    filename: str
+    sources: List[str]
+    unique_cards: int = 0
+    entries: int = 0
+    total_quantity: int = 0
+    conflicts: List[MergeConflict] = field(default_factory=list)
+
+class CollectionMerger:
+    """
+    Merges any number of collections in a single hash-join pass.
+    Entries are keyed by MergeKey and their quantities summed; card, variant and
+    storage metadata is taken from the first collection that defines it, and any
+    disagreement with later collections is reported as a MergeConflict.
+    """
+    def __init__(self):
+        self.card_names: Dict[int, str] = {}
+        self.variants: Dict[Tuple[int, str], Dict[str, Any]] = {}
+        self.entries: Dict[MergeKey, Dict[str, Any]] = {}
+        self.storage: Dict[str, Dict[str, Any]] = {}
+        self.conflicts: List[MergeConflict] = []
+
+    def add(self, collection: Collection, source: str = ""):
+        """Folds one collection into the merge state."""
+        label = source or collection.name
+
+        for s in collection.storage_definitions:
+            data = s.model_dump(mode='json')
+            existing = self.storage.get(s.name)
+            if existing is None:
+                self.storage[s.name] = data
+            elif existing != data:
+                self.conflicts.append(MergeConflict(
+                    'storage', s.name,
+                    f"Storage '{s.name}' in {label} differs from an earlier definition; keeping the first one."
+                ))
+
+        for card in collection.cards:
+            name = self.card_names.setdefault(card.card_id, card.name)
+            if name != card.name:
+                self.conflicts.append(MergeConflict(
+                    'card', str(card.card_id),
+                    f"Card {card.card_id} is named '{card.name}' in {label} but '{name}' earlier; keeping '{name}'."
+                ))
+
+            for var in card.variants:
+                var_key = (card.card_id, var.variant_id)
+                meta = {'set_code': var.set_code, 'rarity': var.rarity, 'image_id': var.image_id}
+                existing = self.variants.get(var_key)
+                if existing is None:
+                    self.variants[var_key] = meta
+                elif existing != meta:
+                    self.conflicts.append(MergeConflict(
+                        'variant', var.variant_id,
+                        f"Variant {var.variant_id} of card {card.card_id} has {var.set_code} ({var.rarity}) in {label} "
+                        f"but {existing['set_code']} ({existing['rarity']}) earlier; keeping the first one."
+                    ))
+
+                for entry in var.entries:
+                    if entry.quantity <= 0:
+                        continue
+                    key = (card.card_id, var.variant_id, entry.language, entry.condition,
+                           entry.first_edition, entry.storage_location)
+                    merged = self.entries.get(key)
+                    if merged is None:
+                        self.entries[key] = entry.model_dump(mode='json')
+                    else:
+                        merged['quantity'] += entry.quantity
+
+    def iter_cards(self) -> Iterator[Dict[str, Any]]:
+        """Yields merged cards in CollectionCard.model_dump(mode='json') format."""
+        grouped: Dict[int, Dict[str, List[Dict[str, Any]]]] = {}
+        for key, entry in self.entries.items():
+            grouped.setdefault(key[0], {}).setdefault(key[1], []).append(entry)
+
+        for card_id, variants in grouped.items():
+            yield {
+                'card_id': card_id,
+                'name': self.card_names[card_id],
+                'variants': [
+                    {'variant_id': variant_id, **self.variants[(card_id, variant_id)], 'entries': entries}
+                    for variant_id, entries in variants.items()
+                ]
+            }
+
+def merge_collection_files(sources: Iterable[str], target_filename: str, name: str,
+                           description: str = "") -> MergeResult:
+    """
+    Merges the given collection files into a new collection file. Blocks.
+    Sources are loaded one at a time, so only the merge state and a single source
+    are held in memory; the result is streamed to disk.
+    """
+    sources = list(sources)
+    merger = CollectionMerger()
+
+    for filename in sources:
+        merger.add(persistence.load_collection(filename), source=filename)
+
+    stats = persistence.save_collection_stream(
+        name, description, list(merger.storage.values()), merger.iter_cards(), target_filename
+    )
+
+    for c in merger.conflicts:
+        logger.warning(f"Merge conflict ({c.kind}): {c.message}")
+    logger.info(f"Merged {len(sources)} collections into {target_filename}: "
+                f"{len(merger.entries)} entries, {stats.total_qty} cards, {len(merger.conflicts)} conflicts")
+
+    return MergeResult(
+        filename=target_filename,
+        sources=sources,
+        unique_cards=stats.unique_cards,
+        entries=len(merger.entries),
+        total_quantity=stats.total_qty,
+        conflicts=merger.conflicts
+    )
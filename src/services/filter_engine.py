@@ -0,0 +1,744 @@
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.core.models import ApiCard
+from src.services.text_index import TextIndex, CardTextIndex, CARD_TEXT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the FilterPane range sliders. A range is only applied once narrowed from these.
+ATK_DEF_LIMIT = 5000
+PRICE_LIMIT = 1000.0
+OWNERSHIP_LIMIT = 100
+
+DEFAULT_SEARCH_FIELDS = ('name', 'type', 'desc', 'set_code')
+
+# Text searches restricted to at most this many rows check them directly instead of using the indexes
+DIRECT_SCAN_LIMIT = 1000
+
+# Cached masks kept per filter (e.g. the last few ATK ranges)
+MASKS_PER_FILTER = 8
+
+# Sort options shared by the card pages, see FilterColumns.sort_order
+SORT_KEYS = ('Name', 'ATK', 'DEF', 'Level', 'Newest', 'Price', 'Quantity', 'Set Code')
+
+# Cached masks and sort orders that only depend on the rows' cards, which FilterColumns.splice can patch
+CARD_LEVEL_FILTERS = {'type', 'attr', 'monster_race', 'st_race', 'archetype', 'category', 'level', 'atk', 'def'}
+CARD_LEVEL_SORT_KEYS = {'Name', 'ATK', 'DEF', 'Level', 'Newest'}
+
+# (set_code, set_name, rarity)
+SetTuple = Tuple[str, str, str]
+
+COMPARATORS: Dict[str, Callable[[np.ndarray, float], np.ndarray]] = {
+    '=': np.equal, '!=': np.not_equal, '>': np.greater, '>=': np.greater_equal, '<': np.less, '<=': np.less_equal,
+}
+
+def tcgplayer_price(card: ApiCard) -> float:
+    """The card's TCGplayer market price as a float (0.0 if missing or malformed)."""
+    return card.tcgplayer_price
+
+class _Vocab:
+    """Maps strings to dense integer codes (-1 for missing values)."""
+    def __init__(self):
+        self.codes: Dict[Any, int] = {}
+        self.values: List[Any] = []
+
+    def code(self, value) -> int:
+        if value is None:
+            return -1
+        c = self.codes.get(value)
+        if c is None:
+            c = len(self.values)
+            self.codes[value] = c
+            self.values.append(value)
+        return c
+
+    def lookup(self, value) -> int:
+        return self.codes.get(value, -2)
+
+    def matching(self, value: str) -> List[int]:
+        """Codes of all values equal to value, ignoring case."""
+        value = value.lower()
+        return [c for c, v in enumerate(self.values) if isinstance(v, str) and v.lower() == value]
+
+class _MultiColumn:
+    """A multi-valued row attribute (e.g. owned languages) as flat (row, code) arrays."""
+    def __init__(self, n_rows: int, values_of: Callable[[Any], Iterable[str]], rows: Sequence[Any]):
+        self.vocab = _Vocab()
+        self.values_of = values_of
+        self.n_rows = n_rows
+        self.owners, self.codes = self._encode(rows, 0)
+
+    def _encode(self, rows: Sequence[Any], first_row: int) -> Tuple[np.ndarray, np.ndarray]:
+        owners, codes = [], []
+        for i, row in enumerate(rows, first_row):
+            for v in self.values_of(row) or ():
+                owners.append(i)
+                codes.append(self.vocab.code(v))
+        return np.asarray(owners, dtype=np.int64), np.asarray(codes, dtype=np.int64)
+
+    def splice(self, start: int, stop: int, new_rows: Sequence[Any]):
+        """Replaces the values of rows [start, stop) by those of new_rows."""
+        lo, hi = np.searchsorted(self.owners, [start, stop])
+        owners, codes = self._encode(new_rows, start)
+        delta = len(new_rows) - (stop - start)
+        self.owners = np.concatenate([self.owners[:lo], owners, self.owners[hi:] + delta])
+        self.codes = np.concatenate([self.codes[:lo], codes, self.codes[hi:]])
+        self.n_rows += delta
+
+    def any_of(self, values: Iterable[str]) -> np.ndarray:
+        """Rows holding any of the values (case-insensitive)."""
+        wanted = [c for v in values for c in self.vocab.matching(v)]
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.owners[np.isin(self.codes, wanted)]] = True
+        return mask
+
+class FilterColumns:
+    """
+    Columnar NumPy view over a page's rows for vectorized filtering with FilterPane state.
+
+    Card attributes are stored once per distinct ApiCard and broadcast to rows via
+    card_index; per-row data (sets, ownership, price, languages, ...) comes from the
+    accessor callables, so every page can keep its own row objects. Build once per
+    row list and call mask() on every filter change.
+    """
+    def __init__(self, rows: Sequence[Any], card_of: Callable[[Any], ApiCard],
+                 sets_of: Optional[Callable[[Any], Iterable[SetTuple]]] = None,
+                 qty_of: Optional[Callable[[Any], int]] = None,
+                 price_of: Optional[Callable[[Any], float]] = None,
+                 owned_of: Optional[Callable[[Any], bool]] = None,
+                 languages_of: Optional[Callable[[Any], Iterable[str]]] = None,
+                 conditions_of: Optional[Callable[[Any], Iterable[str]]] = None,
+                 storages_of: Optional[Callable[[Any], Iterable[str]]] = None):
+        self.rows = rows
+        self.n = len(rows)
+        self._card_of = card_of
+        self._qty_of = qty_of
+        self._price_of = price_of
+        self._owned_of = owned_of
+
+        # --- Card level ---
+        card_pos: Dict[int, int] = {}
+        self._card_pos = card_pos
+        cards: List[ApiCard] = []
+        card_index = np.empty(self.n, dtype=np.int64)
+        for i, row in enumerate(rows):
+            card = card_of(row)
+            pos = card_pos.get(id(card))
+            if pos is None:
+                pos = len(cards)
+                card_pos[id(card)] = pos
+                cards.append(card)
+            card_index[i] = pos
+        self.card_index = card_index
+        self.cards = cards
+        self.card_ids = np.fromiter((c.id for c in cards), dtype=np.int64, count=len(cards))
+
+        self._types = _Vocab()
+        self._type_kinds = _Vocab()
+        self._attrs = _Vocab()
+        self._races = _Vocab()
+        self._archetypes = _Vocab()
+        # Representative card per (type, typeline) combination, for matches_category
+        self._kind_cards: List[ApiCard] = []
+
+        m = len(cards)
+        self.type_code = np.empty(m, dtype=np.int64)
+        self.kind_code = np.empty(m, dtype=np.int64)
+        self.attr_code = np.empty(m, dtype=np.int64)
+        self.race_code = np.empty(m, dtype=np.int64)
+        self.archetype_code = np.empty(m, dtype=np.int64)
+        self.atk = np.empty(m, dtype=np.float64)
+        self.def_ = np.empty(m, dtype=np.float64)
+        self.level = np.empty(m, dtype=np.float64)
+
+        for j, c in enumerate(cards):
+            self.type_code[j] = self._types.code(c.type)
+            typeline = getattr(c, 'typeline', None)
+            kind = (c.type, tuple(typeline) if typeline is not None else None)
+            k = self._type_kinds.code(kind)
+            if k == len(self._kind_cards):
+                self._kind_cards.append(c)
+            self.kind_code[j] = k
+            self.attr_code[j] = self._attrs.code(c.attribute)
+            self.race_code[j] = self._races.code(c.race)
+            self.archetype_code[j] = self._archetypes.code(c.archetype)
+            self.atk[j] = c.atk if c.atk is not None else np.nan
+            self.def_[j] = c.def_ if c.def_ is not None else np.nan
+            self.level[j] = c.level if c.level is not None else np.nan
+
+        self._type_hits: Dict[str, np.ndarray] = {}
+        self._category_hits: Dict[str, np.ndarray] = {}
+        self._text: Dict[str, TextIndex] = {}
+        self._indexed_by: Optional[CardTextIndex] = None
+        self._missing = np.empty(0, dtype=np.int64)
+        self._missing_text: Dict[str, TextIndex] = {}
+        self._mask_cache: Dict[str, Dict[Tuple, Optional[np.ndarray]]] = {}
+        # (text, fields, text_index, matched literally, mask) of the last search
+        self._last_search: Optional[Tuple] = None
+        self._sort_orders: Dict[Tuple[str, bool], Optional[np.ndarray]] = {}
+
+        # --- Row level ---
+        self._sets_of = sets_of
+        self.set_owner = np.empty(0, dtype=np.int64)
+        self._set_codes: List[str] = []
+        self._set_names: List[str] = []
+        if sets_of:
+            self._prefixes = _Vocab()
+            self._rarities = _Vocab()
+            self.set_owner, self._set_codes, self._set_names, self.set_prefix, self.set_rarity = self._encode_sets(rows, 0)
+
+        self.qty = self._encode_qty(rows)
+        self.price = self._encode_price(rows)
+        self.owned = self._encode_owned(rows, self.qty)
+
+        self.languages = _MultiColumn(self.n, languages_of, rows) if languages_of else None
+        self.conditions = _MultiColumn(self.n, conditions_of, rows) if conditions_of else None
+        self.storages = _MultiColumn(self.n, storages_of, rows) if storages_of else None
+
+    def _encode_sets(self, rows: Sequence[Any], first_row: int):
+        owners, codes, names, prefixes, rarities = [], [], [], [], []
+        for i, row in enumerate(rows, first_row):
+            for code, name, rarity in self._sets_of(row) or ():
+                code = code or ''
+                owners.append(i)
+                codes.append(code)
+                names.append(name or '')
+                prefixes.append(self._prefixes.code(code.split('-')[0].lower()))
+                rarities.append(self._rarities.code((rarity or '').lower()))
+        return (np.asarray(owners, dtype=np.int64), codes, names,
+                np.asarray(prefixes, dtype=np.int64), np.asarray(rarities, dtype=np.int64))
+
+    def _encode_qty(self, rows: Sequence[Any]) -> Optional[np.ndarray]:
+        if not self._qty_of:
+            return None
+        return np.fromiter((self._qty_of(r) for r in rows), dtype=np.int64, count=len(rows))
+
+    def _encode_price(self, rows: Sequence[Any]) -> Optional[np.ndarray]:
+        if not self._price_of:
+            return None
+        return np.fromiter((self._price_of(r) or 0.0 for r in rows), dtype=np.float64, count=len(rows))
+
+    def _encode_owned(self, rows: Sequence[Any], qty: Optional[np.ndarray]) -> Optional[np.ndarray]:
+        if self._owned_of:
+            return np.fromiter((bool(self._owned_of(r)) for r in rows), dtype=bool, count=len(rows))
+        return qty > 0 if qty is not None else None
+
+    def splice(self, start: int, old_count: int) -> bool:
+        """
+        Updates the columns after the page replaced its rows[start:start + old_count], all
+        showing the same card, in place (any number of rows, including none, may replace
+        them). Only the new rows are read: cached masks and sort orders that depend on the
+        cards alone are patched, the rest are recomputed on their next use. Returns False,
+        without changes, if the new rows show a card these columns do not hold; the columns
+        must then be rebuilt.
+        """
+        stop = start + old_count
+        new_count = len(self.rows) - self.n + old_count
+        new_rows = self.rows[start:start + new_count]
+        positions = {self._card_pos.get(id(self._card_of(r))) for r in new_rows}
+        if None in positions or len(positions) > 1:
+            return False
+        if old_count and positions and positions != set(self.card_index[start:stop].tolist()):
+            return False
+        delta = new_count - old_count
+
+        def spliced(values: np.ndarray, new_values: np.ndarray) -> np.ndarray:
+            return np.concatenate([values[:start], new_values, values[stop:]])
+
+        card = positions.pop() if positions else 0
+        self.card_index = spliced(self.card_index, np.full(new_count, card, dtype=np.int64))
+
+        if self._sets_of:
+            lo, hi = np.searchsorted(self.set_owner, [start, stop])
+            owners, codes, names, prefixes, rarities = self._encode_sets(new_rows, start)
+            self.set_owner = np.concatenate([self.set_owner[:lo], owners, self.set_owner[hi:] + delta])
+            self._set_codes[lo:hi] = codes
+            self._set_names[lo:hi] = names
+            self.set_prefix = np.concatenate([self.set_prefix[:lo], prefixes, self.set_prefix[hi:]])
+            self.set_rarity = np.concatenate([self.set_rarity[:lo], rarities, self.set_rarity[hi:]])
+            self._text.pop('set_code', None)
+            self._text.pop('set_name', None)
+
+        new_qty = self._encode_qty(new_rows)
+        if new_qty is not None:
+            self.qty = spliced(self.qty, new_qty)
+        if self.price is not None:
+            self.price = spliced(self.price, self._encode_price(new_rows))
+        if self.owned is not None:
+            self.owned = spliced(self.owned, self._encode_owned(new_rows, new_qty))
+        for column in (self.languages, self.conditions, self.storages):
+            if column is not None:
+                column.splice(start, stop, new_rows)
+        self.n += delta
+
+        # Card-level values of the replaced rows carry over to the new ones
+        self._last_search = None
+        for name in list(self._mask_cache):
+            if name not in CARD_LEVEL_FILTERS or not old_count:
+                del self._mask_cache[name]
+                continue
+            masks = self._mask_cache[name]
+            for key, mask in masks.items():
+                if mask is not None:
+                    masks[key] = spliced(mask, np.full(new_count, mask[start]))
+
+        # The replaced rows tie on card-level keys, so they form one block in those orders
+        for cache_key, order in list(self._sort_orders.items()):
+            if order is None or cache_key[0] not in CARD_LEVEL_SORT_KEYS or not old_count:
+                del self._sort_orders[cache_key]
+                continue
+            p = int(np.flatnonzero(order == start)[0])
+            rest = np.concatenate([order[:p], order[p + old_count:]])
+            rest[rest >= stop] += delta
+            self._sort_orders[cache_key] = np.concatenate([
+                rest[:p], np.arange(start, start + new_count, dtype=rest.dtype), rest[p:]
+            ])
+        return True
+
+    # --- Card level predicates (length = number of distinct cards) ---
+
+    def _type_contains(self, token: str) -> np.ndarray:
+        hits = self._type_hits.get(token)
+        if hits is None:
+            needle = token.lower()
+            vocab_hits = np.array([needle in t.lower() for t in self._types.values], dtype=bool)
+            hits = vocab_hits[self.type_code] if len(vocab_hits) else np.zeros(len(self.cards), dtype=bool)
+            self._type_hits[token] = hits
+        return hits
+
+    def _category(self, category: str) -> np.ndarray:
+        hits = self._category_hits.get(category)
+        if hits is None:
+            vocab_hits = np.array([c.matches_category(category) for c in self._kind_cards], dtype=bool)
+            hits = vocab_hits[self.kind_code] if len(vocab_hits) else np.zeros(len(self.cards), dtype=bool)
+            self._category_hits[category] = hits
+        return hits
+
+    def _card_text(self, field: str) -> TextIndex:
+        col = self._text.get(field)
+        if col is None:
+            col = TextIndex([getattr(c, field, None) or '' for c in self.cards], np.arange(len(self.cards)))
+            self._text[field] = col
+        return col
+
+    def _set_text(self, field: str) -> TextIndex:
+        col = self._text.get(field)
+        if col is None:
+            values = self._set_codes if field == 'set_code' else self._set_names
+            col = TextIndex(values, self.set_owner)
+            self._text[field] = col
+        return col
+
+    def _unindexed_text(self, text_index: CardTextIndex, field: str) -> Optional[TextIndex]:
+        """Local index over the cards missing from text_index (None if it covers all of them)."""
+        if self._indexed_by is not text_index:
+            self._indexed_by = text_index
+            self._missing = np.flatnonzero(~np.isin(self.card_ids, text_index.card_ids))
+            self._missing_text = {}
+        if not len(self._missing):
+            return None
+        col = self._missing_text.get(field)
+        if col is None:
+            col = TextIndex([getattr(self.cards[j], field, None) or '' for j in self._missing.tolist()], self._missing)
+            self._missing_text[field] = col
+        return col
+
+    def _rows_mask(self, row_ids: np.ndarray) -> np.ndarray:
+        mask = np.zeros(self.n, dtype=bool)
+        mask[row_ids] = True
+        return mask
+
+    def _direct_search(self, txt: str, fields: Sequence[str], within: np.ndarray) -> np.ndarray:
+        """Literal matches among the given rows, checking their texts one by one."""
+        hits = np.zeros(self.n, dtype=bool)
+        card_fields = [f for f in fields if f in CARD_TEXT_FIELDS]
+        if card_fields:
+            positions = np.unique(self.card_index[within])
+            texts = [self._card_text(f).texts for f in card_fields]
+            matched = np.fromiter((any(txt in t[j] for t in texts) for j in positions.tolist()),
+                                  dtype=bool, count=len(positions))
+            card_hits = np.zeros(len(self.cards), dtype=bool)
+            card_hits[positions[matched]] = True
+            hits[within] = card_hits[self.card_index[within]]
+
+        set_fields = [f for f in fields if f in ('set_code', 'set_name')] if self._sets_of else []
+        if set_fields:
+            texts = [self._set_text(f).texts for f in set_fields]
+            lo = np.searchsorted(self.set_owner, within, 'left').tolist()
+            hi = np.searchsorted(self.set_owner, within, 'right').tolist()
+            for row, a, b in zip(within.tolist(), lo, hi):
+                if not hits[row] and any(txt in t[k] for t in texts for k in range(a, b)):
+                    hits[row] = True
+        return hits
+
+    def search(self, txt: str, fields: Sequence[str] = DEFAULT_SEARCH_FIELDS,
+               text_index: Optional[CardTextIndex] = None, fuzzy: bool = True,
+               within: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Rows where any of the given fields contains txt (case-insensitive). Card fields are
+        looked up in text_index (the catalog's shared index) when given; cards it does not
+        cover fall back to a local index. If nothing matches literally, text_index's fuzzy
+        name index is consulted instead, so misspelled names still find their cards.
+        within restricts the search to the given row positions; small subsets are checked
+        directly instead of through the indexes.
+        """
+        txt = txt.lower().replace('\x00', '')
+        if within is not None and len(within) <= DIRECT_SCAN_LIMIT:
+            hits = self._direct_search(txt, fields, within)
+        else:
+            card_fields = [f for f in fields if f in CARD_TEXT_FIELDS]
+            card_hits = np.zeros(len(self.cards), dtype=bool)
+            row_hits = np.zeros(self.n, dtype=bool)
+
+            if card_fields and text_index is not None:
+                card_hits |= np.isin(self.card_ids, text_index.search(txt, card_fields))
+                for field in card_fields:
+                    local = self._unindexed_text(text_index, field)
+                    if local is not None:
+                        card_hits[local.search(txt)] = True
+            else:
+                for field in card_fields:
+                    card_hits[self._card_text(field).search(txt)] = True
+
+            if self._sets_of:
+                for field in fields:
+                    if field in ('set_code', 'set_name'):
+                        row_hits[self._set_text(field).search(txt)] = True
+
+            hits = row_hits | card_hits[self.card_index]
+            if within is not None:
+                hits &= self._rows_mask(within)
+
+        # Nothing matched literally: fall back to typo-tolerant name matching
+        if fuzzy and 'name' in fields and text_index is not None and not hits.any():
+            hits = np.isin(self.card_ids, text_index.names.search(txt))[self.card_index]
+            if within is not None:
+                hits &= self._rows_mask(within)
+        return hits
+
+    def estimate_search(self, txt: str, fields: Sequence[str], text_index: Optional[CardTextIndex]) -> Optional[int]:
+        """
+        Upper bound of the rows a literal search() matches, counted from the trigram candidates
+        of text_index without checking any text. None if it cannot be estimated: txt is
+        shorter than a trigram, or a field is not one of text_index's card fields.
+        """
+        if text_index is None or not fields or any(f not in text_index.fields for f in fields):
+            return None
+        txt = txt.lower().replace('\x00', '')
+        card_hits = np.zeros(len(self.cards), dtype=bool)
+        for field in fields:
+            index = text_index.fields[field]
+            candidates = index.candidates(txt)
+            if candidates is None:
+                return None
+            card_hits |= np.isin(self.card_ids, index.ids[candidates])
+            local = self._unindexed_text(text_index, field)
+            if local is not None:
+                card_hits[local.ids[local.candidates(txt)]] = True
+        return int(np.count_nonzero(card_hits[self.card_index]))
+
+    def _refined_search(self, txt: str, fields: Sequence[str], text_index: Optional[CardTextIndex]) -> np.ndarray:
+        """
+        search() that reuses the previous result when txt extends the previous query:
+        every row containing txt also contains the previous text, so only its literal
+        matches need checking.
+        """
+        txt = txt.lower()
+        last = self._last_search
+        within = None
+        if last and last[0] in txt and last[1:4] == (tuple(fields), text_index, True):
+            within = np.flatnonzero(last[4])
+
+        hits = self.search(txt, fields, text_index, fuzzy=False, within=within)
+        literal = bool(hits.any())
+        if not literal:
+            hits = self.search(txt, fields, text_index)
+        self._last_search = (txt, tuple(fields), text_index, literal, hits)
+        return hits
+
+    def cached_mask(self, key: Tuple, compute: Callable[[], Optional[np.ndarray]]) -> Optional[np.ndarray]:
+        """
+        The mask of one filter, keyed by the filter and its parameters. Masks live as long as
+        these columns, i.e. until the page's rows change. The returned arrays are shared and
+        must not be modified.
+        """
+        masks = self._mask_cache.setdefault(key[0], {})
+        if key in masks:
+            return masks[key]
+        mask = compute()
+        if len(masks) >= MASKS_PER_FILTER:
+            masks.pop(next(iter(masks)))
+        masks[key] = mask
+        return mask
+
+    def mask(self, state: Dict[str, Any], search_text: str = '', search_fields: Sequence[str] = DEFAULT_SEARCH_FIELDS,
+             only_owned: bool = False, category_match: str = 'all',
+             text_index: Optional[CardTextIndex] = None) -> np.ndarray:
+        """
+        Evaluates the FilterPane state keys against all rows at once and returns a boolean
+        mask over the rows. Filters that need a column the page did not provide are skipped.
+        category_match selects whether rows must match 'all' or 'any' selected monster categories.
+        Each filter's mask is cached by its parameters, so changing one filter only recomputes
+        that filter's mask and ANDs it with the cached others.
+        """
+        row_mask = np.ones(self.n, dtype=bool)
+
+        def narrow(key: Tuple, compute: Callable[[], Optional[np.ndarray]]):
+            nonlocal row_mask
+            rows = self.cached_mask(key, compute)
+            if rows is not None:
+                row_mask &= rows
+
+        def as_tuple(value) -> Tuple:
+            return (value,) if isinstance(value, str) else tuple(value)
+
+        if search_text:
+            narrow(('search', search_text.lower(), tuple(search_fields), text_index),
+                   lambda: self._refined_search(search_text, search_fields, text_index))
+        if only_owned:
+            narrow(('owned',), self.owned_rows)
+
+        ctypes = state.get('filter_card_type')
+        if ctypes:
+            narrow(('type', as_tuple(ctypes)), lambda: self.card_type_rows(as_tuple(ctypes)))
+        attr = state.get('filter_attr')
+        if attr:
+            narrow(('attr', attr), lambda: self.attribute_rows(attr))
+        m_race = state.get('filter_monster_race')
+        if m_race:
+            narrow(('monster_race', m_race), lambda: self.monster_race_rows(m_race))
+        st_race = state.get('filter_st_race')
+        if st_race:
+            narrow(('st_race', st_race), lambda: self.st_race_rows(st_race))
+        archetype = state.get('filter_archetype')
+        if archetype:
+            narrow(('archetype', archetype), lambda: self.archetype_rows(archetype))
+
+        categories = state.get('filter_monster_category')
+        if categories:
+            narrow(('category', as_tuple(categories), category_match),
+                   lambda: self.category_rows(as_tuple(categories), category_match))
+
+        level = state.get('filter_level')
+        if level is not None and level != '':
+            narrow(('level', int(level)), lambda: self.compare_rows('level', '=', int(level)))
+
+        for column, limit in (('atk', ATK_DEF_LIMIT), ('def', ATK_DEF_LIMIT), ('price', PRICE_LIMIT)):
+            lo, hi = state.get(f'filter_{column}_min', 0), state.get(f'filter_{column}_max', limit)
+            if lo > 0 or hi < limit:
+                narrow((column, lo, hi), lambda column=column, lo=lo, hi=hi: self.range_rows(column, lo, hi))
+
+        own_min, own_max = state.get('filter_ownership_min', 0), state.get('filter_ownership_max', OWNERSHIP_LIMIT)
+        if own_min > 0 or own_max < state.get('max_owned_quantity', OWNERSHIP_LIMIT):
+            narrow(('qty', own_min, own_max), lambda: self.range_rows('qty', own_min, own_max))
+
+        set_value = state.get('filter_set')
+        if set_value:
+            narrow(('set', set_value), lambda: self.set_rows(set_value))
+        rarity = state.get('filter_rarity')
+        if rarity:
+            narrow(('rarity', rarity), lambda: self.rarity_rows(rarity))
+        lang = state.get('filter_owned_lang')
+        if lang:
+            narrow(('lang', lang), lambda: self.language_rows([lang]))
+
+        conds = state.get('filter_condition')
+        if conds:
+            narrow(('condition', as_tuple(conds)), lambda: self.condition_rows(as_tuple(conds)))
+        storages = state.get('filter_storage')
+        if storages:
+            narrow(('storage', as_tuple(storages)), lambda: self.storage_rows(as_tuple(storages)))
+
+        return row_mask
+
+    # --- Predicates ---
+    # Each returns a row mask, or None when the page did not provide the column it needs.
+    # mask() skips those; the query language (src/services/card_query.py) reports them.
+
+    def _broadcast(self, card_mask: np.ndarray) -> np.ndarray:
+        return card_mask[self.card_index]
+
+    def _codes_rows(self, vocab: _Vocab, codes: np.ndarray, value: str) -> np.ndarray:
+        return self._broadcast(np.isin(codes, vocab.matching(value)))
+
+    def card_type_rows(self, tokens: Sequence[str]) -> np.ndarray:
+        """Rows whose card type contains any of the tokens ('Spell' matches 'Spell Card')."""
+        hits = np.zeros(len(self.cards), dtype=bool)
+        for t in tokens:
+            hits |= self._type_contains(t)
+        return self._broadcast(hits)
+
+    def attribute_rows(self, value: str) -> np.ndarray:
+        return self._codes_rows(self._attrs, self.attr_code, value)
+
+    def archetype_rows(self, value: str) -> np.ndarray:
+        return self._codes_rows(self._archetypes, self.archetype_code, value)
+
+    def monster_race_rows(self, value: str) -> np.ndarray:
+        return self._codes_rows(self._races, self.race_code, value) & self._broadcast(self._type_contains('Monster'))
+
+    def st_race_rows(self, value: str) -> np.ndarray:
+        is_st = self._type_contains('Spell') | self._type_contains('Trap')
+        return self._codes_rows(self._races, self.race_code, value) & self._broadcast(is_st)
+
+    def race_rows(self, value: str) -> np.ndarray:
+        """Monster type or Spell/Trap property, whichever the card has."""
+        return self._codes_rows(self._races, self.race_code, value)
+
+    def category_rows(self, categories: Sequence[str], match: str = 'all') -> np.ndarray:
+        hits = [self._category(cat) for cat in categories]
+        return self._broadcast(np.logical_and.reduce(hits) if match == 'all' else np.logical_or.reduce(hits))
+
+    def _numeric(self, column: str) -> Optional[np.ndarray]:
+        if column in ('atk', 'def', 'level'):
+            values = {'atk': self.atk, 'def': self.def_, 'level': self.level}[column]
+            return values[self.card_index]
+        if column == 'qty':
+            return self.qty
+        if column == 'price':
+            return self.price
+        raise ValueError(f"Unknown numeric column: {column}")
+
+    def compare_rows(self, column: str, op: str, value: float) -> Optional[np.ndarray]:
+        """Rows where column <op> value, for column in atk/def/level/qty/price. Missing values never match."""
+        values = self._numeric(column)
+        if values is None:
+            return None
+        with np.errstate(invalid='ignore'):
+            return COMPARATORS[op](values, value)
+
+    def range_rows(self, column: str, lo: float, hi: float) -> Optional[np.ndarray]:
+        values = self._numeric(column)
+        if values is None:
+            return None
+        with np.errstate(invalid='ignore'):
+            return (values >= lo) & (values <= hi)
+
+    def owned_rows(self) -> Optional[np.ndarray]:
+        return self.owned
+
+    def set_prefix_rows(self, prefix: str) -> Optional[np.ndarray]:
+        """Rows with a set whose code prefix is exactly prefix (case-insensitive)."""
+        if not self._sets_of:
+            return None
+        return self._rows_mask(self.set_owner[self.set_prefix == self._prefixes.lookup(prefix.strip().lower())])
+
+    def has_set_prefix(self, prefix: str) -> bool:
+        return bool(self._sets_of) and self._prefixes.lookup(prefix.strip().lower()) >= 0
+
+    def set_rows(self, value: str) -> Optional[np.ndarray]:
+        """
+        FilterPane set semantics: a dropdown value ("Name | CODE") matches the code prefix
+        strictly, typed text matches set code or set name as a substring.
+        """
+        if not self._sets_of:
+            return None
+        if '|' in value:
+            return self.set_prefix_rows(value.split('|')[-1])
+        txt = value.strip().lower()
+        return self._rows_mask(np.concatenate([
+            self._set_text('set_code').search(txt), self._set_text('set_name').search(txt)
+        ]))
+
+    def rarity_rows(self, value: str) -> Optional[np.ndarray]:
+        if not self._sets_of:
+            return None
+        return self._rows_mask(self.set_owner[self.set_rarity == self._rarities.lookup(value.lower())])
+
+    def language_rows(self, values: Sequence[str]) -> Optional[np.ndarray]:
+        return self.languages.any_of(values) if self.languages is not None else None
+
+    def condition_rows(self, values: Sequence[str]) -> Optional[np.ndarray]:
+        return self.conditions.any_of(values) if self.conditions is not None else None
+
+    def storage_rows(self, values: Sequence[str]) -> Optional[np.ndarray]:
+        return self.storages.any_of(values) if self.storages is not None else None
+
+    def select(self, mask: np.ndarray) -> List[Any]:
+        """Maps a mask back to the page's row objects, keeping their order."""
+        rows = self.rows
+        return [rows[i] for i in np.flatnonzero(mask)]
+
+    # --- Sorting ---
+
+    def _sort_values(self, key: str) -> Optional[np.ndarray]:
+        """Per-row values ordering the rows like the pages' sort keys (missing stats sort as -1)."""
+        if key == 'Name':
+            names = np.array([c.name for c in self.cards], dtype=str)
+            return np.unique(names, return_inverse=True)[1][self.card_index]
+        if key in ('ATK', 'DEF', 'Level'):
+            values = {'ATK': self.atk, 'DEF': self.def_, 'Level': self.level}[key]
+            return np.where(np.isnan(values) | (values == 0), -1.0, values)[self.card_index]
+        if key == 'Newest':
+            return self.card_ids[self.card_index]
+        if key == 'Price':
+            return self.price
+        if key == 'Quantity':
+            return self.qty
+        if key == 'Set Code':
+            if not self._sets_of:
+                return None
+            # The row's first set; rows without sets sort as ''
+            first = np.searchsorted(self.set_owner, np.arange(self.n), 'left')
+            has_set = first < np.searchsorted(self.set_owner, np.arange(self.n), 'right')
+            codes = np.array(self._set_codes + [''], dtype=str)
+            return np.unique(codes[np.where(has_set, first, len(self._set_codes))], return_inverse=True)[1]
+        return None
+
+    def sort_order(self, key: str, descending: bool = False) -> Optional[np.ndarray]:
+        """
+        Permutation of all rows sorted by one of SORT_KEYS, or None if the key is unknown or
+        the page has no such column. Computed once per key and direction while these columns
+        live; like list.sort, ties keep their row order in both directions.
+        """
+        cache_key = (key, descending)
+        if cache_key not in self._sort_orders:
+            values = self._sort_values(key)
+            order = None
+            if values is not None:
+                order = np.argsort(-values if descending else values, kind='stable')
+            self._sort_orders[cache_key] = order
+        return self._sort_orders[cache_key]
+
+    def select_sorted(self, mask: np.ndarray, key: str, descending: bool = False) -> List[Any]:
+        """select(), ordered by sort key by gathering the masked rows from the cached permutation."""
+        order = self.sort_order(key, descending)
+        if order is None:
+            return self.select(mask)
+        rows = self.rows
+        return [rows[i] for i in order[mask[order]].tolist()]
+
+class FilterColumnsCache:
+    """
+    Holds the FilterColumns of one page, rebuilding them when the row list (or any of the
+    extra dependencies, such as a reference collection) is replaced. Pages that mutate
+    rows in place must call splice() or invalidate().
+    """
+    def __init__(self):
+        self._key = None
+        self._columns: Optional[FilterColumns] = None
+
+    def get(self, rows: Sequence[Any], build: Callable[[Sequence[Any]], FilterColumns], *deps) -> FilterColumns:
+        key = (id(rows), len(rows)) + tuple(id(d) for d in deps)
+        if self._columns is None or key != self._key:
+            self._columns = build(rows)
+            self._key = key
+        return self._columns
+
+    def splice(self, rows: Sequence[Any], start: int, old_count: int):
+        """
+        Tells the cache that rows[start:start + old_count] were replaced in place (see
+        FilterColumns.splice). Columns that cannot be patched are rebuilt on the next get().
+        """
+        if self._columns is None or self._columns.rows is not rows:
+            return
+        if self._columns.splice(start, old_count):
+            self._key = (id(rows), len(rows)) + self._key[2:]
+        else:
+            self.invalidate()
+
+    def invalidate(self):
+        self._columns = None
@@ -0,0 +1,120 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Requests arriving within this many seconds of each other are coalesced into one pass
+FILTER_DEBOUNCE = 0.15
+
+_STALE = object()
+
+class FilterScheduler:
+    """
+    Runs a page's filter pass off the event loop. compute() filters and sorts in a worker
+    thread and returns the result; apply(result) then renders it on the loop. Requests are
+    debounced, a newer request cancels the pending or running one, and only the result of
+    the latest request is applied.
+
+    Threads cannot be interrupted, so a superseded compute() that already started runs to
+    completion and its result is dropped. Passes never overlap, and none runs while the
+    page patches its rows in an exclusive() section, as the page's filter columns and their
+    caches are not thread-safe. All waiting is done on the loop, which never blocks.
+    """
+    def __init__(self, compute: Callable[[], Any], apply: Callable[[Any], Awaitable[None]],
+                 delay: float = FILTER_DEBOUNCE):
+        self._compute = compute
+        self._apply = apply
+        self.delay = delay
+        self._generation = 0
+        self._task: Optional[asyncio.Task] = None
+        self._done: Optional[asyncio.Future] = None
+        # Set once the compute() running in the worker thread (if any) has returned
+        self._computed: Optional[asyncio.Event] = None
+        self._exclusive = 0
+        self._released: Optional[asyncio.Event] = None
+
+    async def request(self):
+        """Schedules a filter pass and waits until the latest requested pass has been applied."""
+        self._schedule()
+        await asyncio.shield(self._done)
+
+    @asynccontextmanager
+    async def exclusive(self) -> AsyncIterator[None]:
+        """
+        Holds off filter passes while the page mutates the rows or columns they read. The
+        pending or running pass is superseded, and a compute() already running in the worker
+        is awaited before the body runs. Callers still waiting for a pass get one on the
+        patched rows afterwards.
+        """
+        self._generation += 1
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._exclusive += 1
+        if self._released is None or self._released.is_set():
+            self._released = asyncio.Event()
+        try:
+            if self._computed is not None:
+                await self._computed.wait()
+            yield
+        finally:
+            self._exclusive -= 1
+            if not self._exclusive:
+                self._released.set()
+                if self._done is not None and not self._done.done():
+                    self._schedule()
+
+    def _schedule(self):
+        self._generation += 1
+        if self._task and not self._task.done():
+            self._task.cancel()
+        if self._done is None or self._done.done():
+            self._done = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(self._generation, self._done))
+
+    async def _wait_idle(self):
+        """Waits until no compute() runs in the worker and no exclusive() section is open."""
+        while True:
+            if self._computed is not None and not self._computed.is_set():
+                await self._computed.wait()
+            elif self._exclusive:
+                await self._released.wait()
+            else:
+                return
+
+    def _compute_if_current(self, generation: int, loop: asyncio.AbstractEventLoop, computed: asyncio.Event):
+        try:
+            if generation != self._generation:
+                return _STALE
+            return self._compute()
+        finally:
+            loop.call_soon_threadsafe(computed.set)
+
+    async def _run(self, generation: int, done: asyncio.Future):
+        try:
+            if self.delay:
+                await asyncio.sleep(self.delay)
+            await self._wait_idle()
+            if generation != self._generation:
+                return
+            computed = self._computed = asyncio.Event()
+            result = await asyncio.to_thread(self._compute_if_current, generation,
+                                             asyncio.get_running_loop(), computed)
+            if result is _STALE or generation != self._generation:
+                return
+            await self._apply(result)
+        except asyncio.CancelledError:
+            # Superseded: the newer pass resolves done
+            return
+        except Exception as e:
+            if generation != self._generation:
+                # Superseded while failing (e.g. its rows changed under it): the newer pass resolves done
+                logger.debug(f"Superseded filter pass failed: {e}")
+                return
+            logger.error(f"Error applying filters: {e}")
+            if not done.done():
+                done.set_exception(e)
+            return
+        if not done.done():
+            done.set_result(None)
@@ -20,6 +20,8 @@ class ImageManager:
         os.makedirs(self.sets_dir, exist_ok=True)
         os.makedirs(self.flags_dir, exist_ok=True)
         self.logger = logging.getLogger(__name__)
+        # Set image path -> version of the local file used in its URL
+        self._set_image_versions: Dict[str, str] = {}
 
     def get_set_image_path(self, set_code: str) -> str:
         """Returns the local file path for a set image."""
@@ -27,6 +29,31 @@ class ImageManager:
         safe_code = "".join(c for c in set_code if c.isalnum() or c in ('-', '_')).strip()
         return os.path.join(self.sets_dir, f"{safe_code}.jpg")
 
+    def get_set_image_url(self, set_code: str) -> str:
+        """
+        Returns the URL of a local set image. It carries the file's modification time, so
+        browsers can cache it forever and still refetch a replaced image.
+        """
+        path = self.get_set_image_path(set_code)
+        url = f"/sets/{os.path.basename(path)}"
+        version = self._set_image_versions.get(path)
+        if version is None:
+            try:
+                version = f"{os.stat(path).st_mtime_ns:x}"
+            except OSError:
+                return url
+            self._set_image_versions[path] = version
+        return f"{url}?v={version}"
+
+    def remove_set_image(self, set_code: str):
+        """Deletes the local set image, e.g. before replacing it."""
+        path = self.get_set_image_path(set_code)
+        self._set_image_versions.pop(path, None)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
     def set_image_exists(self, set_code: str) -> bool:
         """Checks if the set image exists locally. Note: Does not verify resolution."""
         return os.path.exists(self.get_set_image_path(set_code))
@@ -57,10 +84,7 @@ class ImageManager:
                  return local_path
              else:
                  self.logger.info(f"Existing image for {set_code} is low resolution (<240p). Deleting.")
-                 try:
-                    os.remove(local_path)
-                 except OSError:
-                    pass
+                 self.remove_set_image(set_code)
 
         # Download
         try:
@@ -70,15 +94,13 @@ class ImageManager:
                     if response.status == 200:
                         data = await response.read()
                         await run.io_bound(self._write_file, local_path, data)
+                        self._set_image_versions.pop(local_path, None)
 
                         # Check resolution of new file
                         is_good = await run.io_bound(self.check_image_resolution, local_path)
                         if not is_good:
                             self.logger.warning(f"Downloaded image for {set_code} is low resolution (<240p). Deleting.")
-                            try:
-                                os.remove(local_path)
-                            except OSError:
-                                pass
+                            self.remove_set_image(set_code)
                             return None
 
                         return local_path
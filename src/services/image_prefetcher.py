@@ -0,0 +1,64 @@
+import asyncio
+import logging
+from collections import Counter
+from typing import Callable, Dict, Optional, Tuple
+from src.services.image_manager import image_manager
+
+logger = logging.getLogger(__name__)
+
+class ImagePrefetcher:
+    """
+    Background downloads of images a paged view is likely to need next: the thumbnails of
+    the pages after and before the current one, then the high-res images of the cards
+    hovered most often. Work starts once the view has been idle for `idle_delay` seconds,
+    runs with low concurrency, and is cancelled by any new schedule() or by cancel()
+    (e.g. when the filters change or the current page is being downloaded).
+    """
+    def __init__(self, idle_delay: float = 1.5, concurrency: int = 2, hover_limit: int = 8):
+        self.idle_delay = idle_delay
+        self.concurrency = concurrency
+        self.hover_limit = hover_limit
+        self._pages: Tuple[Dict[int, str], ...] = ()
+        self._hovers: Counter = Counter()
+        self._task: Optional[asyncio.Task] = None
+
+    def schedule(self, page: int, total_pages: int, page_urls: Callable[[int], Dict[int, str]]):
+        """Prefetches the thumbnails ({image_id: url} from page_urls) of the pages around `page`."""
+        self._pages = tuple(page_urls(p) for p in (page + 1, page - 1) if 1 <= p <= total_pages)
+        self._restart()
+
+    def note_hover(self, image_id: Optional[int], high_res_url: Optional[str]):
+        """Counts a hover over a card whose high-res image is not local yet."""
+        if not image_id or not high_res_url:
+            return
+        self._hovers[(image_id, high_res_url)] += 1
+        # The pointer is moving, so the user is not idle
+        self._restart()
+
+    def cancel(self):
+        self._pages = ()
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = None
+
+    def _restart(self):
+        if self._task and not self._task.done():
+            self._task.cancel()
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        await asyncio.sleep(self.idle_delay)
+        try:
+            for url_map in self._pages:
+                if url_map:
+                    await image_manager.download_batch(url_map, concurrency=self.concurrency)
+
+            hovered = dict(key for key, _ in self._hovers.most_common(self.hover_limit))
+            if hovered:
+                await image_manager.download_batch(hovered, concurrency=self.concurrency, high_res=True)
+                for key in hovered.items():
+                    del self._hovers[key]
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Image prefetch failed: {e}")
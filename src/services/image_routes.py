@@ -0,0 +1,38 @@
+import os
+from urllib.parse import parse_qs
+from fastapi import FastAPI, Request
+from starlette.responses import Response
+from starlette.staticfiles import StaticFiles
+from starlette.types import Scope
+
+# Files that never change under their URL: id-addressed card images, flags, versioned set images
+IMMUTABLE = 'public, max-age=31536000, immutable'
+# Files that may be replaced in place: cached, but revalidated (ETag -> 304) on every use
+REVALIDATE = 'no-cache'
+
+class ImageStaticFiles(StaticFiles):
+    """
+    StaticFiles with a per-directory Cache-Control. StaticFiles already sends a strong ETag
+    (from the file's mtime and size) plus Last-Modified and answers matching If-None-Match /
+    If-Modified-Since requests with 304. Requests with a version query (?v=...) are cached
+    as immutable whatever the directory policy, see ImageManager.get_set_image_url.
+    """
+    def __init__(self, *, directory: str, cache_control: str, **kwargs):
+        super().__init__(directory=directory, **kwargs)
+        self.cache_control = cache_control
+
+    def file_response(self, full_path: os.PathLike, stat_result: os.stat_result, scope: Scope,
+                      status_code: int = 200) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        # Only set for existing files, so a missing image is not cached
+        versioned = 'v' in parse_qs(scope.get('query_string', b'').decode('latin-1'))
+        response.headers['Cache-Control'] = IMMUTABLE if versioned else self.cache_control
+        return response
+
+def add_image_files(app: FastAPI, url_path: str, directory: str, cache_control: str = REVALIDATE):
+    """Serves a directory of images like app.add_static_files, with the given Cache-Control."""
+    handler = ImageStaticFiles(directory=directory, cache_control=cache_control)
+
+    @app.get(url_path.rstrip('/') + '/{path:path}', include_in_schema=False)
+    async def image_file(request: Request, path: str = '') -> Response:
+        return await handler.get_response(path, request.scope)
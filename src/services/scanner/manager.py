@@ -962,9 +962,9 @@ class ScannerManager:
                              # 2. Check if normalized codes match (meaning it is the corresponding variant)
                              # normalize_set_code("LOB-G001") -> "LOB-001"
                              # normalize_set_code("LOB-E001") -> "LOB-001"
-                             if normalize_set_code(ocr_res.set_id) == normalize_set_code(variant.set_code):
+                             if normalize_set_code(ocr_res.set_id) == variant.code_parts.normalized:
                                  # Ensure we are matching against an English variant
-                                 if extract_language_code(variant.set_code) == 'EN':
+                                 if variant.code_parts.language == 'EN':
                                      should_inject_virtual = True
 
                     if should_inject_virtual:
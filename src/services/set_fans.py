@@ -0,0 +1,169 @@
+import asyncio
+import glob
+import hashlib
+import heapq
+import logging
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+from nicegui import run
+from PIL import Image, ImageDraw, ImageFilter, ImageOps
+from src.core.constants import RARITY_RANKING
+from src.services.image_manager import image_manager, SETS_DIR
+from src.services.shared_view_models import shared_view_models
+from src.services.ygo_api import ygo_service
+
+logger = logging.getLogger(__name__)
+
+FANS_DIR = os.path.join(SETS_DIR, "fans")
+
+# Scattered pile slots from back to front: (left, top) as fractions of the fan size and a
+# clockwise rotation in degrees. N cards use the last N slots, so the rarest is always on top.
+FAN_SLOTS = (
+    (-0.05, 0.05, -15), (0.60, 0.05, 15), (-0.05, 0.60, -10), (0.60, 0.60, 10),
+    (0.10, 0.30, -25), (0.45, 0.30, 25),
+    (0.20, 0.15, -5), (0.35, 0.50, 5),
+    (0.275, 0.325, 0),
+)
+CARD_WIDTH = 0.45
+CARD_RATIO = 614 / 421
+BACKGROUND = (31, 41, 55)
+
+FanCards = Tuple[Tuple[int, str], ...]
+
+def set_prefix(set_code: str) -> str:
+    return set_code.split('-')[0].lower()
+
+def build_set_fan_cards(cards: Sequence, limit: int = len(FAN_SLOTS)) -> Dict[str, FanCards]:
+    """
+    The (image id, thumbnail url) of the rarest cards of every set prefix, rarest first, in
+    one pass over the catalog. Ties keep catalog order, like ygo_service.get_set_cards.
+    """
+    ranks: Dict[str, int] = {}
+    for i, rarity in enumerate(RARITY_RANKING):
+        ranks.setdefault(rarity, i)
+
+    by_prefix: Dict[str, List[Tuple[int, int, object]]] = {}
+    for n, card in enumerate(cards):
+        if not card.card_images or not card.card_sets:
+            continue
+        best: Dict[str, int] = {}
+        for cs in card.card_sets:
+            prefix = set_prefix(cs.set_code)
+            rank = ranks.get(cs.set_rarity, 999)
+            if rank < best.get(prefix, 1000):
+                best[prefix] = rank
+        for prefix, rank in best.items():
+            by_prefix.setdefault(prefix, []).append((rank, n, card))
+
+    fans = {}
+    for prefix, ranked in by_prefix.items():
+        top = heapq.nsmallest(limit, ranked, key=lambda r: r[:2])
+        fans[prefix] = tuple((c.card_images[0].id, c.card_images[0].image_url_small) for _, _, c in top)
+    return fans
+
+class SetFans:
+    """
+    Fallback visuals of sets without a cover image: the rarest cards of a set prefix
+    scattered on one JPEG, composed with PIL in a worker thread, so a gallery tile costs a
+    single image. Fans are written to data/sets/fans (served from /sets), named by the prefix
+    and a hash of the images they show, so a new card database only re-renders the fans
+    whose cards changed. URLs are remembered per card database version.
+    """
+    def __init__(self, fans_dir: str = FANS_DIR, size: Tuple[int, int] = (400, 600), language: str = "en"):
+        self.fans_dir = fans_dir
+        self.size = size
+        self.language = language
+        # prefix -> (database version, URL or None if the set has no card images)
+        self._urls: Dict[str, Tuple[int, Optional[str]]] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        os.makedirs(self.fans_dir, exist_ok=True)
+
+    def cached_url(self, set_code: str) -> Optional[str]:
+        """The URL of the fan of a set if it is already rendered for the current database."""
+        cached = self._urls.get(set_prefix(set_code))
+        if cached is not None and cached[0] == ygo_service.get_db_version(self.language):
+            return cached[1]
+        return None
+
+    async def get(self, set_code: str) -> Optional[str]:
+        """The URL of the fan of a set, rendered if needed; None if none of its card images are available."""
+        prefix = set_prefix(set_code)
+        cached = self._urls.get(prefix)
+        if cached is not None and cached[0] == ygo_service.get_db_version(self.language):
+            return cached[1]
+
+        # Concurrent requests (e.g. from several sessions) share one render
+        task = self._pending.get(prefix)
+        if task is None:
+            task = self._pending[prefix] = asyncio.ensure_future(self._render(prefix))
+            task.add_done_callback(lambda _: self._pending.pop(prefix, None))
+        return await asyncio.shield(task)
+
+    async def _render(self, prefix: str) -> Optional[str]:
+        cards = await ygo_service.load_card_database(self.language)
+        version = ygo_service.get_db_version(self.language)
+        fans = await run.io_bound(shared_view_models.get, 'set_fan_cards', self.language,
+                                  lambda: build_set_fan_cards(cards))
+        images = fans.get(prefix, ())
+
+        if images:
+            await image_manager.download_batch(dict(images), concurrency=4)
+        present = [image_id for image_id, _ in images if image_manager.image_exists(image_id)]
+        url = await run.io_bound(self._compose, prefix, present) if present else None
+        # A set with images but no fan failed to download them (e.g. offline): retry next time
+        if url is not None or not images:
+            self._urls[prefix] = (version, url)
+        return url
+
+    def _compose(self, prefix: str, image_ids: List[int]) -> Optional[str]:
+        safe_prefix = "".join(c for c in prefix if c.isalnum())
+        digest = hashlib.sha1(",".join(map(str, image_ids)).encode()).hexdigest()[:12]
+        name = f"{safe_prefix}_{digest}.jpg"
+        path = os.path.join(self.fans_dir, name)
+        url = f"/sets/{os.path.basename(self.fans_dir)}/{name}"
+        if os.path.exists(path):
+            return url
+
+        width, height = self.size
+        card_size = (round(width * CARD_WIDTH), round(width * CARD_WIDTH * CARD_RATIO))
+        fan = Image.new("RGB", self.size, BACKGROUND)
+        drawn = 0
+        # Back to front, so the rarest card (first) ends up on top
+        for image_id, (left, top, angle) in zip(reversed(image_ids), FAN_SLOTS[len(FAN_SLOTS) - len(image_ids):]):
+            try:
+                with Image.open(image_manager.get_local_path(image_id)) as img:
+                    card = ImageOps.fit(img.convert("RGB"), card_size).convert("RGBA")
+            except Exception as e:
+                logger.warning(f"Could not add image {image_id} to the fan of set {prefix}: {e}")
+                continue
+            ImageDraw.Draw(card).rectangle((0, 0, card_size[0] - 1, card_size[1] - 1), outline=(255, 255, 255, 40))
+            center = (left * width + card_size[0] / 2, top * height + card_size[1] / 2)
+
+            shadow = Image.new("RGBA", card_size, (0, 0, 0, 150)).rotate(-angle, Image.BICUBIC, expand=True)
+            shadow = shadow.filter(ImageFilter.GaussianBlur(6))
+            fan.paste(shadow, self._offset(center, shadow.size, dy=6), shadow)
+
+            card = card.rotate(-angle, Image.BICUBIC, expand=True)
+            fan.paste(card, self._offset(center, card.size), card)
+            drawn += 1
+
+        if not drawn:
+            return None
+        tmp_path = f"{path}.tmp"
+        fan.save(tmp_path, "JPEG", quality=85)
+        os.replace(tmp_path, path)
+
+        # Drop the fans this one replaces
+        for old in glob.glob(os.path.join(self.fans_dir, f"{safe_prefix}_*.jpg")):
+            if old != path:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+        return url
+
+    @staticmethod
+    def _offset(center: Tuple[float, float], size: Tuple[int, int], dy: int = 0) -> Tuple[int, int]:
+        return round(center[0] - size[0] / 2), round(center[1] - size[1] / 2) + dy
+
+set_fans = SetFans()
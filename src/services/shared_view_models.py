@@ -0,0 +1,34 @@
+import threading
+from typing import Any, Callable, Dict, Hashable, Tuple
+from src.services.ygo_api import ygo_service
+
+class SharedViewModels:
+    """
+    Catalog-derived view models shared by every page instance, and so by every connected
+    browser session of the process. A value is built once per card database version,
+    database language and extra key (e.g. a default language).
+
+    Values are shared read-only: pages must copy a list before changing it and must
+    never mutate its items. Collection-dependent data belongs in per-page overlays
+    built on top of them.
+    """
+    def __init__(self):
+        self._entries: Dict[Tuple[Hashable, ...], Tuple[int, Any]] = {}
+        # Held while building, so concurrent sessions wait for one build instead of repeating it
+        self._lock = threading.RLock()
+
+    def get(self, kind: str, language: str, build: Callable[[], Any], *key: Hashable) -> Any:
+        """Returns the cached value of (kind, language, *key), calling build() if it is missing or stale."""
+        cache_key = (kind, language) + key
+        version = ygo_service.get_db_version(language)
+        with self._lock:
+            cached = self._entries.get(cache_key)
+            if cached is None or cached[0] != version:
+                # Drop entries of older databases that differ only in the extra key
+                for k in [k for k, (v, _) in self._entries.items() if k[:2] == (kind, language) and v != version]:
+                    del self._entries[k]
+                cached = (version, build())
+                self._entries[cache_key] = cached
+            return cached[1]
+
+shared_view_models = SharedViewModels()
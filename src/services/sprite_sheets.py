@@ -0,0 +1,138 @@
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+from nicegui import run
+from PIL import Image, ImageOps
+from src.services.image_manager import image_manager, DATA_DIR
+
+logger = logging.getLogger(__name__)
+
+SPRITES_DIR = os.path.join(DATA_DIR, "sprites")
+
+@dataclass(frozen=True)
+class SpriteSheet:
+    url: str
+    tile_width: int
+    tile_height: int
+    width: int
+    height: int
+    # image id -> (x, y) of its tile; images that were not local are missing
+    positions: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+    # Local images that could not be read, left blank on the sheet
+    failed: FrozenSet[int] = frozenset()
+
+    def client_props(self) -> Dict:
+        """The sheet geometry as sent to CardGrid."""
+        return {'url': self.url, 'w': self.tile_width, 'h': self.tile_height,
+                'sw': self.width, 'sh': self.height}
+
+class SpriteSheets:
+    """
+    Composes the local thumbnails of a grid page into one JPEG, so the page loads with a
+    single image request. Sheets are cached by the tuple of image ids, in memory and on
+    disk (named by a hash of the ids they contain, served from /sprites). Thumbnails are
+    cropped to the 2:3 tile size used by the card grids.
+
+    The files of sheets evicted from the memory cache are deleted, and on startup only the
+    newest cache_size files are kept, so the directory stays bounded.
+    """
+    def __init__(self, sprites_dir: str = SPRITES_DIR, tile_size: Tuple[int, int] = (168, 252),
+                 columns: int = 10, cache_size: int = 64):
+        self.sprites_dir = sprites_dir
+        self.tile_size = tile_size
+        self.columns = columns
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[int, ...], SpriteSheet]" = OrderedDict()
+        self._lock = threading.Lock()
+        os.makedirs(self.sprites_dir, exist_ok=True)
+        self._prune_directory()
+
+    async def get(self, image_ids: Iterable[int]) -> Optional[SpriteSheet]:
+        """The sheet of the given images, composed in a worker thread if needed; None if none is local."""
+        key = tuple(dict.fromkeys(i for i in image_ids if i))
+        if not key:
+            return None
+        with self._lock:
+            sheet = self._cache.get(key)
+            if sheet is not None:
+                self._cache.move_to_end(key)
+        # Recompose once a thumbnail that was missing has been downloaded
+        if sheet is None or any(i not in sheet.positions and i not in sheet.failed and image_manager.image_exists(i)
+                                for i in key):
+            sheet = await run.io_bound(self._compose, key)
+            evicted = []
+            with self._lock:
+                self._cache[key] = sheet
+                while len(self._cache) > self.cache_size:
+                    evicted.append(self._cache.popitem(last=False)[1])
+                # Different keys can share a file (e.g. when their missing images differ)
+                in_use = {s.url for s in self._cache.values()}
+            for old in evicted:
+                if old.url not in in_use:
+                    self._remove_file(old.url)
+        return sheet if sheet.positions else None
+
+    def _compose(self, key: Tuple[int, ...]) -> SpriteSheet:
+        present = [i for i in key if image_manager.image_exists(i)]
+        tile_w, tile_h = self.tile_size
+        columns = min(self.columns, len(present)) or 1
+        rows = (len(present) + columns - 1) // columns
+        name = self._name(present)
+        path = os.path.join(self.sprites_dir, name)
+
+        positions, failed = {}, set()
+        # Only sheets with every image painted are written under the name of their ids
+        sheet = None if os.path.exists(path) else Image.new("RGB", (columns * tile_w, rows * tile_h))
+        for n, image_id in enumerate(present):
+            x, y = (n % columns) * tile_w, (n // columns) * tile_h
+            if sheet is not None:
+                try:
+                    with Image.open(image_manager.get_local_path(image_id)) as img:
+                        sheet.paste(ImageOps.fit(img.convert("RGB"), self.tile_size), (x, y))
+                except Exception as e:
+                    logger.warning(f"Could not add image {image_id} to sprite sheet: {e}")
+                    failed.add(image_id)
+                    continue
+            positions[image_id] = (x, y)
+
+        if failed:
+            name = self._name(present, failed)
+            path = os.path.join(self.sprites_dir, name)
+        if sheet is not None and positions:
+            tmp_path = f"{path}.tmp"
+            sheet.save(tmp_path, "JPEG", quality=85)
+            os.replace(tmp_path, path)
+        return SpriteSheet(f"/sprites/{name}", tile_w, tile_h, columns * tile_w, rows * tile_h, positions,
+                           frozenset(failed))
+
+    @staticmethod
+    def _name(present: List[int], failed: Iterable[int] = ()) -> str:
+        text = ",".join(map(str, present))
+        if failed:
+            text += "!" + ",".join(map(str, sorted(failed)))
+        return f"{hashlib.sha1(text.encode()).hexdigest()[:20]}.jpg"
+
+    def _remove_file(self, url: str):
+        try:
+            os.remove(os.path.join(self.sprites_dir, os.path.basename(url)))
+        except OSError:
+            pass
+
+    def _prune_directory(self):
+        """Keeps the newest cache_size sheets of earlier runs, which later pages may reuse."""
+        try:
+            entries = [e for e in os.scandir(self.sprites_dir) if e.is_file()]
+        except OSError:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+        for entry in entries[self.cache_size:]:
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+sprite_sheets = SpriteSheets()
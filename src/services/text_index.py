@@ -0,0 +1,255 @@
+import logging
+import re
+import time
+from bisect import bisect_right
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Searchable ApiCard text fields of the catalog index
+CARD_TEXT_FIELDS = ('name', 'type', 'desc', 'archetype')
+
+_SEP = '\x00'
+_NON_WORD = re.compile(r'[\W_]+')
+
+def normalize_name(name: str) -> str:
+    """Lower-cases a name and collapses punctuation and whitespace runs into single spaces."""
+    return ' '.join(_NON_WORD.sub(' ', (name or '').lower()).split())
+
+class TextIndex:
+    """
+    Case-insensitive substring index over a list of strings.
+
+    Queries of three or more characters intersect the posting lists of their trigrams and
+    only verify the surviving candidates with a real substring test, so results are exactly
+    those of `query in text`. Shorter queries fall back to scanning one joined buffer.
+    The trigram postings are built on the first query that needs them.
+    """
+    def __init__(self, texts: Sequence[str], ids: Optional[Sequence[int]] = None):
+        self.texts: List[str] = [(t or '').lower().replace(_SEP, '') for t in texts]
+        self.ids = np.asarray(ids, dtype=np.int64) if ids is not None else np.arange(len(self.texts), dtype=np.int64)
+        self._blob: Optional[str] = None
+        self._starts: Optional[List[int]] = None
+        self._alphabet: Optional[np.ndarray] = None
+        self._alphabet_size = 0
+        self._gram_keys: Optional[np.ndarray] = None
+        self._gram_bounds: Optional[np.ndarray] = None
+        self._postings: Optional[np.ndarray] = None
+
+    def __len__(self):
+        return len(self.texts)
+
+    # --- Build ---
+
+    def _ensure_blob(self):
+        if self._blob is None:
+            self._blob = _SEP.join(self.texts)
+            lengths = np.fromiter((len(t) + 1 for t in self.texts), dtype=np.int64, count=len(self.texts))
+            self._starts = (np.cumsum(lengths) - lengths).tolist()
+
+    def _ensure_postings(self):
+        if self._postings is not None:
+            return
+        self._ensure_blob()
+        start = time.perf_counter()
+
+        chars = np.frombuffer(self._blob.encode('utf-32-le'), dtype=np.uint32)
+        n_docs = len(self.texts)
+        if len(chars) < 3:
+            self._alphabet = np.zeros(1, dtype=np.int64)
+            self._gram_keys = np.empty(0, dtype=np.int64)
+            self._gram_bounds = np.zeros(1, dtype=np.int64)
+            self._postings = np.empty(0, dtype=np.int64)
+            return
+
+        # Dense alphabet codes (0 = separator, 1.. = characters present) keep trigram keys
+        # small enough to pack (trigram, document) into one int64 and sort once
+        present = np.bincount(chars) > 0
+        present[ord(_SEP)] = False
+        alphabet = np.zeros(len(present), dtype=np.int64)
+        alphabet[present] = np.arange(1, int(present.sum()) + 1)
+        size = int(present.sum()) + 1
+        dense = alphabet[chars]
+
+        grams = (dense[:-2] * size + dense[1:-1]) * size + dense[2:]
+        valid = (dense[:-2] != 0) & (dense[1:-1] != 0) & (dense[2:] != 0)
+        doc = np.cumsum(dense == 0)[:-2]
+
+        pairs = np.unique(grams[valid] * n_docs + doc[valid])
+        grams, doc = pairs // n_docs, pairs % n_docs
+
+        self._alphabet = alphabet
+        self._alphabet_size = size
+        # grams come out sorted, so each trigram's postings are one contiguous run
+        first = np.flatnonzero(np.diff(grams, prepend=-1))
+        self._gram_keys = grams[first]
+        self._gram_bounds = np.append(first, len(grams)).astype(np.int64)
+        self._postings = doc
+        logger.debug(f"Built trigram index over {len(self.texts)} texts ({len(self._gram_keys)} trigrams) "
+                     f"in {time.perf_counter() - start:.3f}s")
+
+    # --- Query ---
+
+    def _query_slots(self, query: str) -> Tuple[int, np.ndarray]:
+        """Number of distinct trigrams in query, and the posting slots of those the index contains."""
+        n_grams = len({query[i:i + 3] for i in range(len(query) - 2)})
+        self._ensure_postings()
+        if not n_grams or not len(self._gram_keys):
+            return n_grams, np.empty(0, dtype=np.int64)
+
+        codes = np.frombuffer(query.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+        dense = np.where(codes < len(self._alphabet), self._alphabet[np.minimum(codes, len(self._alphabet) - 1)], 0)
+        known = (dense[:-2] != 0) & (dense[1:-1] != 0) & (dense[2:] != 0)
+        size = self._alphabet_size
+        grams = np.unique(((dense[:-2] * size + dense[1:-1]) * size + dense[2:])[known])
+        slots = np.searchsorted(self._gram_keys, grams)
+        slots = slots[slots < len(self._gram_keys)]
+        return n_grams, slots[np.isin(self._gram_keys[slots], grams)]
+
+    def candidates(self, query: str) -> Optional[np.ndarray]:
+        """
+        Positions of the texts containing every trigram of query, or None when the query is
+        too short to narrow anything down.
+        """
+        query = query.lower().replace(_SEP, '')
+        if len(query) < 3:
+            return None
+        n_grams, slots = self._query_slots(query)
+        if len(slots) < n_grams:
+            return np.empty(0, dtype=np.int64)
+
+        lists = sorted((self._postings[self._gram_bounds[s]:self._gram_bounds[s + 1]] for s in slots), key=len)
+        result = lists[0]
+        for posting in lists[1:]:
+            if not len(result):
+                break
+            result = np.intersect1d(result, posting, assume_unique=True)
+        return result
+
+    def shared_trigrams(self, query: str) -> Tuple[int, np.ndarray]:
+        """
+        Number of distinct trigrams in query, and for every text how many of them it contains.
+        The basis of similarity ranking (see FuzzyNameIndex).
+        """
+        query = query.lower().replace(_SEP, '')
+        n_grams, slots = self._query_slots(query)
+        if not len(slots):
+            return n_grams, np.zeros(len(self.texts), dtype=np.int64)
+        hits = np.concatenate([self._postings[self._gram_bounds[s]:self._gram_bounds[s + 1]] for s in slots])
+        return n_grams, np.bincount(hits, minlength=len(self.texts))
+
+    def trigram_totals(self) -> np.ndarray:
+        """Number of distinct trigrams of every text."""
+        self._ensure_postings()
+        return np.bincount(self._postings, minlength=len(self.texts))
+
+    def positions(self, query: str) -> np.ndarray:
+        """Positions of all texts containing query (case-insensitive)."""
+        query = query.lower().replace(_SEP, '')
+        cands = self.candidates(query)
+        if cands is not None:
+            texts = self.texts
+            return np.fromiter((i for i in cands.tolist() if query in texts[i]), dtype=np.int64)
+
+        self._ensure_blob()
+        hits = []
+        blob, starts = self._blob, self._starts
+        pos = blob.find(query)
+        while pos != -1:
+            idx = bisect_right(starts, pos) - 1
+            hits.append(idx)
+            if idx + 1 >= len(starts):
+                break
+            pos = blob.find(query, starts[idx + 1])
+        return np.asarray(hits, dtype=np.int64)
+
+    def search(self, query: str) -> np.ndarray:
+        """Ids of all texts containing query (case-insensitive)."""
+        return self.ids[self.positions(query)]
+
+class FuzzyNameIndex:
+    """
+    Typo-tolerant lookup of card names. Names are normalized ("Blue-Eyes" == "blue eyes") and
+    padded with spaces, so word boundaries count as trigrams. Trigram overlap with the query
+    is counted for all names in one vectorized pass, and only the best candidates are scored
+    with difflib.
+    """
+    def __init__(self, cards: Sequence):
+        self.cards = list(cards)
+        self.card_ids = np.fromiter((c.id for c in self.cards), dtype=np.int64, count=len(self.cards))
+        self.names = [normalize_name(c.name) for c in self.cards]
+        self._exact: Dict[str, int] = {}
+        for i, name in enumerate(self.names):
+            self._exact.setdefault(name, i)
+        self._index = TextIndex([f' {n} ' for n in self.names])
+        self._totals: Optional[np.ndarray] = None
+
+    def exact(self, name: str) -> Optional[Any]:
+        """The card whose normalized name equals name's, if any."""
+        i = self._exact.get(normalize_name(name))
+        return self.cards[i] if i is not None else None
+
+    def best_matches(self, name: str, limit: int = 5, cutoff: float = 0.6) -> List[Tuple[Any, float]]:
+        """
+        Cards whose whole name is most similar to name, as (card, ratio) pairs, best first.
+        ratio is difflib's similarity of the normalized names; pairs below cutoff are dropped.
+        """
+        query = normalize_name(name)
+        if not query or not self.cards:
+            return []
+        if self._totals is None:
+            self._totals = self._index.trigram_totals()
+
+        n_grams, shared = self._index.shared_trigrams(f' {query} ')
+        dice = 2.0 * shared / (n_grams + self._totals)
+        k = min(len(self.cards), max(limit * 10, 50))
+        top = np.argpartition(-dice, k - 1)[:k]
+        top = top[dice[top] > 0]
+
+        scored = []
+        for i in top.tolist():
+            ratio = SequenceMatcher(None, query, self.names[i]).ratio()
+            if ratio >= cutoff:
+                scored.append((i, ratio))
+        scored.sort(key=lambda p: (-p[1], p[0]))
+        return [(self.cards[i], ratio) for i, ratio in scored[:limit]]
+
+    def search(self, query: str, min_overlap: float = 0.7) -> np.ndarray:
+        """
+        Ids of cards whose name approximately contains query: at least min_overlap of the
+        query's trigrams (word boundaries included) occur in the name.
+        """
+        query = normalize_name(query)
+        if not query:
+            return np.empty(0, dtype=np.int64)
+        n_grams, shared = self._index.shared_trigrams(f' {query} ')
+        return self.card_ids[shared >= max(1, min_overlap * n_grams)]
+
+class CardTextIndex:
+    """
+    One TextIndex per searchable field of a card list, keyed by card id, plus a fuzzy name
+    index. Built once per card database version (see YugiohService.get_text_index) and
+    shared by all pages.
+    """
+    def __init__(self, cards: Sequence, fields: Sequence[str] = CARD_TEXT_FIELDS):
+        self.card_ids = np.fromiter((c.id for c in cards), dtype=np.int64, count=len(cards))
+        self.fields: Dict[str, TextIndex] = {
+            f: TextIndex([getattr(c, f, None) or '' for c in cards], self.card_ids) for f in fields
+        }
+        self.names = FuzzyNameIndex(cards)
+
+    def warm(self):
+        """Builds the trigram postings of every field up front. Blocks."""
+        for index in self.fields.values():
+            index._ensure_postings()
+        self.names._index._ensure_postings()
+
+    def search(self, query: str, fields: Sequence[str]) -> np.ndarray:
+        """Card ids where any of the given (indexed) fields contains query."""
+        hits = [self.fields[f].search(query) for f in fields if f in self.fields]
+        if not hits:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(hits))
@@ -1,7 +1,7 @@
 from src.core.models import Collection, ApiCard
 from src.services.collection_editor import CollectionEditor
 from src.services.ygo_api import ygo_service
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,8 +26,27 @@ class UndoService:
         else:
             UndoService._apply_single_inverse(collection, change_record)
 
+    @staticmethod
+    def apply_forward(collection: Collection, change_record: Dict[str, Any], card_cache: Optional[Dict[int, ApiCard]] = None):
+        """
+        Re-applies a recorded change to the collection (used to replay history).
+        card_cache memoizes card lookups across many records.
+        """
+        if not change_record:
+            return
+
+        if change_record.get('type') == 'batch':
+            for change in change_record.get('changes', []):
+                UndoService._apply_single(collection, change, invert=False, card_cache=card_cache)
+        else:
+            UndoService._apply_single(collection, change_record, invert=False, card_cache=card_cache)
+
     @staticmethod
     def _apply_single_inverse(collection: Collection, change: Dict[str, Any]):
+        UndoService._apply_single(collection, change, invert=True)
+
+    @staticmethod
+    def _apply_single(collection: Collection, change: Dict[str, Any], invert: bool, card_cache: Optional[Dict[int, ApiCard]] = None):
         action = change.get('action')
         quantity = change.get('quantity', 1)
         card_data = change.get('card_data', {})
@@ -35,23 +54,30 @@ class UndoService:
         # Invert Action
         # Logged ADD -> Undo is REMOVE (negative quantity add)
         # Logged REMOVE -> Undo is ADD (positive quantity add)
+        # Logged SET is absolute and can only be replayed forward
 
+        mode = 'ADD' # CollectionEditor handles +/- quantity
         final_quantity = 0
         if action == 'ADD':
-            final_quantity = -quantity
+            final_quantity = -quantity if invert else quantity
         elif action == 'REMOVE':
+            final_quantity = quantity if invert else -quantity
+        elif action == 'SET' and not invert:
             final_quantity = quantity
+            mode = 'SET'
         else:
             return # Unknown action
 
         # Extract Card Data
         card_id = card_data.get('card_id')
         if not card_id:
-            logger.error("Missing card_id in undo record")
+            logger.error("Missing card_id in change record")
             return
 
         # Try to get full card data, fall back to dummy if offline/error
-        api_card = ygo_service.get_card(card_id)
+        api_card = card_cache.get(card_id) if card_cache is not None else None
+        if not api_card:
+            api_card = ygo_service.get_card(card_id)
         if not api_card:
             api_card = ApiCard(
                 id=card_id,
@@ -60,6 +86,8 @@ class UndoService:
                 frameType="unknown",
                 desc="Restored from Undo"
             )
+        if card_cache is not None:
+            card_cache[card_id] = api_card
 
         CollectionEditor.apply_change(
             collection=collection,
@@ -72,6 +100,6 @@ class UndoService:
             first_edition=card_data.get('first_edition', False),
             image_id=card_data.get('image_id'),
             variant_id=card_data.get('variant_id'),
-            mode='ADD', # CollectionEditor handles +/- quantity
+            mode=mode,
             storage_location=card_data.get('storage_location')
         )
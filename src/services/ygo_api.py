@@ -10,9 +10,11 @@ import asyncio
 import uuid
 import logging
 from typing import List, Optional, Callable, Dict, Any, Tuple
-from src.core.models import ApiCard, ApiCardSet
+from src.core.models import ApiCard, ApiCardSet, cache_code_parts, cache_prices
 from src.services.image_manager import image_manager
 from src.services.yugipedia_service import yugipedia_service
+from src.services.text_index import CardTextIndex, FuzzyNameIndex
+from src.services.catalog_metadata import CatalogMetadata
 from src.core.persistence import persistence
 from src.core.utils import generate_variant_id
 from src.core.constants import RARITY_RANKING, RARITY_ABBREVIATIONS
@@ -27,12 +29,20 @@ SETS_FILE = os.path.join(DB_DIR, "sets.json")
 logger = logging.getLogger(__name__)
 
 def parse_cards_data(data: List[dict]) -> List[ApiCard]:
-    return [ApiCard(**c) for c in data]
+    cards = [ApiCard(**c) for c in data]
+    # Set codes and prices are parsed once per loaded database
+    for card in cards:
+        cache_code_parts(card.card_sets)
+    cache_prices(cards)
+    return cards
 
 class YugiohService:
     def __init__(self):
         self._cards_cache: Dict[str, List[ApiCard]] = {}
         self._sets_cache: Dict[str, Dict[str, Any]] = {} # set_code_prefix -> {name, code, image, date, count}
+        self._db_versions: Dict[str, int] = {} # language -> bumped whenever the cached card list changes
+        self._text_indexes: Dict[str, Tuple[int, CardTextIndex]] = {}
+        self._filter_metadata: Dict[str, Tuple[int, CatalogMetadata]] = {}
         self._migrate_old_db_files()
 
     def _migrate_old_db_files(self):
@@ -233,9 +243,20 @@ class YugiohService:
 
         return merged_list
 
-    async def save_card_database(self, cards: List[ApiCard], language: str = "en"):
-        """Saves the card database to disk."""
+    async def save_card_database(self, cards: List[ApiCard], language: str = "en",
+                                 added_sets: Optional[List[ApiCardSet]] = None):
+        """
+        Saves the card database to disk.
+        added_sets lists the variants added since the last save, if that was the only change;
+        the filter metadata is then updated in place instead of being rebuilt.
+        """
+        metadata = self._current_filter_metadata(language) if added_sets is not None else None
         self._cards_cache[language] = cards
+        self._bump_db_version(language)
+        if metadata is not None:
+            for card_set in added_sets:
+                metadata.add_card_set(card_set)
+            self._filter_metadata[language] = (self.get_db_version(language), metadata)
 
         if not cards:
             return
@@ -299,6 +320,7 @@ class YugiohService:
         cards = await self.load_card_database(language)
         card_map = {c.id: c for c in cards}
         added_count = 0
+        added_sets = []
         modified = False
 
         for v in variants:
@@ -342,12 +364,13 @@ class YugiohService:
                 )
 
                 card.card_sets.append(new_set)
+                added_sets.append(new_set)
                 added_count += 1
                 modified = True
                 logger.info(f"Batch ensure: Added variant {set_code} to card {card_id}")
 
         if modified:
-             await self.save_card_database(cards, language)
+             await self.save_card_database(cards, language, added_sets=added_sets)
 
         return added_count
 
@@ -393,7 +416,7 @@ class YugiohService:
         card.card_sets.append(new_set)
 
         # Save updated database
-        await self.save_card_database(cards, language)
+        await self.save_card_database(cards, language, added_sets=[new_set])
         logger.info(f"Added new variant {new_variant_id} to card {card_id}")
 
         return new_set
@@ -441,7 +464,7 @@ class YugiohService:
             )
             card.card_sets.append(new_set)
 
-            await self.save_card_database(cards, language)
+            await self.save_card_database(cards, language, added_sets=[new_set])
             logger.info(f"Added new variant {new_id} to card {card_id} (update fallback)")
             return True
 
@@ -517,10 +540,52 @@ class YugiohService:
                  parsed_cards = parse_cards_data(data)
 
              self._cards_cache[language] = parsed_cards
+             self._bump_db_version(language)
              logger.info(f"Loaded {len(parsed_cards)} cards.")
 
+             # Build the search index and filter options off the event loop; otherwise they are built on first use
+             try:
+                 await run.io_bound(self.get_text_index(language).warm)
+                 await run.io_bound(self.get_filter_metadata, language)
+             except RuntimeError:
+                 pass
+
         return self._cards_cache.get(language, [])
 
+    def _bump_db_version(self, language: str):
+        self._db_versions[language] = self._db_versions.get(language, 0) + 1
+
+    def get_db_version(self, language: str = "en") -> int:
+        """Counter that changes whenever the cached card database of a language is replaced or saved."""
+        return self._db_versions.get(language, 0)
+
+    def get_text_index(self, language: str = "en") -> CardTextIndex:
+        """Full-text index over the cached card database, rebuilt once per database version."""
+        version = self.get_db_version(language)
+        cached = self._text_indexes.get(language)
+        if cached is None or cached[0] != version:
+            cached = (version, CardTextIndex(self._cards_cache.get(language, [])))
+            self._text_indexes[language] = cached
+        return cached[1]
+
+    def _current_filter_metadata(self, language: str) -> Optional[CatalogMetadata]:
+        cached = self._filter_metadata.get(language)
+        if cached is not None and cached[0] == self.get_db_version(language):
+            return cached[1]
+        return None
+
+    def get_filter_metadata(self, language: str = "en") -> CatalogMetadata:
+        """Sorted filter option lists of the cached card database, built once per database version."""
+        metadata = self._current_filter_metadata(language)
+        if metadata is None:
+            metadata = CatalogMetadata(self._cards_cache.get(language, []))
+            self._filter_metadata[language] = (self.get_db_version(language), metadata)
+        return metadata
+
+    def get_name_index(self, language: str = "en") -> FuzzyNameIndex:
+        """Typo-tolerant name index over the cached card database (part of the text index)."""
+        return self.get_text_index(language).names
+
     def _read_db_file(self, language: str = "en"):
         db_file = self._get_db_file(language)
         return self._read_json_file(db_file)
@@ -837,12 +902,7 @@ class YugiohService:
                         if url:
                             # Found on Yugipedia!
                             # Force replacement: delete existing file
-                            local_path = image_manager.get_set_image_path(set_code)
-                            if os.path.exists(local_path):
-                                try:
-                                    os.remove(local_path)
-                                except OSError:
-                                    pass
+                            image_manager.remove_set_image(set_code)
 
                             # Download (ensure_set_image will download since file is gone)
                             await image_manager.ensure_set_image(set_code, url)
@@ -926,7 +986,7 @@ class YugiohService:
         Adds a new variant with the specified rarity to all cards belonging to the set.
         """
         cards = await self.load_card_database(language)
-        added_count = 0
+        added_sets = []
         target_prefix = set_prefix.strip()
 
         # Resolve rarity code
@@ -978,13 +1038,13 @@ class YugiohService:
                         image_id=ref_img_id
                     )
                     card.card_sets.append(new_set)
-                    added_count += 1
+                    added_sets.append(new_set)
 
-        if added_count > 0:
-            await self.save_card_database(cards, language)
+        if added_sets:
+            await self.save_card_database(cards, language, added_sets=added_sets)
 
-        logger.info(f"Bulk added rarity {rarity} to set {target_prefix}. Added {added_count} variants.")
-        return added_count
+        logger.info(f"Bulk added rarity {rarity} to set {target_prefix}. Added {len(added_sets)} variants.")
+        return len(added_sets)
 
     async def bulk_delete_set(self, set_prefix: str, language: str = "en") -> int:
         """
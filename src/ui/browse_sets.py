@@ -1,12 +1,14 @@
 from nicegui import ui, run
 from src.services.ygo_api import ygo_service, ApiCard
 from src.services.image_manager import image_manager
+from src.services.set_fans import set_fans
 from src.core.constants import RARITY_RANKING
 from src.ui.components.filter_pane import FilterPane
 from src.ui.components.single_card_view import SingleCardView
-from src.ui.collection import build_collector_rows, CollectorRow, CardViewModel
+from src.ui.collection import build_collector_rows, CollectorRow, CardViewModel, build_consolidated_columns, build_collector_columns
+from src.services.filter_engine import FilterColumnsCache
 from src.core.persistence import persistence
-from src.core.utils import transform_set_code, normalize_set_code
+from src.core.utils import transform_set_code
 import asyncio
 import logging
 from datetime import datetime
@@ -16,11 +18,7 @@ logger = logging.getLogger(__name__)
 
 def build_set_rows(api_cards, collection, target_set_code):
     rows = []
-    # Build ownership map
-    owned_map = {} # card_id -> CollectionCard
-    if collection:
-        for c in collection.cards:
-            owned_map[c.card_id] = c
+    ownership = collection.ownership if collection else None
 
     # Normalize target prefix
     prefix = target_set_code.split('-')[0].lower()
@@ -30,7 +28,7 @@ def build_set_rows(api_cards, collection, target_set_code):
 
         # Filter sets for this specific target set
         # We match if the set code starts with the prefix (case insensitive)
-        matching_sets = [s for s in card.card_sets if s.set_code.split('-')[0].lower() == prefix]
+        matching_sets = [s for s in card.card_sets if s.code_parts.prefix.lower() == prefix]
 
         for s in matching_sets:
             # Check ownership
@@ -40,15 +38,9 @@ def build_set_rows(api_cards, collection, target_set_code):
             if collection is None:
                 is_owned = True
                 owned_count = 0
-            elif card.id in owned_map:
-                c_card = owned_map[card.id]
-                # Find matching variant
-                for v in c_card.variants:
-                    # Logic: exact match set_code + rarity
-                    # If local set code is "MP19-EN001" and API is "MP19-EN001", match.
-                    if normalize_set_code(v.set_code) == normalize_set_code(s.set_code) and v.rarity == s.set_rarity:
-                         owned_count += v.total_quantity
-
+            else:
+                # Owned variants of this set code and rarity in any region
+                owned_count = ownership.printing_total(card.id, s.code_parts.normalized, s.set_rarity)
                 is_owned = owned_count > 0
 
             # Construct Row
@@ -64,7 +56,7 @@ def build_set_rows(api_cards, collection, target_set_code):
                 set_code=s.set_code,
                 set_name=s.set_name,
                 rarity=s.set_rarity,
-                price=float(s.set_price) if s.set_price else 0.0,
+                price=s.price,
                 image_url=img_url,
                 owned_count=owned_count,
                 is_owned=is_owned,
@@ -79,10 +71,7 @@ def build_set_rows(api_cards, collection, target_set_code):
 
 def build_consolidated_rows(api_cards, collection):
     rows = []
-    owned_map = {}
-    if collection:
-        for c in collection.cards:
-            owned_map[c.card_id] = c
+    ownership = collection.ownership if collection else None
 
     for card in api_cards:
         is_owned = False
@@ -95,31 +84,16 @@ def build_consolidated_rows(api_cards, collection):
             is_owned = True
             qty = 0 # Visuals should handle is_owned=True with qty=0 correctly (opaque but no badge)
         else:
-            c_card = owned_map.get(card.id)
-            if c_card:
-                qty = c_card.total_quantity
-                is_owned = qty > 0
-                for v in c_card.variants:
-                    for e in v.entries:
-                        owned_langs.add(e.language)
-                        owned_conds.add(e.condition)
-
-        # Calculate lowest price
-        lowest = 0.0
-        prices = []
-        if card.card_prices:
-            p = card.card_prices[0]
-            for val in [p.cardmarket_price, p.tcgplayer_price, p.coolstuffinc_price]:
-                 if val:
-                     try: prices.append(float(val))
-                     except: pass
-        if prices: lowest = min(prices)
+            qty = ownership.total(card.id)
+            is_owned = qty > 0
+            owned_langs = set(ownership.languages(card.id))
+            owned_conds = set(ownership.conditions(card.id))
 
         rows.append(CardViewModel(
             api_card=card,
             owned_quantity=qty,
             is_owned=is_owned,
-            lowest_price=lowest,
+            lowest_price=card.lowest_price,
             owned_languages=owned_langs,
             owned_conditions=owned_conds
         ))
@@ -223,6 +197,7 @@ class BrowseSetsPage:
 
         self.single_card_view = SingleCardView()
         self.filter_pane = None # For detail view
+        self.filter_columns = {'consolidated': FilterColumnsCache(), 'collectors': FilterColumnsCache()}
         self.filter_dialog = None
 
     async def select_collection_dialog(self):
@@ -502,88 +477,17 @@ class BrowseSetsPage:
     async def apply_detail_filters(self):
         is_cons = self.state['view_scope'] == 'consolidated'
         source = self.state['detail_rows_consolidated'] if is_cons else self.state['detail_rows_collectors']
-        res = list(source)
-
-        # Filter Logic
-        txt = self.state['detail_search'].lower()
-        if txt:
-             res = [r for r in res if txt in r.api_card.name.lower()]
-
-        if self.state.get('filter_owned_only'):
-             res = [c for c in res if c.is_owned]
-
-        # Reuse state filters
-        if self.state['filter_rarity']:
-             r = self.state['filter_rarity'].lower()
-             if is_cons:
-                 res = [c for c in res if c.api_card.card_sets and any(r == cs.set_rarity.lower() for cs in c.api_card.card_sets)]
-             else:
-                 res = [c for c in res if r == c.rarity.lower()]
-
-        if self.state['filter_attr']:
-            res = [c for c in res if c.api_card.attribute == self.state['filter_attr']]
-
-        if self.state['filter_card_type']:
-             ctypes = self.state['filter_card_type']
-             if isinstance(ctypes, str): ctypes = [ctypes]
-             res = [c for c in res if any(t in c.api_card.type for t in ctypes)]
-
-        if self.state['filter_monster_race']:
-             res = [c for c in res if "Monster" in c.api_card.type and c.api_card.race == self.state['filter_monster_race']]
-
-        if self.state['filter_st_race']:
-             res = [c for c in res if ("Spell" in c.api_card.type or "Trap" in c.api_card.type) and c.api_card.race == self.state['filter_st_race']]
-
-        if self.state['filter_archetype']:
-             res = [c for c in res if c.api_card.archetype == self.state['filter_archetype']]
-
-        if self.state['filter_monster_category']:
-             categories = self.state['filter_monster_category']
-             if isinstance(categories, list) and categories:
-                 res = [c for c in res if all(c.api_card.matches_category(cat) for cat in categories)]
-
-        if self.state['filter_level']:
-             res = [c for c in res if c.api_card.level == int(self.state['filter_level'])]
-
-        atk_min, atk_max = self.state['filter_atk_min'], self.state['filter_atk_max']
-        if atk_min > 0 or atk_max < 5000:
-             res = [c for c in res if c.api_card.atk is not None and atk_min <= int(c.api_card.atk) <= atk_max]
-
-        def_min, def_max = self.state['filter_def_min'], self.state['filter_def_max']
-        if def_min > 0 or def_max < 5000:
-             res = [c for c in res if getattr(c.api_card, 'def_', None) is not None and def_min <= getattr(c.api_card, 'def_', -1) <= def_max]
-
-        # Ownership & Price
-        min_q = self.state['filter_ownership_min']
-        max_q = self.state['filter_ownership_max']
+        cols = self.filter_columns[self.state['view_scope']].get(source, build_consolidated_columns if is_cons else build_collector_columns)
+        mask = cols.mask(self.state, search_text=self.state['detail_search'], search_fields=('name',),
+                         only_owned=self.state.get('filter_owned_only', False))
+        res = cols.select(mask)
 
         def get_qty(c):
             return c.owned_quantity if hasattr(c, 'owned_quantity') else c.owned_count
 
-        res = [c for c in res if min_q <= get_qty(c) <= max_q]
-
-        p_min = self.state['filter_price_min']
-        p_max = self.state['filter_price_max']
-
         def get_price(c):
             return c.lowest_price if hasattr(c, 'lowest_price') else c.price
 
-        res = [c for c in res if p_min <= get_price(c) <= p_max]
-
-        if self.state['filter_condition']:
-            conds = self.state['filter_condition']
-            if is_cons:
-                 res = [c for c in res if any(cond in c.owned_conditions for cond in conds)]
-            else:
-                 res = [c for c in res if c.condition in conds]
-
-        if self.state['filter_owned_lang']:
-            target_lang = self.state['filter_owned_lang']
-            if is_cons:
-                 res = [c for c in res if target_lang in c.owned_languages]
-            else:
-                 res = [c for c in res if c.language == target_lang]
-
         # Sort
         key = self.state['detail_sort']
         desc = self.state['detail_sort_desc']
@@ -729,85 +633,22 @@ class BrowseSetsPage:
             with container:
                 ui.spinner('dots', size='lg').classes('absolute top-1/2 left-1/2 transform -translate-x-1/2 -translate-y-1/2 text-gray-600')
 
+        def render_fan(fan_url):
+            container.clear()
+            with container:
+                if fan_url:
+                    ui.image(fan_url).classes('w-full h-full object-cover')
+                else:
+                    with ui.element('div').classes('relative w-full h-full bg-gray-800 overflow-hidden'):
+                        ui.icon('image_not_supported', size='xl', color='grey').classes('absolute top-1/2 left-1/2 transform -translate-x-1/2 -translate-y-1/2')
+
         async def load_fan():
              if container.is_deleted: return
              try:
-                cards = await ygo_service.get_set_cards(set_code)
+                # Pre-rendered on the server from the rarest cards of the set
+                fan_url = await set_fans.get(set_code)
                 if container.is_deleted: return
-                container.clear()
-                with container:
-                     fan_div = ui.element('div').classes('relative w-full h-full bg-gray-800 overflow-hidden')
-                     with fan_div:
-                        if not cards:
-                            ui.icon('image_not_supported', size='xl', color='grey').classes('absolute top-1/2 left-1/2 transform -translate-x-1/2 -translate-y-1/2')
-                            return
-
-                        # Sort by rarity (rarest first)
-                        def get_card_rarity_index(c):
-                             target_prefix = set_code.split('-')[0].lower()
-                             best_idx = 999
-                             if c.card_sets:
-                                 for s in c.card_sets:
-                                     if s.set_code.split('-')[0].lower() == target_prefix:
-                                         try:
-                                             idx = RARITY_RANKING.index(s.set_rarity)
-                                         except ValueError:
-                                             idx = 999
-                                         if idx < best_idx:
-                                             best_idx = idx
-                             return best_idx
-
-                        sorted_cards = sorted(cards, key=get_card_rarity_index)
-
-                        # Take top 9 (rarest)
-                        top_cards = sorted_cards[:9]
-                        # Reverse so the rarest (first in sorted list) ends up last in rendering order (on top)
-                        top_cards.reverse()
-
-                        # Scattered pile positions (ordered from back to front)
-                        positions = [
-                            # Background Layer
-                            {'left': '-5%', 'top': '5%', 'rotate': '-15deg'},
-                            {'left': '60%', 'top': '5%', 'rotate': '15deg'},
-                            {'left': '-5%', 'top': '60%', 'rotate': '-10deg'},
-                            {'left': '60%', 'top': '60%', 'rotate': '10deg'},
-
-                            # Mid Layer
-                            {'left': '10%', 'top': '30%', 'rotate': '-25deg'},
-                            {'left': '45%', 'top': '30%', 'rotate': '25deg'},
-
-                            # Inner Layer
-                            {'left': '20%', 'top': '15%', 'rotate': '-5deg'},
-                            {'left': '35%', 'top': '50%', 'rotate': '5deg'},
-
-                            # Top (Rarest) - Center
-                            {'left': '27.5%', 'top': '32.5%', 'rotate': '0deg'},
-                        ]
-
-                        # Adjust positions if we have fewer cards to ensure the last one (rarest) is somewhat central
-                        # But simpler to just fill from the start.
-                        # If we have 1 card -> index 0 (was rarest) -> Pos 0.
-                        # Wait, if we have 1 card, top_cards has 1. reversed -> same.
-                        # It will use position 0 which is Left/Top. Not ideal.
-                        # If we have 1 card, we want it center.
-                        # Let's map based on how many we have.
-
-                        # Actually, if we use the last N positions for N cards, the "top" card always lands on the "Center-ish top" position.
-                        # Let's try that.
-
-                        start_index = len(positions) - len(top_cards)
-                        # e.g. 7 cards: start 0.
-                        # e.g. 1 card: start 6. Pos 6 is center.
-
-                        for i, card in enumerate(top_cards):
-                            pos_idx = start_index + i
-                            if pos_idx < 0: pos_idx = 0 # Should not happen
-                            pos = positions[pos_idx]
-
-                            img_url = card.card_images[0].image_url_small if card.card_images else None
-                            if img_url:
-                                ui.image(img_url).classes('absolute w-[45%] shadow-lg border border-white/10 rounded') \
-                                    .style(f"left: {pos['left']}; top: {pos['top']}; transform: rotate({pos['rotate']});")
+                render_fan(fan_url)
              except Exception as e:
                 logger.error(f"Error loading fallback for set {set_code}: {e}")
                 if not container.is_deleted: container.clear()
@@ -815,9 +656,8 @@ class BrowseSetsPage:
         # Check Local existence AND resolution
         path = image_manager.get_set_image_path(set_code)
         if image_manager.set_image_exists(set_code) and image_manager.check_image_resolution(path):
-             safe_code = "".join(c for c in set_code if c.isalnum() or c in ('-', '_')).strip()
              with container:
-                ui.image(f"/sets/{safe_code}.jpg").classes('w-full h-full object-contain')
+                ui.image(image_manager.get_set_image_url(set_code)).classes('w-full h-full object-contain')
         elif image_url:
              # Spinner
              render_fan_spinner()
@@ -830,10 +670,9 @@ class BrowseSetsPage:
                      if container.is_deleted: return
 
                      if path:
-                         safe_code = "".join(c for c in set_code if c.isalnum() or c in ('-', '_')).strip()
                          container.clear()
                          with container:
-                             ui.image(f"/sets/{safe_code}.jpg").classes('w-full h-full object-contain')
+                             ui.image(image_manager.get_set_image_url(set_code)).classes('w-full h-full object-contain')
                      else:
                          # Download failed or Low Res -> Fan
                          await load_fan()
@@ -844,9 +683,13 @@ class BrowseSetsPage:
              with container:
                  ui.timer(0.1, download_and_update, once=True)
         else:
-            render_fan_spinner()
-            with container:
-                ui.timer(0.1, load_fan, once=True)
+            fan_url = set_fans.cached_url(set_code)
+            if fan_url:
+                render_fan(fan_url)
+            else:
+                render_fan_spinner()
+                with container:
+                    ui.timer(0.1, load_fan, once=True)
 
     def render_set_card(self, set_info):
         async def on_click(e):
@@ -1322,13 +1165,12 @@ class BrowseSetsPage:
 
     async def open_consolidated_view(self, vm: CardViewModel):
          owned_breakdown = {}
-         if self.state['current_collection']:
-             for c in self.state['current_collection'].cards:
-                 if c.card_id == vm.api_card.id:
-                     for v in c.variants:
-                         for e in v.entries:
-                             owned_breakdown[e.language] = owned_breakdown.get(e.language, 0) + e.quantity
-                     break
+         collection = self.state['current_collection']
+         c_card = collection.ownership.card(vm.api_card.id) if collection else None
+         if c_card:
+             for v in c_card.variants:
+                 for e in v.entries:
+                     owned_breakdown[e.language] = owned_breakdown.get(e.language, 0) + e.quantity
 
          await self.single_card_view.open_consolidated(
              card=vm.api_card,
@@ -5,21 +5,28 @@ from src.core.config import config_manager
 from src.services.ygo_api import ygo_service, ApiCard
 from src.services.image_manager import image_manager
 from src.services.collection_editor import CollectionEditor
-from src.core.utils import generate_variant_id, normalize_set_code, extract_language_code, transform_set_code, LANGUAGE_COUNTRY_MAP
+from src.core.utils import generate_variant_id, normalize_set_code, transform_set_code, LANGUAGE_COUNTRY_MAP
 from src.core.constants import CARD_CONDITIONS, CONDITION_ABBREVIATIONS
 from src.ui.components.filter_pane import FilterPane
 from src.ui.components.single_card_view import SingleCardView
 from src.ui.components.structure_deck_dialog import StructureDeckDialog
+from src.ui.components.card_grid import CardGrid, tooltip_source, tooltip_target, ensure_tooltip_image
+from src.services.filter_engine import FilterColumns, FilterColumnsCache
+from src.services.filter_scheduler import FilterScheduler
+from src.services.shared_view_models import shared_view_models
+from src.services.image_prefetcher import ImagePrefetcher
 from src.core.models import Collection
 from dataclasses import dataclass, field
-from typing import List, Optional, Any, Dict
+from typing import List, Optional, Any, Dict, Tuple
 import logging
 import uuid
 import asyncio
 import re
+from functools import lru_cache
 
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=65536)
 def get_grouping_key_parts(set_code: str):
     """
     Parses set code into (Prefix, Category, Number).
@@ -79,6 +86,26 @@ class BulkCollectionEntry:
     storage_location: Optional[str] = None
     price: float = 0.0
 
+def build_library_columns(entries: List[LibraryEntry]) -> FilterColumns:
+    return FilterColumns(
+        entries,
+        card_of=lambda e: e.api_card,
+        sets_of=lambda e: [(e.set_code, e.set_name, e.rarity)],
+        price_of=lambda e: e.price
+    )
+
+def build_bulk_collection_columns(entries: List[BulkCollectionEntry]) -> FilterColumns:
+    return FilterColumns(
+        entries,
+        card_of=lambda e: e.api_card,
+        sets_of=lambda e: [(e.set_code, e.set_name, e.rarity)],
+        qty_of=lambda e: e.quantity,
+        price_of=lambda e: e.price,
+        languages_of=lambda e: [e.language],
+        conditions_of=lambda e: [e.condition],
+        storages_of=lambda e: [e.storage_location or 'None']
+    )
+
 def _resolve_set_name(api_card: ApiCard, target_set_code: str) -> str:
     if not api_card or not api_card.card_sets:
         return "Unknown Set"
@@ -91,7 +118,7 @@ def _resolve_set_name(api_card: ApiCard, target_set_code: str) -> str:
     # 2. Normalized Match
     target_norm = normalize_set_code(target_set_code)
     for s in api_card.card_sets:
-        if normalize_set_code(s.set_code) == target_norm:
+        if s.code_parts.normalized == target_norm:
             return s.set_name
 
     return "Unknown Set"
@@ -135,6 +162,78 @@ def _build_collection_entries(col: Collection, api_card_map: Dict[int, ApiCard])
                 ))
     return entries
 
+def _image_urls(entries) -> Dict[int, str]:
+    """The {image_id: url} thumbnails of library or collection entries."""
+    return {e.image_id: e.image_url for e in entries if e.image_url}
+
+def build_library_entries(api_cards: List[ApiCard], default_lang: str) -> List[LibraryEntry]:
+    """One entry per card printing, preferring the variant of the default language."""
+    entries = []
+
+    for c in api_cards:
+        if c.card_sets:
+            # Group sets by (Prefix, Category, Number, Rarity)
+            grouped_sets = {}
+            for s in c.card_sets:
+                prefix, cat, num = get_grouping_key_parts(s.set_code)
+                key = (prefix, cat, num, s.set_rarity)
+                if key not in grouped_sets:
+                    grouped_sets[key] = []
+                grouped_sets[key].append(s)
+
+            for key, variants in grouped_sets.items():
+                # Pick the best variant
+                selected = variants[0]
+                # Try to find match for default language
+                for v in variants:
+                     if v.code_parts.language == default_lang:
+                         selected = v
+                         break
+
+                # Create entry
+                img_id = selected.image_id if selected.image_id else (c.card_images[0].id if c.card_images else c.id)
+                img_url = c.card_images[0].image_url_small if c.card_images else None
+                if selected.image_id and c.card_images:
+                    for img in c.card_images:
+                        if img.id == selected.image_id:
+                            img_url = img.image_url_small
+                            break
+
+                entries.append(LibraryEntry(
+                    id=f"{c.id}_{selected.set_code}_{selected.set_rarity}",
+                    api_card=c,
+                    set_code=selected.set_code,
+                    set_name=selected.set_name,
+                    rarity=selected.set_rarity,
+                    image_url=img_url,
+                    image_id=img_id,
+                    price=selected.price
+                ))
+        else:
+            img_id = c.card_images[0].id if c.card_images else c.id
+            img_url = c.card_images[0].image_url_small if c.card_images else None
+            entries.append(LibraryEntry(
+                id=str(c.id),
+                api_card=c,
+                set_code="N/A",
+                set_name="No Set Info",
+                rarity="Common",
+                image_url=img_url,
+                image_id=img_id
+            ))
+
+    return entries
+
+def build_library_maps(api_cards: List[ApiCard]) -> Tuple[Dict[int, ApiCard], Dict[str, ApiCard]]:
+    """Card id -> card and set code -> card lookups of the catalog."""
+    api_card_map = {c.id: c for c in api_cards}
+    set_code_map = {}
+    for c in api_cards:
+        if c.card_sets:
+            for s in c.card_sets:
+                set_code_map[s.set_code] = c
+    return api_card_map, set_code_map
+
 class BulkAddPage:
     def __init__(self):
         # Global Metadata (shared)
@@ -262,6 +361,13 @@ class BulkAddPage:
 
         self.save_task = None
         self.undoing = False
+        self.library_filter_columns = FilterColumnsCache()
+        self.collection_filter_columns = FilterColumnsCache()
+        self.library_filter_scheduler = FilterScheduler(self._compute_library_filtered, self._show_library_filtered)
+        self.collection_filter_scheduler = FilterScheduler(self._compute_collection_filtered, self._show_collection_filtered)
+        self.library_prefetcher = ImagePrefetcher()
+        self.collection_prefetcher = ImagePrefetcher()
+        self._collection_reset_page_pending = False
 
     async def _perform_save(self):
         try:
@@ -409,58 +515,63 @@ class BulkAddPage:
 
         cards = self.col_state['collection_cards']
 
-        target_index = -1
-        for i, entry in enumerate(cards):
-            if entry.id == unique_id:
-                target_index = i
-                break
+        # Filter passes read the rows and their columns in a worker thread
+        async with self.collection_filter_scheduler.exclusive():
+            target_index = -1
+            for i, entry in enumerate(cards):
+                if entry.id == unique_id:
+                    target_index = i
+                    break
 
-        if target_index != -1:
-            entry = cards[target_index]
-            if mode == 'SET':
-                entry.quantity = qty
-            else:
-                entry.quantity += qty
+            if target_index != -1:
+                entry = cards[target_index]
+                if mode == 'SET':
+                    entry.quantity = qty
+                else:
+                    entry.quantity += qty
 
-            if entry.quantity <= 0:
-                cards.pop(target_index)
-        else:
-            if mode == 'SET' and qty > 0:
-                new_qty = qty
-            elif mode == 'ADD' and qty > 0:
-                new_qty = qty
+                if entry.quantity <= 0:
+                    cards.pop(target_index)
             else:
-                new_qty = 0
-
-            if new_qty > 0:
-                # Create new entry
-                set_name = _resolve_set_name(api_card, set_code)
-
-                # Image URL
-                img_url = api_card.card_images[0].image_url_small if api_card.card_images else None
-                if img_id and api_card.card_images:
-                    for img in api_card.card_images:
-                        if img.id == img_id:
-                            img_url = img.image_url_small
-                            break
+                if mode == 'SET' and qty > 0:
+                    new_qty = qty
+                elif mode == 'ADD' and qty > 0:
+                    new_qty = qty
+                else:
+                    new_qty = 0
+
+                if new_qty > 0:
+                    # Create new entry
+                    set_name = _resolve_set_name(api_card, set_code)
+
+                    # Image URL
+                    img_url = api_card.card_images[0].image_url_small if api_card.card_images else None
+                    if img_id and api_card.card_images:
+                        for img in api_card.card_images:
+                            if img.id == img_id:
+                                img_url = img.image_url_small
+                                break
+
+                    new_entry = BulkCollectionEntry(
+                        id=unique_id,
+                        api_card=api_card,
+                        quantity=new_qty,
+                        set_code=set_code,
+                        set_name=set_name,
+                        rarity=rarity,
+                        language=lang,
+                        condition=cond,
+                        first_edition=first,
+                        image_url=img_url,
+                        image_id=img_id,
+                        variant_id=variant_id,
+                        storage_location=storage_location,
+                        price=0.0
+                    )
+                    cards.insert(0, new_entry) # Add to top
 
-                new_entry = BulkCollectionEntry(
-                    id=unique_id,
-                    api_card=api_card,
-                    quantity=new_qty,
-                    set_code=set_code,
-                    set_name=set_name,
-                    rarity=rarity,
-                    language=lang,
-                    condition=cond,
-                    first_edition=first,
-                    image_url=img_url,
-                    image_id=img_id,
-                    variant_id=variant_id,
-                    storage_location=storage_location,
-                    price=0.0
-                )
-                cards.insert(0, new_entry) # Add to top
+            # Rows were changed in place, so the cached columns no longer match them
+            self.collection_filter_columns.invalidate()
 
         # Refresh View (preserve page)
         await self.apply_collection_filters(reset_page=False)
@@ -712,16 +823,15 @@ class BulkAddPage:
             added_count += qty
 
         if processed_changes:
-            # Save Collection
-            await run.io_bound(persistence.save_collection, collection, self.state['selected_collection'])
-
-            # Log Batch
             changelog_manager.log_batch_change(
                 self.state['selected_collection'],
                 f"Imported {deck_name}",
                 processed_changes
             )
 
+            # Save after logging so the saved state never precedes its changelog record
+            await run.io_bound(persistence.save_collection, collection, self.state['selected_collection'])
+
             ui.notify(f"Added {added_count} cards from {deck_name}", type='positive')
             self.render_header.refresh()
             await self.refresh_collection_view_from_memory()
@@ -857,12 +967,6 @@ class BulkAddPage:
              if not entry: return
 
              await self.remove_card_from_collection(entry)
-             # Refresh library to ensure the dropped item doesn't stay as a ghost
-             self.render_library_content.refresh()
-
-        # REORDER/REFRESH: Collection -> Collection
-        elif from_id == 'collection-list' and to_id == 'collection-list':
-            self.render_collection_content.refresh()
 
     # ... [Previous methods: on_collection_change, _setup_card_tooltip, load_library_data, apply_library_filters, etc.]
     # (I will include the full class content in write_file to ensure consistency)
@@ -1006,14 +1110,14 @@ class BulkAddPage:
             updated_count += qty
 
         if processed_changes:
-            await run.io_bound(persistence.save_collection, collection, self.state['selected_collection'])
-
             changelog_manager.log_batch_change(
                 self.state['selected_collection'],
                 f"Bulk Updated {len(processed_changes)} stacks",
                 processed_changes
             )
 
+            await run.io_bound(persistence.save_collection, collection, self.state['selected_collection'])
+
             ui.notify(f"Updated {len(processed_changes)} entries", type='positive')
             self.render_header.refresh()
             await self.refresh_collection_view_from_memory()
@@ -1128,14 +1232,14 @@ class BulkAddPage:
             added_count += 1
 
         if processed_changes:
-            await run.io_bound(persistence.save_collection, collection, self.state['selected_collection'])
-
             changelog_manager.log_batch_change(
                 self.state['selected_collection'],
                 f"Bulk Added {added_count} cards",
                 processed_changes
             )
 
+            await run.io_bound(persistence.save_collection, collection, self.state['selected_collection'])
+
             ui.notify(f"Added {added_count} cards", type='positive')
             self.render_header.refresh()
             await self.refresh_collection_view_from_memory()
@@ -1188,14 +1292,14 @@ class BulkAddPage:
             removed_count += qty_to_remove
 
         if processed_changes:
-            await run.io_bound(persistence.save_collection, collection, self.state['selected_collection'])
-
             changelog_manager.log_batch_change(
                 self.state['selected_collection'],
                 f"Bulk Removed {len(processed_changes)} entries",
                 processed_changes
             )
 
+            await run.io_bound(persistence.save_collection, collection, self.state['selected_collection'])
+
             ui.notify(f"Removed {len(processed_changes)} entries", type='positive')
             self.render_header.refresh()
             await self.refresh_collection_view_from_memory()
@@ -1337,126 +1441,20 @@ class BulkAddPage:
         self.render_header.refresh()
         await self.load_collection_data()
 
-    def _setup_card_tooltip(self, card: ApiCard, specific_image_id: int = None):
-        if not card: return
-        target_img = card.card_images[0] if card.card_images else None
-        if specific_image_id and card.card_images:
-            for img in card.card_images:
-                if img.id == specific_image_id:
-                    target_img = img
-                    break
-        if not target_img: return
-
-        img_id = target_img.id
-        high_res_url = target_img.image_url
-        low_res_url = target_img.image_url_small
-        is_local = image_manager.image_exists(img_id, high_res=True)
-        initial_src = f"/images/{img_id}_high.jpg" if is_local else (high_res_url or low_res_url)
-
-        with ui.tooltip().classes('bg-transparent shadow-none border-none p-0 overflow-visible z-[9999] max-w-none').props('style="max-width: none" delay=5000') as tooltip:
-            if initial_src:
-                ui.image(initial_src).classes('w-auto h-[65vh] min-w-[1000px] object-contain rounded-lg shadow-2xl').props('fit=contain')
-            if not is_local and high_res_url:
-                async def ensure_high():
-                    if not image_manager.image_exists(img_id, high_res=True):
-                         await image_manager.ensure_image(img_id, high_res_url, high_res=True)
-                tooltip.on('show', ensure_high)
-
     async def load_library_data(self):
         try:
             logger.info("Starting load_library_data")
             lang_code = config_manager.get_language().lower()
             api_cards = await ygo_service.load_card_database(lang_code)
-            self.api_card_map = {c.id: c for c in api_cards}
+            self.api_card_map, self.set_code_map = await run.io_bound(
+                shared_view_models.get, 'library_maps', lang_code, lambda: build_library_maps(api_cards))
             logger.info(f"Loaded {len(api_cards)} cards into API map")
 
-            # Build Set Code Map
-            # Note: Set codes in DB might be "SDAZ-EN001" or "SDAZ-EN001"
-            self.set_code_map = {}
-            for c in api_cards:
-                if c.card_sets:
-                    for s in c.card_sets:
-                        self.set_code_map[s.set_code] = c
-
-            entries = []
-            sets = set()
-            m_races = set()
-            st_races = set()
-            archetypes = set()
-
             default_lang = self.state['default_language'].upper()
-
-            for c in api_cards:
-                if c.card_sets:
-                    for s in c.card_sets:
-                        sets.add(f"{s.set_name} | {s.set_code.split('-')[0] if '-' in s.set_code else s.set_code}")
-                if c.archetype: archetypes.add(c.archetype)
-                if "Monster" in c.type: m_races.add(c.race)
-                elif "Spell" in c.type or "Trap" in c.type:
-                    if c.race: st_races.add(c.race)
-
-                if c.card_sets:
-                    # Group sets by (Prefix, Category, Number, Rarity)
-                    grouped_sets = {}
-                    for s in c.card_sets:
-                        prefix, cat, num = get_grouping_key_parts(s.set_code)
-                        key = (prefix, cat, num, s.set_rarity)
-                        if key not in grouped_sets:
-                            grouped_sets[key] = []
-                        grouped_sets[key].append(s)
-
-                    for key, variants in grouped_sets.items():
-                        # Pick the best variant
-                        selected = variants[0]
-                        # Try to find match for default language
-                        for v in variants:
-                             v_lang = extract_language_code(v.set_code)
-                             if v_lang == default_lang:
-                                 selected = v
-                                 break
-
-                        # Create entry
-                        price = 0.0
-                        if selected.set_price:
-                            try: price = float(selected.set_price)
-                            except: pass
-
-                        img_id = selected.image_id if selected.image_id else (c.card_images[0].id if c.card_images else c.id)
-                        img_url = c.card_images[0].image_url_small if c.card_images else None
-                        if selected.image_id and c.card_images:
-                            for img in c.card_images:
-                                if img.id == selected.image_id:
-                                    img_url = img.image_url_small
-                                    break
-
-                        entries.append(LibraryEntry(
-                            id=f"{c.id}_{selected.set_code}_{selected.set_rarity}",
-                            api_card=c,
-                            set_code=selected.set_code,
-                            set_name=selected.set_name,
-                            rarity=selected.set_rarity,
-                            image_url=img_url,
-                            image_id=img_id,
-                            price=price
-                        ))
-                else:
-                    img_id = c.card_images[0].id if c.card_images else c.id
-                    img_url = c.card_images[0].image_url_small if c.card_images else None
-                    entries.append(LibraryEntry(
-                        id=str(c.id),
-                        api_card=c,
-                        set_code="N/A",
-                        set_name="No Set Info",
-                        rarity="Common",
-                        image_url=img_url,
-                        image_id=img_id
-                    ))
-
-            self.state['library_cards'] = entries
-            self.metadata['available_sets'][:] = sorted(list(sets))
-            self.metadata['available_monster_races'][:] = sorted(list(m_races))
-            self.metadata['available_st_races'][:] = sorted(list(st_races))
-            self.metadata['available_archetypes'][:] = sorted(list(archetypes))
+            self.state['library_cards'] = await run.io_bound(
+                shared_view_models.get, 'library', lang_code,
+                lambda: build_library_entries(api_cards, default_lang), default_lang)
+            ygo_service.get_filter_metadata(lang_code).apply_to(self.metadata)
 
             for k, v in self.metadata.items():
                 self.state[k] = v
@@ -1483,60 +1481,20 @@ class BulkAddPage:
         if self.collection_filter_pane: self.collection_filter_pane.update_options()
 
     async def apply_library_filters(self):
-        source = self.state['library_cards']
-        res = list(source)
-        txt = self.state['library_search_text'].lower()
-        if txt:
-            def matches(e: LibraryEntry):
-                return (txt in e.api_card.name.lower() or
-                        txt in e.set_code.lower() or
-                        txt in e.set_name.lower() or
-                        txt in e.api_card.desc.lower())
-            res = [e for e in res if matches(e)]
+        self.library_prefetcher.cancel()
+        await self.library_filter_scheduler.request()
 
+    def _compute_library_filtered(self):
+        """Filters and sorts the library; runs in the library filter scheduler's worker."""
+        source = self.state['library_cards']
         s = self.state
-        if s['filter_card_type']: res = [e for e in res if any(t in e.api_card.type for t in s['filter_card_type'])]
-        if s['filter_attr']: res = [e for e in res if e.api_card.attribute == s['filter_attr']]
-        if s['filter_monster_race']: res = [e for e in res if "Monster" in e.api_card.type and e.api_card.race == s['filter_monster_race']]
-        if s['filter_st_race']: res = [e for e in res if ("Spell" in e.api_card.type or "Trap" in e.api_card.type) and e.api_card.race == s['filter_st_race']]
-        if s['filter_archetype']: res = [e for e in res if e.api_card.archetype == s['filter_archetype']]
-        if s['filter_set']:
-             parts = s['filter_set'].split('|')
-             name_target = parts[0].strip().lower()
-             code_target = parts[1].strip().lower() if len(parts) > 1 else None
-
-             if code_target:
-                 res = [e for e in res if code_target in e.set_code.lower()]
-             else:
-                 res = [e for e in res if name_target in e.set_name.lower() or name_target in e.set_code.lower()]
-        if s['filter_rarity']:
-             target = s['filter_rarity'].lower()
-             res = [e for e in res if e.rarity.lower() == target]
-        if s['filter_monster_category']:
-             cats = s['filter_monster_category']
-             res = [e for e in res if any(e.api_card.matches_category(cat) for cat in cats)]
-        if s['filter_level'] is not None:
-             res = [e for e in res if e.api_card.level == int(s['filter_level'])]
-        atk_min, atk_max = s['filter_atk_min'], s['filter_atk_max']
-        if atk_min > 0 or atk_max < 5000:
-             res = [e for e in res if e.api_card.atk is not None and atk_min <= int(e.api_card.atk) <= atk_max]
-        def_min, def_max = s['filter_def_min'], s['filter_def_max']
-        if def_min > 0 or def_max < 5000:
-             res = [e for e in res if e.api_card.def_ is not None and def_min <= int(e.api_card.def_) <= def_max]
-        p_min, p_max = s['filter_price_min'], s['filter_price_max']
-        if p_min > 0 or p_max < 1000:
-             res = [e for e in res if p_min <= e.price <= p_max]
-
-        key = s['library_sort_by']
-        reverse = s['library_sort_desc']
-        if key == 'Name': res.sort(key=lambda x: x.api_card.name, reverse=reverse)
-        elif key == 'ATK': res.sort(key=lambda x: (x.api_card.atk or -1), reverse=reverse)
-        elif key == 'DEF': res.sort(key=lambda x: (getattr(x.api_card, 'def_', None) or -1), reverse=reverse)
-        elif key == 'Level': res.sort(key=lambda x: (x.api_card.level or -1), reverse=reverse)
-        elif key == 'Price': res.sort(key=lambda x: x.price, reverse=reverse)
-        elif key == 'Set Code': res.sort(key=lambda x: x.set_code, reverse=reverse)
-        elif key == 'Newest': res.sort(key=lambda x: x.api_card.id, reverse=reverse)
+        cols = self.library_filter_columns.get(source, build_library_columns)
+        mask = cols.mask(s, search_text=s['library_search_text'],
+                         search_fields=('name', 'set_code', 'set_name', 'desc'), category_match='any',
+                         text_index=ygo_service.get_text_index(config_manager.get_language().lower()))
+        return cols.select_sorted(mask, s['library_sort_by'], s['library_sort_desc'])
 
+    async def _show_library_filtered(self, res):
         self.state['library_filtered'] = res
         self.state['library_page'] = 1
         self.update_library_pagination()
@@ -1573,62 +1531,25 @@ class BulkAddPage:
         if self.collection_filter_pane: self.collection_filter_pane.update_options()
 
     async def apply_collection_filters(self, reset_page=True):
+        self.collection_prefetcher.cancel()
+        self._collection_reset_page_pending = self._collection_reset_page_pending or reset_page
+        await self.collection_filter_scheduler.request()
+
+    def _compute_collection_filtered(self):
+        """Filters and sorts the collection entries; runs in the collection filter scheduler's worker."""
         source = self.col_state['collection_cards']
-        res = list(source)
         s = self.col_state
+        cols = self.collection_filter_columns.get(source, build_bulk_collection_columns)
+        mask = cols.mask(s, search_text=s['search_text'],
+                         search_fields=('name', 'set_code', 'desc'), category_match='any',
+                         text_index=ygo_service.get_text_index(config_manager.get_language().lower()))
+        return cols.select_sorted(mask, s['sort_by'], s['sort_desc'])
 
-        txt = s['search_text'].lower()
-        if txt:
-            def matches(e: BulkCollectionEntry):
-                return (txt in e.api_card.name.lower() or
-                        txt in e.set_code.lower() or
-                        txt in e.api_card.desc.lower())
-            res = [e for e in res if matches(e)]
-
-        if s['filter_card_type']: res = [e for e in res if any(t in e.api_card.type for t in s['filter_card_type'])]
-        if s['filter_attr']: res = [e for e in res if e.api_card.attribute == s['filter_attr']]
-        if s['filter_monster_race']: res = [e for e in res if "Monster" in e.api_card.type and e.api_card.race == s['filter_monster_race']]
-        if s['filter_st_race']: res = [e for e in res if ("Spell" in e.api_card.type or "Trap" in e.api_card.type) and e.api_card.race == s['filter_st_race']]
-        if s['filter_archetype']: res = [e for e in res if e.api_card.archetype == s['filter_archetype']]
-        if s['filter_set']:
-             parts = s['filter_set'].split('|')
-             name_target = parts[0].strip().lower()
-             code_target = parts[1].strip().lower() if len(parts) > 1 else None
-
-             if code_target:
-                 res = [e for e in res if code_target in e.set_code.lower()]
-             else:
-                 res = [e for e in res if name_target in e.set_name.lower() or name_target in e.set_code.lower()]
-        if s['filter_rarity']:
-             target = s['filter_rarity'].lower()
-             res = [e for e in res if e.rarity.lower() == target]
-        if s['filter_monster_category']:
-             cats = s['filter_monster_category']
-             res = [e for e in res if any(e.api_card.matches_category(cat) for cat in cats)]
-        if s['filter_owned_lang']:
-             res = [e for e in res if e.language == s['filter_owned_lang']]
-        if s['filter_condition']:
-             res = [e for e in res if e.condition in s['filter_condition']]
-        if s['filter_storage']:
-             selected = set(s['filter_storage'])
-             def match_storage(e):
-                 loc = e.storage_location if e.storage_location else 'None'
-                 return loc in selected
-             res = [e for e in res if match_storage(e)]
-
-        key = s['sort_by']
-        reverse = s['sort_desc']
-        if key == 'Name': res.sort(key=lambda x: x.api_card.name, reverse=reverse)
-        elif key == 'ATK': res.sort(key=lambda x: (x.api_card.atk or -1), reverse=reverse)
-        elif key == 'DEF': res.sort(key=lambda x: (getattr(x.api_card, 'def_', None) or -1), reverse=reverse)
-        elif key == 'Level': res.sort(key=lambda x: (x.api_card.level or -1), reverse=reverse)
-        elif key == 'Set Code': res.sort(key=lambda x: x.set_code, reverse=reverse)
-        elif key == 'Quantity': res.sort(key=lambda x: x.quantity, reverse=reverse)
-        elif key == 'Newest': res.sort(key=lambda x: x.api_card.id, reverse=reverse)
-
+    async def _show_collection_filtered(self, res):
         self.col_state['collection_filtered'] = res
-        if reset_page:
+        if self._collection_reset_page_pending:
             self.col_state['collection_page'] = 1
+            self._collection_reset_page_pending = False
         self.update_collection_pagination()
         self.render_collection_content.refresh()
 
@@ -1854,153 +1775,83 @@ class BulkAddPage:
              else:
                  with btn: ui.tooltip('Undo the last add/remove action')
 
+    def _library_page(self, page: int) -> List[LibraryEntry]:
+        start = (page - 1) * self.state['library_page_size']
+        end = min(start + self.state['library_page_size'], len(self.state['library_filtered']))
+        return self.state['library_filtered'][start:end]
+
+    def _collection_page(self, page: int) -> List[BulkCollectionEntry]:
+        start = (page - 1) * self.col_state['collection_page_size']
+        end = min(start + self.col_state['collection_page_size'], len(self.col_state['collection_filtered']))
+        return self.col_state['collection_filtered'][start:end]
+
     @ui.refreshable
     def render_library_content(self):
-        start = (self.state['library_page'] - 1) * self.state['library_page_size']
-        end = min(start + self.state['library_page_size'], len(self.state['library_filtered']))
-        items = self.state['library_filtered'][start:end]
+        items = self._library_page(self.state['library_page'])
 
-        url_map = {}
-        for item in items:
-            if item.image_url: url_map[item.image_id] = item.image_url
+        url_map = _image_urls(items)
         if url_map:
             asyncio.create_task(image_manager.download_batch(url_map, concurrency=5))
+        self.library_prefetcher.schedule(self.state['library_page'], self.state['library_total_pages'],
+                                         lambda p: _image_urls(self._library_page(p)))
 
         if not items:
             ui.label('No cards found.').classes('text-gray-500 italic w-full text-center mt-10')
             return
 
-        with ui.grid(columns='repeat(auto-fill, minmax(110px, 1fr))').classes('w-full gap-2 p-2').props('id="library-list"'):
-            for item in items:
-                img_src = f"/images/{item.image_id}.jpg" if image_manager.image_exists(item.image_id) else item.image_url
-
-                with ui.card().classes('p-0 cursor-pointer hover:scale-105 transition-transform border border-gray-800 w-full aspect-[2/3] select-none') \
-                        .props(f'data-id="{item.id}"') \
-                        .on('click', lambda i=item: self.open_single_view_library(i)) \
-                        .on('contextmenu.prevent', lambda i=item: self.add_card_to_collection(i, self.state['default_language'], self.state['default_condition'], self.state['default_first_ed'], 1)):
-
-                    with ui.element('div').classes('relative w-full h-full'):
-                         ui.image(img_src).classes('w-full h-full object-cover')
-
-                         with ui.column().classes('absolute bottom-0 left-0 w-full bg-black/80 p-0.5 gap-0'):
-                             ui.label(item.api_card.name).classes('text-[9px] font-bold text-white leading-none truncate w-full')
-                             ui.label(item.set_code).classes('text-[10px] font-mono font-bold text-yellow-500 leading-none truncate')
-                             ui.label(item.rarity).classes('text-[8px] text-gray-300 leading-none truncate')
-
-                    self._setup_card_tooltip(item.api_card, specific_image_id=item.image_id)
-
-        # putMode = true to allow dropping from collection (to remove)
-        ui.run_javascript('initSortable("library-list", "shared", "clone", true)')
+        grid = self._card_grid('library-list', self.library_prefetcher)
+        grid.on_card('card_click', self.open_single_view_library)
+        grid.on_card('card_contextmenu', lambda i: self.add_card_to_collection(i, self.state['default_language'], self.state['default_condition'], self.state['default_first_ed'], 1))
+        grid.set_items(items, self.library_grid_row)
 
     @ui.refreshable
     def render_collection_content(self):
-        start = (self.col_state['collection_page'] - 1) * self.col_state['collection_page_size']
-        end = min(start + self.col_state['collection_page_size'], len(self.col_state['collection_filtered']))
-        items = self.col_state['collection_filtered'][start:end]
+        items = self._collection_page(self.col_state['collection_page'])
 
-        url_map = {}
-        for item in items:
-            if item.image_url: url_map[item.image_id] = item.image_url
+        url_map = _image_urls(items)
         if url_map:
             asyncio.create_task(image_manager.download_batch(url_map, concurrency=5))
+        self.collection_prefetcher.schedule(self.col_state['collection_page'], self.col_state['collection_total_pages'],
+                                            lambda p: _image_urls(self._collection_page(p)))
 
         if not items:
             ui.label('Collection is empty or no matches.').classes('text-gray-500 italic w-full text-center mt-10')
             return
 
-        with ui.grid(columns='repeat(auto-fill, minmax(110px, 1fr))').classes('w-full gap-2 p-2').props('id="collection-list"'):
-            for item in items:
-                img_src = f"/images/{item.image_id}.jpg" if image_manager.image_exists(item.image_id) else item.image_url
-
-                cond_short = CONDITION_ABBREVIATIONS.get(item.condition, item.condition[:2].upper())
-
-                with ui.card().classes('p-0 cursor-pointer hover:scale-105 transition-transform border border-accent w-full aspect-[2/3] select-none') \
-                        .props(f'data-id="{item.id}"') \
-                        .on('click', lambda i=item: self.open_single_view_collection(i)) \
-                        .on('contextmenu.prevent', lambda i=item: self.reduce_collection_card_qty(i)):
-
-                    with ui.element('div').classes('relative w-full h-full'):
-                         ui.image(img_src).classes('w-full h-full object-cover')
-
-                         lang_code = item.language.strip().upper()
-                         country_code = LANGUAGE_COUNTRY_MAP.get(lang_code)
-                         if country_code:
-                             ui.element('img').props(f'src="https://flagcdn.com/h24/{country_code}.png" alt="{lang_code}"').classes('absolute top-[1px] left-[1px] h-4 w-6 shadow-black drop-shadow-md rounded bg-black/30')
-                         else:
-                             ui.label(lang_code).classes('absolute top-[1px] left-[1px] text-xs font-bold shadow-black drop-shadow-md bg-black/30 rounded px-1')
-
-                         ui.label(f"{item.quantity}").classes('absolute top-1 right-1 bg-accent text-dark font-bold px-2 rounded-full text-xs shadow-md')
-
-                         with ui.column().classes('absolute bottom-0 left-0 bg-black/80 text-white text-[9px] px-1 gap-0 w-full'):
-                             ui.label(item.api_card.name).classes('text-[9px] font-bold text-white leading-none truncate w-full')
-                             with ui.row().classes('w-full justify-between items-center'):
-                                 with ui.row().classes('gap-1'):
-                                     ui.label(cond_short).classes('font-bold text-yellow-500')
-                                     if item.first_edition:
-                                         ui.label('1st').classes('font-bold text-orange-400')
-                                 ui.label(item.set_code).classes('font-mono')
-                             with ui.row().classes('w-full justify-between items-center gap-1'):
-                                 ui.label(item.rarity).classes('text-[8px] text-gray-300 truncate flex-shrink')
-                                 ui.label(item.storage_location or "None").classes('text-[8px] text-gray-400 font-mono truncate flex-shrink text-right')
-
-                    self._setup_card_tooltip(item.api_card, specific_image_id=item.image_id)
+        grid = self._card_grid('collection-list', self.collection_prefetcher)
+        grid.on_card('card_click', self.open_single_view_collection)
+        grid.on_card('card_contextmenu', self.reduce_collection_card_qty)
+        grid.set_items(items, self.collection_grid_row)
+
+    def _card_grid(self, grid_id: str, prefetcher: ImagePrefetcher) -> CardGrid:
+        with ui.element('div').classes('w-full p-2'):
+            grid = CardGrid(grid_id=grid_id, variant='compact', min_width=110, gap=8, tooltip_delay=5000,
+                            draggable=True, accept_drop=True)
+        grid.on_card('tooltip_show', lambda i: ensure_tooltip_image(i.api_card, i.image_id))
+        grid.on_card('card_hover', lambda i: prefetcher.note_hover(*tooltip_target(i.api_card, i.image_id)))
+        return grid
+
+    def library_grid_row(self, item: LibraryEntry) -> Dict:
+        tip, fetch = tooltip_source(item.api_card, item.image_id)
+        return {
+            'id': item.id, 'img': f"/images/{item.image_id}.jpg" if image_manager.image_exists(item.image_id) else item.image_url,
+            'tip': tip, 'fetch': fetch, 'title': item.api_card.name, 'code': item.set_code, 'sub': item.rarity,
+        }
 
-        ui.run_javascript('initSortable("collection-list", "shared", true, true)')
+    def collection_grid_row(self, item: BulkCollectionEntry) -> Dict:
+        lang_code = item.language.strip().upper()
+        country_code = LANGUAGE_COUNTRY_MAP.get(lang_code)
+        tip, fetch = tooltip_source(item.api_card, item.image_id)
+        return {
+            'id': item.id, 'img': f"/images/{item.image_id}.jpg" if image_manager.image_exists(item.image_id) else item.image_url,
+            'tip': tip, 'fetch': fetch, 'accent': True,
+            'flag': f"https://flagcdn.com/h24/{country_code}.png" if country_code else None, 'lang': lang_code,
+            'qty': item.quantity, 'cond': CONDITION_ABBREVIATIONS.get(item.condition, item.condition[:2].upper()),
+            'ed': item.first_edition, 'code': item.set_code, 'title': item.api_card.name, 'sub': item.rarity,
+            'loc': item.storage_location or "None",
+        }
 
     def build_ui(self):
-        ui.add_head_html('<script src="https://cdnjs.cloudflare.com/ajax/libs/Sortable/1.15.0/Sortable.min.js"></script>')
-        ui.add_head_html('<style>.sortable-ghost-custom { opacity: 0.5; }</style>')
-        ui.add_body_html('''
-            <script>
-            window.initSortable = function(elementId, groupName, pullMode, putMode) {
-                var el = document.getElementById(elementId);
-                if (!el) return;
-                if (el._sortable) el._sortable.destroy();
-
-                el._sortable = new Sortable(el, {
-                    group: { name: groupName, pull: pullMode, put: putMode },
-                    animation: 150,
-                    sort: true,
-                    ghostClass: 'sortable-ghost-custom',
-                    forceFallback: true,
-                    fallbackTolerance: 3,
-                    onClone: function (evt) { evt.clone.removeAttribute('id'); },
-                    onEnd: function (evt) {
-                        // Fix for context menu not working after drag (restore original element with events to source)
-                        if (pullMode === 'clone' && evt.item && evt.clone) {
-                            if (evt.to !== evt.from && evt.clone.parentNode === evt.from) {
-                                evt.from.replaceChild(evt.item, evt.clone);
-                            }
-                        }
-                    },
-                    onAdd: function (evt) {
-                         var itemEl = evt.item;
-                         var fromId = evt.from.id;
-                         var toId = evt.to.id;
-                         var dataId = itemEl.getAttribute('data-id');
-
-                         var container = document.getElementById('bulk-add-container');
-                         if (container) {
-                             container.dispatchEvent(new CustomEvent('card_drop', {
-                                 detail: {
-                                     data_id: dataId,
-                                     from_id: fromId,
-                                     to_id: toId
-                                 },
-                                 bubbles: true
-                             }));
-                         }
-                         // For drops into library (from collection) or collection (from library), we remove the element visually
-                         // so it doesn't stay as a "ghost" with incorrect events/state while the backend processes.
-                         if (toId === 'library-list' || toId === 'collection-list') {
-                             itemEl.remove();
-                         }
-                    }
-                });
-            }
-            </script>
-        ''')
-
         self.library_filter_dialog = ui.dialog().props('position=right')
         with self.library_filter_dialog, ui.card().classes('h-full w-96 bg-gray-900 border-l border-gray-700 p-0 flex flex-col'):
              with ui.scroll_area().classes('flex-grow w-full'):
@@ -1,17 +1,30 @@
 from nicegui import ui, run
 from src.core.persistence import persistence
 from src.core.changelog_manager import changelog_manager
+from src.core.collection_events import collection_events, EntryChanged, CollectionSaved
 from src.core.models import Collection, CollectionCard, CollectionVariant, CollectionEntry, Card, CardMetadata
 from src.services.ygo_api import ygo_service, ApiCard
 from src.services.image_manager import image_manager
 from src.core.config import config_manager
-from src.core.utils import transform_set_code, generate_variant_id, normalize_set_code, LANGUAGE_COUNTRY_MAP, REGION_TO_LANGUAGE_MAP, is_set_code_compatible, extract_language_code
+from src.core.utils import transform_set_code, LANGUAGE_COUNTRY_MAP, REGION_TO_LANGUAGE_MAP
+from src.core.constants import CONDITION_ABBREVIATIONS
 from src.ui.components.filter_pane import FilterPane
+from src.ui.components.advanced_search import AdvancedSearchInput
 from src.ui.components.single_card_view import SingleCardView
+from src.ui.components.card_grid import CardGrid, tooltip_source, tooltip_target, ensure_tooltip_image
 from src.services.collection_editor import CollectionEditor
+from src.services.filter_engine import FilterColumns, FilterColumnsCache
+from src.services.card_query import evaluate_query
+from src.services.filter_scheduler import FilterScheduler
+from src.services.shared_view_models import shared_view_models
+from src.services.image_prefetcher import ImagePrefetcher
+from src.services.sprite_sheets import sprite_sheets, SpriteSheet
+from src.services import collection_history
+from datetime import datetime
 from dataclasses import dataclass, field, replace
-from typing import List, Optional, Dict, Set, Callable
+from typing import List, Optional, Dict, Set, Callable, Tuple
 import asyncio
+import queue
 import traceback
 import re
 import logging
@@ -45,203 +58,75 @@ class CollectorRow:
     variant_id: Optional[str] = None
     entries: List[CollectionEntry] = field(default_factory=list)
 
-def build_consolidated_vms(api_cards: List[ApiCard], owned_details: Dict[int, CollectionCard]) -> List[CardViewModel]:
-    vms = []
-    for card in api_cards:
-        c_card = owned_details.get(card.id)
-        qty = c_card.total_quantity if c_card else 0
-        owned_langs = set()
-        owned_conds = set()
-        if c_card:
-            for v in c_card.variants:
-                for e in v.entries:
-                    owned_langs.add(e.language)
-                    owned_conds.add(e.condition)
-
-        lowest = 0.0
-        prices = []
-        if card.card_prices:
-            p = card.card_prices[0]
-            for val in [p.cardmarket_price, p.tcgplayer_price, p.coolstuffinc_price]:
-                 if val:
-                     try:
-                         prices.append(float(val))
-                     except:
-                         pass
-        if prices:
-            lowest = min(prices)
-
-        vms.append(CardViewModel(card, qty, qty > 0, lowest, owned_langs, owned_conds))
-    return vms
-
-def build_collector_rows(api_cards: List[ApiCard], owned_details: Dict[int, CollectionCard], language: str) -> List[CollectorRow]:
+def build_card_vm(card: ApiCard, c_card: Optional[CollectionCard]) -> CardViewModel:
+    qty = c_card.total_quantity if c_card else 0
+    owned_langs = set()
+    owned_conds = set()
+    if c_card:
+        for v in c_card.variants:
+            for e in v.entries:
+                owned_langs.add(e.language)
+                owned_conds.add(e.condition)
+
+    return CardViewModel(card, qty, qty > 0, card.lowest_price, owned_langs, owned_conds)
+
+def build_consolidated_vms(api_cards: List[ApiCard], owned_details: Dict[int, CollectionCard],
+                           unowned: Optional[List[CardViewModel]] = None) -> List[CardViewModel]:
+    """
+    unowned: the shared view models of api_cards with nothing owned (see catalog_view_models).
+    They are reused as is for cards missing from owned_details.
+    """
+    if unowned is None:
+        return [build_card_vm(card, owned_details.get(card.id)) for card in api_cards]
+    return [vm if card.id not in owned_details else build_card_vm(card, owned_details[card.id])
+            for card, vm in zip(api_cards, unowned)]
+
+def build_card_collector_rows(card: ApiCard, c_card: Optional[CollectionCard], language: str) -> List[CollectorRow]:
+    """The collector rows of one card, in the order build_collector_rows lists them."""
     rows = []
 
-    for card in api_cards:
-        c_card = owned_details.get(card.id)
-
-        owned_variants = {v.variant_id: v for v in c_card.variants} if c_card else {}
-        processed_variant_ids = set()
-
-        img_url = card.card_images[0].image_url_small if card.card_images else None
-        default_image_id = card.card_images[0].id if card.card_images else None
+    owned_variants = {v.variant_id: v for v in c_card.variants} if c_card else {}
+    processed_variant_ids = set()
 
-        # 1. Group API sets by (normalized_code, rarity)
-        api_groups = {} # (norm_code, rarity) -> List[ApiCardSet]
-        if card.card_sets:
-            for cset in card.card_sets:
-                norm = normalize_set_code(cset.set_code)
-                key = (norm, cset.set_rarity)
-                if key not in api_groups: api_groups[key] = []
-                api_groups[key].append(cset)
-
-        # 2. Process Groups
-        for (norm_code, rarity), group_sets in api_groups.items():
-            matched_owned = []
-
-            # Find owned variants belonging to this group
-            for var_id, var in owned_variants.items():
-                if var_id in processed_variant_ids:
-                    continue
+    img_url = card.card_images[0].image_url_small if card.card_images else None
+    default_image_id = card.card_images[0].id if card.card_images else None
 
-                # Check compatibility
-                # Exact variant ID match? (Ideally yes, if API variant ID matches)
-                # Or fuzzy match on normalized code + rarity
-
-                # Note: normalize_set_code is cheap
-                var_norm = normalize_set_code(var.set_code)
-                if var_norm == norm_code and var.rarity == rarity:
-                     matched_owned.append(var)
-                     processed_variant_ids.add(var_id)
-
-            if matched_owned:
-                # Create rows for owned variants
-                for cv in matched_owned:
-                    groups = {}
-                    for entry in cv.entries:
-                        k = (entry.language, entry.condition, entry.first_edition)
-                        groups[k] = groups.get(k, 0) + entry.quantity
-
-                    # Resolve image
-                    row_img_url = img_url
-                    if cv.image_id:
-                         for img in card.card_images:
-                             if img.id == cv.image_id:
-                                 row_img_url = img.image_url_small
-                                 break
-
-                    # Get Set Name/Price from API group if possible (best effort match)
-                    # We can pick the API set that matches the owned set code best
-                    best_api_set = group_sets[0]
-                    for s in group_sets:
-                        if s.set_code == cv.set_code:
-                            best_api_set = s
-                            break
-
-                    set_name = best_api_set.set_name
-                    price = 0.0
-                    if best_api_set.set_price:
-                        try: price = float(best_api_set.set_price)
-                        except: pass
-
-                    for (lang, cond, first), qty in groups.items():
-                        group_entries = [e for e in cv.entries if e.language == lang and e.condition == cond and e.first_edition == first]
-                        rows.append(CollectorRow(
-                            api_card=card,
-                            set_code=cv.set_code,
-                            set_name=set_name,
-                            rarity=rarity,
-                            price=price,
-                            image_url=row_img_url,
-                            owned_count=qty,
-                            is_owned=True,
-                            language=lang,
-                            condition=cond,
-                            first_edition=first,
-                            image_id=cv.image_id,
-                            variant_id=cv.variant_id,
-                            entries=group_entries
-                        ))
-            else:
-                # Create ONE unowned row for this group
-                # Pick representative set
-                # Priority: Match 'language' arg, then 'EN', then first
-                representative = None
+    # 1. Group API sets by (normalized_code, rarity)
+    api_groups = {} # (norm_code, rarity) -> List[ApiCardSet]
+    if card.card_sets:
+        for cset in card.card_sets:
+            norm = cset.code_parts.normalized
+            key = (norm, cset.set_rarity)
+            if key not in api_groups: api_groups[key] = []
+            api_groups[key].append(cset)
 
-                # Try exact language match (Explicit Region)
-                for s in group_sets:
-                    if extract_language_code(s.set_code) == language.upper():
-                        representative = s
-                        break
+    # 2. Process Groups
+    for (norm_code, rarity), group_sets in api_groups.items():
+        matched_owned = []
 
-                if not representative:
-                     # Try compatible match (e.g. Base codes for any language)
-                    for s in group_sets:
-                        if is_set_code_compatible(s.set_code, language):
-                            representative = s
-                            break
-
-                if not representative:
-                    # Try EN
-                    for s in group_sets:
-                        if is_set_code_compatible(s.set_code, "EN"):
-                            representative = s
-                            break
-
-                if not representative:
-                    representative = group_sets[0]
-
-                set_name = representative.set_name
-                set_code = representative.set_code
-                price = 0.0
-                if representative.set_price:
-                    try: price = float(representative.set_price)
-                    except: pass
+        # Find owned variants belonging to this group
+        for var_id, var in owned_variants.items():
+            if var_id in processed_variant_ids:
+                continue
 
-                row_img_url = img_url
-                if representative.image_id:
-                     for img in card.card_images:
-                         if img.id == representative.image_id:
-                             row_img_url = img.image_url_small
-                             break
+            # Check compatibility
+            # Exact variant ID match? (Ideally yes, if API variant ID matches)
+            # Or fuzzy match on normalized code + rarity
 
-                # Determine base language for display
-                base_lang = "EN"
-                if "-" in set_code:
-                    parts = set_code.split('-')
-                    if len(parts) > 1:
-                        reg_match = re.match(r'^([A-Za-z]+)', parts[1])
-                        if reg_match:
-                            r = reg_match.group(1).upper()
-                            if r in REGION_TO_LANGUAGE_MAP:
-                                base_lang = REGION_TO_LANGUAGE_MAP[r]
-                            elif r in ['EN', 'DE', 'FR', 'IT', 'PT', 'ES', 'JP']: # Fallback
-                                base_lang = r
-
-                rows.append(CollectorRow(
-                    api_card=card,
-                    set_code=set_code,
-                    set_name=set_name,
-                    rarity=rarity,
-                    price=price,
-                    image_url=row_img_url,
-                    owned_count=0,
-                    is_owned=False,
-                    language=base_lang,
-                    condition="Near Mint",
-                    first_edition=False,
-                    image_id=representative.image_id,
-                    variant_id=representative.variant_id
-                ))
+            var_norm = var.code_parts.normalized
+            if var_norm == norm_code and var.rarity == rarity:
+                 matched_owned.append(var)
+                 processed_variant_ids.add(var_id)
 
-        # 3. Handle Custom/Unknown Variants
-        for var_id, cv in owned_variants.items():
-            if var_id not in processed_variant_ids:
+        if matched_owned:
+            # Create rows for owned variants
+            for cv in matched_owned:
                 groups = {}
                 for entry in cv.entries:
                     k = (entry.language, entry.condition, entry.first_edition)
                     groups[k] = groups.get(k, 0) + entry.quantity
 
+                # Resolve image
                 row_img_url = img_url
                 if cv.image_id:
                      for img in card.card_images:
@@ -249,14 +134,25 @@ def build_collector_rows(api_cards: List[ApiCard], owned_details: Dict[int, Coll
                              row_img_url = img.image_url_small
                              break
 
+                # Get Set Name/Price from API group if possible (best effort match)
+                # We can pick the API set that matches the owned set code best
+                best_api_set = group_sets[0]
+                for s in group_sets:
+                    if s.set_code == cv.set_code:
+                        best_api_set = s
+                        break
+
+                set_name = best_api_set.set_name
+                price = best_api_set.price
+
                 for (lang, cond, first), qty in groups.items():
-                     group_entries = [e for e in cv.entries if e.language == lang and e.condition == cond and e.first_edition == first]
-                     rows.append(CollectorRow(
+                    group_entries = [e for e in cv.entries if e.language == lang and e.condition == cond and e.first_edition == first]
+                    rows.append(CollectorRow(
                         api_card=card,
                         set_code=cv.set_code,
-                        set_name="Custom / Unmatched",
-                        rarity=cv.rarity,
-                        price=0.0,
+                        set_name=set_name,
+                        rarity=rarity,
+                        price=price,
                         image_url=row_img_url,
                         owned_count=qty,
                         is_owned=True,
@@ -267,27 +163,227 @@ def build_collector_rows(api_cards: List[ApiCard], owned_details: Dict[int, Coll
                         variant_id=cv.variant_id,
                         entries=group_entries
                     ))
+        else:
+            # Create ONE unowned row for this group
+            # Pick representative set
+            # Priority: Match 'language' arg, then 'EN', then first
+            representative = None
+
+            # Try exact language match (Explicit Region)
+            for s in group_sets:
+                if s.code_parts.language == language.upper():
+                    representative = s
+                    break
+
+            if not representative:
+                 # Try compatible match (e.g. Base codes for any language)
+                for s in group_sets:
+                    if s.code_parts.is_compatible(language):
+                        representative = s
+                        break
+
+            if not representative:
+                # Try EN
+                for s in group_sets:
+                    if s.code_parts.is_compatible("EN"):
+                        representative = s
+                        break
+
+            if not representative:
+                representative = group_sets[0]
+
+            set_name = representative.set_name
+            set_code = representative.set_code
+            price = representative.price
+
+            row_img_url = img_url
+            if representative.image_id:
+                 for img in card.card_images:
+                     if img.id == representative.image_id:
+                         row_img_url = img.image_url_small
+                         break
 
-        # 4. Fallback if no sets in API and no owned variants
-        if not card.card_sets and not owned_variants:
-             rows.append(CollectorRow(
+            # Determine base language for display
+            base_lang = "EN"
+            if "-" in set_code:
+                parts = set_code.split('-')
+                if len(parts) > 1:
+                    reg_match = re.match(r'^([A-Za-z]+)', parts[1])
+                    if reg_match:
+                        r = reg_match.group(1).upper()
+                        if r in REGION_TO_LANGUAGE_MAP:
+                            base_lang = REGION_TO_LANGUAGE_MAP[r]
+                        elif r in ['EN', 'DE', 'FR', 'IT', 'PT', 'ES', 'JP']: # Fallback
+                            base_lang = r
+
+            rows.append(CollectorRow(
+                api_card=card,
+                set_code=set_code,
+                set_name=set_name,
+                rarity=rarity,
+                price=price,
+                image_url=row_img_url,
+                owned_count=0,
+                is_owned=False,
+                language=base_lang,
+                condition="Near Mint",
+                first_edition=False,
+                image_id=representative.image_id,
+                variant_id=representative.variant_id
+            ))
+
+    # 3. Handle Custom/Unknown Variants
+    for var_id, cv in owned_variants.items():
+        if var_id not in processed_variant_ids:
+            groups = {}
+            for entry in cv.entries:
+                k = (entry.language, entry.condition, entry.first_edition)
+                groups[k] = groups.get(k, 0) + entry.quantity
+
+            row_img_url = img_url
+            if cv.image_id:
+                 for img in card.card_images:
+                     if img.id == cv.image_id:
+                         row_img_url = img.image_url_small
+                         break
+
+            for (lang, cond, first), qty in groups.items():
+                 group_entries = [e for e in cv.entries if e.language == lang and e.condition == cond and e.first_edition == first]
+                 rows.append(CollectorRow(
                     api_card=card,
-                    set_code="N/A",
-                    set_name="No Set Info",
-                    rarity="Common",
+                    set_code=cv.set_code,
+                    set_name="Custom / Unmatched",
+                    rarity=cv.rarity,
                     price=0.0,
-                    image_url=img_url,
-                    owned_count=0,
-                    is_owned=False,
-                    language="EN",
-                    condition="Near Mint",
-                    first_edition=False,
-                    image_id=default_image_id,
-                    variant_id=None
+                    image_url=row_img_url,
+                    owned_count=qty,
+                    is_owned=True,
+                    language=lang,
+                    condition=cond,
+                    first_edition=first,
+                    image_id=cv.image_id,
+                    variant_id=cv.variant_id,
+                    entries=group_entries
                 ))
 
+    # 4. Fallback if no sets in API and no owned variants
+    if not card.card_sets and not owned_variants:
+         rows.append(CollectorRow(
+                api_card=card,
+                set_code="N/A",
+                set_name="No Set Info",
+                rarity="Common",
+                price=0.0,
+                image_url=img_url,
+                owned_count=0,
+                is_owned=False,
+                language="EN",
+                condition="Near Mint",
+                first_edition=False,
+                image_id=default_image_id,
+                variant_id=None
+            ))
+
+
     return rows
 
+def build_collector_rows(api_cards: List[ApiCard], owned_details: Dict[int, CollectionCard], language: str,
+                         unowned: Optional[List[List[CollectorRow]]] = None) -> List[CollectorRow]:
+    """
+    unowned: the shared per-card collector rows of api_cards with nothing owned (see
+    catalog_collector_blocks). They are reused as is for cards missing from owned_details.
+    """
+    rows = []
+    if unowned is None:
+        for card in api_cards:
+            rows.extend(build_card_collector_rows(card, owned_details.get(card.id), language))
+        return rows
+    for card, block in zip(api_cards, unowned):
+        c_card = owned_details.get(card.id)
+        rows.extend(block if c_card is None else build_card_collector_rows(card, c_card, language))
+    return rows
+
+def _built_from(items: List, api_cards: List[ApiCard], card_of: Callable) -> bool:
+    """Whether per-card items line up with api_cards, i.e. were built from this very card list."""
+    if len(items) != len(api_cards):
+        return False
+    return all(card is None or card is api_card for card, api_card in zip(map(card_of, items), api_cards))
+
+def catalog_view_models(api_cards: List[ApiCard], language: str) -> List[CardViewModel]:
+    """
+    Consolidated view models of the catalog with nothing owned, shared by all sessions.
+    If the catalog was reloaded since api_cards was read, the shared ones belong to the new
+    card list, so view models of api_cards are built for this call instead.
+    """
+    def build():
+        return [build_card_vm(card, None) for card in api_cards]
+    vms = shared_view_models.get('consolidated', language, build)
+    return vms if _built_from(vms, api_cards, lambda vm: vm.api_card) else build()
+
+def catalog_collector_blocks(api_cards: List[ApiCard], language: str, display_language: str) -> List[List[CollectorRow]]:
+    """Per-card collector rows of the catalog with nothing owned, shared by all sessions (see catalog_view_models)."""
+    def build():
+        return [build_card_collector_rows(card, None, display_language) for card in api_cards]
+    blocks = shared_view_models.get('collectors', language, build, display_language)
+    return blocks if _built_from(blocks, api_cards, lambda block: block[0].api_card if block else None) else build()
+
+class CardRowIndex:
+    """
+    Where each card's rows sit in a page row list (view models or collector rows). The builders
+    list a card's rows contiguously, so an edit can replace just that card's block in place.
+    """
+    def __init__(self, rows: List):
+        self.rows = rows
+        self.blocks: Dict[int, int] = {}
+        self.counts: List[int] = []
+        self.contiguous = True
+        last_id = None
+        for row in rows:
+            card_id = row.api_card.id
+            block = self.blocks.get(card_id)
+            if block is None:
+                block = self.blocks[card_id] = len(self.counts)
+                self.counts.append(0)
+            elif card_id != last_id:
+                self.contiguous = False
+            self.counts[block] += 1
+            last_id = card_id
+
+    def span(self, card_id: int) -> Optional[Tuple[int, int]]:
+        """(start, stop) of the card's rows, or None if it has none or the rows are not grouped by card."""
+        block = self.blocks.get(card_id)
+        if block is None or not self.contiguous:
+            return None
+        start = sum(self.counts[:block])
+        return start, start + self.counts[block]
+
+    def resize(self, card_id: int, count: int):
+        self.counts[self.blocks[card_id]] = count
+
+def build_consolidated_columns(vms: List[CardViewModel]) -> FilterColumns:
+    return FilterColumns(
+        vms,
+        card_of=lambda vm: vm.api_card,
+        sets_of=lambda vm: [(s.set_code, s.set_name, s.set_rarity) for s in vm.api_card.card_sets or []],
+        qty_of=lambda vm: vm.owned_quantity,
+        price_of=lambda vm: vm.lowest_price,
+        owned_of=lambda vm: vm.is_owned,
+        languages_of=lambda vm: vm.owned_languages,
+        conditions_of=lambda vm: vm.owned_conditions
+    )
+
+def build_collector_columns(rows: List[CollectorRow]) -> FilterColumns:
+    return FilterColumns(
+        rows,
+        card_of=lambda r: r.api_card,
+        sets_of=lambda r: [(r.set_code, r.set_name, r.rarity)],
+        qty_of=lambda r: r.owned_count,
+        price_of=lambda r: r.price,
+        owned_of=lambda r: r.is_owned,
+        languages_of=lambda r: [r.language],
+        conditions_of=lambda r: [r.condition]
+    )
+
 class CollectionPage:
     def __init__(self):
         # Load persisted UI state
@@ -307,6 +403,8 @@ class CollectionPage:
             'max_owned_quantity': 100,
 
             'search_text': '',
+            'advanced_query': '',
+            'advanced_query_error': '',
             'filter_set': '',
             'filter_rarity': '',
             'filter_attr': '',
@@ -340,6 +438,9 @@ class CollectionPage:
             'page': 1,
             'page_size': 48,
             'total_pages': 1,
+
+            # Unix timestamp while viewing a past state of the collection (read-only), else None
+            'history_as_of': None,
         }
 
         files = persistence.list_collections()
@@ -349,13 +450,26 @@ class CollectionPage:
         else:
             self.state['selected_file'] = files[0] if files else None
         self.filter_pane: Optional[FilterPane] = None
+        self.advanced_search: Optional[AdvancedSearchInput] = None
         self.single_card_view = SingleCardView()
 
         # UI Element references for pagination updates
         self.pagination_showing_label = None
         self.pagination_total_label = None
+        # (view scope, CardGrid) of the rendered grid, reused for page changes
+        self.card_grid: Optional[Tuple[str, CardGrid]] = None
+        self.image_prefetcher = ImagePrefetcher()
+        # Sprite sheet of the current page's thumbnails (grid view with sprite sheets enabled)
+        self.page_sprite: Optional[SpriteSheet] = None
         self.api_card_map = {}
         self.save_task = None
+        self.filter_columns = {'consolidated': FilterColumnsCache(), 'collectors': FilterColumnsCache()}
+        self.filter_scheduler = FilterScheduler(self._compute_filtered, self._show_filtered)
+        self._reset_page_pending = False
+        self._row_indexes: Dict[str, CardRowIndex] = {}
+        # Filled by on_collection_event, drained by apply_collection_changes
+        self.collection_changes: "queue.Queue" = queue.Queue()
+        collection_events.subscribe(self.on_collection_event)
 
     async def _perform_save(self):
         try:
@@ -393,35 +507,17 @@ class CollectionPage:
             ui.notify(f"Error loading database: {e}", type='negative')
             return
 
-        sets = set()
-        m_races = set()
-        st_races = set()
-        archetypes = set()
-
-        for c in api_cards:
-            if c.card_sets:
-                for s in c.card_sets:
-                    parts = s.set_code.split('-')
-                    prefix = parts[0] if len(parts) > 0 else s.set_code
-                    sets.add(f"{s.set_name} | {prefix}")
-
-            if c.archetype:
-                archetypes.add(c.archetype)
-
-            if "Monster" in c.type:
-                m_races.add(c.race)
-            elif "Spell" in c.type or "Trap" in c.type:
-                if c.race: st_races.add(c.race)
-
-        self.state['available_sets'] = sorted(list(sets))
-        self.state['available_monster_races'] = sorted(list(m_races))
-        self.state['available_st_races'] = sorted(list(st_races))
-        self.state['available_archetypes'] = sorted(list(archetypes))
+        ygo_service.get_filter_metadata(lang_code).apply_to(self.state)
 
         collection = None
+        # Pending events are covered by the reload
+        self.collection_changes = queue.Queue()
         if self.state['selected_file']:
             try:
-                collection = await run.io_bound(persistence.load_collection, self.state['selected_file'])
+                if self.state['history_as_of']:
+                    collection = await run.io_bound(collection_history.reconstruct, self.state['selected_file'], self.state['history_as_of'])
+                else:
+                    collection = await run.io_bound(persistence.load_collection, self.state['selected_file'])
             except Exception as e:
                 logger.warning(f"Error loading collection {self.state['selected_file']}: {e}")
                 ui.notify(f"Error loading collection: {e}", type='warning')
@@ -431,27 +527,32 @@ class CollectionPage:
         owned_details = {}
         max_qty = 0
         if collection:
-            storage_opts = ['None']
-            if collection.storage_definitions:
-                storage_opts.extend(sorted([s.name for s in collection.storage_definitions]))
-            self.state['available_storage'] = storage_opts
-
+            self._update_storage_options(collection)
             for c in collection.cards:
                 owned_details[c.card_id] = c
                 max_qty = max(max_qty, c.total_quantity)
 
         self.state['max_owned_quantity'] = max(100, max_qty)
 
-        self.state['cards_consolidated'] = await run.io_bound(build_consolidated_vms, api_cards, owned_details)
+        unowned = await run.io_bound(catalog_view_models, api_cards, lang_code)
+        self.state['cards_consolidated'] = await run.io_bound(build_consolidated_vms, api_cards, owned_details, unowned)
 
         self.state['cards_collectors'] = []
         if self.state['view_scope'] == 'collectors':
-             self.state['cards_collectors'] = await run.io_bound(build_collector_rows, api_cards, owned_details, self.state['language'])
+             blocks = await run.io_bound(catalog_collector_blocks, api_cards, lang_code, self.state['language'])
+             self.state['cards_collectors'] = await run.io_bound(build_collector_rows, api_cards, owned_details,
+                                                                 self.state['language'], blocks)
 
         await self.apply_filters(reset_page=not keep_page)
         self.update_filter_ui()
         logger.info(f"Data loaded. Items: {len(self.state['cards_consolidated'])}")
 
+    def _update_storage_options(self, collection: Collection):
+        storage_opts = ['None']
+        if collection.storage_definitions:
+            storage_opts.extend(sorted([s.name for s in collection.storage_definitions]))
+        self.state['available_storage'] = storage_opts
+
     def update_filter_ui(self):
         if self.filter_pane:
             self.filter_pane.update_options()
@@ -484,17 +585,15 @@ class CollectionPage:
 
         if self.filter_pane:
             self.filter_pane.reset_ui_elements()
+        if self.advanced_search:
+            self.advanced_search.reset()
 
         await self.apply_filters()
 
-    async def prepare_current_page_images(self):
-        start = (self.state['page'] - 1) * self.state['page_size']
-        end = min(start + self.state['page_size'], len(self.state['filtered_items']))
-        items = self.state['filtered_items'][start:end]
-        if not items: return
-
+    def _page_image_urls(self, page: int) -> Dict[int, str]:
+        """The {image_id: url} thumbnails shown by a page of the filtered items."""
         url_map = {}
-        for item in items:
+        for item in self._page_items(page):
             card = item.api_card
             image_id = None
             url = None
@@ -524,7 +623,15 @@ class CollectionPage:
                          img_obj = next((img for img in card.card_images if img.id == best_id), None)
                          if img_obj:
                              url_map[best_id] = img_obj.image_url_small
+        return url_map
 
+    async def prepare_current_page_images(self):
+        # The shown page goes first; adjacent pages are prefetched once the user is idle
+        self.image_prefetcher.cancel()
+        items = self._page_items()
+        if not items: return
+
+        url_map = self._page_image_urls(self.state['page'])
         if url_map:
              await image_manager.download_batch(url_map, concurrency=10)
 
@@ -539,214 +646,67 @@ class CollectionPage:
                  tasks = [image_manager.ensure_flag_image(code) for code in unique_codes]
                  await asyncio.gather(*tasks)
 
+        self.page_sprite = None
+        if self.state['view_mode'] == 'grid' and config_manager.get_sprite_sheets():
+            self.page_sprite = await sprite_sheets.get(self._grid_image_id(item) for item in items)
+
+        self.image_prefetcher.schedule(self.state['page'], self.state['total_pages'], self._page_image_urls)
+
     async def apply_filters(self, e=None, reset_page=True):
+        self.image_prefetcher.cancel()
+        self._reset_page_pending = self._reset_page_pending or reset_page
+        await self.filter_scheduler.request()
+
+    def _compute_filtered(self):
+        """Filters and sorts the current source rows; runs in the filter scheduler's worker."""
         if self.state['view_scope'] == 'consolidated':
             source = self.state['cards_consolidated']
         else:
             source = self.state['cards_collectors']
 
         if not source:
-            self.state['filtered_items'] = []
-            if hasattr(self, 'render_card_display'): self.render_card_display.refresh()
-            self.update_pagination_labels()
-            return
-
-        res = list(source)
-
-        txt = self.state['search_text'].lower()
-        if txt:
-            def matches_search(item):
-                # 1. Check common fields
-                if (txt in item.api_card.name.lower() or
-                    txt in item.api_card.type.lower() or
-                    txt in item.api_card.desc.lower()):
-                    return True
-
-                # 2. Check Set Code
-                if self.state['view_scope'] == 'consolidated':
-                    # In consolidated view, check if ANY of the card's sets match
-                    if item.api_card.card_sets:
-                        for s in item.api_card.card_sets:
-                            if txt in s.set_code.lower():
-                                return True
-                else:
-                    # In collectors view, check the SPECIFIC set code of this row
-                    if hasattr(item, 'set_code') and txt in item.set_code.lower():
-                        return True
-
-                return False
-
-            res = [c for c in res if matches_search(c)]
-
-        if self.state['only_owned']:
-            res = [c for c in res if c.is_owned]
-
-        min_q = self.state['filter_ownership_min']
-        max_q = self.state['filter_ownership_max']
-
-        def get_qty(item):
-            if hasattr(item, 'owned_quantity'): return item.owned_quantity
-            return getattr(item, 'owned_count', 0)
-
-        res = [c for c in res if min_q <= get_qty(c) <= max_q]
-
-        p_min = self.state['filter_price_min']
-        p_max = self.state['filter_price_max']
-
-        def get_price(item):
-             if hasattr(item, 'lowest_price'): return item.lowest_price
-             return getattr(item, 'price', 0.0)
-
-        res = [c for c in res if p_min <= get_price(c) <= p_max]
-
-        if self.state['filter_owned_lang']:
-            target_lang = self.state['filter_owned_lang']
-            if self.state['view_scope'] == 'consolidated':
-                res = [c for c in res if target_lang in c.owned_languages]
-            else:
-                 res = [c for c in res if c.language == target_lang]
-
-        if self.state.get('filter_condition'):
-            conds = self.state['filter_condition']
-            if self.state['view_scope'] == 'consolidated':
-                res = [c for c in res if any(cond in c.owned_conditions for cond in conds)]
-            else:
-                res = [c for c in res if c.condition in conds]
-
-        if self.state.get('filter_storage'):
+            return [], self.state.get('advanced_query_error', '')
+
+        is_cons = self.state['view_scope'] == 'consolidated'
+        cols = self.filter_columns[self.state['view_scope']].get(source, build_consolidated_columns if is_cons else build_collector_columns)
+        lang_code = self.state['language'].lower() if self.state['language'] else 'en'
+        text_index = ygo_service.get_text_index(lang_code)
+        mask = cols.mask(self.state, search_text=self.state['search_text'], only_owned=self.state['only_owned'],
+                         text_index=text_index)
+        query_mask, query_error = evaluate_query(self.state['advanced_query'], cols, text_index)
+        mask &= query_mask
+        res = cols.select_sorted(mask, self.state['sort_by'], self.state.get('sort_descending', False))
+
+        if self.state.get('filter_storage') and not is_cons:
+            # Collector rows only show the quantity stored in the selected locations
             selected_storage = set(self.state['filter_storage'])
 
             new_res = []
             for item in res:
-                if self.state['view_scope'] == 'collectors':
-                    visible_qty = 0
-                    for e in item.entries:
-                        loc = e.storage_location if e.storage_location else 'None'
-                        if loc in selected_storage:
-                            visible_qty += e.quantity
-
-                    if visible_qty > 0:
-                        new_item = replace(item, owned_count=visible_qty)
-                        new_res.append(new_item)
-                else:
-                    new_res.append(item)
-
-            if self.state['view_scope'] == 'collectors':
-                res = new_res
-
-        if self.state['filter_attr']:
-            res = [c for c in res if c.api_card.attribute == self.state['filter_attr']]
-
-        if self.state['filter_card_type']:
-             ctypes = self.state['filter_card_type']
-             if isinstance(ctypes, str): ctypes = [ctypes]
-             res = [c for c in res if any(t in c.api_card.type for t in ctypes)]
-
-        if self.state['filter_monster_race']:
-             res = [c for c in res if "Monster" in c.api_card.type and c.api_card.race == self.state['filter_monster_race']]
-
-        if self.state['filter_st_race']:
-             res = [c for c in res if ("Spell" in c.api_card.type or "Trap" in c.api_card.type) and c.api_card.race == self.state['filter_st_race']]
-
-        if self.state['filter_archetype']:
-             res = [c for c in res if c.api_card.archetype == self.state['filter_archetype']]
-
-        if self.state['filter_monster_category']:
-             categories = self.state['filter_monster_category']
-             if isinstance(categories, list) and categories:
-                 res = [c for c in res if all(c.api_card.matches_category(cat) for cat in categories)]
-
-        if self.state['filter_level']:
-             res = [c for c in res if c.api_card.level == int(self.state['filter_level'])]
-
-        atk_min, atk_max = self.state['filter_atk_min'], self.state['filter_atk_max']
-        if atk_min > 0 or atk_max < 5000:
-             res = [c for c in res if c.api_card.atk is not None and atk_min <= int(c.api_card.atk) <= atk_max]
-
-        def_min, def_max = self.state['filter_def_min'], self.state['filter_def_max']
-        if def_min > 0 or def_max < 5000:
-             res = [c for c in res if getattr(c.api_card, 'def_', None) is not None and def_min <= getattr(c.api_card, 'def_', -1) <= def_max]
-
-        if self.state['filter_set']:
-            s_val = self.state['filter_set']
-            is_strict = '|' in s_val
-
-            if is_strict:
-                target_prefix = s_val.split('|')[-1].strip().lower()
-
-                if self.state['view_scope'] == 'consolidated':
-                    def match_set_strict(c):
-                        if not c.api_card.card_sets: return False
-                        for cs in c.api_card.card_sets:
-                             parts = cs.set_code.split('-')
-                             c_prefix = parts[0].lower() if parts else cs.set_code.lower()
-                             if c_prefix == target_prefix:
-                                 return True
-                        return False
-                    res = [c for c in res if match_set_strict(c)]
-                else:
-                    def match_row_strict(c):
-                        parts = c.set_code.split('-')
-                        c_prefix = parts[0].lower() if parts else c.set_code.lower()
-                        return c_prefix == target_prefix
-
-                    res = [c for c in res if match_row_strict(c)]
-
-            else:
-                txt = s_val.strip().lower()
-                if self.state['view_scope'] == 'consolidated':
-                    def match_set_loose(c):
-                        if not c.api_card.card_sets: return False
-                        for cs in c.api_card.card_sets:
-                            if txt in cs.set_code.lower() or txt in cs.set_name.lower():
-                                return True
-                        return False
-                    res = [c for c in res if match_set_loose(c)]
-                else:
-                    res = [c for c in res if txt in c.set_code.lower() or txt in c.set_name.lower()]
-
-        if self.state['filter_rarity']:
-            r = self.state['filter_rarity'].lower()
-            if self.state['view_scope'] == 'consolidated':
-                 res = [c for c in res if c.api_card.card_sets and any(r == cs.set_rarity.lower() for cs in c.api_card.card_sets)]
-            else:
-                 res = [c for c in res if r == c.rarity.lower()]
-
-        key = self.state['sort_by']
-        reverse = self.state.get('sort_descending', False)
-
-        if key == 'Name':
-            res.sort(key=lambda x: x.api_card.name, reverse=reverse)
-        elif key == 'ATK':
-            res.sort(key=lambda x: (x.api_card.atk or -1), reverse=reverse)
-        elif key == 'DEF':
-            res.sort(key=lambda x: (getattr(x.api_card, 'def_', None) or -1), reverse=reverse)
-        elif key == 'Level':
-            res.sort(key=lambda x: (x.api_card.level or -1), reverse=reverse)
-        elif key == 'Newest':
-            res.sort(key=lambda x: x.api_card.id, reverse=reverse)
-        elif key == 'Price':
-             res.sort(key=lambda x: get_price(x), reverse=reverse)
-        elif key == 'Quantity':
-             res.sort(key=lambda x: get_qty(x), reverse=reverse)
-        elif key == 'Set Code':
-            if self.state['view_scope'] == 'consolidated':
-                # Sort by the first set code found
-                def get_set_code(x):
-                    if x.api_card.card_sets:
-                         return x.api_card.card_sets[0].set_code
-                    return ""
-                res.sort(key=get_set_code, reverse=reverse)
-            else:
-                res.sort(key=lambda x: x.set_code, reverse=reverse)
-
-        self.state['filtered_items'] = res
-        if reset_page:
+                visible_qty = 0
+                for e in item.entries:
+                    loc = e.storage_location if e.storage_location else 'None'
+                    if loc in selected_storage:
+                        visible_qty += e.quantity
+
+                if visible_qty > 0:
+                    new_res.append(replace(item, owned_count=visible_qty))
+            res = new_res
+            # The cached order used the full quantities
+            if self.state['sort_by'] == 'Quantity':
+                res.sort(key=lambda x: x.owned_count, reverse=self.state.get('sort_descending', False))
+
+        return res, query_error
+
+    async def _show_filtered(self, result):
+        self.state['filtered_items'], self.state['advanced_query_error'] = result
+        if self._reset_page_pending:
             self.state['page'] = 1
+            self._reset_page_pending = False
         self.update_pagination()
 
         await self.prepare_current_page_images()
-        if hasattr(self, 'render_card_display'): self.render_card_display.refresh()
+        if hasattr(self, 'render_card_display'): self.update_card_display()
         self.update_pagination_labels()
 
     def update_pagination(self):
@@ -762,206 +722,93 @@ class CollectionPage:
         if self.pagination_total_label:
             self.pagination_total_label.text = f"/ {max(1, self.state['total_pages'])}"
 
-    def _update_in_memory(self, api_card: ApiCard, set_code: str, rarity: str, language: str, quantity: int, condition: str, first_edition: bool, image_id: Optional[int], variant_id: Optional[str], mode: str = 'ADD'):
+    def _row_index(self, key: str) -> CardRowIndex:
+        rows = self.state[key]
+        index = self._row_indexes.get(key)
+        if index is None or index.rows is not rows:
+            index = self._row_indexes[key] = CardRowIndex(rows)
+        return index
+
+    def _update_in_memory(self, api_card: ApiCard):
         """
         Updates the in-memory view models (consolidated and collectors) to reflect changes immediately
-        without reloading from disk.
+        without reloading from disk. Only the edited card's view model and collector rows are rebuilt,
+        and the cached filter columns are patched at their positions. Call within
+        filter_scheduler.exclusive(), as filter passes read the rows and their columns in a worker thread.
         """
-        # 1. Update Consolidated View
-        vm_index = -1
-        for i, vm in enumerate(self.state['cards_consolidated']):
-             if vm.api_card.id == api_card.id:
-                 vm_index = i
-                 break
-
-        if vm_index != -1:
-            # We found the VM. Since the collection object is updated, we can re-scan it for this card.
-            c_card = None
-            if self.state['current_collection']:
-                 for c in self.state['current_collection'].cards:
-                     if c.card_id == api_card.id:
-                         c_card = c
-                         break
-
-            if c_card:
-                total_qty = c_card.total_quantity
-                owned_langs = set()
-                owned_conds = set()
-                for v in c_card.variants:
-                    for e in v.entries:
-                        owned_langs.add(e.language)
-                        owned_conds.add(e.condition)
-
-                vm = self.state['cards_consolidated'][vm_index]
-                vm.owned_quantity = total_qty
-                vm.is_owned = total_qty > 0
-                vm.owned_languages = owned_langs
-                vm.owned_conditions = owned_conds
-            else:
-                vm = self.state['cards_consolidated'][vm_index]
-                vm.owned_quantity = 0
-                vm.is_owned = False
-                vm.owned_languages = set()
-                vm.owned_conditions = set()
-
-        # 2. Update Collectors View
-        if not variant_id:
-             if self.state['current_collection']:
-                 for c in self.state['current_collection'].cards:
-                     if c.card_id == api_card.id:
-                         for v in c.variants:
-                             if v.set_code == set_code and v.rarity == rarity and (v.image_id == image_id if image_id else True):
-                                 variant_id = v.variant_id
-                                 break
-                         if variant_id: break
-
-        if not variant_id:
-             variant_id = generate_variant_id(api_card.id, set_code, rarity, image_id)
-
-        target_row_index = -1
-        empty_placeholder_index = -1
-
-        for i, row in enumerate(self.state['cards_collectors']):
-            if row.api_card.id != api_card.id:
-                continue
-
-            match_variant = False
-            if row.variant_id and variant_id:
-                if row.variant_id == variant_id:
-                    match_variant = True
-            elif row.set_code == set_code and row.rarity == rarity:
-                 match_variant = True
-
-            if match_variant:
-                if (row.language == language and
-                    row.condition == condition and
-                    row.first_edition == first_edition):
-                    target_row_index = i
-                    break
-
-                if not row.is_owned:
-                    empty_placeholder_index = i
-
-        new_qty = 0
-        if self.state['current_collection']:
-             qty = CollectionEditor.get_total_quantity(
-                 self.state['current_collection'],
-                 api_card.id,
-                 variant_id=variant_id,
-                 language=language,
-                 condition=condition,
-                 first_edition=first_edition
-             )
-             new_qty = qty
-
-        # Refresh entries from collection to support storage filtering
-        row_entries = []
+        c_card = None
         if self.state['current_collection']:
-             for c in self.state['current_collection'].cards:
-                 if c.card_id == api_card.id:
-                     for v in c.variants:
-                         if v.variant_id == variant_id:
-                             row_entries = [e for e in v.entries
-                                            if e.language == language
-                                            and e.condition == condition
-                                            and e.first_edition == first_edition]
-                             break
-                     break
+            c_card = self.state['current_collection'].ownership.card(api_card.id)
 
-        if target_row_index != -1:
-            row = self.state['cards_collectors'][target_row_index]
-            row.owned_count = new_qty
-            row.is_owned = new_qty > 0
-            row.entries = row_entries
-        else:
-            if new_qty > 0:
-                set_name = "Unknown Set"
-                price = 0.0
-                if api_card.card_sets:
-                    for s in api_card.card_sets:
-                        if s.set_code == set_code:
-                            set_name = s.set_name
-                            try: price = float(s.set_price)
-                            except: pass
-                            break
-
-                img_url = api_card.card_images[0].image_url_small if api_card.card_images else None
-                if image_id and api_card.card_images:
-                    for img in api_card.card_images:
-                        if img.id == image_id:
-                            img_url = img.image_url_small
-                            break
-
-                new_row = CollectorRow(
-                    api_card=api_card,
-                    set_code=set_code,
-                    set_name=set_name,
-                    rarity=rarity,
-                    price=price,
-                    image_url=img_url,
-                    owned_count=new_qty,
-                    is_owned=True,
-                    language=language,
-                    condition=condition,
-                    first_edition=first_edition,
-                    image_id=image_id,
-                    variant_id=variant_id,
-                    entries=row_entries
-                )
-                self.state['cards_collectors'].append(new_row)
-
-        if new_qty > 0 and empty_placeholder_index != -1:
-             self.state['cards_collectors'].pop(empty_placeholder_index)
-
-        if new_qty == 0 and target_row_index != -1:
-             self.state['cards_collectors'].pop(target_row_index)
-
-             has_siblings = False
-             for row in self.state['cards_collectors']:
-                 if row.api_card.id == api_card.id and row.variant_id == variant_id:
-                     has_siblings = True
-                     break
-
-             if not has_siblings:
-                 is_standard = False
-                 if api_card.card_sets:
-                     for s in api_card.card_sets:
-                         if s.set_code == set_code:
-                             is_standard = True
-                             break
+        for key, scope in (('cards_consolidated', 'consolidated'), ('cards_collectors', 'collectors')):
+            rows = self.state[key]
+            index = self._row_index(key)
+            span = index.span(api_card.id)
+            if span is None:
+                continue
+            start, stop = span
+            # Keep the catalog's ApiCard object, the filter columns are keyed by it
+            card = rows[start].api_card if stop > start else api_card
+            if scope == 'consolidated':
+                new_rows = [build_card_vm(card, c_card)]
+            else:
+                new_rows = build_card_collector_rows(card, c_card, self.state['language'])
+            rows[start:stop] = new_rows
+            index.resize(api_card.id, len(new_rows))
+            self.filter_columns[scope].splice(rows, start, stop - start)
 
-                 if is_standard:
-                     set_name = "Unknown Set"
-                     price = 0.0
-                     if api_card.card_sets:
-                        for s in api_card.card_sets:
-                            if s.set_code == set_code:
-                                set_name = s.set_name
-                                try: price = float(s.set_price)
-                                except: pass
-                                break
-                     img_url = api_card.card_images[0].image_url_small if api_card.card_images else None
-
-                     ph_row = CollectorRow(
-                        api_card=api_card,
-                        set_code=set_code,
-                        set_name=set_name,
-                        rarity=rarity,
-                        price=price,
-                        image_url=img_url,
-                        owned_count=0,
-                        is_owned=False,
-                        language="EN",
-                        condition="Near Mint",
-                        first_edition=False,
-                        image_id=image_id,
-                        variant_id=variant_id
-                     )
-                     self.state['cards_collectors'].append(ph_row)
+    def on_collection_event(self, event):
+        """Collection event listener. May be called from worker threads, so it only queues."""
+        col = self.state['current_collection']
+        if isinstance(event, CollectionSaved):
+            # Saves of our own copy are already shown
+            if event.filename == self.state['selected_file'] and (col is None or event.collection is not col):
+                self.collection_changes.put(event)
+        elif col is not None and event.collection is col:
+            self.collection_changes.put(event)
+
+    async def apply_collection_changes(self):
+        """
+        Applies the queued collection events: the view models of edited cards are patched in
+        place (see _update_in_memory). Edits saved by other pages are replayed onto our copy
+        of the collection first, or it is reloaded if they are unknown.
+        """
+        changed: Dict[int, ApiCard] = {}
+        reload = False
+        while not self.collection_changes.empty():
+            event = self.collection_changes.get_nowait()
+            col = self.state['current_collection']
+            if isinstance(event, CollectionSaved):
+                if self.state['history_as_of']:
+                    # Reloaded when returning to the current collection
+                    continue
+                if event.changes is None or col is None:
+                    reload = True
+                    continue
+                # Queues the replayed EntryChanged events, handled by this loop
+                CollectionEditor.replay_changes(col, event.changes)
+                if event.collection is not None:
+                    col.storage_definitions = [s.model_copy() for s in event.collection.storage_definitions]
+                    self._update_storage_options(col)
+            elif isinstance(event, EntryChanged) and event.collection is col:
+                changed[event.api_card.id] = event.api_card
+
+        if reload:
+            await self.load_data(keep_page=True)
+            self.render_header.refresh()
+        elif changed:
+            async with self.filter_scheduler.exclusive():
+                for api_card in changed.values():
+                    self._update_in_memory(api_card)
+            await self.apply_filters(reset_page=False)
+            self.render_header.refresh()
 
     async def undo_last_action(self):
         col_name = self.state['selected_file']
         if not col_name: return
+        if self.state['history_as_of']:
+            ui.notify('Return to the current collection to undo changes.', type='warning')
+            return
 
         last_change = changelog_manager.undo_last_change(col_name)
         if last_change:
@@ -990,14 +837,14 @@ class CollectionPage:
                                  first_edition=data['first_edition'],
                                  image_id=data.get('image_id'),
                                  variant_id=data.get('variant_id'),
-                                 mode='ADD'
+                                 mode='ADD',
+                                 storage_location=data.get('storage_location')
                              )
                              count += 1
 
                     await run.io_bound(persistence.save_collection, col, col_name)
                     ui.notify(f"Undid batch: {last_change.get('description')}", type='positive')
-                    await self.load_data(keep_page=True)
-                    self.render_header.refresh()
+                    await self.apply_collection_changes()
                 return
 
             # Single Undo
@@ -1019,7 +866,8 @@ class CollectionPage:
                      image_id=data.get('image_id'),
                      variant_id=data.get('variant_id'),
                      mode='ADD',
-                     skip_log=True
+                     skip_log=True,
+                     storage_location=data.get('storage_location')
                  )
                  ui.notify(f"Undid: {action}", type='positive')
                  self.render_header.refresh()
@@ -1033,6 +881,10 @@ class CollectionPage:
             ui.notify('No collection selected.', type='negative')
             return
 
+        if self.state['history_as_of']:
+            ui.notify('Viewing a past state. Return to the current collection to make changes.', type='warning')
+            return
+
         col = self.state['current_collection']
 
         try:
@@ -1053,7 +905,6 @@ class CollectionPage:
                         language=src_lang, quantity=-src_qty, condition=src_cond, first_edition=src_first,
                         variant_id=src_var_id, mode='ADD'
                     )
-                    self._update_in_memory(api_card, "", "", src_lang, -src_qty, src_cond, src_first, None, src_var_id, mode='ADD')
 
                     # 2. Add to Target
                     # Ensure target variant exists
@@ -1072,8 +923,6 @@ class CollectionPage:
                         image_id=image_id, variant_id=variant_id, mode='ADD',
                         storage_location=storage_location
                     )
-                    # Note: _update_in_memory does not currently track storage location, but that's fine for totals.
-                    self._update_in_memory(api_card, set_code, rarity, language, src_qty, condition, first_edition, image_id, variant_id, mode='ADD')
 
                     modified = True
 
@@ -1114,9 +963,6 @@ class CollectionPage:
                     storage_location=storage_location
                 )
 
-                if modified:
-                    self._update_in_memory(api_card, set_code, rarity, language, quantity, condition, first_edition, image_id, variant_id, mode)
-
                 if modified and not skip_log:
                     card_data = {
                         'card_id': api_card.id,
@@ -1133,10 +979,9 @@ class CollectionPage:
                     changelog_manager.log_change(self.state['selected_file'], mode, card_data, quantity)
 
             if modified:
-                await self.apply_filters(reset_page=False)
+                await self.apply_collection_changes()
                 self._schedule_save()
                 ui.notify('Collection updated.', type='positive')
-                self.render_header.refresh()
             else:
                 # No change needed, but maybe refresh just in case? Or just do nothing.
                 pass
@@ -1152,17 +997,16 @@ class CollectionPage:
         if self.state['view_scope'] == 'consolidated':
             owned_breakdown = {}
             total_owned = 0
-            if self.state['current_collection']:
-                 for c in self.state['current_collection'].cards:
-                     if c.card_id == card.id:
-                         for v in c.variants:
-                             qty = v.total_quantity
-                             if qty > 0:
-                                 # Format: "SetCode (Rarity)"
-                                 key = f"{v.set_code} ({v.rarity})"
-                                 owned_breakdown[key] = owned_breakdown.get(key, 0) + qty
-                                 total_owned += qty
-                         break
+            collection = self.state['current_collection']
+            c_card = collection.ownership.card(card.id) if collection else None
+            if c_card:
+                 for v in c_card.variants:
+                     qty = collection.ownership.variant_total(card.id, v.variant_id)
+                     if qty > 0:
+                         # Format: "SetCode (Rarity)"
+                         key = f"{v.set_code} ({v.rarity})"
+                         owned_breakdown[key] = owned_breakdown.get(key, 0) + qty
+                         total_owned += qty
 
             # Sort breakdown by key (Set Code)
             sorted_breakdown = dict(sorted(owned_breakdown.items()))
@@ -1177,32 +1021,7 @@ class CollectionPage:
         # Fallback removed
 
     def _setup_card_tooltip(self, card: ApiCard, specific_image_id: int = None):
-        if not card: return
-
-        # Determine target ID
-        if specific_image_id:
-            img_id = specific_image_id
-        else:
-            img_id = card.get_best_image_id()
-
-        high_res_url = None
-        low_res_url = None
-
-        # Try to find URL for this ID
-        if card.card_images:
-            target_img = next((img for img in card.card_images if img.id == img_id), None)
-            if target_img:
-                high_res_url = target_img.image_url
-                low_res_url = target_img.image_url_small
-            else:
-                 # Fallback to default if specific/best ID has no URL (e.g. custom) but we need a fallback for non-local
-                 high_res_url = card.card_images[0].image_url
-                 low_res_url = card.card_images[0].image_url_small
-
-        # Check local high-res existence immediately
-        is_local = image_manager.image_exists(img_id, high_res=True)
-        initial_src = f"/images/{img_id}_high.jpg" if is_local else (high_res_url or low_res_url)
-
+        initial_src, needs_download = tooltip_source(card, specific_image_id)
         if not initial_src:
              return
 
@@ -1210,63 +1029,39 @@ class CollectionPage:
         with ui.tooltip().classes('bg-transparent shadow-none border-none p-0 overflow-visible z-[9999] max-w-none') \
                          .props('style="max-width: none" delay=1050') as tooltip:
             # Image at 65vh height and 1000px min width for readability
-            if initial_src:
-                ui.image(initial_src).classes('w-auto h-[65vh] min-w-[1000px] object-contain rounded-lg shadow-2xl') \
-                                     .props('fit=contain')
+            ui.image(initial_src).classes('w-auto h-[65vh] min-w-[1000px] object-contain rounded-lg shadow-2xl') \
+                                 .props('fit=contain')
 
             # Trigger download on show if needed
-            if not is_local and high_res_url:
-                async def ensure_high():
-                    # Check again to avoid redundant downloads
-                    # Only download if we are not using a fallback URL for a custom ID
-
-                    real_target_id = img_id
-
-                    # Check if img_id corresponds to the URL
-                    is_exact_match = False
-                    if card.card_images:
-                        for img in card.card_images:
-                            if img.id == img_id:
-                                is_exact_match = True
-                                break
-
-                    if not is_exact_match and card.card_images:
-                        # We are using fallback. Download to default ID instead.
-                        real_target_id = card.card_images[0].id
-
-                    if not image_manager.image_exists(real_target_id, high_res=True):
-                         await image_manager.ensure_image(real_target_id, high_res_url, high_res=True)
-
-                tooltip.on('show', ensure_high)
+            if needs_download:
+                tooltip.on('show', lambda: ensure_tooltip_image(card, specific_image_id))
 
     # --- Renderers ---
 
-    def render_consolidated_grid(self, items: List[CardViewModel]):
-        with ui.grid(columns='repeat(auto-fill, minmax(160px, 1fr))').classes('w-full gap-4'):
-            for vm in items:
-                card = vm.api_card
-                opacity = "opacity-100" if vm.is_owned else "opacity-60 grayscale"
-                border = "border-accent" if vm.is_owned else "border-gray-700"
-
-                with ui.card().classes(f'collection-card w-full p-0 cursor-pointer {opacity} border {border} hover:scale-105 transition-transform') \
-                        .on('click', lambda c=vm: self.open_single_view(c.api_card, c.is_owned, c.owned_quantity, owned_languages=c.owned_languages)):
-
-                    img_id = card.get_best_image_id()
-                    img_src = f"/images/{img_id}.jpg" if image_manager.image_exists(img_id) else (card.card_images[0].image_url_small if card.card_images else None)
-
-                    with ui.element('div').classes('relative w-full aspect-[2/3] bg-black'):
-                        if img_src: ui.image(img_src).classes('w-full h-full object-cover')
-                        if vm.owned_quantity > 0:
-                            ui.label(f"{vm.owned_quantity}").classes('absolute top-1 right-1 bg-accent text-dark font-bold px-2 rounded-full text-xs')
-
-                        if card.level:
-                             ui.label(f"Lv {card.level}").classes('absolute bottom-1 right-1 bg-black/70 text-white text-[10px] px-1 rounded')
-
-                    with ui.column().classes('p-2 gap-0 w-full'):
-                        ui.label(card.name).classes('text-xs font-bold truncate w-full')
-                        ui.label(card.type).classes('text-[10px] text-gray-400 truncate w-full')
+    def _grid_image_id(self, item) -> int:
+        """The id of the thumbnail shown for a grid item (CardViewModel or CollectorRow)."""
+        if isinstance(item, CardViewModel):
+            return item.api_card.get_best_image_id()
+        return item.image_id if item.image_id else (item.api_card.card_images[0].id if item.api_card.card_images else item.api_card.id)
+
+    def consolidated_grid_row(self, vm: CardViewModel) -> Dict:
+        card = vm.api_card
+        img_id = self._grid_image_id(vm)
+        tip, fetch = tooltip_source(card)
+        sprite_pos = self.page_sprite.positions.get(img_id) if self.page_sprite else None
+        return {
+            'img': None if sprite_pos else (f"/images/{img_id}.jpg" if image_manager.image_exists(img_id) else (card.card_images[0].image_url_small if card.card_images else None)),
+            'sp': sprite_pos, 'tip': tip, 'fetch': fetch, 'dim': not vm.is_owned, 'accent': vm.is_owned,
+            'qty': vm.owned_quantity, 'lv': card.level, 'title': card.name, 'sub': card.type,
+        }
 
-                    self._setup_card_tooltip(card)
+    def render_consolidated_grid(self, items: List[CardViewModel]) -> CardGrid:
+        grid = CardGrid(footer=48).classes('w-full')
+        grid.on_card('card_click', lambda c: self.open_single_view(c.api_card, c.is_owned, c.owned_quantity, owned_languages=c.owned_languages))
+        grid.on_card('tooltip_show', lambda c: ensure_tooltip_image(c.api_card))
+        grid.on_card('card_hover', lambda c: self.image_prefetcher.note_hover(*tooltip_target(c.api_card)))
+        grid.set_items(items, self.consolidated_grid_row, self.page_sprite)
+        return grid
 
     def render_consolidated_list(self, items: List[CardViewModel]):
          headers = ['Image', 'Name', 'Type', 'Card Type', 'Owned']
@@ -1299,7 +1094,6 @@ class CollectionPage:
                               ui.label('-').classes('text-gray-600')
 
     def render_collectors_list(self, items: List[CollectorRow]):
-        cond_map = {'Mint': 'MT', 'Near Mint': 'NM', 'Played': 'PL', 'Damaged': 'DM'}
 
         headers = ['Image', 'Name', 'Set', 'Rarity', 'Cond', '1st', 'Lang', 'Price', 'Owned']
         cols = '60px 4fr 2fr 1.5fr 0.8fr 0.5fr 0.5fr 1fr 0.8fr'
@@ -1326,7 +1120,7 @@ class CollectionPage:
                         ui.label(item.set_name).classes('text-xs text-gray-400 truncate')
                     ui.label(item.rarity).classes('text-xs')
 
-                    ui.label(cond_map.get(item.condition, item.condition[:2].upper())).classes('text-xs font-bold text-yellow-500')
+                    ui.label(CONDITION_ABBREVIATIONS.get(item.condition, item.condition[:2].upper())).classes('text-xs font-bold text-yellow-500')
                     ui.label("1st" if item.first_edition else "").classes('text-xs font-bold text-orange-400')
 
                     lang_code = item.language.strip().upper()
@@ -1345,52 +1139,31 @@ class CollectionPage:
                          else:
                               ui.label('-').classes('text-gray-600')
 
-    def render_collectors_grid(self, items: List[CollectorRow]):
-        cond_map = {'Mint': 'MT', 'Near Mint': 'NM', 'Played': 'PL', 'Damaged': 'DM'}
-
-        with ui.grid(columns='repeat(auto-fill, minmax(160px, 1fr))').classes('w-full gap-4'):
-            for item in items:
-                opacity = "opacity-100" if item.is_owned else "opacity-60 grayscale"
-                border = "border-accent" if item.is_owned else "border-gray-700"
-
-                img_src = item.image_url
-                img_id = item.image_id if item.image_id else (item.api_card.card_images[0].id if item.api_card.card_images else item.api_card.id)
-                if image_manager.image_exists(img_id):
-                    img_src = f"/images/{img_id}.jpg"
-
-                with ui.card().classes(f'collection-card w-full p-0 cursor-pointer {opacity} border {border} hover:scale-105 transition-transform') \
-                        .on('click', lambda c=item: self.open_single_view(c.api_card, c.is_owned, c.owned_count, initial_set=c.set_code, rarity=c.rarity, set_name=c.set_name, language=c.language, condition=c.condition, first_edition=c.first_edition, image_url=c.image_url, image_id=c.image_id, set_price=c.price, variant_id=c.variant_id)):
-
-                    with ui.element('div').classes('relative w-full aspect-[2/3] bg-black'):
-                        if img_src: ui.image(img_src).classes('w-full h-full object-cover')
-
-                        lang_code = item.language.strip().upper()
-                        country_code = LANGUAGE_COUNTRY_MAP.get(lang_code)
-                        flag_url = image_manager.get_flag_image_url(country_code) if country_code else None
-                        if flag_url:
-                            ui.element('img').props(f'src="{flag_url}" alt="{lang_code}"').classes('absolute top-[1px] left-[1px] h-4 w-6 shadow-black drop-shadow-md rounded bg-black/30')
-                        else:
-                            ui.label(lang_code).classes('absolute top-[1px] left-[1px] text-xs font-bold shadow-black drop-shadow-md bg-black/30 rounded px-1')
-
-                        if item.is_owned:
-                             ui.label(f"{item.owned_count}").classes('absolute top-1 right-1 bg-accent text-dark font-bold px-2 rounded-full text-xs')
-
-                        cond_short = cond_map.get(item.condition, item.condition[:2].upper())
-                        ed_text = "1st" if item.first_edition else ""
-
-                        with ui.row().classes('absolute bottom-0 left-0 bg-black/80 text-white text-[10px] px-1 gap-1 items-center rounded-tr'):
-                            ui.label(cond_short).classes('font-bold text-yellow-500')
-                            if ed_text:
-                                ui.label(ed_text).classes('font-bold text-orange-400')
-
-                        ui.label(item.set_code).classes('absolute bottom-0 right-0 bg-black/80 text-white text-[10px] px-1 font-mono rounded-tl')
-
-                    with ui.column().classes('p-2 gap-0 w-full'):
-                        ui.label(item.api_card.name).classes('text-xs font-bold truncate w-full')
-                        ui.label(f"{item.rarity}").classes('text-[10px] text-gray-400')
-                        ui.label(f"${item.price:.2f}").classes('text-xs text-green-400')
+    def collectors_grid_row(self, item: CollectorRow) -> Dict:
+        img_src = item.image_url
+        img_id = self._grid_image_id(item)
+        if image_manager.image_exists(img_id):
+            img_src = f"/images/{img_id}.jpg"
+
+        lang_code = item.language.strip().upper()
+        country_code = LANGUAGE_COUNTRY_MAP.get(lang_code)
+        tip, fetch = tooltip_source(item.api_card, item.image_id)
+        sprite_pos = self.page_sprite.positions.get(img_id) if self.page_sprite else None
+        return {
+            'img': None if sprite_pos else img_src, 'sp': sprite_pos, 'tip': tip, 'fetch': fetch, 'dim': not item.is_owned, 'accent': item.is_owned,
+            'flag': image_manager.get_flag_image_url(country_code) if country_code else None, 'lang': lang_code,
+            'qty': item.owned_count if item.is_owned else 0,
+            'cond': CONDITION_ABBREVIATIONS.get(item.condition, item.condition[:2].upper()), 'ed': item.first_edition,
+            'code': item.set_code, 'title': item.api_card.name, 'sub': item.rarity, 'price': f"${item.price:.2f}",
+        }
 
-                    self._setup_card_tooltip(item.api_card, specific_image_id=item.image_id)
+    def render_collectors_grid(self, items: List[CollectorRow]) -> CardGrid:
+        grid = CardGrid(footer=64).classes('w-full')
+        grid.on_card('card_click', lambda c: self.open_single_view(c.api_card, c.is_owned, c.owned_count, initial_set=c.set_code, rarity=c.rarity, set_name=c.set_name, language=c.language, condition=c.condition, first_edition=c.first_edition, image_url=c.image_url, image_id=c.image_id, set_price=c.price, variant_id=c.variant_id))
+        grid.on_card('tooltip_show', lambda c: ensure_tooltip_image(c.api_card, c.image_id))
+        grid.on_card('card_hover', lambda c: self.image_prefetcher.note_hover(*tooltip_target(c.api_card, c.image_id)))
+        grid.set_items(items, self.collectors_grid_row, self.page_sprite)
+        return grid
 
     async def switch_scope(self, scope):
         self.state['view_scope'] = scope
@@ -1445,6 +1218,72 @@ class CollectionPage:
                 ui.button('Create', on_click=create).props('color=positive')
         d.open()
 
+    async def view_as_of(self, timestamp: Optional[float]):
+        """Shows the collection as it was at timestamp (read-only), or the current state for None."""
+        self.state['history_as_of'] = timestamp
+        await self.load_data(keep_page=True)
+        self.render_header.refresh()
+
+    async def restore_to(self, timestamp: float):
+        col_name = self.state['selected_file']
+        if not col_name: return
+
+        if self.save_task:
+            self.save_task.cancel()
+            await self._perform_save()
+
+        notification = ui.notification('Restoring collection...', spinner=True, timeout=None)
+        try:
+            count = await run.io_bound(collection_history.restore_to, col_name, timestamp)
+            if count:
+                ui.notify(f'Restored {count} entries. Use Undo to revert the restore.', type='positive')
+            else:
+                ui.notify('Collection already matches that point in time.', type='info')
+            await self.view_as_of(None)
+        except Exception as e:
+            logger.error(f"Error restoring collection: {e}", exc_info=True)
+            ui.notify(f"Error restoring collection: {e}", type='negative')
+        finally:
+            notification.dismiss()
+
+    def open_history_dialog(self):
+        now = datetime.fromtimestamp(self.state['history_as_of']) if self.state['history_as_of'] else datetime.now()
+        picked = {'date': now.strftime('%Y-%m-%d'), 'time': now.strftime('%H:%M')}
+
+        def get_timestamp() -> Optional[float]:
+            try:
+                return datetime.strptime(f"{picked['date']} {picked['time']}", '%Y-%m-%d %H:%M').timestamp()
+            except (TypeError, ValueError):
+                ui.notify('Please pick a valid date and time.', type='warning')
+                return None
+
+        with ui.dialog() as d, ui.card().classes('w-96'):
+            ui.label('Collection History').classes('text-h6')
+            ui.label('View or restore the collection as it was at a point in time.').classes('text-grey text-sm')
+
+            ui.date().bind_value(picked, 'date').classes('w-full')
+            ui.time().bind_value(picked, 'time').props('format24h').classes('w-full')
+
+            async def view():
+                ts = get_timestamp()
+                if ts is None: return
+                d.close()
+                await self.view_as_of(ts)
+
+            async def restore():
+                ts = get_timestamp()
+                if ts is None: return
+                d.close()
+                await self.restore_to(ts)
+
+            with ui.row().classes('w-full justify-end q-mt-md'):
+                ui.button('Cancel', on_click=d.close).props('flat')
+                with ui.button('View as of', on_click=view).props('color=primary'):
+                    ui.tooltip('Show the collection at this time without changing it')
+                with ui.button('Restore to', on_click=restore).props('color=warning'):
+                    ui.tooltip('Change the collection back to this time (can be undone)')
+        d.open()
+
     @ui.refreshable
     def render_header(self):
         with ui.row().classes('w-full items-center gap-4 q-mb-md p-4 bg-gray-900 rounded-lg border border-gray-800'):
@@ -1473,6 +1312,7 @@ class CollectionPage:
                     # We will handle that in the dialog logic or just refresh header
                 else:
                     self.state['selected_file'] = val
+                    self.state['history_as_of'] = None
                     persistence.save_ui_state({'collection_selected_file': val})
                     await self.load_data()
 
@@ -1491,6 +1331,9 @@ class CollectionPage:
                 i.value = self.state['search_text']
                 ui.tooltip('Search by card name, type, or description')
 
+            self.advanced_search = AdvancedSearchInput(self.state, self.apply_filters)
+            self.advanced_search.build(classes='w-72')
+
             async def on_sort_change(e):
                 self.state['sort_by'] = e.value
                 # Smart default: non-Name fields usually sort descending (High to Low)
@@ -1552,6 +1395,17 @@ class CollectionPage:
 
             ui.space()
 
+            if self.state['history_as_of']:
+                as_of = datetime.fromtimestamp(self.state['history_as_of']).strftime('%Y-%m-%d %H:%M')
+                ui.chip(f'As of {as_of}', icon='history', color='warning').props('outline')
+                with ui.button('Restore', icon='restore', on_click=lambda: self.restore_to(self.state['history_as_of'])).props('flat color=warning'):
+                    ui.tooltip('Restore the collection to this state')
+                with ui.button('Current', icon='update', on_click=lambda: self.view_as_of(None)).props('flat color=white'):
+                    ui.tooltip('Return to the current collection')
+
+            with ui.button(icon='history', on_click=self.open_history_dialog).props('flat round color=white'):
+                ui.tooltip('View or restore the collection at a past time')
+
             # Undo Button
             has_history = False
             if self.state['selected_file']:
@@ -1568,24 +1422,40 @@ class CollectionPage:
             with ui.button(icon='filter_list', on_click=self.filter_dialog.open).props('color=primary size=lg'):
                 ui.tooltip('Open advanced filters')
 
+    def _page_items(self, page: Optional[int] = None) -> List:
+        start = ((page or self.state['page']) - 1) * self.state['page_size']
+        end = min(start + self.state['page_size'], len(self.state['filtered_items']))
+        return self.state['filtered_items'][start:end]
+
+    def update_card_display(self):
+        """Shows the current page. A grid still on screen only gets the rows of the new page."""
+        page_items = self._page_items()
+        if self.card_grid and page_items and self.state['view_mode'] == 'grid':
+            scope, grid = self.card_grid
+            if scope == self.state['view_scope'] and not grid.is_deleted:
+                row = self.consolidated_grid_row if scope == 'consolidated' else self.collectors_grid_row
+                grid.set_items(page_items, row, self.page_sprite)
+                return
+        self.render_card_display.refresh()
+
     @ui.refreshable
     def render_card_display(self):
-        start = (self.state['page'] - 1) * self.state['page_size']
-        end = min(start + self.state['page_size'], len(self.state['filtered_items']))
-        page_items = self.state['filtered_items'][start:end]
+        self.card_grid = None
+        page_items = self._page_items()
 
         if not page_items:
             ui.label('No items found.').classes('w-full text-center text-xl text-grey italic q-mt-xl')
             return
 
-        if self.state['view_scope'] == 'consolidated':
+        scope = self.state['view_scope']
+        if scope == 'consolidated':
             if self.state['view_mode'] == 'grid':
-                self.render_consolidated_grid(page_items)
+                self.card_grid = (scope, self.render_consolidated_grid(page_items))
             else:
                 self.render_consolidated_list(page_items)
         else:
             if self.state['view_mode'] == 'grid':
-                self.render_collectors_grid(page_items)
+                self.card_grid = (scope, self.render_collectors_grid(page_items))
             else:
                 self.render_collectors_list(page_items)
 
@@ -1599,7 +1469,7 @@ class CollectionPage:
                     new_val = int(p) if p else 1
                     self.state['page'] = new_val
                     await self.prepare_current_page_images()
-                    self.render_card_display.refresh()
+                    self.update_card_display()
                     self.update_pagination_labels()
 
                 async def change_page(delta):
@@ -1607,7 +1477,7 @@ class CollectionPage:
                     if new_p != self.state['page']:
                         self.state['page'] = new_p
                         await self.prepare_current_page_images()
-                        self.render_card_display.refresh()
+                        self.update_card_display()
                         self.update_pagination_labels()
 
                 with ui.button(icon='chevron_left', on_click=lambda: change_page(-1)).props('flat dense'):
@@ -1645,6 +1515,10 @@ class CollectionPage:
         self.content_area()
         ui.timer(0.1, self.load_data, once=True)
 
+        # Not on_disconnect, which also fires when the client reconnects
+        ui.context.client.on_delete(lambda: collection_events.unsubscribe(self.on_collection_event))
+        ui.timer(0.5, self.apply_collection_changes)
+
 def collection_page():
     page = CollectionPage()
     page.build_ui()
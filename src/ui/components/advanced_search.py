@@ -0,0 +1,51 @@
+from nicegui import ui
+from typing import Callable, Dict, Any
+
+QUERY_HELP = (
+    'Combine terms like atk>=2500 attr:DARK set:LOB rarity:"Ultra Rare" owned>0 lang:DE storage:"Binder 3". '
+    'Fields: name, desc, type, attr, race, archetype, category, level, atk, def, price, owned, '
+    'set, rarity, lang, condition, storage. Use OR, -term and ( ) to combine; bare words search like the search box.'
+)
+
+class AdvancedSearchInput:
+    """
+    Query-language search box (see src/services/card_query.py). The page's apply_filters
+    evaluates state['advanced_query'] and stores parse errors in state['advanced_query_error'],
+    which are shown under the input.
+    """
+    def __init__(self, state: Dict[str, Any], on_change: Callable):
+        self.state = state
+        self.on_change = on_change
+        self.input = None
+
+    def build(self, classes: str = 'w-64', props: str = ''):
+        async def handle_change(e):
+            value = e.value or ''
+            if self.state.get('advanced_query', '') == value:
+                return
+            self.state['advanced_query'] = value
+            await self.on_change()
+            self.update_error()
+
+        with ui.input(placeholder='Advanced search...', value=self.state.get('advanced_query', ''),
+                      on_change=handle_change) \
+                .props(f'debounce=400 icon=manage_search clearable {props}').classes(classes) as self.input:
+            ui.tooltip(QUERY_HELP).classes('max-w-md')
+        self.update_error()
+
+    def reset(self):
+        self.state['advanced_query'] = ''
+        self.state['advanced_query_error'] = ''
+        if self.input:
+            self.input.value = ''
+        self.update_error()
+
+    def update_error(self):
+        if not self.input:
+            return
+        error = self.state.get('advanced_query_error')
+        if error:
+            message = error.replace('"', "'")
+            self.input.props(f'error error-message="{message}"')
+        else:
+            self.input.props(remove='error error-message')
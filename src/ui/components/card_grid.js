@@ -0,0 +1,215 @@
+// Virtualized card grid, see card_grid.py for the row payload and the emitted events.
+const DRAG_TYPE = "application/x-card-grid";
+
+function findScroller(el) {
+  for (let node = el.parentElement; node && node !== document.body; node = node.parentElement) {
+    const overflow = getComputedStyle(node).overflowY;
+    if (overflow === "auto" || overflow === "scroll") return node;
+  }
+  return null;
+}
+
+export default {
+  template: `
+    <div ref="root" :style="{ position: 'relative', width: '100%', height: totalHeight + 'px' }"
+         @dragover="onDragOver" @drop="onDrop">
+      <div :style="windowStyle">
+        <div v-for="row in visibleRows" :key="gen + ':' + row.k"
+             :class="tileClass(row)" :style="{ height: tileHeight + 'px' }"
+             :draggable="draggable"
+             @dragstart="onDragStart($event, row)"
+             @click="emitCard('card_click', row)"
+             @contextmenu.prevent="emitCard('card_contextmenu', row)"
+             @mouseenter="onEnter(row)" @mouseleave="onLeave">
+          <div class="relative w-full bg-black" :style="{ height: imageHeight + 'px' }">
+            <div v-if="row.sp && sprite" class="w-full h-full" :style="spriteStyle(row)"></div>
+            <img v-else-if="row.img" :src="row.img" class="w-full h-full object-cover" loading="lazy" draggable="false">
+            <img v-if="row.flag" :src="row.flag" :alt="row.lang" draggable="false"
+                 class="absolute top-[1px] left-[1px] h-4 w-6 shadow-black drop-shadow-md rounded bg-black/30">
+            <div v-else-if="row.lang" class="absolute top-[1px] left-[1px] text-xs font-bold shadow-black drop-shadow-md bg-black/30 rounded px-1">{{ row.lang }}</div>
+            <div v-if="row.qty" class="absolute top-1 right-1 bg-accent text-dark font-bold px-2 rounded-full text-xs shadow-md">{{ row.qty }}</div>
+            <template v-if="variant === 'compact'">
+              <div class="absolute bottom-0 left-0 w-full bg-black/80 text-white p-0.5 flex flex-col">
+                <div class="text-[9px] font-bold leading-none truncate w-full">{{ row.title }}</div>
+                <template v-if="row.cond">
+                  <div class="w-full flex justify-between items-center text-[9px]">
+                    <div class="flex gap-1">
+                      <span class="font-bold text-yellow-500">{{ row.cond }}</span>
+                      <span v-if="row.ed" class="font-bold text-orange-400">1st</span>
+                    </div>
+                    <span class="font-mono">{{ row.code }}</span>
+                  </div>
+                  <div class="w-full flex justify-between items-center gap-1">
+                    <span class="text-[8px] text-gray-300 truncate">{{ row.sub }}</span>
+                    <span class="text-[8px] text-gray-400 font-mono truncate text-right">{{ row.loc }}</span>
+                  </div>
+                </template>
+                <template v-else>
+                  <div class="text-[10px] font-mono font-bold text-yellow-500 leading-none truncate">{{ row.code }}</div>
+                  <div class="text-[8px] text-gray-300 leading-none truncate">{{ row.sub }}</div>
+                </template>
+              </div>
+            </template>
+            <template v-else>
+              <div v-if="row.lv" class="absolute bottom-1 right-1 bg-black/70 text-white text-[10px] px-1 rounded">Lv {{ row.lv }}</div>
+              <div v-if="row.cond" class="absolute bottom-0 left-0 bg-black/80 text-white text-[10px] px-1 flex gap-1 items-center rounded-tr">
+                <span class="font-bold text-yellow-500">{{ row.cond }}</span>
+                <span v-if="row.ed" class="font-bold text-orange-400">1st</span>
+              </div>
+              <div v-if="row.code" class="absolute bottom-0 right-0 bg-black/80 text-white text-[10px] px-1 font-mono rounded-tl">{{ row.code }}</div>
+            </template>
+          </div>
+          <div v-if="variant !== 'compact'" class="p-2 flex flex-col w-full">
+            <div class="text-xs font-bold truncate w-full">{{ row.title }}</div>
+            <div v-if="row.sub" class="text-[10px] text-gray-400 truncate w-full">{{ row.sub }}</div>
+            <div v-if="row.price" class="text-xs text-green-400">{{ row.price }}</div>
+          </div>
+        </div>
+      </div>
+      <div v-if="tipRow" class="fixed inset-0 flex items-center justify-center pointer-events-none z-[9999]">
+        <img :src="tipRow.tip" class="w-auto h-[65vh] min-w-[1000px] object-contain rounded-lg shadow-2xl">
+      </div>
+    </div>
+  `,
+  props: {
+    rows: { type: Array, default: () => [] },
+    gen: { type: Number, default: 0 },
+    sprite: { type: Object, default: null },
+    gridId: { type: String, default: "" },
+    variant: { type: String, default: "card" },
+    minWidth: { type: Number, default: 160 },
+    gap: { type: Number, default: 16 },
+    footer: { type: Number, default: 0 },
+    tipDelay: { type: Number, default: 1050 },
+    hoverDelay: { type: Number, default: 250 },
+    draggable: { type: Boolean, default: false },
+    acceptDrop: { type: Boolean, default: false },
+    overscan: { type: Number, default: 2 },
+  },
+  data() {
+    return { width: 0, viewTop: 0, viewBottom: 0, tipRow: null };
+  },
+  computed: {
+    columns() {
+      return Math.max(1, Math.floor((this.width + this.gap) / (this.minWidth + this.gap)));
+    },
+    itemWidth() {
+      return this.width ? (this.width - this.gap * (this.columns - 1)) / this.columns : this.minWidth;
+    },
+    imageHeight() {
+      return this.itemWidth * 1.5;
+    },
+    tileHeight() {
+      return this.imageHeight + this.footer;
+    },
+    rowHeight() {
+      return this.tileHeight + this.gap;
+    },
+    rowCount() {
+      return Math.ceil(this.rows.length / this.columns);
+    },
+    totalHeight() {
+      return Math.max(0, this.rowCount * this.rowHeight - this.gap);
+    },
+    firstRow() {
+      return Math.max(0, Math.floor(this.viewTop / this.rowHeight) - this.overscan);
+    },
+    lastRow() {
+      return Math.min(this.rowCount, Math.ceil(this.viewBottom / this.rowHeight) + this.overscan);
+    },
+    visibleRows() {
+      return this.rows.slice(this.firstRow * this.columns, this.lastRow * this.columns);
+    },
+    windowStyle() {
+      return {
+        position: "absolute",
+        top: this.firstRow * this.rowHeight + "px",
+        left: 0,
+        right: 0,
+        display: "grid",
+        gridTemplateColumns: `repeat(${this.columns}, minmax(0, 1fr))`,
+        gap: this.gap + "px",
+      };
+    },
+  },
+  watch: {
+    rows() {
+      this.onLeave();
+    },
+  },
+  mounted() {
+    this.scroller = findScroller(this.$refs.root);
+    (this.scroller || window).addEventListener("scroll", this.measure, { passive: true });
+    window.addEventListener("resize", this.measure);
+    this.resizeObserver = new ResizeObserver(this.measure);
+    this.resizeObserver.observe(this.$refs.root);
+    this.measure();
+  },
+  unmounted() {
+    (this.scroller || window).removeEventListener("scroll", this.measure);
+    window.removeEventListener("resize", this.measure);
+    this.resizeObserver.disconnect();
+    this.onLeave();
+  },
+  methods: {
+    measure() {
+      const root = this.$refs.root;
+      if (!root) return;
+      const rect = root.getBoundingClientRect();
+      const view = this.scroller ? this.scroller.getBoundingClientRect() : { top: 0, bottom: window.innerHeight };
+      this.width = root.clientWidth;
+      this.viewTop = view.top - rect.top;
+      this.viewBottom = view.bottom - rect.top;
+    },
+    tileClass(row) {
+      const look = row.dim ? "opacity-60 grayscale" : "opacity-100";
+      const border = row.accent ? "border-accent" : "border-gray-700";
+      return `q-card collection-card w-full p-0 overflow-hidden cursor-pointer select-none border ${border} ${look} hover:scale-105 transition-transform`;
+    },
+    spriteStyle(row) {
+      // Sprite tiles have the 2:3 ratio of the image box, which is inside the tile's 1px border
+      const scale = (this.itemWidth - 2) / this.sprite.w;
+      return {
+        backgroundImage: `url(${this.sprite.url})`,
+        backgroundSize: `${this.sprite.sw * scale}px ${this.sprite.sh * scale}px`,
+        backgroundPosition: `${-row.sp[0] * scale}px ${-row.sp[1] * scale}px`,
+      };
+    },
+    emitCard(type, row) {
+      this.$emit(type, { k: row.k, gen: this.gen });
+    },
+    onEnter(row) {
+      this.onLeave();
+      if (!row.tip) return;
+      if (row.fetch) this.hoverTimer = setTimeout(() => this.emitCard("card_hover", row), this.hoverDelay);
+      this.tipTimer = setTimeout(() => {
+        this.tipRow = row;
+        if (row.fetch) this.emitCard("tooltip_show", row);
+      }, this.tipDelay);
+    },
+    onLeave() {
+      clearTimeout(this.hoverTimer);
+      clearTimeout(this.tipTimer);
+      this.tipRow = null;
+    },
+    onDragStart(event, row) {
+      this.onLeave();
+      event.dataTransfer.effectAllowed = "copyMove";
+      event.dataTransfer.setData(DRAG_TYPE, JSON.stringify({ id: row.id ?? row.k, from: this.gridId }));
+    },
+    onDragOver(event) {
+      if (this.acceptDrop && event.dataTransfer.types.includes(DRAG_TYPE)) event.preventDefault();
+    },
+    onDrop(event) {
+      if (!this.acceptDrop) return;
+      const data = event.dataTransfer.getData(DRAG_TYPE);
+      if (!data) return;
+      event.preventDefault();
+      const { id, from } = JSON.parse(data);
+      if (from === this.gridId) return;
+      this.$refs.root.dispatchEvent(
+        new CustomEvent("card_drop", { detail: { data_id: id, from_id: from, to_id: this.gridId }, bubbles: true }),
+      );
+    },
+  },
+};
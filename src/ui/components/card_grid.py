@@ -0,0 +1,97 @@
+from nicegui import ui
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.services.ygo_api import ApiCard
+from src.services.image_manager import image_manager
+from src.services.sprite_sheets import SpriteSheet
+
+class CardGrid(ui.element, component='card_grid.js'):
+    """
+    Card grid rendered in the browser. The server sends one compact JSON row per card
+    (see set_items) and the client only mounts the tiles scrolled into view, showing the
+    large hover image once the tooltip delay has passed. Replacing the rows of a page
+    sends the new payload instead of building a server-side element tree per card.
+
+    Row keys (all optional): id, img, sp, tip, fetch, dim, accent, qty, flag, lang, lv, cond,
+    ed, code, title, sub, loc, price. sp is the [x, y] tile of the row's image in the sprite
+    sheet passed to set_items (see SpriteSheets) and replaces img. The 'card' variant shows
+    title/sub/price below the image (reserve `footer` pixels for them), 'compact' overlays
+    them on the image.
+
+    Events: card_click, card_contextmenu, card_hover (after a short dwell) and tooltip_show
+    can be handled with on_card; the hover events only fire for rows with fetch=True.
+    Dropping a tile of another grid dispatches a bubbling 'card_drop' DOM event with detail
+    {data_id, from_id, to_id}, where data_id is the row's id and from_id/to_id are grid
+    ids, so a common container can handle it.
+    """
+    def __init__(self, *, grid_id: str = '', variant: str = 'card', min_width: int = 160, gap: int = 16,
+                 footer: int = 0, tooltip_delay: int = 1050, draggable: bool = False, accept_drop: bool = False):
+        super().__init__()
+        self._items: List[Any] = []
+        self._props.update({
+            'rows': [], 'gen': 0, 'gridId': grid_id, 'variant': variant, 'minWidth': min_width, 'gap': gap,
+            'footer': footer, 'tipDelay': tooltip_delay, 'draggable': draggable, 'acceptDrop': accept_drop,
+        })
+
+    def set_items(self, items: Iterable[Any], to_row: Callable[[Any], Dict[str, Any]], sprite: Optional[SpriteSheet] = None):
+        """Replaces the grid content with one row per item. Empty values are left out of the payload."""
+        self._items = list(items)
+        rows = []
+        for i, item in enumerate(self._items):
+            row = {k: v for k, v in to_row(item).items() if v}
+            row['k'] = i
+            rows.append(row)
+        self._props['rows'] = rows
+        self._props['sprite'] = sprite.client_props() if sprite else None
+        # Events of rows sent before this update are dropped by item_for
+        self._props['gen'] += 1
+        self.update()
+
+    def item_for(self, args: Dict[str, Any]) -> Optional[Any]:
+        """The item an event's {k, gen} arguments refer to, or None if the rows have changed since."""
+        key = args.get('k')
+        if args.get('gen') != self._props['gen'] or not isinstance(key, int) or not 0 <= key < len(self._items):
+            return None
+        return self._items[key]
+
+    def on_card(self, event: str, handler: Callable[[Any], Any]) -> 'CardGrid':
+        """Calls handler(item) for a card event; async handlers are awaited by NiceGUI."""
+        def dispatch(e):
+            item = self.item_for(e.args)
+            if item is not None:
+                return handler(item)
+        self.on(event, dispatch)
+        return self
+
+def tooltip_source(card: ApiCard, specific_image_id: int = None) -> Tuple[Optional[str], bool]:
+    """The hover image of a card and whether its high-res file still has to be downloaded."""
+    if not card: return None, False
+    img_id = specific_image_id or card.get_best_image_id()
+
+    high_res_url = None
+    low_res_url = None
+    if card.card_images:
+        # Fall back to the default artwork if the image id has no URL (e.g. custom artwork)
+        target_img = next((img for img in card.card_images if img.id == img_id), card.card_images[0])
+        high_res_url = target_img.image_url
+        low_res_url = target_img.image_url_small
+
+    if image_manager.image_exists(img_id, high_res=True):
+        return f"/images/{img_id}_high.jpg", False
+    return high_res_url or low_res_url, bool(high_res_url)
+
+def tooltip_target(card: ApiCard, specific_image_id: int = None) -> Tuple[Optional[int], Optional[str]]:
+    """The image id and URL the high-res hover image of a card is downloaded from."""
+    if not card or not card.card_images: return None, None
+    img_id = specific_image_id or card.get_best_image_id()
+    target_img = next((img for img in card.card_images if img.id == img_id), None)
+    if target_img is None:
+        # Fallback URL of a custom artwork: store it under the default artwork id instead
+        target_img = card.card_images[0]
+    return target_img.id, target_img.image_url
+
+async def ensure_tooltip_image(card: ApiCard, specific_image_id: int = None):
+    """Downloads the high-res hover image of a card (see tooltip_source) if it is missing."""
+    img_id, url = tooltip_target(card, specific_image_id)
+    if url and not image_manager.image_exists(img_id, high_res=True):
+        await image_manager.ensure_image(img_id, url, high_res=True)
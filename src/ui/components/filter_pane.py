@@ -1,6 +1,13 @@
 from nicegui import ui
 from typing import Callable, Dict, Any, List
-from src.core.constants import CARD_CONDITIONS
+from src.core.constants import CARD_CONDITIONS, MONSTER_CATEGORIES
+
+# Options used until a page has loaded the vocabularies of its card database
+COMMON_RARITIES = [
+    "Common", "Rare", "Super Rare", "Ultra Rare", "Secret Rare",
+    "Ghost Rare", "Ultimate Rare", "Starlight Rare", "Collector's Rare"
+]
+ATTRIBUTES = ['DARK', 'LIGHT', 'EARTH', 'WIND', 'FIRE', 'WATER', 'DIVINE']
 
 class FilterPane:
     def __init__(self, state: Dict[str, Any], on_change: Callable, on_reset: Callable, show_set_selector: bool = True):
@@ -23,15 +30,12 @@ class FilterPane:
                 ).bind_value(self.state, 'filter_set').classes('w-full').props('use-input fill-input input-debounce=0')
 
             # Rarity
-            common_rarities = [
-                "Common", "Rare", "Super Rare", "Ultra Rare", "Secret Rare",
-                "Ghost Rare", "Ultimate Rare", "Starlight Rare", "Collector's Rare"
-            ]
-            ui.select(common_rarities, label='Rarity', with_input=True, clearable=True,
+            self.rarity_selector = ui.select(self.state.get('available_rarities') or COMMON_RARITIES,
+                      label='Rarity', with_input=True, clearable=True,
                       on_change=self.on_change).bind_value(self.state, 'filter_rarity').classes('w-full')
 
             # Attribute
-            ui.select(['DARK', 'LIGHT', 'EARTH', 'WIND', 'FIRE', 'WATER', 'DIVINE'],
+            self.attr_selector = ui.select(self.state.get('available_attributes') or ATTRIBUTES,
                       label='Attribute', clearable=True,
                       on_change=self.on_change).bind_value(self.state, 'filter_attr').classes('w-full')
 
@@ -64,8 +68,7 @@ class FilterPane:
             ).bind_value(self.state, 'filter_archetype').classes('w-full')
 
             # Monster Category
-            categories = ['Effect', 'Normal', 'Synchro', 'Xyz', 'Ritual', 'Fusion', 'Link', 'Pendulum', 'Toon', 'Spirit', 'Union', 'Gemini', 'Flip']
-            ui.select(categories, label='Monster Category', multiple=True, clearable=True,
+            ui.select(MONSTER_CATEGORIES, label='Monster Category', multiple=True, clearable=True,
                       on_change=self.on_change).bind_value(self.state, 'filter_monster_category').classes('w-full').props('use-chips')
 
             # Level
@@ -199,6 +202,12 @@ class FilterPane:
         if hasattr(self, 'set_selector'):
             self.set_selector.options = self.state.get('available_sets', [])
             self.set_selector.update()
+        if hasattr(self, 'rarity_selector'):
+            self.rarity_selector.options = self.state.get('available_rarities') or COMMON_RARITIES
+            self.rarity_selector.update()
+        if hasattr(self, 'attr_selector'):
+            self.attr_selector.options = self.state.get('available_attributes') or ATTRIBUTES
+            self.attr_selector.update()
         if hasattr(self, 'ctype_selector'):
             self.ctype_selector.options = self.state.get('available_card_types', [])
             self.ctype_selector.update()
@@ -213,13 +213,11 @@ class SingleCardView:
                         art_options[img.id] = f"Artwork {i+1} (ID: {img.id})"
 
                 # 2. Collection Variants (Custom Arts)
-                if current_collection:
-                    for c in current_collection.cards:
-                        if c.card_id == card.id:
-                            for v in c.variants:
-                                if v.image_id and v.image_id not in art_options:
-                                    art_options[v.image_id] = f"Custom Art (ID: {v.image_id})"
-                            break
+                c_card = current_collection.ownership.card(card.id) if current_collection else None
+                if c_card:
+                    for v in c_card.variants:
+                        if v.image_id and v.image_id not in art_options:
+                            art_options[v.image_id] = f"Custom Art (ID: {v.image_id})"
 
                 # 3. Ensure Current ID is present
                 current_img_id = int(input_state['image_id']) if input_state['image_id'] is not None else None
@@ -677,19 +675,16 @@ class SingleCardView:
                 if set_base_code:
                     target_codes.add(set_base_code)
 
-                if current_collection:
-                    for c in current_collection.cards:
-                        if c.card_id == card.id:
-                            for v in c.variants:
-                                if v.set_code in target_codes and v.rarity == rarity and v.image_id == image_id:
-                                    for e in v.entries:
-                                        if e.language == language and e.condition == condition and e.first_edition == first_edition:
-                                            cur_owned += e.quantity
-                                            loc = e.storage_location if e.storage_location else "Unsorted"
-                                            storage_breakdown[loc] = storage_breakdown.get(loc, 0) + e.quantity
-                                    # Don't break here, we might have multiple variants matching (e.g. one EN code, one DE code)
-                                    # break
-                            break
+                c_card = current_collection.ownership.card(card.id) if current_collection else None
+                if c_card:
+                    for v in c_card.variants:
+                        if v.set_code in target_codes and v.rarity == rarity and v.image_id == image_id:
+                            for e in v.entries:
+                                if e.language == language and e.condition == condition and e.first_edition == first_edition:
+                                    cur_owned += e.quantity
+                                    loc = e.storage_location if e.storage_location else "Unsorted"
+                                    storage_breakdown[loc] = storage_breakdown.get(loc, 0) + e.quantity
+                            # Don't break here, we might have multiple variants matching (e.g. one EN code, one DE code)
 
                 text = str(cur_owned)
                 if cur_owned > 0 and storage_breakdown:
@@ -825,8 +820,7 @@ class SingleCardView:
                                         matched_set = s
                                         break
                                 if matched_set and matched_set.set_price:
-                                    try: s_price = float(matched_set.set_price)
-                                    except: pass
+                                    s_price = matched_set.price
 
                             lbl_set_name.text = s_name
                             final_code = transform_set_code(base_code, input_state['language'])
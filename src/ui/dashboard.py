@@ -39,10 +39,11 @@ async def load_dashboard_data(filename=None):
         elif not files:
              selected_file = None
 
-        collection = None
+        collection_stats = None
         if selected_file:
             try:
-                collection = await run.io_bound(persistence.load_collection, selected_file)
+                # Served from the statistics sidecar unless the collection changed on disk
+                collection_stats = await run.io_bound(persistence.get_collection_stats, selected_file)
             except Exception as e:
                 logger.error(f"Failed to load collection {selected_file}: {e}")
 
@@ -61,49 +62,22 @@ async def load_dashboard_data(filename=None):
             'language_dist': {}
         }
 
-        if collection:
-            stats['unique_owned'] = len(collection.cards)
-            stats['total_qty'] = collection.total_cards
-            stats['total_value'] = collection.total_value
-
-            # Count Unique Variants Owned
-            unique_vars = 0
-            for card in collection.cards:
-                for var in card.variants:
-                    if var.total_quantity > 0:
-                        unique_vars += 1
-            stats['unique_variants_owned'] = unique_vars
+        if collection_stats:
+            stats['unique_owned'] = collection_stats.unique_cards
+            stats['total_qty'] = collection_stats.total_qty
+            stats['total_value'] = collection_stats.total_value
+            stats['unique_variants_owned'] = collection_stats.unique_variants
 
             if total_db_unique > 0:
-                stats['completion_unique_pct'] = (len(collection.cards) / total_db_unique) * 100
+                stats['completion_unique_pct'] = (collection_stats.unique_cards / total_db_unique) * 100
 
             if total_db_variants > 0:
-                stats['completion_variants_pct'] = (unique_vars / total_db_variants) * 100
-
-            # Distributions
-            r_dist = {}
-            c_dist = {}
-            l_dist = {}
-
-            for card in collection.cards:
-                for var in card.variants:
-                    # Rarity - weighted by quantity
-                    qty = var.total_quantity
-                    r = var.rarity
-                    r_dist[r] = r_dist.get(r, 0) + qty
-
-                    # Condition
-                    for entry in var.entries:
-                        c = entry.condition
-                        c_dist[c] = c_dist.get(c, 0) + entry.quantity
-
-                        l = entry.language
-                        l_dist[l] = l_dist.get(l, 0) + entry.quantity
-
-            stats['rarity_dist'] = r_dist
-            stats['condition_dist'] = c_dist
-            stats['language_dist'] = l_dist
-            stats['collection_name'] = collection.name
+                stats['completion_variants_pct'] = (collection_stats.unique_variants / total_db_variants) * 100
+
+            stats['rarity_dist'] = dict(collection_stats.rarity_dist)
+            stats['condition_dist'] = dict(collection_stats.condition_dist)
+            stats['language_dist'] = dict(collection_stats.language_dist)
+            stats['collection_name'] = collection_stats.name
         else:
             stats['collection_name'] = "No Collection Selected"
 
@@ -7,8 +7,12 @@ from src.core.config import config_manager
 from src.core.utils import generate_variant_id, normalize_set_code
 from src.ui.components.filter_pane import FilterPane
 from src.ui.components.single_card_view import SingleCardView, STANDARD_RARITIES
+from src.services.filter_engine import FilterColumns, FilterColumnsCache
+from src.services.filter_scheduler import FilterScheduler
+from src.services.shared_view_models import shared_view_models
+from src.services.image_prefetcher import ImagePrefetcher
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import List, Optional, Dict
 import logging
 import re
 import asyncio
@@ -41,11 +45,6 @@ def build_db_rows(api_cards: List[ApiCard]) -> List[DbEditorRow]:
                              row_img_url = img.image_url_small
                              break
 
-                price = 0.0
-                if cset.set_price:
-                    try: price = float(cset.set_price)
-                    except: pass
-
                 rows.append(DbEditorRow(
                     api_card=card,
                     set_code=cset.set_code,
@@ -54,7 +53,7 @@ def build_db_rows(api_cards: List[ApiCard]) -> List[DbEditorRow]:
                     image_url=row_img_url,
                     image_id=cset.image_id or default_image_id,
                     variant_id=cset.variant_id,
-                    set_price=price
+                    set_price=cset.price
                 ))
         else:
              # Card with no sets
@@ -70,6 +69,14 @@ def build_db_rows(api_cards: List[ApiCard]) -> List[DbEditorRow]:
             ))
     return rows
 
+def build_db_editor_columns(rows: List[DbEditorRow]) -> FilterColumns:
+    return FilterColumns(
+        rows,
+        card_of=lambda r: r.api_card,
+        sets_of=lambda r: [(r.set_code, r.set_name, r.rarity)],
+        price_of=lambda r: r.set_price
+    )
+
 class DbEditorPage:
     def __init__(self):
         saved_state = persistence.load_ui_state()
@@ -125,6 +132,9 @@ class DbEditorPage:
         self.single_card_view = SingleCardView()
         self.pagination_showing_label = None
         self.pagination_total_label = None
+        self.filter_columns = FilterColumnsCache()
+        self.filter_scheduler = FilterScheduler(self._compute_filtered, self._show_filtered)
+        self.image_prefetcher = ImagePrefetcher()
 
     async def load_data(self):
         logger.info(f"Loading DB Editor data... (Language: {self.state['language']})")
@@ -136,27 +146,10 @@ class DbEditorPage:
             ui.notify(f"Error loading database: {e}", type='negative')
             return
 
-        sets = set()
-        m_races = set()
-        st_races = set()
-        archetypes = set()
-
-        for c in api_cards:
-            if c.card_sets:
-                for s in c.card_sets:
-                    parts = s.set_code.split('-')
-                    prefix = parts[0] if len(parts) > 0 else s.set_code
-                    sets.add(f"{s.set_name} | {prefix}")
-            if c.archetype: archetypes.add(c.archetype)
-            if "Monster" in c.type: m_races.add(c.race)
-            elif ("Spell" in c.type or "Trap" in c.type) and c.race: st_races.add(c.race)
-
-        self.state['available_sets'] = sorted(list(sets))
-        self.state['available_monster_races'] = sorted([r for r in list(m_races) if r])
-        self.state['available_st_races'] = sorted([r for r in list(st_races) if r])
-        self.state['available_archetypes'] = sorted([a for a in list(archetypes) if a])
-
-        self.state['cards_rows'] = await run.io_bound(build_db_rows, api_cards)
+        ygo_service.get_filter_metadata(lang_code).apply_to(self.state)
+
+        self.state['cards_rows'] = await run.io_bound(
+            shared_view_models.get, 'db_rows', lang_code, lambda: build_db_rows(api_cards))
         await self.apply_filters()
         self.update_filter_ui()
 
@@ -225,8 +218,9 @@ class DbEditorPage:
         if self.filter_pane: self.filter_pane.reset_ui_elements()
         await self.apply_filters()
 
-    async def prepare_current_page_images(self):
-        start = (self.state['page'] - 1) * self.state['page_size']
+    def _page_image_urls(self, page: int) -> Dict[int, str]:
+        """The {image_id: url} thumbnails shown by a page of the current view."""
+        start = (page - 1) * self.state['page_size']
 
         if self.state['main_view'] == 'set_detail':
             all_items = self.state.get('set_detail_rows', [])
@@ -236,97 +230,30 @@ class DbEditorPage:
             all_items = self.state['filtered_items']
 
         end = min(start + self.state['page_size'], len(all_items))
-        items = all_items[start:end]
-        if not items: return
-        url_map = {item.image_id: item.image_url for item in items if item.image_id and item.image_url}
+        return {item.image_id: item.image_url for item in all_items[start:end] if item.image_id and item.image_url}
+
+    async def prepare_current_page_images(self):
+        # The shown page goes first; adjacent pages are prefetched once the user is idle
+        self.image_prefetcher.cancel()
+        url_map = self._page_image_urls(self.state['page'])
         if url_map:
              await image_manager.download_batch(url_map, concurrency=10)
+        self.image_prefetcher.schedule(self.state['page'], self.state['total_pages'], self._page_image_urls)
 
     async def apply_filters(self):
-        res = list(self.state['cards_rows'])
-        txt = self.state['search_text'].lower()
-        if txt:
-            def matches(item):
-                if (txt in item.api_card.name.lower() or
-                    txt in item.api_card.type.lower() or
-                    txt in item.api_card.desc.lower() or
-                    txt in item.set_code.lower()):
-                    return True
-                return False
-            res = [c for c in res if matches(c)]
-
-        # Price Filter
-        p_min = self.state['filter_price_min']
-        p_max = self.state['filter_price_max']
-        res = [c for c in res if p_min <= c.set_price <= p_max]
-
-        if self.state['filter_attr']:
-            res = [c for c in res if c.api_card.attribute == self.state['filter_attr']]
-
-        if self.state['filter_card_type']:
-             ctypes = self.state['filter_card_type']
-             if isinstance(ctypes, str): ctypes = [ctypes]
-             res = [c for c in res if any(t in c.api_card.type for t in ctypes)]
-
-        if self.state['filter_monster_race']:
-             res = [c for c in res if "Monster" in c.api_card.type and c.api_card.race == self.state['filter_monster_race']]
-        if self.state['filter_st_race']:
-             res = [c for c in res if ("Spell" in c.api_card.type or "Trap" in c.api_card.type) and c.api_card.race == self.state['filter_st_race']]
-        if self.state['filter_archetype']:
-             res = [c for c in res if c.api_card.archetype == self.state['filter_archetype']]
-
-        if self.state['filter_monster_category']:
-             categories = self.state['filter_monster_category']
-             if isinstance(categories, list) and categories:
-                 res = [c for c in res if all(c.api_card.matches_category(cat) for cat in categories)]
-
-        if self.state['filter_level']:
-             res = [c for c in res if c.api_card.level == int(self.state['filter_level'])]
-
-        atk_min, atk_max = self.state['filter_atk_min'], self.state['filter_atk_max']
-        if atk_min > 0 or atk_max < 5000:
-             res = [c for c in res if c.api_card.atk is not None and atk_min <= int(c.api_card.atk) <= atk_max]
-
-        def_min, def_max = self.state['filter_def_min'], self.state['filter_def_max']
-        if def_min > 0 or def_max < 5000:
-             res = [c for c in res if getattr(c.api_card, 'def_', None) is not None and def_min <= getattr(c.api_card, 'def_', -1) <= def_max]
-
-        if self.state['filter_set']:
-            s_val = self.state['filter_set']
-            is_strict = '|' in s_val
-            if is_strict:
-                target_prefix = s_val.split('|')[-1].strip().lower()
-                def match_strict(c):
-                    parts = c.set_code.split('-')
-                    c_prefix = parts[0].lower() if parts else c.set_code.lower()
-                    return c_prefix == target_prefix
-                res = [c for c in res if match_strict(c)]
-            else:
-                s_txt = s_val.strip().lower()
-                res = [c for c in res if s_txt in c.set_code.lower() or s_txt in c.set_name.lower()]
-
-        if self.state['filter_rarity']:
-            r = self.state['filter_rarity'].lower()
-            res = [c for c in res if r == c.rarity.lower()]
-
-        key = self.state['sort_by']
-        reverse = self.state.get('sort_descending', False)
-
-        if key == 'Name':
-            res.sort(key=lambda x: x.api_card.name, reverse=reverse)
-        elif key == 'ATK':
-            res.sort(key=lambda x: (x.api_card.atk or -1), reverse=reverse)
-        elif key == 'DEF':
-            res.sort(key=lambda x: (getattr(x.api_card, 'def_', None) or -1), reverse=reverse)
-        elif key == 'Level':
-            res.sort(key=lambda x: (x.api_card.level or -1), reverse=reverse)
-        elif key == 'Newest':
-            res.sort(key=lambda x: x.api_card.id, reverse=reverse)
-        elif key == 'Price':
-             res.sort(key=lambda x: x.set_price, reverse=reverse)
-        elif key == 'Set Code':
-             res.sort(key=lambda x: x.set_code, reverse=reverse)
-
+        self.image_prefetcher.cancel()
+        await self.filter_scheduler.request()
+
+    def _compute_filtered(self):
+        """Filters and sorts the card rows; runs in the filter scheduler's worker."""
+        source = self.state['cards_rows']
+        cols = self.filter_columns.get(source, build_db_editor_columns)
+        lang_code = self.state['language'].lower() if self.state['language'] else 'en'
+        mask = cols.mask(self.state, search_text=self.state['search_text'],
+                         text_index=ygo_service.get_text_index(lang_code))
+        return cols.select_sorted(mask, self.state['sort_by'], self.state.get('sort_descending', False))
+
+    async def _show_filtered(self, res):
         self.state['filtered_items'] = res
 
         # Build consolidated items (unique cards from the filtered results)
@@ -8,7 +8,12 @@ from src.services.banlist_service import banlist_service
 from src.services.image_manager import image_manager
 from src.core.config import config_manager
 from src.ui.components.filter_pane import FilterPane
+from src.ui.components.advanced_search import AdvancedSearchInput
 from src.ui.components.single_card_view import SingleCardView
+from src.services.card_query import evaluate_query
+from src.services.filter_scheduler import FilterScheduler
+from src.services.image_prefetcher import ImagePrefetcher
+from src.services.filter_engine import FilterColumns, FilterColumnsCache, tcgplayer_price
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Set
 import logging
@@ -97,6 +102,8 @@ class DeckBuilderPage:
 
         self.state = {
             'search_text': '',
+            'advanced_query': '',
+            'advanced_query_error': '',
             'filter_set': '',
             'filter_rarity': '',
             'filter_attr': '',
@@ -148,6 +155,7 @@ class DeckBuilderPage:
 
         self.single_card_view = SingleCardView()
         self.filter_pane: Optional[FilterPane] = None
+        self.advanced_search: Optional[AdvancedSearchInput] = None
         self.api_card_map = {} # ID -> ApiCard
         self.alt_art_map = {} # Alt Art Image ID -> Base Card ID
         self.dragged_item = None
@@ -156,6 +164,9 @@ class DeckBuilderPage:
         self.deck_area_container = None
 
         self.deck_changelog_manager = ChangelogManager(os.path.join("data", "changelogs", "decks"))
+        self.filter_columns = FilterColumnsCache()
+        self.filter_scheduler = FilterScheduler(self._compute_filtered, self._show_filtered)
+        self.image_prefetcher = ImagePrefetcher()
 
     def _resolve_card_id(self, card_id: int) -> int:
         """Resolves an ID to its base card ID if it's a known alternate art."""
@@ -295,14 +306,10 @@ class DeckBuilderPage:
             return base_deck_counts
 
         missing = {}
-
-        # Create a map of owned quantities (Base IDs)
-        owned_map = {}
-        for c in ref_col.cards:
-            owned_map[c.card_id] = c.total_quantity
+        ownership = ref_col.ownership
 
         for base_id, required_qty in base_deck_counts.items():
-            owned_qty = owned_map.get(base_id, 0)
+            owned_qty = ownership.total(base_id)
             if owned_qty < required_qty:
                 missing[base_id] = required_qty - owned_qty
 
@@ -380,10 +387,8 @@ class DeckBuilderPage:
             return Deck(name="Empty")
 
         ref_col = self.state['reference_collection']
-        owned_map = {}
-        if ref_col:
-            for c in ref_col.cards:
-                owned_map[c.card_id] = c.total_quantity
+        # Owned copies not yet claimed by an earlier zone
+        owned_map = dict(ref_col.ownership.totals) if ref_col else {}
 
         missing_deck = Deck(name=f"{current_deck.name}_Missing")
 
@@ -451,26 +456,7 @@ class DeckBuilderPage:
                  self.state['current_banlist_type'] = 'classical'
 
             # Setup Filters Metadata
-            sets = set()
-            m_races = set()
-            st_races = set()
-            archetypes = set()
-
-            for c in api_cards:
-                if c.card_sets:
-                    for s in c.card_sets:
-                        parts = s.set_code.split('-')
-                        prefix = parts[0] if len(parts) > 0 else s.set_code
-                        sets.add(f"{s.set_name} | {prefix}")
-                if c.archetype: archetypes.add(c.archetype)
-                if "Monster" in c.type: m_races.add(c.race)
-                elif "Spell" in c.type or "Trap" in c.type:
-                    if c.race: st_races.add(c.race)
-
-            self.state['available_sets'] = sorted(list(sets))
-            self.state['available_monster_races'] = sorted(list(m_races))
-            self.state['available_st_races'] = sorted(list(st_races))
-            self.state['available_archetypes'] = sorted(list(archetypes))
+            ygo_service.get_filter_metadata(lang).apply_to(self.state)
             self.state['available_card_types'] = ['Monster', 'Spell', 'Trap', 'Skill']
 
             # Load Decks List
@@ -632,145 +618,42 @@ class DeckBuilderPage:
 
             self.update_zone_headers()
 
+    def _build_filter_columns(self, cards: List[ApiCard]) -> FilterColumns:
+        ref_col = self.state['reference_collection']
+        ownership = ref_col.ownership if ref_col else None
+        owned_totals = ownership.totals if ownership else {}
+
+        return FilterColumns(
+            cards,
+            card_of=lambda c: c,
+            sets_of=lambda c: [(s.set_code, s.set_name, s.set_rarity) for s in c.card_sets or []],
+            qty_of=lambda c: owned_totals.get(c.id, 0),
+            price_of=tcgplayer_price,
+            owned_of=lambda c: c.id in owned_totals,
+            languages_of=(lambda c: ownership.languages(c.id)) if ownership else None,
+            conditions_of=(lambda c: ownership.conditions(c.id)) if ownership else None
+        )
+
     async def apply_filters(self):
+        self.image_prefetcher.cancel()
+        await self.filter_scheduler.request()
+
+    def _compute_filtered(self):
+        """Filters and sorts the catalog; runs in the filter scheduler's worker."""
         source = self.state['all_api_cards']
-        res = list(source)
 
-        # Helpers for sorting/filtering
         ref_col = self.state['reference_collection']
-        owned_map = {}
-        if ref_col:
-            owned_map = {c.card_id: c for c in ref_col.cards}
-
-        def get_qty(c):
-             if not ref_col: return 0
-             found = owned_map.get(c.id)
-             return found.total_quantity if found else 0
-
-        def get_price(c):
-             if not c.card_prices: return 0.0
-             try:
-                 return float(c.card_prices[0].tcgplayer_price or 0)
-             except: return 0.0
-
-        txt = self.state['search_text'].lower()
-        if txt:
-             def matches(c):
-                 if txt in c.name.lower() or txt in c.type.lower() or txt in c.desc.lower():
-                     return True
-                 if c.card_sets:
-                     for s in c.card_sets:
-                         if txt in s.set_code.lower():
-                             return True
-                 return False
-             res = [c for c in res if matches(c)]
-
-        if self.state['filter_card_type']:
-             ctypes = self.state['filter_card_type']
-             if isinstance(ctypes, str): ctypes = [ctypes]
-             res = [c for c in res if any(t in c.type for t in ctypes)]
-
-        if self.state['filter_attr']:
-             res = [c for c in res if c.attribute == self.state['filter_attr']]
-
-        if self.state['filter_monster_race']:
-             res = [c for c in res if "Monster" in c.type and c.race == self.state['filter_monster_race']]
-        if self.state['filter_st_race']:
-             res = [c for c in res if ("Spell" in c.type or "Trap" in c.type) and c.race == self.state['filter_st_race']]
-        if self.state['filter_archetype']:
-             res = [c for c in res if c.archetype == self.state['filter_archetype']]
-
-        if self.state['filter_set']:
-             # Format: "Set Name | Code"
-             target = self.state['filter_set'].split('|')[0].strip().lower()
-             res = [c for c in res if any(target in (s.set_name or '').lower() or target in (s.set_code or '').lower() for s in c.card_sets)]
-
-        if self.state['filter_rarity']:
-             target = self.state['filter_rarity'].lower()
-             res = [c for c in res if any(target == (s.set_rarity or '').lower() for s in c.card_sets)]
-
-        if self.state['filter_monster_category']:
-             # Check if card matches ANY of the selected categories
-             cats = self.state['filter_monster_category']
-             res = [c for c in res if any(c.matches_category(cat) for cat in cats)]
-
-        if self.state['filter_level'] is not None:
-             res = [c for c in res if c.level == int(self.state['filter_level'])]
-
-        atk_min, atk_max = self.state['filter_atk_min'], self.state['filter_atk_max']
-        if atk_min > 0 or atk_max < 5000:
-             res = [c for c in res if c.atk is not None and atk_min <= int(c.atk) <= atk_max]
-
-        def_min, def_max = self.state['filter_def_min'], self.state['filter_def_max']
-        if def_min > 0 or def_max < 5000:
-             res = [c for c in res if c.def_ is not None and def_min <= int(c.def_) <= def_max]
-
-        # Ownership Filters - (Helper map already created at top)
-
-        # Quantity Range
-        own_min, own_max = self.state['filter_ownership_min'], self.state['filter_ownership_max']
-        if own_min > 0 or own_max < 100:
-             res = [c for c in res if own_min <= get_qty(c) <= own_max]
-
-        # Condition
-        if self.state['filter_condition'] and ref_col:
-             conds = set(self.state['filter_condition'])
-             def has_condition(c):
-                 found = owned_map.get(c.id)
-                 if not found: return False
-                 for v in found.variants:
-                     for e in v.entries:
-                         if e.condition in conds and e.quantity > 0:
-                             return True
-                 return False
-             res = [c for c in res if has_condition(c)]
-
-        # Owned Language
-        if self.state['filter_owned_lang'] and ref_col:
-             lang = self.state['filter_owned_lang']
-             def has_lang(c):
-                 found = owned_map.get(c.id)
-                 if not found: return False
-                 for v in found.variants:
-                     for e in v.entries:
-                         if e.language == lang and e.quantity > 0:
-                             return True
-                 return False
-             res = [c for c in res if has_lang(c)]
-
-        # Price Range
-        p_min, p_max = self.state['filter_price_min'], self.state['filter_price_max']
-        if p_min > 0 or p_max < 1000:
-             res = [c for c in res if p_min <= get_price(c) <= p_max]
-
-        key = self.state['sort_by']
-        reverse = self.state['sort_descending']
-
-        if key == 'Name':
-            res.sort(key=lambda x: x.name, reverse=reverse)
-        elif key == 'ATK':
-            res.sort(key=lambda x: (x.atk or -1), reverse=reverse)
-        elif key == 'DEF':
-            res.sort(key=lambda x: (getattr(x, 'def_', None) or -1), reverse=reverse)
-        elif key == 'Level':
-            res.sort(key=lambda x: (x.level or -1), reverse=reverse)
-        elif key == 'Newest':
-            res.sort(key=lambda x: x.id, reverse=reverse)
-        elif key == 'Price':
-             res.sort(key=lambda x: get_price(x), reverse=reverse)
-        elif key == 'Quantity':
-             res.sort(key=lambda x: get_qty(x), reverse=reverse)
-        elif key == 'Set Code':
-             def get_set_code(x):
-                 if x.card_sets: return x.card_sets[0].set_code
-                 return ""
-             res.sort(key=get_set_code, reverse=reverse)
-
-        if self.state['only_owned'] and self.state['reference_collection']:
-             owned_ids = set(c.card_id for c in self.state['reference_collection'].cards)
-             res = [c for c in res if c.id in owned_ids]
-
-        self.state['filtered_items'] = res
+        cols = self.filter_columns.get(source, self._build_filter_columns, ref_col)
+        text_index = ygo_service.get_text_index(config_manager.get_language())
+        mask = cols.mask(self.state, search_text=self.state['search_text'],
+                         only_owned=bool(self.state['only_owned'] and ref_col), category_match='any',
+                         text_index=text_index)
+        query_mask, query_error = evaluate_query(self.state['advanced_query'], cols, text_index)
+        mask &= query_mask
+        return cols.select_sorted(mask, self.state['sort_by'], self.state['sort_descending']), query_error
+
+    async def _show_filtered(self, result):
+        self.state['filtered_items'], self.state['advanced_query_error'] = result
         self.state['page'] = 1
         self.update_pagination()
         await self.prepare_current_page_images()
@@ -780,19 +663,20 @@ class DeckBuilderPage:
         count = len(self.state['filtered_items'])
         self.state['total_pages'] = (count + self.state['page_size'] - 1) // self.state['page_size']
 
-    async def prepare_current_page_images(self):
-        start = (self.state['page'] - 1) * self.state['page_size']
+    def _page_image_urls(self, page: int) -> Dict[int, str]:
+        """The {image_id: url} thumbnails shown by a page of the search results."""
+        start = (page - 1) * self.state['page_size']
         end = min(start + self.state['page_size'], len(self.state['filtered_items']))
-        items = self.state['filtered_items'][start:end]
-        if not items: return
-
-        url_map = {}
-        for card in items:
-             if card.card_images:
-                 url_map[card.card_images[0].id] = card.card_images[0].image_url_small
+        return {card.card_images[0].id: card.card_images[0].image_url_small
+                for card in self.state['filtered_items'][start:end] if card.card_images}
 
+    async def prepare_current_page_images(self):
+        # The shown page goes first; adjacent pages are prefetched once the user is idle
+        self.image_prefetcher.cancel()
+        url_map = self._page_image_urls(self.state['page'])
         if url_map:
              await image_manager.download_batch(url_map, concurrency=5)
+        self.image_prefetcher.schedule(self.state['page'], self.state['total_pages'], self._page_image_urls)
 
     async def reset_filters(self):
         self.state.update({
@@ -815,6 +699,7 @@ class DeckBuilderPage:
             'only_owned': False
         })
         if self.filter_pane: self.filter_pane.reset_ui_elements()
+        if self.advanced_search: self.advanced_search.reset()
         await self.apply_filters()
 
     def open_new_deck_dialog(self):
@@ -1165,11 +1050,8 @@ class DeckBuilderPage:
                     ui.label('No cards found.').classes('text-grey italic w-full text-center')
                     return
 
-                # Calculate owned counts for the current page
-                owned_map = {}
-                if self.state['reference_collection']:
-                    for c in self.state['reference_collection'].cards:
-                        owned_map[c.card_id] = c.total_quantity
+                ref_col = self.state['reference_collection']
+                owned_map = ref_col.ownership.totals if ref_col else {}
 
                 with ui.grid(columns='repeat(auto-fill, minmax(120px, 1fr))').classes('w-full gap-2').props('id="gallery-list"'):
                     for card in items:
@@ -1331,10 +1213,7 @@ class DeckBuilderPage:
 
         # Prepare ownership maps
         ref_col = self.state['reference_collection']
-        owned_map = {}
-        if ref_col:
-            for c in ref_col.cards:
-                owned_map[c.card_id] = c.total_quantity
+        owned_map = ref_col.ownership.totals if ref_col else {}
 
         # Initialize usage counter with hierarchical usage (Main > Extra > Side)
         usage_counter = self.calculate_hierarchical_usage(target)
@@ -1560,10 +1439,7 @@ class DeckBuilderPage:
 
                      # 3. Prepare ownership data for rendering
                      ref_col = self.state['reference_collection']
-                     owned_map = {}
-                     if ref_col:
-                         for c in ref_col.cards:
-                             owned_map[c.card_id] = c.total_quantity
+                     owned_map = ref_col.ownership.totals if ref_col else {}
 
                      # Dynamic Update Strategy: "Last Arrived = Lowest Priority"
                      # We calculate the TOTAL count of this card in the entire deck (including the new one).
@@ -1809,6 +1685,8 @@ class DeckBuilderPage:
                         await self.apply_filters()
                      ui.input(placeholder='Search...', value=self.state['search_text'], on_change=on_search) \
                         .props('debounce=300 icon=search dense outlined dark input-class=text-white').classes('w-full')
+                     self.advanced_search = AdvancedSearchInput(self.state, self.apply_filters)
+                     self.advanced_search.build(classes='w-full', props='dense outlined dark input-class=text-white')
 
                 # RESULTS CONTAINER
                 self.search_results_container = ui.column().classes('w-full flex-grow overflow-hidden flex flex-col')
@@ -1,4 +1,4 @@
-from nicegui import ui, events
+from nicegui import ui, events, run
 import json
 import logging
 import asyncio
@@ -14,6 +14,7 @@ from src.core.utils import LANGUAGE_TO_LEGACY_REGION_MAP, normalize_set_code, is
 from src.core.constants import RARITY_ABBREVIATIONS
 from src.services.ygo_api import ygo_service
 from src.services.collection_editor import CollectionEditor
+from src.services.collection_merge import merge_collection_files, MergeResult
 from src.services.cardmarket_parser import CardmarketParser, ParsedRow
 
 logger = logging.getLogger(__name__)
@@ -244,7 +245,7 @@ class UnifiedImportController:
                          self.db_lookup[code].append(entry)
 
                      # Key 2: Base Code (Normalized)
-                     base_code = normalize_set_code(code)
+                     base_code = s.code_parts.normalized
                      if base_code != code:
                          if base_code not in self.db_lookup: self.db_lookup[base_code] = []
                          if not any(x['variant'].variant_id == s.variant_id for x in self.db_lookup[base_code]):
@@ -355,29 +356,21 @@ class UnifiedImportController:
                      cards = await ygo_service.load_card_database(lang)
                      if not cards: continue
 
-                     # Simple scan (Optimization: ygo_service could have a name index, but iteration is acceptable for error recovery)
                      # Note: row.name might be in DE ("Hinotama Seele"). Searching in EN DB ("Hinotama Soul") requires fuzzy match.
                      # Searching in DE DB ("Hinotama Seele") requires exact/fuzzy.
+                     name_index = ygo_service.get_name_index(lang)
 
                      # Exact Match first
-                     for c in cards:
-                         if c.name.lower() == row.name.lower():
-                             found_by_name = (c, lang)
-                             break
-                     if found_by_name: break
+                     exact = name_index.exact(row.name)
+                     if exact:
+                         found_by_name = (exact, lang)
+                         break
 
                      # Fuzzy Match (if exact failed)
                      # Only if we are desperate. Let's try high threshold.
-                     best_ratio = 0
-                     best_card = None
-                     for c in cards:
-                         r = difflib.SequenceMatcher(None, row.name, c.name).ratio()
-                         if r > 0.85 and r > best_ratio:
-                             best_ratio = r
-                             best_card = c
-
-                     if best_card:
-                         found_by_name = (best_card, lang)
+                     best = name_index.best_matches(row.name, limit=1, cutoff=0.85)
+                     if best:
+                         found_by_name = (best[0][0], lang)
                          break
 
                 if found_by_name:
@@ -1189,8 +1182,7 @@ class UnifiedImportController:
 class MergeController:
     def __init__(self):
         self.collections: List[str] = []
-        self.coll_a: Optional[str] = None
-        self.coll_b: Optional[str] = None
+        self.sources: List[str] = []
         self.new_name: str = ""
         self.refresh_collections()
 
@@ -1198,11 +1190,8 @@ class MergeController:
         self.collections = persistence.list_collections()
 
     async def handle_merge(self):
-        if not self.coll_a or not self.coll_b:
-            ui.notify("Please select two collections.", type='warning')
-            return
-        if self.coll_a == self.coll_b:
-            ui.notify("Cannot merge collection into itself.", type='warning')
+        if len(self.sources) < 2:
+            ui.notify("Please select at least two collections.", type='warning')
             return
         if not self.new_name.strip():
             ui.notify("Enter a new collection name.", type='warning')
@@ -1213,44 +1202,33 @@ class MergeController:
             ui.notify("Collection exists.", type='negative')
             return
 
-        ui.notify("Merging...", type='info')
+        n = ui.notification("Merging...", type='info', spinner=True, timeout=None)
         try:
-            coll_a_obj = persistence.load_collection(self.coll_a)
-            coll_b_obj = persistence.load_collection(self.coll_b)
-            new_collection = Collection(name=self.new_name.strip())
-
-            await ygo_service.load_card_database()
-
-            async def merge_into(source):
-                for card in source.cards:
-                    api_card = ygo_service.get_card(card.card_id)
-                    if not api_card: continue
-                    for variant in card.variants:
-                        for entry in variant.entries:
-                            CollectionEditor.apply_change(
-                                collection=new_collection,
-                                api_card=api_card,
-                                set_code=variant.set_code,
-                                rarity=variant.rarity,
-                                language=entry.language,
-                                quantity=entry.quantity,
-                                condition=entry.condition,
-                                first_edition=entry.first_edition,
-                                image_id=variant.image_id,
-                                mode='ADD'
-                            )
-
-            await merge_into(coll_a_obj)
-            await merge_into(coll_b_obj)
-
-            persistence.save_collection(new_collection, new_filename)
-            ui.notify(f"Created '{self.new_name}'", type='positive')
+            result = await run.io_bound(merge_collection_files, self.sources, new_filename, self.new_name.strip())
+            n.dismiss()
+            ui.notify(f"Created '{self.new_name}' ({result.total_quantity} cards)", type='positive')
+            if result.conflicts:
+                self.open_conflicts_dialog(result)
             self.refresh_collections()
             self.new_name = ""
         except Exception as e:
+            n.dismiss()
             logger.error(f"Merge error: {e}")
             ui.notify(f"Merge failed: {e}", type='negative')
 
+    def open_conflicts_dialog(self, result: MergeResult):
+        with ui.dialog() as d, ui.card().classes('w-[600px] bg-dark border border-gray-700'):
+            ui.label(f'{len(result.conflicts)} Merge Conflicts').classes('text-h6 text-warning')
+            ui.label('The first definition was kept for each conflict.').classes('text-sm text-grey')
+            with ui.scroll_area().classes('w-full h-64'):
+                for c in result.conflicts:
+                    with ui.row().classes('w-full items-start gap-2 no-wrap'):
+                        ui.badge(c.kind, color='orange')
+                        ui.label(c.message).classes('text-sm')
+            with ui.row().classes('w-full justify-end'):
+                ui.button('Close', on_click=d.close).props('flat')
+        d.open()
+
 
 def import_tools_page():
     controller = UnifiedImportController()
@@ -1334,10 +1312,9 @@ def import_tools_page():
         with ui.card().classes('w-full bg-dark border border-gray-700 p-6'):
             ui.label('Merge Collections').classes('text-xl font-bold q-mb-md')
             with ui.grid().classes('grid-cols-1 md:grid-cols-3 gap-4 w-full'):
-                ui.select(merge_controller.collections, label='Collection A',
-                          on_change=lambda e: setattr(merge_controller, 'coll_a', e.value)).props('dark')
-                ui.select(merge_controller.collections, label='Collection B',
-                          on_change=lambda e: setattr(merge_controller, 'coll_b', e.value)).props('dark')
+                ui.select(merge_controller.collections, label='Collections', multiple=True,
+                          on_change=lambda e: setattr(merge_controller, 'sources', e.value or [])) \
+                    .props('dark use-chips').classes('md:col-span-2')
                 ui.input(label='New Name', on_change=lambda e: setattr(merge_controller, 'new_name', e.value)).props('dark')
 
             with ui.row().classes('w-full justify-end q-mt-md'):
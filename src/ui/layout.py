@@ -56,6 +56,10 @@ def create_layout(content_function):
                       min=1, max=100,
                       on_change=change_bulk_page_size).classes('w-full')
 
+            with ui.switch('Sprite Sheets for Card Grids', value=config_manager.get_sprite_sheets(),
+                           on_change=lambda e: config_manager.set_sprite_sheets(e.value)):
+                ui.tooltip('Load the card images of a collection page as one combined image (for slow connections)')
+
             ui.separator().classes('q-my-md')
             ui.label('Data Management').classes('text-subtitle2 text-grey')
 
@@ -591,24 +591,7 @@ class ScanPage:
             self.api_card_map = {c.id: c for c in api_cards}
 
             # Populate Metadata for Filters
-            sets = set()
-            m_races = set()
-            st_races = set()
-            archetypes = set()
-
-            for c in api_cards:
-                if c.card_sets:
-                    for s in c.card_sets:
-                        sets.add(f"{s.set_name} | {s.set_code.split('-')[0] if '-' in s.set_code else s.set_code}")
-                if c.archetype: archetypes.add(c.archetype)
-                if "Monster" in c.type: m_races.add(c.race)
-                elif "Spell" in c.type or "Trap" in c.type:
-                    if c.race: st_races.add(c.race)
-
-            self.col_state['available_sets'] = sorted(list(sets))
-            self.col_state['available_monster_races'] = sorted(list(m_races))
-            self.col_state['available_st_races'] = sorted(list(st_races))
-            self.col_state['available_archetypes'] = sorted(list(archetypes))
+            ygo_service.get_filter_metadata(lang_code).apply_to(self.col_state)
 
             # Initial Data Load (Recent Scans -> View Model)
             await self.load_data()
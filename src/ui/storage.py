@@ -5,14 +5,20 @@ from src.services.image_manager import image_manager
 from src.services.collection_editor import CollectionEditor
 from src.core.persistence import persistence
 from src.core.changelog_manager import changelog_manager
+from src.core.collection_events import collection_events, EntryChanged, StorageRenamed, CollectionSaved
 from src.core.config import config_manager
 from src.ui.components.filter_pane import FilterPane
 from src.ui.components.single_card_view import SingleCardView
+from src.ui.components.card_grid import CardGrid, tooltip_source, ensure_tooltip_image
+from src.services.filter_engine import FilterColumns, FilterColumnsCache, tcgplayer_price
+from src.services.filter_scheduler import FilterScheduler
+from src.services.shared_view_models import shared_view_models
 from src.core.utils import LANGUAGE_COUNTRY_MAP
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Callable
 import logging
 import asyncio
+import queue
 
 logger = logging.getLogger(__name__)
 
@@ -31,6 +37,17 @@ class StorageRow:
     variant_id: Optional[str] = None
     storage_location: Optional[str] = None
 
+def build_storage_columns(rows: List[StorageRow]) -> FilterColumns:
+    return FilterColumns(
+        rows,
+        card_of=lambda r: r.api_card,
+        sets_of=lambda r: [(r.set_code, r.set_name, r.rarity)],
+        qty_of=lambda r: r.quantity,
+        price_of=lambda r: tcgplayer_price(r.api_card),
+        languages_of=lambda r: [r.language],
+        conditions_of=lambda r: [r.condition]
+    )
+
 class StorageDialog:
     def __init__(self, on_save: Callable):
         self.on_save = on_save
@@ -102,8 +119,7 @@ class StorageDialog:
                                       url = s_info.get('image')
                                       path = await ygo_service.download_set_image(set_code, url)
                                       if path:
-                                           safe_code = "".join(c for c in set_code if c.isalnum() or c in ('-', '_')).strip()
-                                           self.image_preview.set_source(f"/sets/{safe_code}.jpg")
+                                           self.image_preview.set_source(image_manager.get_set_image_url(set_code))
                          except Exception as ex:
                              logger.error(f"Error handling set change: {ex}")
                              ui.notify(f"Error loading set info: {ex}", type='warning')
@@ -173,8 +189,7 @@ class StorageDialog:
         if self.uploaded_image_path:
             self.image_preview.set_source(f"/storage/{self.uploaded_image_path}")
         elif self.current_data.get('set_code'):
-             safe_code = "".join(c for c in self.current_data.get('set_code') if c.isalnum() or c in ('-', '_')).strip()
-             self.image_preview.set_source(f"/sets/{safe_code}.jpg")
+             self.image_preview.set_source(image_manager.get_set_image_url(self.current_data.get('set_code')))
         else:
             self.image_preview.set_source(None)
 
@@ -255,7 +270,6 @@ class StoragePage:
 
             'storage_sort_by': saved_state.get('storage_sort_by', 'Name'),
             'storage_sort_desc': saved_state.get('storage_sort_desc', False),
-            'storage_counts': {},
 
             'available_sets': [],
             'available_monster_races': [],
@@ -280,8 +294,17 @@ class StoragePage:
         self.storage_dialog = StorageDialog(self.on_storage_save)
         self.save_lock = asyncio.Lock()
         self.save_task = None
+        self.filter_columns = FilterColumnsCache()
+        self.filter_scheduler = FilterScheduler(self._compute_filtered, self._show_filtered)
+        self._reset_page_pending = False
+        self.detail_grid: Optional[CardGrid] = None
+        # Filled by on_collection_event, drained by apply_collection_changes
+        self.collection_changes: "queue.Queue" = queue.Queue()
+        collection_events.subscribe(self.on_collection_event)
 
     async def load_data(self):
+        # Pending events are covered by the reload
+        self.collection_changes = queue.Queue()
         if self.state['selected_collection_file']:
             try:
                 self.state['current_collection'] = await run.io_bound(persistence.load_collection, self.state['selected_collection_file'])
@@ -294,16 +317,6 @@ class StoragePage:
         else:
             self.state['storages'] = []
 
-        # Calculate storage counts
-        counts = {}
-        if self.state['current_collection']:
-            for card in self.state['current_collection'].cards:
-                for variant in card.variants:
-                    for entry in variant.entries:
-                        if entry.storage_location:
-                            counts[entry.storage_location] = counts.get(entry.storage_location, 0) + entry.quantity
-        self.state['storage_counts'] = counts
-
         self.sort_storages()
 
         if self.state['view'] == 'gallery':
@@ -399,78 +412,60 @@ class StoragePage:
     async def load_detail_rows(self, reset_page: bool = True):
         if not self.state['current_collection']: return
 
-        target_loc = self.state['current_storage']['name'] if self.state['current_storage'] else None
+        target_loc = None
+        if self.state['in_storage_only'] and self.state['current_storage']:
+            target_loc = self.state['current_storage']['name']
         rows = []
 
         lang = config_manager.get_language()
         await ygo_service.load_card_database(lang)
 
-        api_card_map = {c.id: c for c in ygo_service._cards_cache.get(lang, [])}
-
-        sets = set()
-        m_races = set()
-        st_races = set()
-        archetypes = set()
+        api_card_map = self._card_map(lang)
+        # set code -> set name, per card of the box
+        set_names: Dict[int, Dict[str, str]] = {}
 
-        for c_card in self.state['current_collection'].cards:
-            api_card = api_card_map.get(c_card.card_id)
+        # Showing items IN the current box, or NOT in ANY box (Unassigned) to add to current box
+        for ref in self.state['current_collection'].storage_index.entries(target_loc):
+            api_card = api_card_map.get(ref.card_id)
             if not api_card: continue
 
-            if api_card.archetype: archetypes.add(api_card.archetype)
-            if "Monster" in api_card.type: m_races.add(api_card.race)
-            elif "Spell" in api_card.type or "Trap" in api_card.type:
-                 if api_card.race: st_races.add(api_card.race)
-
-            for v in c_card.variants:
-                set_name = "Unknown"
-                if api_card.card_sets:
-                    for s in api_card.card_sets:
-                         if s.set_code == v.set_code:
-                             set_name = s.set_name
-                             sets.add(f"{s.set_name} | {s.set_code.split('-')[0]}")
-                             break
-
-                for e in v.entries:
-                    qty = e.quantity
-                    if qty <= 0: continue
-
-                    if self.state['in_storage_only']:
-                        # Showing items IN the current box
-                        if e.storage_location != target_loc: continue
-                    else:
-                        # Showing items NOT in ANY box (Unassigned) to add to current box
-                        if e.storage_location is not None: continue
-
-                    img_url = api_card.card_images[0].image_url_small if api_card.card_images else None
-                    if v.image_id:
-                        for img in api_card.card_images:
-                            if img.id == v.image_id:
-                                img_url = img.image_url_small
-                                break
-
-                    rows.append(StorageRow(
-                        api_card=api_card,
-                        set_code=v.set_code,
-                        set_name=set_name,
-                        rarity=v.rarity,
-                        image_url=img_url,
-                        quantity=qty,
-                        language=e.language,
-                        condition=e.condition,
-                        first_edition=e.first_edition,
-                        image_id=v.image_id,
-                        variant_id=v.variant_id,
-                        storage_location=e.storage_location
-                    ))
-
-        self.state['available_sets'] = sorted(list(sets))
-        self.state['available_monster_races'] = sorted(list(m_races))
+            v, e = ref.variant, ref.entry
+            names = set_names.get(api_card.id)
+            if names is None:
+                names = set_names[api_card.id] = {}
+                for s in reversed(api_card.card_sets or []):
+                    names[s.set_code] = s.set_name
+            set_name = names.get(v.set_code, "Unknown")
+
+            img_url = api_card.card_images[0].image_url_small if api_card.card_images else None
+            if v.image_id:
+                for img in api_card.card_images:
+                    if img.id == v.image_id:
+                        img_url = img.image_url_small
+                        break
+
+            rows.append(StorageRow(
+                api_card=api_card,
+                set_code=v.set_code,
+                set_name=set_name,
+                rarity=v.rarity,
+                image_url=img_url,
+                quantity=e.quantity,
+                language=e.language,
+                condition=e.condition,
+                first_edition=e.first_edition,
+                image_id=v.image_id,
+                variant_id=v.variant_id,
+                storage_location=e.storage_location
+            ))
+
+        metadata = ygo_service.get_filter_metadata(lang)
+        metadata.apply_to(self.state)
 
         # Ensure standard Spell/Trap types are always available
         standard_st_races = {"Normal", "Continuous", "Equip", "Field", "Quick-Play", "Ritual", "Counter"}
-        self.state['available_st_races'] = sorted(list(st_races.union(standard_st_races)))
-
-        self.state['available_archetypes'] = sorted(list(archetypes))
+        if not standard_st_races.issubset(metadata.st_races):
+            self.state['available_st_races'] = sorted(standard_st_races.union(metadata.st_races))
 
         if self.filter_pane: self.filter_pane.update_options()
 
@@ -489,123 +484,34 @@ class StoragePage:
 
         await self.apply_filters(reset_page=reset_page)
 
-    async def apply_filters(self, reset_page: bool = True):
-        res = list(self.state['rows'])
-
-        txt = self.state['search_text'].lower()
-        if txt:
-            res = [r for r in res if txt in r.api_card.name.lower() or txt in r.set_code.lower()]
-
-        if self.state['filter_rarity']:
-             res = [r for r in res if r.rarity.lower() == self.state['filter_rarity'].lower()]
-
-        if self.state['filter_attr']:
-             res = [r for r in res if r.api_card.attribute == self.state['filter_attr']]
-
-        if self.state['filter_card_type']:
-             ctypes = self.state['filter_card_type']
-             if isinstance(ctypes, str): ctypes = [ctypes]
-             res = [r for r in res if any(t in r.api_card.type for t in ctypes)]
-
-        # Set
-        if self.state['filter_set']:
-            target = self.state['filter_set']
-            res = [r for r in res if f"{r.set_name} | {r.set_code.split('-')[0]}" == target]
-
-        # Monster Type (Race)
-        if self.state['filter_monster_race']:
-            res = [r for r in res if r.api_card.race == self.state['filter_monster_race']]
-
-        # Spell/Trap Type (Race)
-        if self.state['filter_st_race']:
-            res = [r for r in res if r.api_card.race == self.state['filter_st_race']]
-
-        # Archetype
-        if self.state['filter_archetype']:
-            res = [r for r in res if r.api_card.archetype == self.state['filter_archetype']]
-
-        # Monster Category
-        if self.state['filter_monster_category']:
-            cats = self.state['filter_monster_category']
-            if isinstance(cats, str): cats = [cats]
-            if cats:
-                res = [r for r in res if any(r.api_card.matches_category(c) for c in cats)]
-
-        # Level/Rank
-        if self.state['filter_level'] is not None:
-             res = [r for r in res if r.api_card.level == self.state['filter_level']]
-
-        # ATK
-        if self.state['filter_atk_min'] > 0 or self.state['filter_atk_max'] < 5000:
-            min_v = self.state['filter_atk_min']
-            max_v = self.state['filter_atk_max']
-            res = [r for r in res if r.api_card.atk is not None and min_v <= r.api_card.atk <= max_v]
-
-        # DEF
-        if self.state['filter_def_min'] > 0 or self.state['filter_def_max'] < 5000:
-            min_v = self.state['filter_def_min']
-            max_v = self.state['filter_def_max']
-            res = [r for r in res if r.api_card.def_ is not None and min_v <= r.api_card.def_ <= max_v]
-
-        # Ownership Quantity
-        if self.state['filter_ownership_min'] > 0 or self.state['filter_ownership_max'] < self.state['max_owned_quantity']:
-            min_v = self.state['filter_ownership_min']
-            max_v = self.state['filter_ownership_max']
-            res = [r for r in res if min_v <= r.quantity <= max_v]
-
-        # Price
-        def get_price(card):
-            if not card.card_prices: return 0.0
-            try:
-                p = card.card_prices[0].tcgplayer_price
-                return float(p) if p else 0.0
-            except: return 0.0
-
-        if self.state['filter_price_min'] > 0 or self.state['filter_price_max'] < 1000:
-            min_v = self.state['filter_price_min']
-            max_v = self.state['filter_price_max']
-            res = [r for r in res if min_v <= get_price(r.api_card) <= max_v]
-
-        # Owned Language
-        if self.state['filter_owned_lang']:
-             res = [r for r in res if r.language == self.state['filter_owned_lang']]
-
-        # Condition
-        if self.state['filter_condition']:
-             conds = self.state['filter_condition']
-             if isinstance(conds, str): conds = [conds]
-             if conds:
-                res = [r for r in res if r.condition in conds]
-
-        key = self.state['storage_detail_sort_by']
-        desc = self.state['storage_detail_sort_desc']
-
-        if key == 'Name':
-            res.sort(key=lambda x: x.api_card.name, reverse=desc)
-        elif key == 'ATK':
-            res.sort(key=lambda x: (x.api_card.atk or -1), reverse=desc)
-        elif key == 'DEF':
-            res.sort(key=lambda x: (getattr(x.api_card, 'def_', None) or -1), reverse=desc)
-        elif key == 'Level':
-            res.sort(key=lambda x: (x.api_card.level or -1), reverse=desc)
-        elif key == 'Newest':
-            res.sort(key=lambda x: x.api_card.id, reverse=desc)
-        elif key == 'Price':
-             res.sort(key=lambda x: get_price(x.api_card), reverse=desc)
-        elif key == 'Quantity':
-             res.sort(key=lambda x: x.quantity, reverse=desc)
-        elif key == 'Set Code':
-            res.sort(key=lambda x: x.set_code, reverse=desc)
+    def _card_map(self, lang: str) -> Dict[int, ApiCard]:
+        """Catalog cards by id, shared by all pages until the database changes."""
+        return shared_view_models.get('card_map', lang, lambda: {c.id: c for c in ygo_service._cards_cache.get(lang, [])})
 
+    async def apply_filters(self, reset_page: bool = True):
+        self._reset_page_pending = self._reset_page_pending or reset_page
+        await self.filter_scheduler.request()
+
+    def _compute_filtered(self):
+        """Filters and sorts the storage rows; runs in the filter scheduler's worker."""
+        source = self.state['rows']
+        cols = self.filter_columns.get(source, build_storage_columns)
+        mask = cols.mask(self.state, search_text=self.state['search_text'],
+                         search_fields=('name', 'set_code'), category_match='any',
+                         text_index=ygo_service.get_text_index(config_manager.get_language()))
+        return cols.select_sorted(mask, self.state['storage_detail_sort_by'], self.state['storage_detail_sort_desc'])
+
+    async def _show_filtered(self, res):
         self.state['filtered_rows'] = res
         self.update_pagination()
 
-        if reset_page:
+        if self._reset_page_pending:
             self.state['page'] = 1
+            self._reset_page_pending = False
         elif self.state['page'] > self.state['total_pages']:
             self.state['page'] = max(1, self.state['total_pages'])
 
-        if hasattr(self, 'render_detail_grid'): self.render_detail_grid.refresh()
+        if hasattr(self, 'render_detail_grid'): self.update_detail_grid()
         if hasattr(self, 'render_pagination_controls'): self.render_pagination_controls.refresh()
 
     def update_pagination(self):
@@ -620,7 +526,7 @@ class StoragePage:
             if key == 'Name':
                 return s['name'].lower()
             elif key == 'Count':
-                return self.state['storage_counts'].get(s['name'], 0)
+                return self.storage_quantity(s['name'])
             return s['name']
 
         self.state['storages'].sort(key=get_sort_key, reverse=desc)
@@ -703,8 +609,14 @@ class StoragePage:
                 ui.icon('add_circle_outline', size='4xl', color='grey').classes('group-hover:text-primary transition-colors')
                 ui.label('Add Storage').classes('text-lg font-bold text-gray-400 group-hover:text-primary transition-colors')
 
+    def storage_quantity(self, name: str) -> int:
+        col = self.state['current_collection']
+        return col.storage_index.quantity(name) if col else 0
+
     def render_storage_card(self, storage):
-        count = self.state['storage_counts'].get(storage['name'], 0)
+        col = self.state['current_collection']
+        count = col.storage_index.quantity(storage['name']) if col else 0
+        value = col.storage_index.value(storage['name']) if col else 0.0
 
         with ui.card().classes('w-full p-0 cursor-pointer hover:scale-105 transition-transform border border-gray-700 bg-gray-800') \
                 .on('click', lambda s=storage: self.open_storage(s)):
@@ -714,8 +626,7 @@ class StoragePage:
                     src = f"/storage/{storage['image_path']}"
                     ui.image(src).classes('w-full h-full object-cover')
                 elif storage.get('set_code'):
-                    safe_code = "".join(c for c in storage['set_code'] if c.isalnum() or c in ('-', '_')).strip()
-                    src = f"/sets/{safe_code}.jpg"
+                    src = image_manager.get_set_image_url(storage['set_code'])
                     ui.image(src).classes('w-full h-full object-contain')
                 else:
                     ui.icon('inventory_2', size='4xl', color='grey').classes('absolute top-1/2 left-1/2 transform -translate-x-1/2 -translate-y-1/2')
@@ -725,7 +636,10 @@ class StoragePage:
 
                 with ui.row().classes('w-full justify-between items-center'):
                     ui.label(storage.get('type', 'Unknown')).classes('text-sm text-yellow-500 font-bold')
-                    ui.label(f"{count} Cards").classes('text-xs text-gray-400')
+                    with ui.row().classes('gap-2 items-center'):
+                        if value:
+                            ui.label(f"${value:,.2f}").classes('text-xs text-green-400')
+                        ui.label(f"{count} Cards").classes('text-xs text-gray-400')
 
                 if storage.get('description'):
                     ui.label(storage['description']).classes('text-xs text-gray-400 truncate w-full')
@@ -739,8 +653,7 @@ class StoragePage:
                  if s.get('image_path'):
                      ui.image(f"/storage/{s['image_path']}").classes('w-full h-full object-cover')
                  elif s.get('set_code'):
-                     safe_code = "".join(c for c in s['set_code'] if c.isalnum() or c in ('-', '_')).strip()
-                     ui.image(f"/sets/{safe_code}.jpg").classes('w-full h-full object-contain')
+                     ui.image(image_manager.get_set_image_url(s['set_code'])).classes('w-full h-full object-contain')
                  else:
                      ui.icon('inventory_2', size='xl', color='grey').classes('absolute top-1/2 left-1/2 transform -translate-x-1/2 -translate-y-1/2')
 
@@ -797,7 +710,7 @@ class StoragePage:
                 self.state['in_storage_only'] = e.value
                 update_action_label()
                 await self.load_detail_rows()
-                self.render_detail_grid.refresh()
+                self.update_detail_grid()
                 self.render_pagination_controls.refresh()
 
             ui.switch('In Storage', value=self.state['in_storage_only'], on_change=toggle_storage).props('color=secondary').classes('mr-4')
@@ -818,190 +731,157 @@ class StoragePage:
         with ui.row().classes('w-full justify-center mt-4'):
              self.render_pagination_controls()
 
-    @ui.refreshable
-    def render_detail_grid(self):
+    def _visible_rows(self) -> List[StorageRow]:
         rows = self.state['filtered_rows']
         start = (self.state['page'] - 1) * self.state['page_size']
         end = min(start + self.state['page_size'], len(rows))
-        visible_rows = rows[start:end]
-
-        with ui.grid(columns='repeat(auto-fill, minmax(160px, 1fr))').classes('w-full gap-4'):
-            for row in visible_rows:
-                self.render_card(row)
-
-    def _setup_card_tooltip(self, card: ApiCard, specific_image_id: int = None):
-        if not card: return
+        return rows[start:end]
 
-        # Determine target ID
-        if specific_image_id:
-            img_id = specific_image_id
+    def update_detail_grid(self):
+        """Shows the current page, sending only new rows to a grid that is still on screen."""
+        if self.detail_grid and not self.detail_grid.is_deleted:
+            self.detail_grid.set_items(self._visible_rows(), self.detail_grid_row)
         else:
-            img_id = card.get_best_image_id()
+            self.render_detail_grid.refresh()
 
-        high_res_url = None
-        low_res_url = None
+    @ui.refreshable
+    def render_detail_grid(self):
+        self.detail_grid = CardGrid(footer=48).classes('w-full')
+        self.detail_grid.on_card('card_contextmenu', self.handle_right_click)
+        self.detail_grid.on_card('tooltip_show', lambda r: ensure_tooltip_image(r.api_card, r.image_id))
+        self.detail_grid.set_items(self._visible_rows(), self.detail_grid_row)
+
+    def detail_grid_row(self, row: StorageRow) -> Dict:
+        lang_code = row.language.strip().upper()
+        country_code = LANGUAGE_COUNTRY_MAP.get(lang_code)
+        tip, fetch = tooltip_source(row.api_card, row.image_id)
+        return {
+            'img': row.image_url, 'tip': tip, 'fetch': fetch, 'accent': self.state['in_storage_only'],
+            'flag': image_manager.get_flag_image_url(country_code) if country_code else None, 'lang': lang_code,
+            'qty': row.quantity, 'cond': row.condition, 'ed': row.first_edition, 'code': row.set_code,
+            'title': row.api_card.name, 'sub': row.rarity,
+        }
 
-        # Try to find URL for this ID
-        if card.card_images:
-            target_img = next((img for img in card.card_images if img.id == img_id), None)
-            if target_img:
-                high_res_url = target_img.image_url
-                low_res_url = target_img.image_url_small
+    def on_collection_event(self, event):
+        """Collection event listener. May be called from worker threads, so it only queues."""
+        col = self.state['current_collection']
+        if isinstance(event, CollectionSaved):
+            # Saves of our own copy are already shown
+            if event.filename == self.state['selected_collection_file'] and (col is None or event.collection is not col):
+                self.collection_changes.put(event)
+        elif col is not None and event.collection is col:
+            self.collection_changes.put(event)
+
+    async def apply_collection_changes(self):
+        """
+        Applies the queued collection events to the gallery and the detail rows, without a full
+        reload (storage counts and values are kept by the collection's storage_index). Edits saved by other pages are replayed onto our copy of the collection
+        first, or it is reloaded if they are unknown.
+        """
+        changed = False
+        reload = False
+        entry_changes: List[EntryChanged] = []
+        while not self.collection_changes.empty():
+            event = self.collection_changes.get_nowait()
+            col = self.state['current_collection']
+            if isinstance(event, CollectionSaved):
+                if event.changes is None or col is None:
+                    reload = True
+                    continue
+                # Queues the replayed EntryChanged events, handled by this loop
+                CollectionEditor.replay_changes(col, event.changes)
+                if event.collection is not None:
+                    col.storage_definitions = [s.model_copy() for s in event.collection.storage_definitions]
+                    self.state['storages'] = storage_service.get_all_storage(col)
+                    self.sort_storages()
+                    reload = reload or self._current_storage_removed()
+            elif isinstance(event, EntryChanged) and event.collection is col:
+                entry_changes.append(event)
+                changed = True
+            elif isinstance(event, StorageRenamed) and event.collection is col:
+                changed = True
+
+        if reload:
+            await self.load_data()
+        elif changed:
+            if entry_changes:
+                async with self.filter_scheduler.exclusive():
+                    for event in entry_changes:
+                        self._apply_entry_change(event)
+            if self.state['view'] == 'detail':
+                await self.apply_filters(reset_page=False)
+                self.update_detail_grid()
             else:
-                 # Fallback to default if specific/best ID has no URL (e.g. custom) but we need a fallback for non-local
-                 high_res_url = card.card_images[0].image_url
-                 low_res_url = card.card_images[0].image_url_small
-
-        # Check local high-res existence immediately
-        is_local = image_manager.image_exists(img_id, high_res=True)
-        initial_src = f"/images/{img_id}_high.jpg" if is_local else (high_res_url or low_res_url)
-
-        if not initial_src:
-             return
-
-        # Create tooltip with transparent background and no padding
-        with ui.tooltip().classes('bg-transparent shadow-none border-none p-0 overflow-visible z-[9999] max-w-none') \
-                         .props('style="max-width: none" delay=1050') as tooltip:
-            # Image at 65vh height and 1000px min width for readability
-            if initial_src:
-                ui.image(initial_src).classes('w-auto h-[65vh] min-w-[1000px] object-contain rounded-lg shadow-2xl') \
-                                     .props('fit=contain')
-
-            # Trigger download on show if needed
-            if not is_local and high_res_url:
-                async def ensure_high():
-                    # Check again to avoid redundant downloads
-                    # Only download if we are not using a fallback URL for a custom ID
-
-                    real_target_id = img_id
-
-                    # Check if img_id corresponds to the URL
-                    is_exact_match = False
-                    if card.card_images:
-                        for img in card.card_images:
-                            if img.id == img_id:
-                                is_exact_match = True
-                                break
-
-                    if not is_exact_match and card.card_images:
-                        # We are using fallback. Download to default ID instead.
-                        real_target_id = card.card_images[0].id
-
-                    if not image_manager.image_exists(real_target_id, high_res=True):
-                         await image_manager.ensure_image(real_target_id, high_res_url, high_res=True)
-
-                tooltip.on('show', ensure_high)
-
-    def render_card(self, row: StorageRow):
-        opacity = "opacity-100"
-        border_color = "border-gray-700"
-        if self.state['in_storage_only']:
-            border_color = "border-accent"
-
-        with ui.card().classes(f'collection-card w-full p-0 cursor-pointer {opacity} border {border_color} hover:scale-105 transition-transform') \
-                .on('contextmenu.prevent', lambda e, r=row: self.handle_right_click(e, r)):
-
-            with ui.element('div').classes('relative w-full aspect-[2/3] bg-black'):
-                if row.image_url:
-                    ui.image(row.image_url).classes('w-full h-full object-cover')
-
-                self._setup_card_tooltip(row.api_card, specific_image_id=row.image_id)
-
-                lang_code = row.language.strip().upper()
-                country_code = LANGUAGE_COUNTRY_MAP.get(lang_code)
-                flag_url = image_manager.get_flag_image_url(country_code) if country_code else None
-
-                if flag_url:
-                     ui.image(flag_url).classes('absolute top-[1px] left-[1px] h-4 w-6 shadow-black drop-shadow-md rounded bg-black/30')
-                else:
-                     ui.label(lang_code).classes('absolute top-[1px] left-[1px] text-xs font-bold shadow-black drop-shadow-md bg-black/30 rounded px-1')
-
-                ui.label(f"{row.quantity}").classes('absolute top-1 right-1 bg-accent text-dark font-bold px-2 rounded-full text-xs')
-
-                with ui.row().classes('absolute bottom-0 left-0 bg-black/80 text-white text-[10px] px-1 gap-1 items-center rounded-tr'):
-                    ui.label(row.condition).classes('font-bold text-yellow-500')
-                    if row.first_edition:
-                         ui.label("1st").classes('font-bold text-orange-400')
-
-                ui.label(row.set_code).classes('absolute bottom-0 right-0 bg-black/80 text-white text-[10px] px-1 font-mono rounded-tl')
-
-            with ui.column().classes('p-2 gap-0 w-full'):
-                ui.label(row.api_card.name).classes('text-xs font-bold truncate w-full')
-                ui.label(row.rarity).classes('text-[10px] text-gray-400')
-
-    async def _update_view_model(self, card_id, variant_id, set_code, rarity, language, condition, first_edition, image_id, quantity_change, storage_location=None):
-        """Updates the in-memory rows and refreshes the grid without full reload."""
-        rows = self.state['rows']
-
-        # Determine if we should ignore this update based on current view filter (storage location)
-        # We display cards where row.storage_location matches the current view target.
-        # target_loc is the specific storage name, or None (if viewing Unassigned).
+                self.sort_storages()
+                self.render_content.refresh()
+            if hasattr(self, 'render_undo_button'): self.render_undo_button.refresh()
+
+    def _current_storage_removed(self) -> bool:
+        current = self.state['current_storage']
+        return current is not None and not any(s['name'] == current['name'] for s in self.state['storages'])
+
+    def _apply_entry_change(self, event: EntryChanged):
+        """
+        Patches the detail rows with an entry change, if the entry is in view. Call within
+        filter_scheduler.exclusive(), as filter passes read the rows and their columns in a worker thread.
+        """
+        if self.state['view'] != 'detail' or not self.state['current_storage']:
+            return
+        # We display cards where row.storage_location matches the current view target:
+        # the specific storage name, or None (if viewing Unassigned).
         target_loc = self.state['current_storage']['name'] if self.state['in_storage_only'] else None
-
-        if storage_location != target_loc:
-            # This update is for a storage location not currently being viewed.
+        if event.storage_location != target_loc:
             return
 
-        target_row = None
-        target_index = -1
-
-        # Find existing row
-        for i, row in enumerate(rows):
-            if (row.variant_id == variant_id and
-                row.language == language and
-                row.condition == condition and
-                row.first_edition == first_edition and
-                row.storage_location == storage_location):
-                target_row = row
-                target_index = i
-                break
-
-        if target_row:
-            target_row.quantity += quantity_change
+        rows = self.state['rows']
+        self.filter_columns.invalidate()
+
+        target_index = next((i for i, row in enumerate(rows)
+                             if row.variant_id == event.variant_id and
+                                row.language == event.language and
+                                row.condition == event.condition and
+                                row.first_edition == event.first_edition and
+                                row.storage_location == event.storage_location), -1)
+
+        if target_index >= 0:
+            target_row = rows[target_index]
+            target_row.quantity += event.quantity_delta
             if target_row.quantity <= 0:
                 rows.pop(target_index)
-        elif quantity_change > 0:
-            # Create new row if adding
-            lang = config_manager.get_language()
-            cards = ygo_service._cards_cache.get(lang, [])
-            api_card = next((c for c in cards if c.id == card_id), None)
-
-            if api_card:
-                # Resolve Set Name
-                set_name = "Unknown"
-                if api_card.card_sets:
-                    for s in api_card.card_sets:
-                         if s.set_code == set_code:
-                             set_name = s.set_name
-                             break
-
-                # Resolve Image URL
-                img_url = api_card.card_images[0].image_url_small if api_card.card_images else None
-                if image_id and api_card.card_images:
-                     for img in api_card.card_images:
-                         if img.id == image_id:
-                             img_url = img.image_url_small
-                             break
-
-                new_row = StorageRow(
-                    api_card=api_card,
-                    set_code=set_code,
-                    set_name=set_name,
-                    rarity=rarity,
-                    image_url=img_url,
-                    quantity=quantity_change,
-                    language=language,
-                    condition=condition,
-                    first_edition=first_edition,
-                    image_id=image_id,
-                    variant_id=variant_id,
-                    storage_location=storage_location
-                )
-                rows.append(new_row)
-
-        await self.apply_filters(reset_page=False)
-        self.render_detail_grid.refresh()
-        if hasattr(self, 'render_undo_button'): self.render_undo_button.refresh()
+        elif event.quantity_delta > 0:
+            # Prefer the card of the displayed database language
+            api_card = self._card_map(config_manager.get_language()).get(event.api_card.id, event.api_card)
+
+            # Resolve Set Name
+            set_name = "Unknown"
+            if api_card.card_sets:
+                for s in api_card.card_sets:
+                     if s.set_code == event.set_code:
+                         set_name = s.set_name
+                         break
+
+            # Resolve Image URL
+            img_url = api_card.card_images[0].image_url_small if api_card.card_images else None
+            if event.image_id and api_card.card_images:
+                 for img in api_card.card_images:
+                     if img.id == event.image_id:
+                         img_url = img.image_url_small
+                         break
+
+            rows.append(StorageRow(
+                api_card=api_card,
+                set_code=event.set_code,
+                set_name=set_name,
+                rarity=event.rarity,
+                image_url=img_url,
+                quantity=event.quantity_delta,
+                language=event.language,
+                condition=event.condition,
+                first_edition=event.first_edition,
+                image_id=event.image_id,
+                variant_id=event.variant_id,
+                storage_location=event.storage_location
+            ))
 
     async def undo_last_action(self):
         col_name = self.state['selected_collection_file']
@@ -1028,7 +908,6 @@ class StoragePage:
                 data = change['card_data']
                 revert_qty = -qty if action == 'ADD' else qty
 
-                # 1. Update Backend Collection
                 api_card = await get_api_card(data['card_id'])
                 if api_card:
                     CollectionEditor.apply_change(
@@ -1046,25 +925,6 @@ class StoragePage:
                         storage_location=data.get('storage_location')
                     )
 
-                # 2. Update Frontend View Model
-                # Check if this change entry corresponds to the current view
-                view_loc = self.state['current_storage']['name'] if self.state['in_storage_only'] else None
-                change_loc = data.get('storage_location')
-
-                if change_loc == view_loc:
-                    await self._update_view_model(
-                        card_id=data['card_id'],
-                        variant_id=data.get('variant_id'),
-                        set_code=data.get('set_code', ''),
-                        rarity=data.get('rarity', ''),
-                        language=data['language'],
-                        condition=data['condition'],
-                        first_edition=data['first_edition'],
-                        image_id=data.get('image_id'),
-                        quantity_change=revert_qty,
-                        storage_location=change_loc
-                    )
-
             if last_change.get('type') == 'batch':
                 changes = last_change.get('changes', [])
                 for c in changes:
@@ -1074,12 +934,13 @@ class StoragePage:
                 await apply_revert(last_change)
                 ui.notify(f"Undid: {last_change.get('action')}", type='positive')
 
+            await self.apply_collection_changes()
             # Schedule save instead of immediate blocking
             self.schedule_save()
         else:
             ui.notify("Nothing to undo.", type='warning')
 
-    async def handle_right_click(self, e, row: StorageRow):
+    async def handle_right_click(self, row: StorageRow):
         col = self.state['current_collection']
         storage_name = self.state['current_storage']['name']
         qty = 1
@@ -1139,25 +1000,7 @@ class StoragePage:
             msg = "Not enough copies available!" if not self.state['in_storage_only'] else "Not enough copies in storage!"
 
         if success:
-            # Update View Model
-            # Right Click in this view ALWAYS implies removing the card from the CURRENT view context
-            # (either moving it OUT of storage, or moving it INTO storage which removes it from Unassigned view)
-
-            view_loc = self.state['current_storage']['name'] if self.state['in_storage_only'] else None
-
-            await self._update_view_model(
-                card_id=row.api_card.id,
-                variant_id=row.variant_id,
-                set_code=row.set_code,
-                rarity=row.rarity,
-                language=row.language,
-                condition=row.condition,
-                first_edition=row.first_edition,
-                image_id=row.image_id,
-                quantity_change=-qty,
-                storage_location=view_loc
-            )
-
+            await self.apply_collection_changes()
             self.schedule_save()
             ui.notify(msg, type='positive')
         else:
@@ -1182,7 +1025,7 @@ class StoragePage:
         if self.state['total_pages'] <= 1: return
         async def change_p(delta):
             self.state['page'] += delta
-            self.render_detail_grid.refresh()
+            self.update_detail_grid()
             self.render_pagination_controls.refresh()
         with ui.row().classes('items-center gap-2'):
             ui.button(icon='chevron_left', on_click=lambda: change_p(-1)).props('flat dense color=white').set_enabled(self.state['page'] > 1)
@@ -1205,6 +1048,10 @@ class StoragePage:
         self.render_content()
         ui.timer(0.1, self.load_data, once=True)
 
+        # Not on_disconnect, which also fires when the client reconnects
+        ui.context.client.on_delete(lambda: collection_events.unsubscribe(self.on_collection_event))
+        ui.timer(0.5, self.apply_collection_changes)
+
     async def reset_filters(self):
         self.state['search_text'] = ''
         self.state['filter_rarity'] = ''
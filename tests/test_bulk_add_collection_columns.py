@@ -0,0 +1,49 @@
+import unittest
+from unittest.mock import AsyncMock, patch
+from src.ui.bulk_add import BulkAddPage, BulkCollectionEntry
+from src.core.models import ApiCard
+
+def entry(variant_id, card_id, name, quantity):
+    api_card = ApiCard(id=card_id, name=name, type="Normal Monster", desc="", frameType="normal")
+    return BulkCollectionEntry(id=f"{variant_id}_EN_Near Mint_False_None", api_card=api_card, quantity=quantity,
+                               set_code="LOB-EN001", set_name="LOB", rarity="Common", language="EN",
+                               condition="Near Mint", first_edition=False, image_url=None, image_id=card_id, variant_id=variant_id, price=0.0)
+
+class TestBulkAddCollectionColumns(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        for target in ('persistence', 'changelog_manager', 'ygo_service', 'ui', 'StructureDeckDialog'):
+            patcher = patch(f'src.ui.bulk_add.{target}')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = patch('src.ui.bulk_add.config_manager')
+        patcher.start().get_language.return_value = 'en'
+        self.addCleanup(patcher.stop)
+
+        self.page = BulkAddPage()
+        self.page.apply_collection_filters = AsyncMock()
+        self.entries = [entry("a", 1, "Alpha", 1), entry("b", 2, "Beta", 2), entry("c", 3, "Gamma", 3)]
+        self.page.col_state.update({'collection_cards': self.entries, 'sort_by': 'Quantity', 'sort_desc': True,
+                                    'search_text': ''})
+
+    def names(self):
+        return [e.api_card.name for e in self.page._compute_collection_filtered()]
+
+    async def _update(self, e, qty, mode='ADD'):
+        await self.page._update_view_model(e.api_card, e.set_code, e.rarity, e.language, qty, e.condition,
+                                           e.first_edition, e.image_id, e.variant_id, mode)
+
+    async def test_quantity_edits_resort(self):
+        self.assertEqual(self.names(), ["Gamma", "Beta", "Alpha"])
+        await self._update(self.entries[0], 5, mode='SET')
+        self.assertEqual(self.names(), ["Alpha", "Gamma", "Beta"])
+
+    async def test_remove_and_add_of_same_length(self):
+        self.assertEqual(self.names(), ["Gamma", "Beta", "Alpha"])
+        delta = entry("d", 4, "Delta", 9)
+        await self._update(self.entries[1], -2)
+        await self._update(delta, 9)
+        self.assertEqual(len(self.entries), 3)
+        self.assertEqual(self.names(), ["Delta", "Gamma", "Alpha"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,43 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, AsyncMock, patch
+import sys
+
+# Mock nicegui
+mock_ui = MagicMock()
+sys.modules['nicegui'] = mock_ui
+sys.modules['nicegui.ui'] = mock_ui
+
+from src.core.models import ApiCard, ApiCardImage
+from src.ui.components.card_grid import tooltip_source, ensure_tooltip_image
+
+class TestCardGridTooltips(unittest.TestCase):
+    def setUp(self):
+        self.card = ApiCard(id=46986414, name="Dark Magician", type="Normal Monster", frameType="normal", desc="",
+                            card_images=[ApiCardImage(id=46986414, image_url="https://img/46986414.jpg", image_url_small="https://img/s/46986414.jpg"),
+                                         ApiCardImage(id=46986415, image_url="https://img/46986415.jpg", image_url_small="https://img/s/46986415.jpg")])
+        patcher = patch('src.ui.components.card_grid.image_manager')
+        self.image_manager = patcher.start()
+        self.image_manager.ensure_image = AsyncMock()
+        self.addCleanup(patcher.stop)
+        self.local = set()
+        self.image_manager.image_exists.side_effect = lambda img_id, high_res=False: img_id in self.local
+
+    def test_source_prefers_local_high_res(self):
+        self.assertEqual(tooltip_source(self.card, 46986415), ("https://img/46986415.jpg", True))
+        self.local.add(46986415)
+        self.assertEqual(tooltip_source(self.card, 46986415), ("/images/46986415_high.jpg", False))
+        # Unknown artwork falls back to the default image
+        self.assertEqual(tooltip_source(self.card, 999), ("https://img/46986414.jpg", True))
+        self.assertEqual(tooltip_source(None), (None, False))
+
+    def test_ensure_downloads_missing_image_once(self):
+        asyncio.run(ensure_tooltip_image(self.card, 999))
+        self.image_manager.ensure_image.assert_awaited_once_with(46986414, "https://img/46986414.jpg", high_res=True)
+
+        self.local.add(46986414)
+        asyncio.run(ensure_tooltip_image(self.card))
+        self.assertEqual(self.image_manager.ensure_image.await_count, 1)
+
+if __name__ == '__main__':
+    unittest.main()
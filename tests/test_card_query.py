@@ -0,0 +1,154 @@
+import unittest
+from unittest.mock import patch
+from dataclasses import dataclass
+from typing import Optional
+from src.core.models import ApiCard
+from src.services.filter_engine import FilterColumns
+from src.services.text_index import CardTextIndex
+from src.services import card_query
+from src.services.card_query import parse, compile_query, evaluate_query, QueryError, Term, Text, Not, And, Or
+
+@dataclass
+class Row:
+    card: ApiCard
+    set_code: str
+    set_name: str
+    rarity: str
+    qty: int = 0
+    price: float = 0.0
+    language: str = "EN"
+    storage: Optional[str] = None
+
+class TestQueryParser(unittest.TestCase):
+    def test_terms_words_and_operators(self):
+        self.assertEqual(parse('atk>=2500 attr:DARK rarity:"Ultra Rare"'), And((
+            Term('atk', '>=', '2500'), Term('attr', '=', 'DARK'), Term('rarity', '=', 'Ultra Rare'))))
+        self.assertEqual(parse('"dark magician" OR -lang:DE'), Or((Text('dark magician'), Not(Term('lang', '=', 'DE')))))
+        self.assertEqual(parse('(set:LOB OR set:SDY) cond!=Played'), And((
+            Or((Term('set', '=', 'LOB'), Term('set', '=', 'SDY'))), Not(Term('condition', '=', 'Played')))))
+        self.assertEqual(parse('Blue-Eyes'), Text('Blue-Eyes'))
+        self.assertIsNone(parse('   '))
+
+    def test_errors(self):
+        for query in ['atck>1', 'atk>lots', 'attr>DARK', 'name:"open', '(set:LOB', 'set:LOB)', 'OR', 'level:']:
+            with self.assertRaises(QueryError, msg=query):
+                parse(query)
+
+class TestQueryPlan(unittest.TestCase):
+    def setUp(self):
+        dm = ApiCard(id=1, name="Dark Magician", type="Normal Monster", frameType="normal", desc="The ultimate wizard.",
+                     attribute="DARK", race="Spellcaster", atk=2500, def_=2100, level=7, typeline=["Spellcaster", "Normal"])
+        be = ApiCard(id=2, name="Blue-Eyes White Dragon", type="Normal Monster", frameType="normal", desc="Legendary dragon.",
+                     attribute="LIGHT", race="Dragon", atk=3000, def_=2500, level=8, typeline=["Dragon", "Normal"])
+        pot = ApiCard(id=3, name="Pot of Greed", type="Spell Card", frameType="spell", desc="Draw 2 cards.", race="Normal")
+        self.cards = [dm, be, pot]
+        self.rows = [
+            Row(dm, "SDY-006", "Starter Deck: Yugi", "Ultra Rare", qty=3, price=1.5, language="DE", storage="Binder 3"),
+            Row(dm, "LOB-005", "Legend of Blue Eyes White Dragon", "Ultra Rare", qty=0, price=40.0),
+            Row(be, "LOB-001", "Legend of Blue Eyes White Dragon", "Ultra Rare", qty=1, price=80.0, language="DE"),
+            Row(pot, "LOB-119", "Legend of Blue Eyes White Dragon", "Rare", qty=5, price=0.5),
+            Row(pot, "LOBE-EN119", "Legend of Blue Eyes White Dragon Europe", "Rare", qty=0, price=0.5),
+        ]
+        self.cols = FilterColumns(
+            self.rows, card_of=lambda r: r.card,
+            sets_of=lambda r: [(r.set_code, r.set_name, r.rarity)],
+            qty_of=lambda r: r.qty, price_of=lambda r: r.price,
+            languages_of=lambda r: [r.language] if r.qty else [],
+            storages_of=lambda r: [r.storage or 'None']
+        )
+        self.text_index = CardTextIndex(self.cards)
+
+    def _codes(self, query):
+        mask = compile_query(query).evaluate(self.cols, self.text_index)
+        return [r.set_code for r in self.cols.select(mask)]
+
+    def test_example_query(self):
+        self.assertEqual(self._codes('atk>=2500 attr:DARK set:SDY rarity:"Ultra Rare" owned>0 lang:DE storage:"Binder 3"'),
+                         ["SDY-006"])
+
+    def test_fields_share_filter_pane_semantics(self):
+        pairs = [
+            ('attr:dark', {'filter_attr': 'DARK'}),
+            ('type:spell', {'filter_card_type': ['Spell']}),
+            ('rarity:"ultra rare"', {'filter_rarity': 'Ultra Rare'}),
+            ('level:8', {'filter_level': 8}),
+            ('price<=1', {'filter_price_min': 0.0, 'filter_price_max': 1.0}),
+            ('storage:"binder 3"', {'filter_storage': ['Binder 3']}),
+            ('category:normal', {'filter_monster_category': ['Normal']}),
+        ]
+        for query, state in pairs:
+            expected = [r.set_code for r in self.cols.select(self.cols.mask(state))]
+            self.assertEqual(self._codes(query), expected, query)
+
+    def test_set_prefix_is_strict_when_known(self):
+        self.assertEqual(self._codes('set:LOB'), ["LOB-005", "LOB-001", "LOB-119"])
+        # Not a known prefix: substring on set code or name, like typed set text
+        self.assertEqual(self._codes('set:europe'), ["LOBE-EN119"])
+
+    def test_boolean_logic_and_text(self):
+        self.assertEqual(self._codes('set:LOB -type:spell'), ["LOB-005", "LOB-001"])
+        self.assertEqual(self._codes('owned>=3 OR price>50'), ["SDY-006", "LOB-001", "LOB-119"])
+        self.assertEqual(self._codes('(attr:LIGHT OR name:greed) owned>0'), ["LOB-001", "LOB-119"])
+        self.assertEqual(self._codes('desc:"draw 2" set:LOB'), ["LOB-119"])
+        # Misspelled names fall back to the fuzzy index
+        self.assertEqual(self._codes('name:"dark magican" set:LOB'), ["LOB-005"])
+        self.assertEqual(self._codes(''), [r.set_code for r in self.rows])
+
+    def test_planner_runs_selective_index_terms_first(self):
+        plan = compile_query('desc:wizard atk>2000 rarity:"Ultra Rare" set:SDY')
+        self.assertEqual(plan.explain(self.cols), [
+            "AND",
+            "  set = 'SDY' [cost 0]",
+            "  rarity = 'Ultra Rare' [cost 0]",
+            "  atk > '2000' [cost 2]",
+            "  desc = 'wizard' [cost 3]",
+        ])
+        # The text term only sees the single row left by the index terms
+        with patch.object(card_query, '_text_rows', wraps=card_query._text_rows) as spy:
+            plan.evaluate(self.cols, self.text_index)
+            self.assertEqual(len(spy.call_args[0][2]), 1)
+
+    def test_planner_ranks_text_terms_by_index_estimate(self):
+        plan = compile_query('type:monster rarity:"Ultra Rare" name:"blue-eyes white"')
+        self.assertEqual(plan.explain(self.cols, self.text_index), [
+            "AND",
+            "  name = 'blue-eyes white' [cost 0, ~1 rows]",
+            "  rarity = 'Ultra Rare' [cost 0]",
+            "  type = 'monster' [cost 2]",
+        ])
+        # Without a text index (or for short texts) text terms still run last
+        self.assertEqual(plan.explain(self.cols)[-1], "  name = 'blue-eyes white' [cost 3]")
+        self.assertEqual(compile_query('ey type:monster').explain(self.cols, self.text_index)[-1], "  text 'ey' [cost 3]")
+
+        with patch.object(card_query, '_text_rows', wraps=card_query._text_rows) as spy:
+            self.assertEqual([r.set_code for r in self.cols.select(plan.evaluate(self.cols, self.text_index))], ["LOB-001"])
+            self.assertEqual(len(spy.call_args[0][2]), len(self.rows))
+
+    def test_fuzzy_fallback_does_not_depend_on_plan_order(self):
+        toon = ApiCard(id=4, name="Blue Eyes Toon", type="Toon Monster", frameType="effect", desc="")
+        be = self.cards[1]
+        cols = FilterColumns([Row(toon, "TOON-001", "Toon", "Rare"), Row(be, "SDK-001", "Starter Deck: Kaiba", "Ultra Rare")],
+                             card_of=lambda r: r.card, sets_of=lambda r: [(r.set_code, r.set_name, r.rarity)])
+        text_index = CardTextIndex([toon, be])
+
+        def codes(query):
+            return [r.set_code for r in cols.select(compile_query(query).evaluate(cols, text_index))]
+
+        # "blue eyes" matches literally in some row, so it is not fuzzy-matched to "Blue-Eyes"
+        self.assertEqual(codes('name:"blue eyes"'), ["TOON-001"])
+        self.assertEqual(codes('set:SDK name:"blue eyes"'), [])
+        self.assertEqual(codes('set:SDK -name:"blue eyes"'), ["SDK-001"])
+        # Without any literal match the fuzzy names apply, whatever the other terms
+        self.assertEqual(codes('set:SDK -name:"blue eyez white"'), [])
+        self.assertEqual(codes('set:SDK name:"blue eyez white"'), ["SDK-001"])
+
+    def test_unavailable_field_reports_error(self):
+        cols = FilterColumns(self.cards, card_of=lambda c: c)
+        mask, error = evaluate_query('storage:"Binder 3"', cols)
+        self.assertTrue(mask.all())
+        self.assertIn("storage", error)
+        mask, error = evaluate_query('atk>2600', cols)
+        self.assertEqual((mask.tolist(), error), ([False, True, False], ''))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import asyncio
+import unittest
+from unittest.mock import patch, AsyncMock
+from src.core.models import ApiCard, ApiCardSet
+from src.services.catalog_metadata import CatalogMetadata
+from src.services.ygo_api import YugiohService
+
+class TestCatalogMetadata(unittest.TestCase):
+    def setUp(self):
+        self.cards = [
+            ApiCard(id=1, name="Dark Magician", type="Normal Monster", frameType="normal", desc="",
+                    attribute="DARK", race="Spellcaster", archetype="Dark Magician",
+                    card_sets=[ApiCardSet(set_name="Starter Deck: Yugi", set_code="SDY-006", set_rarity="Ultra Rare"),
+                               ApiCardSet(set_name="Legend of Blue Eyes White Dragon", set_code="LOB-EN005", set_rarity="Ultra Rare")]),
+            ApiCard(id=2, name="Pot of Greed", type="Spell Card", frameType="spell", desc="", race="Normal",
+                    card_sets=[ApiCardSet(set_name="Legend of Blue Eyes White Dragon", set_code="LOB-EN119", set_rarity="Rare")]),
+            ApiCard(id=3, name="Mirror Force", type="Trap Card", frameType="trap", desc="", race="Normal"),
+        ]
+
+    def test_vocabularies(self):
+        metadata = CatalogMetadata(self.cards)
+        self.assertEqual(metadata.sets, ["Legend of Blue Eyes White Dragon | LOB", "Starter Deck: Yugi | SDY"])
+        self.assertEqual(metadata.monster_races, ["Spellcaster"])
+        self.assertEqual(metadata.st_races, ["Normal"])
+        self.assertEqual(metadata.archetypes, ["Dark Magician"])
+        self.assertEqual(metadata.rarities, ["Rare", "Ultra Rare"])
+        self.assertEqual(metadata.attributes, ["DARK"])
+
+    def test_service_updates_metadata_when_variants_are_added(self):
+        service = YugiohService.__new__(YugiohService)
+        service._cards_cache = {"en": self.cards}
+        service._db_versions = {}
+        service._filter_metadata = {}
+
+        first = service.get_filter_metadata("en")
+        self.assertIs(service.get_filter_metadata("en"), first)
+        sets_before = first.sets
+
+        with patch.object(service, '_save_db_file'), patch('src.services.ygo_api.run.io_bound', new=AsyncMock()):
+            asyncio.run(service.add_card_variant(3, "Metal Raiders", "MRD-EN138", "Super Rare"))
+            self.assertIs(service.get_filter_metadata("en"), first)
+            self.assertEqual(first.sets, ["Legend of Blue Eyes White Dragon | LOB", "Metal Raiders | MRD",
+                                          "Starter Deck: Yugi | SDY"])
+            self.assertEqual(first.rarities, ["Rare", "Super Rare", "Ultra Rare"])
+            # Lists handed out earlier are left untouched
+            self.assertEqual(len(sets_before), 2)
+
+            # Other changes rebuild the metadata
+            asyncio.run(service.save_card_database(self.cards[:2], "en"))
+        rebuilt = service.get_filter_metadata("en")
+        self.assertIsNot(rebuilt, first)
+        self.assertEqual(rebuilt.st_races, ["Normal"])
+        self.assertNotIn("Metal Raiders | MRD", rebuilt.sets)
+
+if __name__ == '__main__':
+    unittest.main()
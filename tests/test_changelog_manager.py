@@ -0,0 +1,77 @@
+import unittest
+import tempfile
+import shutil
+import os
+import json
+from src.core.changelog_manager import ChangelogManager
+
+class TestChangelogManager(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.manager = ChangelogManager(self.tmp_dir, segment_max_bytes=400)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _log(self, manager, n, start=0):
+        for i in range(start, start + n):
+            manager.log_change("col.json", "ADD", {"card_id": i, "set_code": f"LOB-{i:03d}"}, 1)
+
+    def test_append_last_and_undo(self):
+        self._log(self.manager, 3)
+        self.assertEqual(self.manager.get_last_change("col.json")['card_data']['card_id'], 2)
+        self.assertEqual([h['id'] for h in self.manager.load_history("col.json")], [1, 2, 3])
+
+        undone = self.manager.undo_last_change("col.json")
+        self.assertEqual(undone['card_data']['card_id'], 2)
+        self.assertEqual(self.manager.get_last_change("col.json")['card_data']['card_id'], 1)
+        self.assertEqual(len(self.manager.load_history("col.json")), 2)
+
+        self.manager.undo_last_change("col.json")
+        self.manager.undo_last_change("col.json")
+        self.assertIsNone(self.manager.undo_last_change("col.json"))
+        self.assertIsNone(self.manager.get_last_change("col.json"))
+
+    def test_segments_roll_over_and_undo_across_them(self):
+        self._log(self.manager, 20)
+        rolled = [f for f in os.listdir(self.tmp_dir) if f.startswith("col.json.log.") and f[-1].isdigit()]
+        self.assertGreater(len(rolled), 1)
+
+        history = self.manager.load_history("col.json")
+        self.assertEqual([h['card_data']['card_id'] for h in history], list(range(20)))
+
+        for expected in reversed(range(20)):
+            self.assertEqual(self.manager.undo_last_change("col.json")['card_data']['card_id'], expected)
+        self.assertEqual(self.manager.load_history("col.json"), [])
+
+    def test_counter_survives_restart(self):
+        self._log(self.manager, 5)
+        reopened = ChangelogManager(self.tmp_dir, segment_max_bytes=400)
+        self._log(reopened, 1, start=5)
+        self.assertEqual(reopened.get_last_change("col.json")['id'], 6)
+        self.assertEqual(len(reopened.load_history("col.json")), 6)
+
+    def test_legacy_log_without_index(self):
+        path = os.path.join(self.tmp_dir, "old.json.log")
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(1, 4):
+                f.write(json.dumps({"action": "ADD", "quantity": 1, "card_data": {}, "type": "single", "id": i, "timestamp": i}) + "\n")
+
+        self.assertEqual(self.manager.get_last_change("old.json")['id'], 3)
+        self.manager.log_change("old.json", "REMOVE", {}, 1)
+        self.assertEqual(self.manager.get_last_change("old.json")['id'], 4)
+        self.assertEqual(self.manager.undo_last_change("old.json")['action'], "REMOVE")
+        self.assertEqual(self.manager.undo_last_change("old.json")['id'], 3)
+
+    def test_torn_tail_is_dropped(self):
+        self._log(self.manager, 2)
+        with open(os.path.join(self.tmp_dir, "col.json.log"), 'ab') as f:
+            f.write(b'{"action": "ADD", "quan')
+
+        reopened = ChangelogManager(self.tmp_dir, segment_max_bytes=400)
+        self.assertEqual(reopened.get_last_change("col.json")['id'], 2)
+        self._log(reopened, 1, start=2)
+        self.assertEqual([h['id'] for h in reopened.load_history("col.json")], [1, 2, 3])
+
+if __name__ == '__main__':
+    unittest.main()
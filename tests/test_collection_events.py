@@ -0,0 +1,171 @@
+import asyncio
+import gc
+import unittest
+import tempfile
+import shutil
+import os
+from unittest.mock import MagicMock, patch
+import sys
+
+# Mock nicegui
+mock_ui = MagicMock()
+sys.modules['nicegui'] = mock_ui
+sys.modules['nicegui.ui'] = mock_ui
+
+from src.core.collection_events import collection_events, EntryChanged, StorageRenamed, CollectionSaved
+from src.core.persistence import PersistenceManager
+from src.core.models import ApiCard, ApiCardSet, Collection, StorageDefinition
+from src.services.collection_editor import CollectionEditor
+from src.ui.collection import CollectionPage, build_consolidated_vms, build_collector_rows
+
+def card(id, name, sets):
+    return ApiCard(id=id, name=name, type="Normal Monster", frameType="normal", desc="",
+                   card_sets=[ApiCardSet(set_name="Set", set_code=c, set_rarity="Ultra Rare") for c in sets])
+
+class TestCollectionEvents(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.pm = PersistenceManager(data_dir=self.tmp_dir, decks_dir=os.path.join(self.tmp_dir, "decks"))
+        self.pm.save_collection(Collection(name="Test"), "test.json")
+
+        self.events = []
+        collection_events.subscribe(self.events.append)
+        self.addCleanup(collection_events.unsubscribe, self.events.append)
+        self.cards = [card(1, "Dark Magician", ["SDY-006", "LOB-005"]), card(2, "Blue-Eyes White Dragon", ["LOB-001"])]
+
+    def _add(self, collection, api_card, set_code, quantity, storage_location=None, mode='ADD'):
+        CollectionEditor.apply_change(collection, api_card, set_code, "Ultra Rare", "EN", quantity,
+                                      "Near Mint", False, mode=mode, storage_location=storage_location)
+
+    def test_editor_publishes_changes(self):
+        col = self.pm.load_collection("test.json")
+        self._add(col, self.cards[0], "SDY-006", 2)
+        self._add(col, self.cards[0], "SDY-006", 5, mode='SET')
+        CollectionEditor.move_card(col, self.cards[0], "SDY-006", "Ultra Rare", "EN", "Near Mint", False,
+                                   from_storage=None, to_storage="Box A", quantity=5)
+        CollectionEditor.rename_storage_location(col, "Box A", "Box B")
+
+        kinds = [(type(e).__name__, getattr(e, 'quantity_delta', None), getattr(e, 'storage_location', None)) for e in self.events]
+        self.assertEqual(kinds, [
+            ('VariantAdded', None, None), ('EntryChanged', 2, None), ('EntryChanged', 3, None),
+            ('EntryChanged', -5, None), ('VariantRemoved', None, None),
+            ('VariantAdded', None, None), ('EntryChanged', 5, 'Box A'),
+            ('StorageRenamed', None, None),
+        ])
+        self.assertTrue(all(e.collection is col for e in self.events))
+
+    def test_saves_carry_changes_for_other_copies(self):
+        ours = self.pm.load_collection("test.json")
+        theirs = self.pm.load_collection("test.json")
+
+        self._add(theirs, self.cards[0], "SDY-006", 2, storage_location="Box A")
+        self._add(theirs, self.cards[1], "LOB-001", 1)
+        CollectionEditor.rename_storage_location(theirs, "Box A", "Box B")
+        self.pm.save_collection(theirs, "test.json")
+
+        saved = self.events[-1]
+        self.assertIsInstance(saved, CollectionSaved)
+        self.assertIs(saved.collection, theirs)
+        self.assertEqual(len(saved.changes), 5)
+        # Recorded changes do not keep the collection alive
+        self.assertTrue(all(c.collection is None for c in saved.changes))
+
+        self.assertTrue(CollectionEditor.replay_changes(ours, saved.changes))
+        self.assertEqual(ours.model_dump(), self.pm.load_collection("test.json").model_dump())
+        self.assertEqual(ours.ownership.storage(1), {"Box B": 2})
+
+        # Replayed edits are published, but not recorded as our unsaved changes
+        self.assertIsInstance(self.events[-1], StorageRenamed)
+        self.assertIs(self.events[-1].collection, ours)
+        self.assertEqual(collection_events.take_changes(ours), ())
+
+        # Nothing changed since the last save
+        self.pm.save_collection(theirs, "test.json")
+        self.assertEqual(self.events[-1].changes, ())
+
+    def test_untracked_and_failed_saves(self):
+        col = Collection(name="New")
+        self._add(col, self.cards[0], "SDY-006", 1)
+        self.pm.save_collection(col, "new.json")
+        self.assertIsNone(self.events[-1].changes)
+
+        # Tracked once saved
+        self._add(col, self.cards[0], "SDY-006", 1)
+        with patch.object(self.pm, '_replace_file', side_effect=OSError("locked")):
+            with self.assertRaises(OSError):
+                self.pm.save_collection(col, "new.json")
+        self._add(col, self.cards[1], "LOB-001", 1)
+        self.pm.save_collection(col, "new.json")
+        self.assertEqual([e.api_card.id for e in self.events[-1].changes if isinstance(e, EntryChanged)], [1, 2])
+
+    def test_collected_collections_are_forgotten(self):
+        col = self.pm.load_collection("test.json")
+        key = id(col)
+        self.assertIn(key, collection_events._unsaved)
+        self._add(col, self.cards[0], "SDY-006", 1)
+        del col
+        self.events.clear()
+        gc.collect()
+        self.assertNotIn(key, collection_events._unsaved)
+
+class TestCollectionPageEvents(unittest.TestCase):
+    def setUp(self):
+        patcher = patch('src.ui.collection.persistence')
+        persistence_mock = patcher.start()
+        persistence_mock.list_collections.return_value = []
+        persistence_mock.load_ui_state.return_value = {}
+        self.addCleanup(patcher.stop)
+        patcher = patch('src.ui.collection.config_manager')
+        patcher.start().get_language.return_value = 'en'
+        self.addCleanup(patcher.stop)
+
+        self.cards = [card(1, "Dark Magician", ["SDY-006", "LOB-005"]), card(2, "Blue-Eyes White Dragon", ["LOB-001"])]
+        self.collection = Collection(name="Test", storage_definitions=[StorageDefinition(name="Box A")])
+        self.page = CollectionPage()
+        self.addCleanup(collection_events.unsubscribe, self.page.on_collection_event)
+        self.page.prepare_current_page_images = MagicMock(side_effect=lambda: asyncio.sleep(0))
+        self.page.load_data = MagicMock(side_effect=lambda **kw: asyncio.sleep(0))
+        self.page.state.update({'current_collection': self.collection, 'selected_file': 'test.json',
+                                'view_scope': 'collectors', 'language': 'EN'})
+        self.page.state['cards_consolidated'] = build_consolidated_vms(self.cards, {})
+        self.page.state['cards_collectors'] = build_collector_rows(self.cards, {}, 'EN')
+
+    def _expect_rebuilt(self):
+        owned = {c.card_id: c for c in self.collection.cards}
+        self.assertEqual(self.page.state['cards_collectors'], build_collector_rows(self.cards, owned, 'EN'))
+        self.assertEqual(self.page.state['cards_consolidated'], build_consolidated_vms(self.cards, owned))
+
+    def test_own_edits_are_patched(self):
+        CollectionEditor.apply_change(self.collection, self.cards[0], "LOB-005", "Ultra Rare", "EN", 2, "Near Mint", False, mode='ADD')
+        CollectionEditor.apply_change(Collection(name="Other"), self.cards[1], "LOB-001", "Ultra Rare", "EN", 1, "Near Mint", False, mode='ADD')
+        self.assertEqual(self.page.collection_changes.qsize(), 2)
+
+        asyncio.run(self.page.apply_collection_changes())
+        self._expect_rebuilt()
+        self.page.load_data.assert_not_called()
+
+    def test_other_pages_saves_are_replayed(self):
+        theirs = Collection(name="Test", storage_definitions=[StorageDefinition(name="Box A"), StorageDefinition(name="Box B")])
+        CollectionEditor.apply_change(theirs, self.cards[1], "LOB-001", "Ultra Rare", "EN", 3, "Near Mint", False,
+                                      mode='ADD', storage_location="Box B")
+        changes = (EntryChanged(None, self.cards[1], theirs.cards[0].variants[0].variant_id, "LOB-001", "Ultra Rare",
+                                None, "EN", "Near Mint", False, "Box B", 3),)
+        collection_events.publish(CollectionSaved(theirs, "test.json", changes))
+        collection_events.publish(CollectionSaved(theirs, "other.json", changes))
+        # Our own saves are ignored
+        collection_events.publish(CollectionSaved(self.collection, "test.json", ()))
+
+        asyncio.run(self.page.apply_collection_changes())
+        self.assertEqual(self.collection.ownership.storage(2), {"Box B": 3})
+        self.assertEqual(self.page.state['available_storage'], ['None', 'Box A', 'Box B'])
+        self._expect_rebuilt()
+        self.page.load_data.assert_not_called()
+
+        # Unknown changes reload
+        collection_events.publish(CollectionSaved(None, "test.json", None))
+        asyncio.run(self.page.apply_collection_changes())
+        self.page.load_data.assert_called_once_with(keep_page=True)
+
+if __name__ == '__main__':
+    unittest.main()
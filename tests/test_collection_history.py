@@ -0,0 +1,93 @@
+import unittest
+import tempfile
+import shutil
+import os
+from unittest.mock import patch, MagicMock
+from src.core.models import Collection, ApiCard
+from src.core.persistence import PersistenceManager
+from src.core.changelog_manager import ChangelogManager
+from src.services.collection_editor import CollectionEditor
+from src.services import collection_history
+
+class TestCollectionHistory(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cm = ChangelogManager(os.path.join(self.tmp_dir, "changelogs"), checkpoint_interval=2)
+        self.pm = PersistenceManager(data_dir=self.tmp_dir, decks_dir=os.path.join(self.tmp_dir, "decks"), changelog=self.cm)
+
+        self.clock = MagicMock()
+        self.patchers = [
+            patch('src.services.collection_history.persistence', self.pm),
+            patch('src.services.collection_history.changelog_manager', self.cm),
+            patch('src.core.changelog_manager.time', self.clock),
+        ]
+        for p in self.patchers:
+            p.start()
+
+        self.dm = ApiCard(id=1001, name="Dark Magician", type="Normal Monster", frameType="normal", desc="")
+        self.be = ApiCard(id=1002, name="Blue-Eyes White Dragon", type="Normal Monster", frameType="normal", desc="")
+
+        # Timeline: 100 create, 110 +3 DM, 120 +1 BE, 130 DM set to 1, 140 -1 BE
+        self.col = Collection(name="History")
+        self._at(100, lambda: self.pm.save_collection(self.col, "h.json"))
+        self._change(110, self.dm, "SDY-006", 'ADD', 3)
+        self._change(120, self.be, "LOB-001", 'ADD', 1, save=True)
+        self._change(130, self.dm, "SDY-006", 'SET', 1)
+        self._change(140, self.be, "LOB-001", 'REMOVE', 1, save=True)
+
+    def tearDown(self):
+        for p in self.patchers:
+            p.stop()
+        shutil.rmtree(self.tmp_dir)
+
+    def _at(self, ts, fn):
+        self.clock.time.return_value = ts
+        fn()
+
+    def _change(self, ts, card, set_code, mode, qty, save=False):
+        def do():
+            CollectionEditor.apply_change(self.col, card, set_code, "Ultra Rare", "EN",
+                                          -qty if mode == 'REMOVE' else qty, "Near Mint", False,
+                                          mode='SET' if mode == 'SET' else 'ADD')
+            self.cm.log_change("h.json", mode, {
+                'card_id': card.id, 'name': card.name, 'set_code': set_code, 'rarity': "Ultra Rare",
+                'language': "EN", 'condition': "Near Mint", 'first_edition': False
+            }, qty)
+            if save:
+                self.pm.save_collection(self.col, "h.json")
+        self._at(ts, do)
+
+    def _quantities(self, collection):
+        return {c.card_id: c.total_quantity for c in collection.cards if c.total_quantity > 0}
+
+    def test_checkpoints_written_periodically(self):
+        meta = self.cm._load_meta(self.cm._get_filepath("h.json"))
+        self.assertEqual([c[0] for c in meta['checkpoints']], [0, 2, 4])
+
+    def test_reconstruct_replays_from_nearest_checkpoint(self):
+        self.assertEqual(self._quantities(collection_history.reconstruct("h.json", 115)), {1001: 3})
+        self.assertEqual(self._quantities(collection_history.reconstruct("h.json", 200)), {1001: 1})
+
+        with patch('src.services.collection_history.UndoService.apply_forward',
+                   wraps=collection_history.UndoService.apply_forward) as spy:
+            result = collection_history.reconstruct("h.json", 135)
+            self.assertEqual(spy.call_count, 1)
+        self.assertEqual(self._quantities(result), {1001: 1, 1002: 1})
+        self.assertEqual(result.name, "History")
+
+    def test_undo_drops_checkpoints_containing_the_record(self):
+        self.cm.undo_last_change("h.json")
+        self.assertEqual(self._quantities(collection_history.reconstruct("h.json", 200)), {1001: 1, 1002: 1})
+
+    def test_restore_to_is_logged_and_replayable(self):
+        self.clock.time.return_value = 150
+        count = collection_history.restore_to("h.json", 125)
+        self.assertEqual(count, 2)
+
+        restored = self.pm.load_collection("h.json")
+        self.assertEqual(self._quantities(restored), {1001: 3, 1002: 1})
+        self.assertTrue(self.cm.get_last_change("h.json")['description'].startswith("Restored to"))
+        self.assertEqual(self._quantities(collection_history.reconstruct("h.json", 200)), {1001: 3, 1002: 1})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import asyncio
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+
+# Mock nicegui
+mock_ui = MagicMock()
+sys.modules['nicegui'] = mock_ui
+sys.modules['nicegui.ui'] = mock_ui
+
+from src.ui.collection import (CollectionPage, build_consolidated_vms, build_collector_rows,
+                               build_collector_columns, CardRowIndex)
+from src.core.models import ApiCard, ApiCardSet, Collection
+from src.services.collection_editor import CollectionEditor
+
+def card(id, name, atk, sets):
+    return ApiCard(id=id, name=name, type="Normal Monster", frameType="normal", desc="", atk=atk,
+                   card_sets=[ApiCardSet(set_name=n, set_code=c, set_rarity=r, set_price="1.00") for c, n, r in sets])
+
+class TestCollectionInMemoryUpdate(unittest.TestCase):
+    def setUp(self):
+        self.persistence_patcher = patch('src.ui.collection.persistence')
+        self.persistence_mock = self.persistence_patcher.start()
+        self.persistence_mock.list_collections.return_value = []
+        self.persistence_mock.load_ui_state.return_value = {}
+        self.config_patcher = patch('src.ui.collection.config_manager')
+        self.config_patcher.start().get_language.return_value = 'en'
+
+        self.cards = [
+            card(1, "Dark Magician", 2500, [("SDY-006", "Starter Deck: Yugi", "Ultra Rare"),
+                                            ("LOB-005", "Legend of Blue Eyes", "Ultra Rare")]),
+            card(2, "Blue-Eyes White Dragon", 3000, [("LOB-001", "Legend of Blue Eyes", "Ultra Rare")]),
+            card(3, "Celtic Guardian", 1400, [("LOB-007", "Legend of Blue Eyes", "Super Rare")]),
+        ]
+        self.collection = Collection(name="Test")
+
+        self.page = CollectionPage()
+        self.page.prepare_current_page_images = MagicMock(side_effect=lambda: asyncio.sleep(0))
+        self.page.state.update({'current_collection': self.collection, 'view_scope': 'collectors',
+                                'language': 'EN', 'sort_by': 'ATK', 'sort_descending': True})
+        self.page.state['cards_consolidated'] = build_consolidated_vms(self.cards, {})
+        self.page.state['cards_collectors'] = build_collector_rows(self.cards, {}, 'EN')
+
+    def tearDown(self):
+        self.persistence_patcher.stop()
+        self.config_patcher.stop()
+
+    def _edit(self, api_card, set_code, quantity, mode='ADD', language='EN'):
+        CollectionEditor.apply_change(self.collection, api_card, set_code, "Ultra Rare", language, quantity,
+                                      "Near Mint", False, mode=mode)
+        self.page._update_in_memory(api_card)
+
+    def _codes(self):
+        return [(r.api_card.id, r.set_code, r.language, r.owned_count) for r in self.page.state['filtered_items']]
+
+    def test_edits_match_a_full_rebuild(self):
+        self.page.state['filter_atk_min'] = 2000
+        asyncio.run(self.page.apply_filters())
+        cols = self.page.filter_columns['collectors'].get(self.page.state['cards_collectors'], build_collector_columns)
+
+        self._edit(self.cards[0], "LOB-005", 2)
+        self._edit(self.cards[0], "LOB-005", 1, language='DE')
+        self._edit(self.cards[1], "LOB-001", 1)
+        self._edit(self.cards[0], "LOB-005", 0, mode='SET')
+
+        owned = {c.card_id: c for c in self.collection.cards}
+        expected_rows = build_collector_rows(self.cards, owned, 'EN')
+        self.assertEqual(self.page.state['cards_collectors'], expected_rows)
+        self.assertEqual(self.page.state['cards_consolidated'], build_consolidated_vms(self.cards, owned))
+
+        asyncio.run(self.page.apply_filters())
+        # The columns were patched, not rebuilt, and agree with freshly built ones
+        self.assertIs(self.page.filter_columns['collectors'].get(self.page.state['cards_collectors'],
+                                                                 build_collector_columns), cols)
+        self.assertEqual(self._codes(), [
+            (2, "LOB-001", "EN", 1), (1, "SDY-006", "EN", 0), (1, "LOB-005", "DE", 1),
+        ])
+        fresh = build_collector_columns(expected_rows)
+        self.assertEqual(self.page.state['filtered_items'],
+                         fresh.select_sorted(fresh.mask(self.page.state), 'ATK', True))
+
+    def test_row_index_spans(self):
+        index = CardRowIndex(self.page.state['cards_collectors'])
+        self.assertEqual([index.span(i) for i in (1, 2, 3, 4)], [(0, 2), (2, 3), (3, 4), None])
+        index.resize(1, 3)
+        self.assertEqual(index.span(3), (4, 5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import tempfile
+import shutil
+import os
+from unittest.mock import patch
+from src.core.models import Collection, ApiCard, StorageDefinition
+from src.core.persistence import PersistenceManager
+from src.services.collection_editor import CollectionEditor
+from src.services.collection_merge import CollectionMerger, merge_collection_files
+
+class TestCollectionMergeEngine(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pm = PersistenceManager(data_dir=self.tmp_dir, decks_dir=os.path.join(self.tmp_dir, "decks"))
+        self.patcher = patch('src.services.collection_merge.persistence', self.pm)
+        self.patcher.start()
+
+        self.dm = ApiCard(id=1001, name="Dark Magician", type="Normal Monster", frameType="normal", desc="")
+        self.be = ApiCard(id=1002, name="Blue-Eyes White Dragon", type="Normal Monster", frameType="normal", desc="")
+
+        self.coll_a = Collection(name="A", storage_definitions=[StorageDefinition(name="Binder", type="Binder")])
+        CollectionEditor.apply_change(self.coll_a, self.dm, "SDY-006", "Ultra Rare", "EN", 1, "Near Mint", True, mode='ADD', storage_location="Binder")
+        CollectionEditor.apply_change(self.coll_a, self.be, "LOB-001", "Ultra Rare", "EN", 1, "Near Mint", True, mode='ADD')
+
+        self.coll_b = Collection(name="B", storage_definitions=[StorageDefinition(name="Binder", type="Box")])
+        CollectionEditor.apply_change(self.coll_b, self.dm, "SDY-006", "Ultra Rare", "EN", 2, "Near Mint", True, mode='ADD', storage_location="Binder")
+        CollectionEditor.apply_change(self.coll_b, self.dm, "SDY-006", "Ultra Rare", "EN", 1, "Played", True, mode='ADD', storage_location="Binder")
+
+        self.coll_c = Collection(name="C")
+        CollectionEditor.apply_change(self.coll_c, self.dm, "SDY-006", "Ultra Rare", "EN", 4, "Near Mint", True, mode='ADD')
+
+    def tearDown(self):
+        self.patcher.stop()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_sums_matching_keys_and_reports_conflicts(self):
+        merger = CollectionMerger()
+        for c in (self.coll_a, self.coll_b, self.coll_c):
+            merger.add(c)
+
+        # DM NM Binder: 1 + 2, DM Played Binder: 1, DM NM no storage: 4, BE: 1
+        self.assertEqual(len(merger.entries), 4)
+        var_id = self.coll_a.cards[0].variants[0].variant_id
+        self.assertEqual(merger.entries[(1001, var_id, "EN", "Near Mint", True, "Binder")]['quantity'], 3)
+        self.assertEqual(merger.entries[(1001, var_id, "EN", "Near Mint", True, None)]['quantity'], 4)
+
+        self.assertEqual([c.kind for c in merger.conflicts], ['storage'])
+        self.assertEqual(merger.storage["Binder"]["type"], "Binder")
+
+    def test_merge_files_streams_valid_collection(self):
+        for c, f in ((self.coll_a, "a.json"), (self.coll_b, "b.json"), (self.coll_c, "c.json")):
+            self.pm.save_collection(c, f)
+
+        result = merge_collection_files(["a.json", "b.json", "c.json"], "merged.json", "Merged")
+        self.assertEqual(result.total_quantity, 9)
+        self.assertEqual(result.unique_cards, 2)
+        self.assertEqual(len(result.conflicts), 1)
+
+        # Streamed file must carry a valid header (trusted path) and match full validation
+        with patch('src.core.persistence.Collection', wraps=Collection) as mock_col:
+            trusted = self.pm.load_collection("merged.json")
+            mock_col.assert_not_called()
+        validated = self.pm.load_collection("merged.json", trusted=False)
+        self.assertEqual(trusted.model_dump(), validated.model_dump())
+        self.assertEqual(validated.total_cards, 9)
+        self.assertEqual(validated.name, "Merged")
+
+        stats = self.pm.load_collection_stats("merged.json")
+        self.assertIsNotNone(stats)
+        self.assertEqual(stats.total_qty, 9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import tempfile
+import shutil
+import os
+import time
+from src.core.models import Collection, ApiCard
+from src.core.collection_stats import CollectionStats
+from src.core.persistence import PersistenceManager
+from src.services.collection_editor import CollectionEditor
+
+class TestCollectionStats(unittest.TestCase):
+    def setUp(self):
+        self.collection = Collection(name="Stats")
+        self.card1 = ApiCard(id=1, name="Dark Magician", type="Normal Monster", frameType="normal", desc="")
+        self.card2 = ApiCard(id=2, name="Pot of Greed", type="Spell Card", frameType="spell", desc="")
+
+    def _assert_matches_rebuild(self):
+        live = self.collection.stats
+        rebuilt = CollectionStats.from_collection(self.collection)
+        self.assertEqual(live.total_qty, rebuilt.total_qty)
+        self.assertAlmostEqual(live.total_value, rebuilt.total_value)
+        self.assertEqual(live.unique_cards, rebuilt.unique_cards)
+        self.assertEqual(live.unique_variants, rebuilt.unique_variants)
+        self.assertEqual(live.rarity_dist, rebuilt.rarity_dist)
+        self.assertEqual(live.condition_dist, rebuilt.condition_dist)
+        self.assertEqual(live.language_dist, rebuilt.language_dist)
+
+    def test_incremental_updates_match_full_rebuild(self):
+        # Build stats before mutating so every change goes through the incremental path
+        self.assertEqual(self.collection.total_cards, 0)
+
+        CollectionEditor.apply_change(self.collection, self.card1, "SDY-006", "Ultra Rare", "EN", 3, "Near Mint", False, mode='ADD')
+        CollectionEditor.apply_change(self.collection, self.card1, "SDY-006", "Ultra Rare", "DE", 1, "Played", False, mode='ADD')
+        CollectionEditor.apply_change(self.collection, self.card2, "LOB-119", "Rare", "EN", 2, "Near Mint", True, mode='ADD')
+        self._assert_matches_rebuild()
+        self.assertEqual(self.collection.stats.unique_cards, 2)
+        self.assertEqual(self.collection.stats.unique_variants, 2)
+        self.assertEqual(self.collection.total_cards, 6)
+
+        # SET to a lower value and remove a whole card
+        CollectionEditor.apply_change(self.collection, self.card1, "SDY-006", "Ultra Rare", "EN", 1, "Near Mint", False, mode='SET')
+        CollectionEditor.apply_change(self.collection, self.card2, "LOB-119", "Rare", "EN", -2, "Near Mint", True, mode='ADD')
+        self._assert_matches_rebuild()
+        self.assertEqual(self.collection.stats.unique_cards, 1)
+        self.assertNotIn("Rare", self.collection.stats.rarity_dist)
+        self.assertEqual(self.collection.total_cards, 2)
+
+    def test_value_tracks_market_value(self):
+        CollectionEditor.apply_change(self.collection, self.card1, "SDY-006", "Ultra Rare", "EN", 2, "Near Mint", False, mode='ADD')
+        self.collection.cards[0].variants[0].entries[0].market_value = 5.0
+        # Direct edits are not tracked; a rebuild picks them up
+        self.collection._stats = None
+        self.assertAlmostEqual(self.collection.total_value, 10.0)
+
+        CollectionEditor.apply_change(self.collection, self.card1, "SDY-006", "Ultra Rare", "EN", 1, "Near Mint", False, mode='ADD')
+        self.assertAlmostEqual(self.collection.total_value, 15.0)
+
+class TestCollectionStatsSidecar(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pm = PersistenceManager(data_dir=self.tmp_dir, decks_dir=os.path.join(self.tmp_dir, "decks"))
+        self.collection = Collection(name="Sidecar")
+        card = ApiCard(id=1, name="Dark Magician", type="Normal Monster", frameType="normal", desc="")
+        CollectionEditor.apply_change(self.collection, card, "SDY-006", "Ultra Rare", "EN", 3, "Near Mint", False, mode='ADD')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_sidecar_written_and_fresh(self):
+        self.pm.save_collection(self.collection, "col.json")
+        self.assertNotIn("col.json.stats", self.pm.list_collections())
+
+        stats = self.pm.load_collection_stats("col.json")
+        self.assertIsNotNone(stats)
+        self.assertEqual(stats.total_qty, 3)
+        self.assertEqual(stats.name, "Sidecar")
+
+    def test_stale_sidecar_is_rebuilt(self):
+        self.pm.save_collection(self.collection, "col.json")
+
+        # Simulate an external edit of the collection file
+        path = os.path.join(self.tmp_dir, "col.json")
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content.replace('"quantity": 3', '"quantity": 7'))
+        future = time.time() + 10
+        os.utime(path, (future, future))
+
+        self.assertIsNone(self.pm.load_collection_stats("col.json"))
+        stats = self.pm.get_collection_stats("col.json")
+        self.assertEqual(stats.total_qty, 7)
+        self.assertIsNotNone(self.pm.load_collection_stats("col.json"))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+import unittest
+from unittest.mock import patch
+from dataclasses import dataclass
+from typing import List, Optional
+from src.core.models import ApiCard
+from src.services.filter_engine import FilterColumns, FilterColumnsCache, SORT_KEYS
+
+@dataclass
+class Row:
+    card: ApiCard
+    set_code: str
+    set_name: str
+    rarity: str
+    qty: int = 0
+    price: float = 0.0
+    language: str = "EN"
+    storage: Optional[str] = None
+
+def build(rows: List[Row]) -> FilterColumns:
+    return FilterColumns(
+        rows,
+        card_of=lambda r: r.card,
+        sets_of=lambda r: [(r.set_code, r.set_name, r.rarity)],
+        qty_of=lambda r: r.qty,
+        price_of=lambda r: r.price,
+        languages_of=lambda r: [r.language],
+        storages_of=lambda r: [r.storage or 'None']
+    )
+
+class TestFilterEngine(unittest.TestCase):
+    def setUp(self):
+        self.dm = ApiCard(id=1, name="Dark Magician", type="Normal Monster", frameType="normal",
+                          desc="The ultimate wizard.", attribute="DARK", race="Spellcaster",
+                          atk=2500, def_=2100, level=7, typeline=["Spellcaster", "Normal"])
+        self.be = ApiCard(id=2, name="Blue-Eyes White Dragon", type="Normal Monster", frameType="normal",
+                          desc="This legendary dragon.", attribute="LIGHT", race="Dragon",
+                          atk=3000, def_=2500, level=8, typeline=["Dragon", "Normal"])
+        self.bls = ApiCard(id=3, name="Black Luster Soldier", type="Ritual Effect Monster", frameType="ritual",
+                           desc="Ritual.", attribute="EARTH", race="Warrior",
+                           atk=3000, def_=2500, level=8, typeline=["Warrior", "Ritual", "Effect"])
+        self.pot = ApiCard(id=4, name="Pot of Greed", type="Spell Card", frameType="spell",
+                           desc="Draw 2 cards.", race="Normal")
+        self.rows = [
+            Row(self.dm, "SDY-006", "Starter Deck: Yugi", "Ultra Rare", qty=3, price=1.5, storage="Binder 1"),
+            Row(self.dm, "LOB-005", "Legend of Blue Eyes White Dragon", "Ultra Rare", qty=0, price=40.0),
+            Row(self.be, "LOB-001", "Legend of Blue Eyes White Dragon", "Ultra Rare", qty=1, price=80.0, language="DE"),
+            Row(self.bls, "SRL-EN000", "Spell Ruler", "Ultra Rare", qty=2, price=5.0),
+            Row(self.pot, "LOBE-EN119", "Legend of Blue Eyes White Dragon", "Rare", qty=5, price=2500.0),
+        ]
+        self.cols = build(self.rows)
+
+    def _ids(self, state, **kwargs):
+        return [r.set_code for r in self.cols.select(self.cols.mask(state, **kwargs))]
+
+    def test_card_level_filters(self):
+        self.assertEqual(self._ids({'filter_card_type': ['Spell']}), ["LOBE-EN119"])
+        self.assertEqual(self._ids({'filter_attr': 'DARK'}), ["SDY-006", "LOB-005"])
+        self.assertEqual(self._ids({'filter_attr': 'WIND'}), [])
+        self.assertEqual(self._ids({'filter_monster_race': 'Dragon'}), ["LOB-001"])
+        # Race filters only match cards of the right kind
+        self.assertEqual(self._ids({'filter_monster_race': 'Normal'}), [])
+        self.assertEqual(self._ids({'filter_st_race': 'Normal'}), ["LOBE-EN119"])
+        self.assertEqual(self._ids({'filter_level': 8}), ["LOB-001", "SRL-EN000"])
+        self.assertEqual(self._ids({'filter_atk_min': 2600, 'filter_atk_max': 5000}), ["LOB-001", "SRL-EN000"])
+
+    def test_category_all_and_any(self):
+        state = {'filter_monster_category': ['Normal', 'Ritual']}
+        self.assertEqual(self._ids(state, category_match='all'), [])
+        self.assertEqual(self._ids(state, category_match='any'), ["SDY-006", "LOB-005", "LOB-001", "SRL-EN000"])
+
+    def test_set_and_rarity(self):
+        # Picked from the dropdown: strict prefix
+        self.assertEqual(self._ids({'filter_set': 'Legend of Blue Eyes White Dragon | LOB'}), ["LOB-005", "LOB-001"])
+        # Typed text: substring on code or name
+        self.assertEqual(self._ids({'filter_set': 'lob'}), ["LOB-005", "LOB-001", "LOBE-EN119"])
+        self.assertEqual(self._ids({'filter_set': 'ruler'}), ["SRL-EN000"])
+        self.assertEqual(self._ids({'filter_rarity': 'rare'}), ["LOBE-EN119"])
+
+    def test_row_level_ranges_apply_only_when_narrowed(self):
+        # Default slider bounds keep rows priced above the slider limit
+        self.assertEqual(len(self._ids({'filter_price_min': 0.0, 'filter_price_max': 1000.0})), 5)
+        self.assertEqual(self._ids({'filter_price_min': 10.0, 'filter_price_max': 100.0}), ["LOB-005", "LOB-001"])
+        self.assertEqual(self._ids({'filter_ownership_min': 2, 'filter_ownership_max': 3}), ["SDY-006", "SRL-EN000"])
+        self.assertEqual(self._ids({}, only_owned=True), ["SDY-006", "LOB-001", "SRL-EN000", "LOBE-EN119"])
+
+    def test_multi_valued_columns(self):
+        self.assertEqual(self._ids({'filter_owned_lang': 'DE'}), ["LOB-001"])
+        self.assertEqual(self._ids({'filter_storage': ['Binder 1']}), ["SDY-006"])
+        self.assertEqual(len(self._ids({'filter_storage': ['None']})), 4)
+
+    def test_search(self):
+        self.assertEqual(self._ids({}, search_text="MAGICIAN"), ["SDY-006", "LOB-005"])
+        self.assertEqual(self._ids({}, search_text="draw 2"), ["LOBE-EN119"])
+        self.assertEqual(self._ids({}, search_text="lob-00"), ["LOB-005", "LOB-001"])
+        self.assertEqual(self._ids({}, search_text="draw", search_fields=('name',)), [])
+        self.assertEqual(self._ids({}, search_text="spell ruler", search_fields=('set_name',)), ["SRL-EN000"])
+
+    def test_cache_rebuilds_on_new_rows_or_invalidate(self):
+        cache = FilterColumnsCache()
+        first = cache.get(self.rows, build)
+        self.assertIs(cache.get(self.rows, build), first)
+
+        self.rows.append(Row(self.pot, "SDJ-042", "Starter Deck: Joey", "Common"))
+        appended = cache.get(self.rows, build)
+        self.assertIsNot(appended, first)
+        self.assertEqual(appended.n, 6)
+
+        cache.invalidate()
+        self.assertIsNot(cache.get(self.rows, build), appended)
+
+    def test_unchanged_filters_reuse_cached_masks(self):
+        state = {'filter_attr': 'DARK', 'filter_rarity': 'Ultra Rare'}
+        with patch.object(self.cols, 'attribute_rows', wraps=self.cols.attribute_rows) as attr_spy, \
+             patch.object(self.cols, 'rarity_rows', wraps=self.cols.rarity_rows) as rarity_spy:
+            first = self.cols.mask(state)
+            state['filter_rarity'] = 'Rare'
+            self.cols.mask(state)
+            state['filter_rarity'] = 'Ultra Rare'
+            again = self.cols.mask(state)
+
+        self.assertEqual(attr_spy.call_count, 1)
+        self.assertEqual(rarity_spy.call_count, 2)
+        self.assertEqual(first.tolist(), again.tolist())
+
+    def test_extended_search_refines_previous_result(self):
+        self.assertEqual(self._ids({}, search_text="dark"), ["SDY-006", "LOB-005"])
+        with patch.object(self.cols, 'search', wraps=self.cols.search) as spy:
+            self.assertEqual(self._ids({}, search_text="dark mag"), ["SDY-006", "LOB-005"])
+        self.assertEqual(spy.call_args_list[0].kwargs['within'].tolist(), [0, 1])
+
+        # Not an extension: searched from scratch
+        with patch.object(self.cols, 'search', wraps=self.cols.search) as spy:
+            self.assertEqual(self._ids({}, search_text="greed"), ["LOBE-EN119"])
+        self.assertIsNone(spy.call_args_list[0].kwargs['within'])
+
+    def test_sort_orders_match_list_sort(self):
+        keys = {
+            'Name': lambda r: r.card.name,
+            'ATK': lambda r: r.card.atk or -1,
+            'DEF': lambda r: r.card.def_ or -1,
+            'Level': lambda r: r.card.level or -1,
+            'Newest': lambda r: r.card.id,
+            'Price': lambda r: r.price,
+            'Quantity': lambda r: r.qty,
+            'Set Code': lambda r: r.set_code,
+        }
+        self.assertEqual(set(keys), set(SORT_KEYS))
+        mask = self.cols.mask({'filter_rarity': 'Ultra Rare'})
+        for key, sort_key in keys.items():
+            for descending in (False, True):
+                expected = sorted(self.cols.select(mask), key=sort_key, reverse=descending)
+                self.assertEqual(self.cols.select_sorted(mask, key, descending), expected, (key, descending))
+
+        self.assertIs(self.cols.sort_order('ATK', True), self.cols.sort_order('ATK', True))
+        # Unknown keys and missing columns keep the row order
+        cards = FilterColumns([self.pot, self.dm], card_of=lambda c: c)
+        everything = cards.mask({})
+        self.assertEqual(cards.select_sorted(everything, 'Quantity'), [self.pot, self.dm])
+        self.assertEqual(cards.select_sorted(everything, 'Rarity'), [self.pot, self.dm])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import asyncio
+import threading
+import unittest
+from src.services.filter_scheduler import FilterScheduler
+
+class TestFilterScheduler(unittest.IsolatedAsyncioTestCase):
+    async def test_burst_is_coalesced_into_one_pass(self):
+        state = {'text': ''}
+        computed, applied = [], []
+
+        def compute():
+            computed.append(state['text'])
+            return state['text'].upper()
+
+        async def apply(result):
+            applied.append(result)
+
+        scheduler = FilterScheduler(compute, apply, delay=0.05)
+        requests = []
+        for text in ['d', 'da', 'dar', 'dark']:
+            state['text'] = text
+            requests.append(asyncio.create_task(scheduler.request()))
+            await asyncio.sleep(0)
+        await asyncio.gather(*requests)
+
+        self.assertEqual(computed, ['dark'])
+        self.assertEqual(applied, ['DARK'])
+
+    async def test_running_pass_is_superseded(self):
+        started, release = threading.Event(), threading.Event()
+        calls, applied = [], []
+
+        def compute():
+            calls.append(len(calls))
+            if len(calls) == 1:
+                started.set()
+                release.wait(5)
+            return len(calls)
+
+        async def apply(result):
+            applied.append(result)
+
+        scheduler = FilterScheduler(compute, apply, delay=0)
+        first = asyncio.create_task(scheduler.request())
+        await asyncio.to_thread(started.wait, 5)
+        second = asyncio.create_task(scheduler.request())
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(first, second)
+
+        # Both callers waited for the newest pass; the stale result was never applied
+        self.assertEqual(applied, [2])
+
+    async def test_exclusive_waits_for_the_running_pass_without_blocking_the_loop(self):
+        started, release = threading.Event(), threading.Event()
+        rows, applied, patched = ['a'], [], []
+
+        def compute():
+            if not started.is_set():
+                started.set()
+                release.wait(5)
+            return list(rows)
+
+        async def apply(result):
+            applied.append(result)
+
+        async def patch():
+            async with scheduler.exclusive():
+                rows.append('b')
+                patched.append(True)
+
+        scheduler = FilterScheduler(compute, apply, delay=0)
+        request = asyncio.create_task(scheduler.request())
+        await asyncio.to_thread(started.wait, 5)
+        patcher = asyncio.create_task(patch())
+
+        # The loop keeps running while the patch waits for the compute in the worker
+        ticks = 0
+        for _ in range(5):
+            await asyncio.wait_for(asyncio.sleep(0.01), 1)
+            ticks += 1
+        self.assertEqual(ticks, 5)
+        self.assertEqual(patched, [])
+
+        release.set()
+        await asyncio.wait_for(asyncio.gather(request, patcher), 5)
+        # The pass computed before the patch was dropped and rerun on the patched rows
+        self.assertEqual(patched, [True])
+        self.assertEqual(applied, [['a', 'b']])
+
+    async def test_errors_reach_the_caller(self):
+        def compute():
+            raise ValueError("boom")
+
+        async def apply(result):
+            pass
+
+        scheduler = FilterScheduler(compute, apply, delay=0)
+        with self.assertRaises(ValueError):
+            await scheduler.request()
+        # A failed pass does not block later ones
+        scheduler._compute = lambda: 1
+        await scheduler.request()
+
+    async def test_superseded_failure_is_ignored(self):
+        applied = []
+
+        async def apply(result):
+            applied.append(result)
+
+        scheduler = FilterScheduler(None, apply, delay=0)
+
+        def compute():
+            # A newer request arrives, but the failure surfaces before its cancel lands
+            scheduler._generation += 1
+            raise IndexError("rows changed")
+
+        scheduler._compute = compute
+        scheduler._generation = 1
+        done = asyncio.get_running_loop().create_future()
+        await scheduler._run(1, done)
+        # Left for the newer pass to resolve
+        self.assertFalse(done.done())
+
+        scheduler._compute = lambda: 2
+        await scheduler._run(2, done)
+        self.assertIsNone(await done)
+        self.assertEqual(applied, [2])
+
+if __name__ == '__main__':
+    unittest.main()
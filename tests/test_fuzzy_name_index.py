@@ -0,0 +1,51 @@
+import unittest
+from src.core.models import ApiCard
+from src.services.text_index import FuzzyNameIndex, CardTextIndex, normalize_name
+from src.services.filter_engine import FilterColumns
+
+def card(id, name):
+    return ApiCard(id=id, name=name, type="Normal Monster", frameType="normal", desc="")
+
+class TestFuzzyNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.cards = [
+            card(1, "Dark Magician"), card(2, "Dark Magician Girl"), card(3, "Blue-Eyes White Dragon"),
+            card(4, "Blue-Eyes Ultimate Dragon"), card(5, "Hinotama Soul"), card(6, "Raigeki"),
+            card(7, "Magician of Black Chaos"),
+        ]
+        self.index = FuzzyNameIndex(self.cards)
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name("  Blue-Eyes  White_Dragon!"), "blue eyes white dragon")
+
+    def test_exact_ignores_case_and_punctuation(self):
+        self.assertEqual(self.index.exact("blue eyes white dragon").id, 3)
+        self.assertIsNone(self.index.exact("Blue-Eyes"))
+
+    def test_best_matches_are_ranked(self):
+        matches = self.index.best_matches("Dark Magican", limit=2)
+        self.assertEqual([c.id for c, _ in matches], [1, 2])
+        self.assertGreater(matches[0][1], matches[1][1])
+
+        self.assertEqual(self.index.best_matches("Riagecki", limit=1)[0][0].id, 6)
+        self.assertEqual(self.index.best_matches("Hinotama Seele", cutoff=0.85), [])
+        self.assertEqual(self.index.best_matches(""), [])
+
+    def test_search_finds_misspelled_fragments(self):
+        self.assertEqual(sorted(self.index.search("blue eyes").tolist()), [3, 4])
+        self.assertEqual(sorted(self.index.search("magican").tolist()), [1, 2, 7])
+        self.assertEqual(self.index.search("xyz").tolist(), [])
+
+    def test_filter_search_falls_back_to_fuzzy_names(self):
+        text_index = CardTextIndex(self.cards)
+        cols = FilterColumns(self.cards, card_of=lambda c: c)
+
+        literal = cols.select(cols.mask({}, search_text="magician girl", text_index=text_index))
+        self.assertEqual([c.id for c in literal], [2])
+        fuzzy = cols.select(cols.mask({}, search_text="dark magican", text_index=text_index))
+        self.assertEqual([c.id for c in fuzzy], [1, 2])
+        # Without the shared index there is no fallback
+        self.assertEqual(cols.select(cols.mask({}, search_text="dark magican")), [])
+
+if __name__ == '__main__':
+    unittest.main()
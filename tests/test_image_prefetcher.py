@@ -0,0 +1,41 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+from src.services.image_prefetcher import ImagePrefetcher
+
+class TestImagePrefetcher(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        patcher = patch('src.services.image_prefetcher.image_manager')
+        self.image_manager = patcher.start()
+        self.image_manager.download_batch = AsyncMock()
+        self.addCleanup(patcher.stop)
+        self.prefetcher = ImagePrefetcher(idle_delay=0.01)
+
+    async def _settle(self):
+        await asyncio.sleep(0.05)
+
+    async def test_adjacent_pages_then_hovered_cards(self):
+        self.prefetcher.note_hover(7, "https://img/7.jpg")
+        self.prefetcher.note_hover(8, "https://img/8.jpg")
+        self.prefetcher.note_hover(8, "https://img/8.jpg")
+        self.prefetcher.note_hover(None, None)
+        self.prefetcher.schedule(2, 3, lambda p: {p: f"https://img/small/{p}.jpg"})
+        await self._settle()
+
+        calls = [(c.args[0], c.kwargs.get('high_res', False)) for c in self.image_manager.download_batch.await_args_list]
+        self.assertEqual(calls, [
+            ({3: "https://img/small/3.jpg"}, False),
+            ({1: "https://img/small/1.jpg"}, False),
+            ({8: "https://img/8.jpg", 7: "https://img/7.jpg"}, True),
+        ])
+        # Downloaded hovers are not fetched again
+        self.assertFalse(self.prefetcher._hovers)
+
+    async def test_cancel_drops_pending_work(self):
+        self.prefetcher.schedule(1, 5, lambda p: {p: f"https://img/small/{p}.jpg"})
+        self.prefetcher.cancel()
+        await self._settle()
+        self.image_manager.download_batch.assert_not_awaited()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,62 @@
+import unittest
+import tempfile
+import shutil
+import os
+from fastapi import FastAPI
+from starlette.testclient import TestClient
+from src.services.image_manager import ImageManager
+from src.services.image_routes import add_image_files, IMMUTABLE, REVALIDATE
+
+class TestImageRoutes(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        with open(os.path.join(self.tmp_dir, "46986414.jpg"), "wb") as f:
+            f.write(b"jpeg")
+
+        app = FastAPI()
+        add_image_files(app, '/images', self.tmp_dir, IMMUTABLE)
+        add_image_files(app, '/sets', self.tmp_dir, REVALIDATE)
+        self.client = TestClient(app)
+
+    def test_cache_headers_and_revalidation(self):
+        response = self.client.get('/images/46986414.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['cache-control'], IMMUTABLE)
+        etag = response.headers['etag']
+        self.assertFalse(etag.startswith('W/'))
+
+        response = self.client.get('/images/46986414.jpg', headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(response.headers['cache-control'], IMMUTABLE)
+
+        self.assertEqual(self.client.get('/sets/46986414.jpg').headers['cache-control'], REVALIDATE)
+        self.assertEqual(self.client.get('/sets/46986414.jpg?v=1a').headers['cache-control'], IMMUTABLE)
+
+        # Missing images must not be cached
+        response = self.client.get('/images/1.jpg')
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn(IMMUTABLE, response.headers.get('cache-control', ''))
+
+    def test_set_image_url_changes_when_replaced(self):
+        manager = ImageManager(images_dir=self.tmp_dir)
+        manager.sets_dir = self.tmp_dir
+        self.assertEqual(manager.get_set_image_url("LOB"), "/sets/LOB.jpg")
+
+        path = manager.get_set_image_path("LOB")
+        with open(path, "wb") as f:
+            f.write(b"old")
+        os.utime(path, ns=(1_000_000_000, 1_000_000_000))
+        first = manager.get_set_image_url("LOB")
+        self.assertTrue(first.startswith("/sets/LOB.jpg?v="))
+        self.assertEqual(manager.get_set_image_url("LOB"), first)
+
+        manager.remove_set_image("LOB")
+        self.assertFalse(os.path.exists(path))
+        with open(path, "wb") as f:
+            f.write(b"new")
+        self.assertNotEqual(manager.get_set_image_url("LOB"), first)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+from src.core.models import Collection, CollectionCard, ApiCard
+from src.core.ownership_index import OwnershipIndex
+from src.services.collection_editor import CollectionEditor
+
+class TestOwnershipIndex(unittest.TestCase):
+    def setUp(self):
+        self.collection = Collection(name="Owned")
+        self.card1 = ApiCard(id=1, name="Dark Magician", type="Normal Monster", frameType="normal", desc="")
+        self.card2 = ApiCard(id=2, name="Pot of Greed", type="Spell Card", frameType="spell", desc="")
+
+    def _snapshot(self, index: OwnershipIndex):
+        return (dict(index.totals), index._variant_qty, index._printing_qty, index._languages,
+                index._conditions, index._storage, {k: id(v) for k, v in index._cards.items()})
+
+    def _assert_matches_rebuild(self):
+        self.assertEqual(self._snapshot(self.collection.ownership),
+                         self._snapshot(OwnershipIndex.from_collection(self.collection)))
+
+    def test_incremental_updates_match_full_rebuild(self):
+        # Build the index before mutating so every change goes through the incremental path
+        self.assertIsNone(self.collection.ownership.card(1))
+
+        CollectionEditor.apply_change(self.collection, self.card1, "LOB-EN005", "Ultra Rare", "EN", 3, "Near Mint", False, mode='ADD')
+        CollectionEditor.apply_change(self.collection, self.card1, "LOB-DE005", "Ultra Rare", "DE", 1, "Played", False,
+                                      mode='ADD', storage_location="Binder")
+        CollectionEditor.apply_change(self.collection, self.card2, "LOB-119", "Rare", "EN", 2, "Near Mint", True, mode='ADD')
+        self._assert_matches_rebuild()
+
+        ownership = self.collection.ownership
+        self.assertIs(ownership.card(1), self.collection.cards[0])
+        self.assertEqual(ownership.total(1), 4)
+        self.assertEqual(ownership.printing_total(1, "LOB-005", "Ultra Rare"), 4)
+        self.assertEqual(set(ownership.languages(1)), {"EN", "DE"})
+        self.assertEqual(set(ownership.conditions(1)), {"Near Mint", "Played"})
+        self.assertEqual(dict(ownership.storage(1)), {None: 3, "Binder": 1})
+
+        CollectionEditor.rename_storage_location(self.collection, "Binder", "Box")
+        CollectionEditor.apply_change(self.collection, self.card1, "LOB-EN005", "Ultra Rare", "EN", 0, "Near Mint", False, mode='SET')
+        CollectionEditor.apply_change(self.collection, self.card2, "LOB-119", "Rare", "EN", -2, "Near Mint", True, mode='ADD')
+        self._assert_matches_rebuild()
+
+        self.assertEqual(dict(ownership.totals), {1: 1})
+        self.assertEqual(set(ownership.languages(1)), {"DE"})
+        self.assertEqual(dict(ownership.storage(1)), {"Box": 1})
+        self.assertIsNone(ownership.card(2))
+        self.assertEqual(ownership.total(2), 0)
+
+    def test_editor_lookups_use_the_index(self):
+        CollectionEditor.apply_change(self.collection, self.card1, "SDY-006", "Ultra Rare", "EN", 2, "Near Mint", False, mode='ADD')
+        CollectionEditor.apply_change(self.collection, self.card1, "SDY-006", "Ultra Rare", "EN", 1, "Near Mint", False, mode='ADD')
+        # The second change found the existing card instead of adding a duplicate
+        self.assertEqual(len(self.collection.cards), 1)
+        self.assertEqual(CollectionEditor.get_total_quantity(self.collection, 1, set_code="SDY-006", rarity="Ultra Rare"), 3)
+
+    def test_first_duplicate_card_wins(self):
+        first = CollectionCard(card_id=1, name="Dark Magician")
+        second = CollectionCard(card_id=1, name="Dark Magician")
+        collection = Collection(name="Dupes", cards=[first, second])
+        self.assertIs(collection.ownership.card(1), first)
+
+        CollectionEditor.apply_change(collection, self.card1, "SDY-006", "Ultra Rare", "EN", 1, "Near Mint", False, mode='ADD')
+        self.assertEqual(len(first.variants), 1)
+        self.assertEqual(second.variants, [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import tempfile
+import shutil
+import os
+import json
+from unittest.mock import patch
+from src.core.persistence import PersistenceManager, FILE_HEADER_KEY
+from src.core.models import Collection, CollectionCard, CollectionVariant, CollectionEntry, StorageDefinition
+
+class TestPersistenceTrustedLoad(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.pm = PersistenceManager(data_dir=self.tmp_dir, decks_dir=os.path.join(self.tmp_dir, "decks"))
+        self.collection = Collection(
+            name="Trusted",
+            cards=[
+                CollectionCard(card_id=1, name="Dark Magician", variants=[
+                    CollectionVariant(variant_id="v1", set_code="SDY-006", rarity="Ultra Rare", entries=[
+                        CollectionEntry(condition="Played", language="DE", quantity=2, storage_location="Box A", market_value=1.5)
+                    ])
+                ])
+            ],
+            storage_definitions=[StorageDefinition(name="Box A")]
+        )
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_roundtrip_uses_fast_path(self):
+        self.pm.save_collection(self.collection, "trusted.json")
+
+        with patch('src.core.persistence.Collection', wraps=Collection) as mock_col:
+            loaded = self.pm.load_collection("trusted.json")
+            mock_col.assert_not_called()
+
+        self.assertEqual(loaded.model_dump(), self.collection.model_dump())
+        self.assertEqual(loaded.total_cards, 2)
+        self.assertIsInstance(loaded.cards[0].variants[0].entries[0], CollectionEntry)
+
+    def test_hand_edited_file_is_validated(self):
+        self.pm.save_collection(self.collection, "edited.json")
+        path = os.path.join(self.tmp_dir, "edited.json")
+
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        data['cards'][0]['variants'][0]['entries'][0]['condition'] = "Destroyed"
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+
+        # Checksum no longer matches, so the Literal condition check must run
+        with self.assertRaises(Exception):
+            self.pm.load_collection("edited.json")
+
+    def test_foreign_file_without_header(self):
+        path = os.path.join(self.tmp_dir, "foreign.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.collection.model_dump(mode='json'), f)
+
+        loaded = self.pm.load_collection("foreign.json")
+        self.assertEqual(loaded.model_dump(), self.collection.model_dump())
+
+    def test_yaml_roundtrip(self):
+        self.pm.save_collection(self.collection, "trusted.yaml")
+        loaded = self.pm.load_collection("trusted.yaml")
+        self.assertEqual(loaded.model_dump(), self.collection.model_dump())
+
+    def test_header_written(self):
+        self.pm.save_collection(self.collection, "header.json")
+        with open(os.path.join(self.tmp_dir, "header.json"), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self.assertIn(FILE_HEADER_KEY, data)
+        self.assertIn('checksum', data[FILE_HEADER_KEY])
+
+if __name__ == '__main__':
+    unittest.main()
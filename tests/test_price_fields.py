@@ -0,0 +1,43 @@
+import unittest
+from src.core.models import ApiCard, ApiCardPrice, ApiCardSet, parse_price
+from src.services.filter_engine import tcgplayer_price
+from src.services.ygo_api import parse_cards_data
+
+def card_data(**prices):
+    return {
+        "id": 1, "name": "Card", "type": "Normal Monster", "frameType": "normal", "desc": "",
+        "card_sets": [{"set_name": "Set", "set_code": "LOB-EN001", "set_rarity": "Common", "set_price": "1.25"}],
+        "card_prices": [prices],
+    }
+
+class TestPriceFields(unittest.TestCase):
+    def test_parse_price(self):
+        self.assertEqual(parse_price("3.50"), 3.5)
+        for value in (None, "", "n/a"):
+            self.assertEqual(parse_price(value), 0.0)
+
+    def test_loaded_database_is_parsed(self):
+        card = parse_cards_data([card_data(cardmarket_price="0.40", tcgplayer_price="0.25", coolstuffinc_price="bad")])[0]
+        self.assertEqual(card.card_prices[0]._values, (0.4, 0.25, 0.0, 0.25))
+        self.assertEqual(card.card_sets[0]._price, ("1.25", 1.25))
+        self.assertEqual(card.lowest_price, 0.25)
+        self.assertEqual(card.tcgplayer_price, 0.25)
+        self.assertEqual(tcgplayer_price(card), 0.25)
+
+    def test_lowest_price(self):
+        # A listed zero counts, missing and malformed prices do not
+        self.assertEqual(ApiCardPrice(cardmarket_price="0.00", tcgplayer_price="2").lowest, 0.0)
+        self.assertEqual(ApiCardPrice(cardmarket_price="x", tcgplayer_price="2", coolstuffinc_price="3").lowest, 2.0)
+        self.assertEqual(ApiCardPrice().lowest, 0.0)
+        self.assertEqual(ApiCard(**{**card_data(), "card_prices": []}).lowest_price, 0.0)
+
+    def test_set_price_edits_are_reparsed(self):
+        s = ApiCardSet(set_name="Set", set_code="LOB-EN001", set_rarity="Common", set_price="1.25")
+        self.assertEqual(s.price, 1.25)
+        s.set_price = "4.00"
+        self.assertEqual(s.price, 4.0)
+        s.set_price = None
+        self.assertEqual(s.price, 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from src.core.utils import parse_set_code, normalize_set_code, extract_language_code, is_set_code_compatible
+from src.core.models import ApiCardSet, CollectionVariant, cache_code_parts
+from src.services.ygo_api import parse_cards_data
+
+class TestSetCodeParts(unittest.TestCase):
+    def test_fields(self):
+        self.assertEqual(tuple(parse_set_code('LOB-G020')), ('LOB-G020', 'LOB', 'G', 'DE', '020', 'LOB-020'))
+        self.assertEqual(tuple(parse_set_code('SDY-006')), ('SDY-006', 'SDY', None, 'EN', '006', 'SDY-006'))
+        self.assertEqual(parse_set_code('SGX2-END16').normalized, 'SGX2-D16')
+        self.assertEqual(tuple(parse_set_code('ABC')), ('ABC', 'ABC', None, 'EN', '', 'ABC'))
+
+        # The helpers agree with the parsed fields
+        for code in ('LOB-G020', 'RA01-FR054', 'SDY-006', 'ABC'):
+            parts = parse_set_code(code)
+            self.assertEqual(normalize_set_code(code), parts.normalized)
+            self.assertEqual(extract_language_code(code), parts.language)
+            for lang in ('EN', 'de', 'FR'):
+                self.assertEqual(is_set_code_compatible(code, lang), parts.is_compatible(lang))
+
+    def test_parts_are_shared(self):
+        code = ''.join(['LOB', '-EN001'])
+        self.assertIs(parse_set_code(code), parse_set_code('LOB-EN001'))
+        self.assertIs(parse_set_code(code).normalized, parse_set_code('LOB-DE001').normalized)
+
+    def test_models_cache_parts(self):
+        variant = CollectionVariant(variant_id="v1", set_code="LOB-E001", rarity="Ultra Rare")
+        self.assertIs(variant.code_parts, variant.code_parts)
+        self.assertEqual(variant.code_parts.language, 'EN')
+
+        # Reassigned codes are reparsed
+        variant.set_code = "LOB-G001"
+        self.assertEqual(variant.code_parts.language, 'DE')
+
+        constructed = CollectionVariant.model_construct(variant_id="v2", set_code="MRD-F060", rarity="Rare")
+        cache_code_parts([constructed])
+        self.assertEqual(constructed.code_parts.normalized, 'MRD-060')
+        self.assertIs(constructed.set_code, parse_set_code('MRD-F060').code)
+
+    def test_loaded_database_is_parsed(self):
+        cards = parse_cards_data([{
+            "id": 1, "name": "Dark Magician", "type": "Normal Monster", "frameType": "normal", "desc": "",
+            "card_sets": [{"set_name": "Starter Deck: Yugi", "set_code": "SDY-006", "set_rarity": "Ultra Rare"}]
+        }])
+        card_set = cards[0].card_sets[0]
+        self.assertIsInstance(card_set, ApiCardSet)
+        self.assertIsNotNone(card_set._code_parts)
+        self.assertEqual(card_set.code_parts.prefix, 'SDY')
+
+if __name__ == '__main__':
+    unittest.main()
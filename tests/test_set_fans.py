@@ -0,0 +1,98 @@
+import asyncio
+import unittest
+import tempfile
+import shutil
+import os
+from unittest.mock import AsyncMock, MagicMock, patch
+from PIL import Image
+from src.core.models import ApiCard, ApiCardImage, ApiCardSet
+from src.services.image_manager import ImageManager
+from src.services.shared_view_models import SharedViewModels
+from src.services.set_fans import SetFans, build_set_fan_cards
+
+def card(id, sets):
+    return ApiCard(id=id, name=f"Card {id}", type="Normal Monster", frameType="normal", desc="",
+                   card_images=[ApiCardImage(id=id, image_url=f"http://x/{id}.jpg", image_url_small=f"http://x/s/{id}.jpg")],
+                   card_sets=[ApiCardSet(set_name="Set", set_code=c, set_rarity=r) for c, r in sets])
+
+class TestSetFans(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.images = ImageManager(images_dir=os.path.join(self.tmp_dir, "images"))
+        self.images.download_batch = AsyncMock()
+        self.cards = [
+            card(1, [("LOB-001", "Common"), ("SDY-001", "Ultra Rare")]),
+            card(2, [("LOB-002", "Ultra Rare")]),
+            card(3, [("LOB-003", "Secret Rare"), ("LOB-EN003", "Common")]),
+        ]
+        for image_id, color in ((1, "red"), (2, "green"), (3, "blue")):
+            Image.new("RGB", (42, 61), color).save(self.images.get_local_path(image_id), "JPEG")
+
+        self.version = 1
+        service = MagicMock()
+        service.get_db_version.side_effect = lambda lang: self.version
+        service.load_card_database = AsyncMock(side_effect=lambda lang: self.cards)
+        shared = SharedViewModels()
+        self.patchers = [
+            patch('src.services.set_fans.image_manager', self.images),
+            patch('src.services.set_fans.ygo_service', service),
+            patch('src.services.shared_view_models.ygo_service', service),
+            patch('src.services.set_fans.shared_view_models', shared),
+            patch('src.services.set_fans.run.io_bound', new=AsyncMock(side_effect=lambda f, *args: f(*args))),
+        ]
+        for p in self.patchers:
+            p.start()
+            self.addCleanup(p.stop)
+        self.fans = SetFans(fans_dir=os.path.join(self.tmp_dir, "sets", "fans"), size=(100, 150))
+
+    def test_rarest_cards_per_prefix(self):
+        fans = build_set_fan_cards(self.cards)
+        self.assertEqual([i for i, _ in fans['lob']], [3, 2, 1])
+        self.assertEqual(fans['sdy'], ((1, "http://x/s/1.jpg"),))
+        self.assertEqual([i for i, _ in build_set_fan_cards(self.cards, limit=2)['lob']], [3, 2])
+
+    def test_renders_once_per_database(self):
+        self.assertIsNone(self.fans.cached_url("LOB"))
+        url = asyncio.run(self.fans.get("LOB"))
+        self.assertTrue(url.startswith("/sets/fans/lob_"))
+        self.assertEqual(self.fans.cached_url("LOB-EN001"), url)
+
+        path = os.path.join(self.fans.fans_dir, os.path.basename(url))
+        with Image.open(path) as img:
+            self.assertEqual(img.size, (100, 150))
+            # The rarest card is drawn on top, in the center
+            r, g, b = img.getpixel((50, 85))
+            self.assertGreater(b, max(r, g))
+        self.images.download_batch.assert_awaited_once()
+
+        # A new database with the same fan reuses the file
+        self.version = 2
+        self.assertIsNone(self.fans.cached_url("LOB"))
+        mtime = os.stat(path).st_mtime_ns
+        self.assertEqual(asyncio.run(self.fans.get("LOB")), url)
+        self.assertEqual(os.stat(path).st_mtime_ns, mtime)
+
+        # A changed fan replaces the old file
+        self.version = 3
+        self.cards = self.cards[1:]
+        updated = asyncio.run(self.fans.get("LOB"))
+        self.assertNotEqual(updated, url)
+        self.assertEqual(os.listdir(self.fans.fans_dir), [os.path.basename(updated)])
+
+    def test_no_fan_without_images(self):
+        self.assertIsNone(asyncio.run(self.fans.get("XYZ")))
+        self.assertIn("xyz", self.fans._urls)
+
+        # Failed downloads are retried on the next request
+        os.remove(self.images.get_local_path(1))
+        self.assertIsNone(asyncio.run(self.fans.get("SDY")))
+        self.assertEqual(os.listdir(self.fans.fans_dir), [])
+        self.assertNotIn("sdy", self.fans._urls)
+
+        Image.new("RGB", (42, 61), "red").save(self.images.get_local_path(1), "JPEG")
+        self.assertIsNotNone(asyncio.run(self.fans.get("SDY")))
+        self.assertEqual(self.images.download_batch.await_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
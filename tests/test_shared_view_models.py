@@ -0,0 +1,83 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import sys
+
+# Mock nicegui
+mock_ui = MagicMock()
+sys.modules['nicegui'] = mock_ui
+sys.modules['nicegui.ui'] = mock_ui
+
+from src.core.models import ApiCard, ApiCardSet, Collection
+from src.services.collection_editor import CollectionEditor
+from src.services.shared_view_models import SharedViewModels
+from src.ui.collection import (build_consolidated_vms, build_collector_rows, build_card_vm, build_card_collector_rows,
+                               catalog_view_models, catalog_collector_blocks)
+
+def card(id, name, sets):
+    return ApiCard(id=id, name=name, type="Normal Monster", frameType="normal", desc="",
+                   card_sets=[ApiCardSet(set_name=n, set_code=c, set_rarity=r, set_price="1.00") for c, n, r in sets])
+
+class TestSharedViewModels(unittest.TestCase):
+    def setUp(self):
+        self.versions = {'en': 1}
+        patcher = patch('src.services.shared_view_models.ygo_service')
+        patcher.start().get_db_version.side_effect = lambda lang: self.versions.get(lang, 0)
+        self.addCleanup(patcher.stop)
+        self.shared = SharedViewModels()
+
+    def test_built_once_per_version_and_key(self):
+        builds = []
+        def build():
+            builds.append(1)
+            return [len(builds)]
+
+        first = self.shared.get('library', 'en', build, 'EN')
+        self.assertIs(self.shared.get('library', 'en', build, 'EN'), first)
+        self.assertIsNot(self.shared.get('library', 'en', build, 'DE'), first)
+        self.assertEqual(len(builds), 2)
+
+        self.versions['en'] = 2
+        self.assertEqual(self.shared.get('library', 'en', build, 'EN'), [3])
+        # Entries of the old database were dropped
+        self.assertEqual(list(self.shared._entries), [('library', 'en', 'EN')])
+
+    def test_overlays_reuse_unowned_view_models(self):
+        cards = [
+            card(1, "Dark Magician", [("SDY-006", "Starter Deck: Yugi", "Ultra Rare")]),
+            card(2, "Blue-Eyes White Dragon", [("LOB-001", "Legend of Blue Eyes", "Ultra Rare")]),
+        ]
+        collection = Collection(name="Test")
+        CollectionEditor.apply_change(collection, cards[1], "LOB-001", "Ultra Rare", "EN", 2, "Near Mint", False, mode='ADD')
+        owned = {c.card_id: c for c in collection.cards}
+
+        unowned = [build_card_vm(c, None) for c in cards]
+        vms = build_consolidated_vms(cards, owned, unowned)
+        self.assertEqual(vms, build_consolidated_vms(cards, owned))
+        self.assertIs(vms[0], unowned[0])
+        self.assertEqual(vms[1].owned_quantity, 2)
+
+        blocks = [build_card_collector_rows(c, None, 'EN') for c in cards]
+        rows = build_collector_rows(cards, owned, 'EN', blocks)
+        self.assertEqual(rows, build_collector_rows(cards, owned, 'EN'))
+        self.assertIs(rows[0], blocks[0][0])
+        self.assertEqual(rows[1].owned_count, 2)
+
+    def test_catalog_rows_match_the_callers_cards(self):
+        cards = [card(1, "Dark Magician", [("SDY-006", "Starter Deck: Yugi", "Ultra Rare")])]
+        with patch('src.ui.collection.shared_view_models', self.shared):
+            vms = catalog_view_models(cards, 'en')
+            self.assertIs(catalog_view_models(cards, 'en'), vms)
+            blocks = catalog_collector_blocks(cards, 'en', 'EN')
+            self.assertIs(catalog_collector_blocks(cards, 'en', 'EN'), blocks)
+
+            # The catalog was reloaded, but the shared rows were built from the other card list
+            reloaded = [card(1, "Dark Magician", [("SDY-006", "Starter Deck: Yugi", "Ultra Rare")]),
+                        card(2, "Blue-Eyes White Dragon", [("LOB-001", "Legend of Blue Eyes", "Ultra Rare")])]
+            self.assertEqual([vm.api_card for vm in catalog_view_models(reloaded, 'en')], reloaded)
+            self.assertIs(catalog_view_models(reloaded[:1], 'en')[0].api_card, reloaded[0])
+            self.assertEqual([b[0].api_card for b in catalog_collector_blocks(reloaded, 'en', 'EN')], reloaded)
+            # The shared rows are left to the callers they were built for
+            self.assertIs(catalog_view_models(cards, 'en'), vms)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import asyncio
+import unittest
+import tempfile
+import shutil
+import os
+from unittest.mock import AsyncMock, patch
+from PIL import Image
+from src.services.image_manager import ImageManager
+from src.services.sprite_sheets import SpriteSheets
+
+class TestSpriteSheets(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.tmp_dir)
+        self.images = ImageManager(images_dir=os.path.join(self.tmp_dir, "images"))
+        for image_id, color in ((1, "red"), (2, "green"), (3, "blue")):
+            self._write_image(image_id, color)
+
+        self.patchers = [
+            patch('src.services.sprite_sheets.image_manager', self.images),
+            patch('src.services.sprite_sheets.run.io_bound', new=AsyncMock(side_effect=lambda f, *args: f(*args))),
+        ]
+        for p in self.patchers:
+            p.start()
+            self.addCleanup(p.stop)
+        self.sheets = SpriteSheets(sprites_dir=os.path.join(self.tmp_dir, "sprites"), tile_size=(20, 30), columns=2)
+
+    def _write_image(self, image_id, color):
+        Image.new("RGB", (42, 61), color).save(self.images.get_local_path(image_id), "JPEG")
+
+    def test_composes_local_images_once(self):
+        sheet = asyncio.run(self.sheets.get([1, 2, 3, 4, 2]))
+        self.assertEqual(sheet.positions, {1: (0, 0), 2: (20, 0), 3: (0, 30)})
+        self.assertEqual((sheet.width, sheet.height), (40, 60))
+
+        path = os.path.join(self.sheets.sprites_dir, os.path.basename(sheet.url))
+        with Image.open(path) as img:
+            self.assertEqual(img.size, (40, 60))
+            r, g, b = img.getpixel((30, 15))
+            self.assertGreater(g, max(r, b))
+
+        self.assertIs(asyncio.run(self.sheets.get([1, 2, 3, 4])), sheet)
+
+        # Recomposed once the missing thumbnail is local
+        self._write_image(4, "white")
+        updated = asyncio.run(self.sheets.get([1, 2, 3, 4]))
+        self.assertIn(4, updated.positions)
+        self.assertNotEqual(updated.url, sheet.url)
+
+    def test_no_sheet_without_local_images(self):
+        self.assertIsNone(asyncio.run(self.sheets.get([7, 8])))
+        self.assertIsNone(asyncio.run(self.sheets.get([])))
+
+    def test_unreadable_images_are_not_retried_on_every_call(self):
+        with open(self.images.get_local_path(2), "wb") as f:
+            f.write(b"not a jpeg")
+        sheet = asyncio.run(self.sheets.get([1, 2, 3]))
+        self.assertEqual(set(sheet.positions), {1, 3})
+        self.assertEqual(sheet.failed, {2})
+        self.assertIs(asyncio.run(self.sheets.get([1, 2, 3])), sheet)
+
+        # A later compose does not take the partial sheet for a complete one
+        again = asyncio.run(SpriteSheets(sprites_dir=self.sheets.sprites_dir, tile_size=(20, 30), columns=2).get([1, 2, 3]))
+        self.assertEqual(set(again.positions), {1, 3})
+        self._write_image(2, "green")
+        fixed = asyncio.run(SpriteSheets(sprites_dir=self.sheets.sprites_dir, tile_size=(20, 30), columns=2).get([1, 2, 3]))
+        self.assertEqual(set(fixed.positions), {1, 2, 3})
+        self.assertNotEqual(fixed.url, sheet.url)
+
+    def test_sprite_files_stay_bounded(self):
+        sheets = SpriteSheets(sprites_dir=self.sheets.sprites_dir, tile_size=(20, 30), columns=2, cache_size=2)
+        urls = [asyncio.run(sheets.get(ids)).url for ids in ([1], [2], [1, 2, 3], [3])]
+        # Evicted sheets are deleted
+        self.assertEqual(sorted(os.listdir(sheets.sprites_dir)), sorted(os.path.basename(u) for u in urls[2:]))
+
+        # On startup only the newest cache_size files are kept
+        for n, name in enumerate(("a.jpg", "b.jpg", "c.jpg")):
+            path = os.path.join(sheets.sprites_dir, name)
+            open(path, "wb").close()
+            os.utime(path, (2_000_000_000 + n, 2_000_000_000 + n))
+        SpriteSheets(sprites_dir=sheets.sprites_dir, cache_size=2)
+        self.assertEqual(sorted(os.listdir(sheets.sprites_dir)), ["b.jpg", "c.jpg"])
+
+if __name__ == '__main__':
+    unittest.main()
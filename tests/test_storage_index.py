@@ -0,0 +1,53 @@
+import unittest
+from src.core.models import Collection, CollectionCard, CollectionVariant, CollectionEntry, ApiCard
+from src.core.storage_index import StorageIndex
+from src.services.collection_editor import CollectionEditor
+
+class TestStorageIndex(unittest.TestCase):
+    def setUp(self):
+        self.collection = Collection(name="Stored", cards=[
+            CollectionCard(card_id=1, name="Dark Magician", variants=[
+                CollectionVariant(variant_id="v1", set_code="SDY-006", rarity="Ultra Rare", entries=[
+                    CollectionEntry(quantity=2, storage_location="Box A", market_value=1.5),
+                    CollectionEntry(quantity=1, language="DE", market_value=1.0),
+                ])
+            ])
+        ])
+        self.card1 = ApiCard(id=1, name="Dark Magician", type="Normal Monster", frameType="normal", desc="")
+        self.card2 = ApiCard(id=2, name="Pot of Greed", type="Spell Card", frameType="spell", desc="")
+
+    def _snapshot(self, index: StorageIndex):
+        refs = {loc: sorted((r.card_id, r.variant.variant_id, r.entry.language, r.quantity) for r in index.entries(loc))
+                for loc in index._refs}
+        return refs, dict(index.quantities), {loc: round(v, 6) for loc, v in index._value.items()}
+
+    def _assert_matches_rebuild(self):
+        self.assertEqual(self._snapshot(self.collection.storage_index),
+                         self._snapshot(StorageIndex.from_collection(self.collection)))
+
+    def test_incremental_updates_match_full_rebuild(self):
+        index = self.collection.storage_index
+        self.assertEqual(dict(index.quantities), {"Box A": 2, None: 1})
+        self.assertEqual(index.value("Box A"), 3.0)
+
+        CollectionEditor.move_card(self.collection, self.card1, "SDY-006", "Ultra Rare", "DE", "Near Mint", False,
+                                   from_storage=None, to_storage="Box A", variant_id="v1")
+        CollectionEditor.apply_change(self.collection, self.card2, "LOB-119", "Rare", "EN", 4, "Near Mint", False,
+                                      mode='ADD', storage_location="Binder")
+        self._assert_matches_rebuild()
+        self.assertEqual(dict(index.quantities), {"Box A": 3, "Binder": 4})
+        self.assertEqual([r.entry.language for r in index.entries("Box A")], ["EN", "DE"])
+        self.assertEqual(list(index.entries(None)), [])
+
+        CollectionEditor.rename_storage_location(self.collection, "Box A", "Binder")
+        CollectionEditor.apply_change(self.collection, self.card2, "LOB-119", "Rare", "EN", 0, "Near Mint", False,
+                                      mode='SET', storage_location="Binder")
+        self._assert_matches_rebuild()
+        self.assertEqual(dict(index.quantities), {"Binder": 3})
+        self.assertEqual(index.quantity("Box A"), 0)
+        self.assertEqual(index.value("Binder"), 3.0)
+        # Refs point at the live entries
+        self.assertTrue(all(r.entry.quantity == r.quantity for r in index.entries("Binder")))
+
+if __name__ == '__main__':
+    unittest.main()
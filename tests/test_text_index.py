@@ -0,0 +1,75 @@
+import unittest
+import asyncio
+from unittest.mock import patch, AsyncMock
+from src.core.models import ApiCard
+from src.services.text_index import TextIndex, CardTextIndex
+from src.services.filter_engine import FilterColumns
+from src.services.ygo_api import YugiohService
+
+class TestTextIndex(unittest.TestCase):
+    def setUp(self):
+        self.texts = [
+            "Dark Magician", "Dark Magician Girl", "Blue-Eyes White Dragon",
+            "The ultimate wizard in terms of attack and defense.", "", "Magicians' Souls", "Élémentaire"
+        ]
+        self.index = TextIndex(self.texts)
+
+    def _brute(self, query):
+        return [i for i, t in enumerate(self.texts) if query.lower() in t.lower()]
+
+    def test_matches_plain_substring_semantics(self):
+        for query in ["magician", "MAGIC", "ian g", "dark magician girl", "-eyes", "ark", "zzz", "élé",
+                      "a", "da", "s' s", "wizard in terms"]:
+            self.assertEqual(self.index.positions(query).tolist(), self._brute(query), query)
+
+    def test_candidates_are_narrowed_by_trigrams(self):
+        self.assertIsNone(self.index.candidates("ma"))
+        self.assertEqual(self.index.candidates("girl").tolist(), [1])
+        # Every trigram present, but not contiguously: a candidate the verification step drops
+        index = TextIndex(["abcd bcde", "abcde"])
+        self.assertEqual(index.candidates("abcde").tolist(), [0, 1])
+        self.assertEqual(index.positions("abcde").tolist(), [1])
+
+    def test_ids_and_empty_index(self):
+        index = TextIndex(["abc", "xabcx"], ids=[7, 9])
+        self.assertEqual(index.search("abc").tolist(), [7, 9])
+        self.assertEqual(TextIndex([]).search("abc").tolist(), [])
+
+class TestCardTextIndex(unittest.TestCase):
+    def setUp(self):
+        self.cards = [
+            ApiCard(id=10, name="Dark Magician", type="Normal Monster", frameType="normal",
+                    desc="The ultimate wizard.", archetype="Dark Magician"),
+            ApiCard(id=20, name="Pot of Greed", type="Spell Card", frameType="spell", desc="Draw 2 cards."),
+        ]
+
+    def test_filter_columns_use_shared_index_and_cover_missing_cards(self):
+        index = CardTextIndex(self.cards)
+        extra = ApiCard(id=30, name="Custom Wizard", type="Normal Monster", frameType="normal", desc="")
+        cols = FilterColumns(self.cards + [extra], card_of=lambda c: c)
+
+        found = cols.select(cols.search("wizard", ('name', 'desc'), text_index=index))
+        self.assertEqual([c.id for c in found], [10, 30])
+        found = cols.select(cols.mask({}, search_text="draw", text_index=index))
+        self.assertEqual([c.id for c in found], [20])
+        self.assertEqual(index.search("dark magician", ('archetype',)).tolist(), [10])
+
+    def test_service_rebuilds_index_per_database_version(self):
+        service = YugiohService.__new__(YugiohService)
+        service._cards_cache = {"en": self.cards}
+        service._db_versions = {}
+        service._text_indexes = {}
+
+        first = service.get_text_index("en")
+        self.assertIs(service.get_text_index("en"), first)
+
+        renamed = self.cards[1].model_copy(update={"name": "Pot of Avarice"})
+        with patch.object(service, '_save_db_file'), patch('src.services.ygo_api.run.io_bound', new=AsyncMock()):
+            asyncio.run(service.save_card_database([self.cards[0], renamed], "en"))
+
+        second = service.get_text_index("en")
+        self.assertIsNot(second, first)
+        self.assertEqual(second.search("avarice", ('name',)).tolist(), [20])
+
+if __name__ == '__main__':
+    unittest.main()